@@ -15,7 +15,9 @@ dotenv.config();
 
 const app = express();
 app.use(cors());
-app.use(json());
+// POST /notifications/bulk carries up to 1000 notifications per request,
+// well above body-parser's 100kb default
+app.use(json({ limit: process.env.JSON_BODY_LIMIT || "5mb" }));
 
 app.use(
   "/api-docs",
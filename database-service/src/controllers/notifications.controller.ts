@@ -18,6 +18,19 @@ export function createNotificationsController(service: NotificationsService) {
       }
     },
 
+    sendNotificationsBulk: async (
+      req: Request,
+      res: Response,
+      next: NextFunction
+    ) => {
+      try {
+        const created = await service.sendNotificationsBulk(req.body);
+        res.status(201).json(created);
+      } catch (err) {
+        next(err);
+      }
+    },
+
     listNotifications: async (
       req: Request,
       res: Response,
@@ -83,6 +96,7 @@ const defaultController = createNotificationsController(
 export default defaultController;
 
 export const sendNotification = defaultController.sendNotification;
+export const sendNotificationsBulk = defaultController.sendNotificationsBulk;
 export const listNotifications = defaultController.listNotifications;
 export const getNotification = defaultController.getNotification;
 export const updateNotification = defaultController.updateNotification;
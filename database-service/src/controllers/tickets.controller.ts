@@ -22,7 +22,12 @@ export function createTicketsController(service: TicketsService) {
       try {
         const page = req.query.page ? Number(req.query.page) : 1;
         const pageSize = req.query.pageSize ? Number(req.query.pageSize) : 100;
-        const items = await service.listTickets({}, { page, pageSize });
+        // optional bulk lookup: ?ids=a,b,c returns only those tickets
+        const ids = req.query.ids
+          ? String(req.query.ids).split(",").map((id) => id.trim()).filter(Boolean)
+          : [];
+        const filter = ids.length ? { id: { in: ids } } : {};
+        const items = await service.listTickets(filter, { page, pageSize });
         res.json(items);
       } catch (err) {
         next(err);
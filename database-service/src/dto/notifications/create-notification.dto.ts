@@ -5,3 +5,8 @@ export interface CreateNotificationDTO {
   message: string;
   recipients: string[]; // array of emails or phone numbers
 }
+
+export interface CreateNotificationsBulkDTO {
+  // sentAt: when the notification was actually sent (defaults to now)
+  notifications: (CreateNotificationDTO & { sentAt?: string | null })[];
+}
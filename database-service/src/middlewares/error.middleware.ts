@@ -4,5 +4,5 @@ export function errorHandler(err: any, _req: Request, res: Response, _next: Next
   console.error(err);
   const status = err?.status || 500;
   const message = err?.message || 'Internal Server Error';
-  res.status(status).json({ error: message });
+  res.status(status).json({ error: message, ...(err?.details ?? {}) });
 }
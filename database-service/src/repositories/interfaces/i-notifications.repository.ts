@@ -16,6 +16,14 @@ export interface INotificationsRepository {
     sentAt?: Date | null;
   }): Promise<Notification>;
 
+  // single INSERT for the whole batch (all rows or none)
+  createMany(data: {
+    type: "EMAIL" | "SMS";
+    message: string;
+    recipients: string[];
+    sentAt?: Date | null;
+  }[]): Promise<Notification[]>;
+
   findById(id: string): Promise<Notification | null>;
 
   findAll(filter?: Record<string, any>, pagination?: { page: number; pageSize: number }): Promise<Notification[]>;
@@ -33,6 +33,7 @@ export interface ITicketsRepository {
     type: string
   ): Promise<TicketEntity | null>;
 
-  // atomic purchase: decrement available and increment sold if enough available; returns true if succeeded
-  purchaseAtomic(ticketId: string, qty: number): Promise<boolean>;
+  // atomic purchase: decrement available and increment sold if enough available;
+  // returns the updated ticket if succeeded, null otherwise
+  purchaseAtomic(ticketId: string, qty: number): Promise<TicketEntity | null>;
 }
@@ -1,3 +1,4 @@
+import { randomUUID } from "node:crypto";
 import { prisma } from "../../prisma/client.js";
 import type { INotificationsRepository, Notification } from "../interfaces/i-notifications.repository.js";
 
@@ -14,6 +15,21 @@ export class PrismaNotificationsRepository implements INotificationsRepository {
     return created as unknown as Notification;
   }
 
+  async createMany(data: { type: "EMAIL" | "SMS"; message: string; recipients: string[]; sentAt?: Date | null; }[]) {
+    // Postgres does not guarantee RETURNING order for a multi-row INSERT, so
+    // ids are generated here and the rows are matched back to the input by id
+    const rows = data.map((d) => ({
+      id: randomUUID(),
+      type: d.type,
+      message: d.message,
+      recipients: d.recipients,
+      sentAt: d.sentAt ?? null,
+    }));
+    const created = await prisma.notification.createManyAndReturn({ data: rows });
+    const byId = new Map(created.map((n) => [n.id, n]));
+    return rows.map((row) => byId.get(row.id)) as unknown as Notification[];
+  }
+
   async findById(id: string) {
     const res = await prisma.notification.findUnique({ where: { id } });
     return (res as unknown) as Notification | null;
@@ -74,7 +74,7 @@ export interface ITicketsRepository {
     type: string
   ): Promise<TicketEntity | null>;
 
-  purchaseAtomic(ticketId: string, qty: number): Promise<boolean>;
+  purchaseAtomic(ticketId: string, qty: number): Promise<TicketEntity | null>;
 }
 
 /* ---------- Implementación usando Prisma ---------- */
@@ -120,7 +120,8 @@ export class PrismaTicketsRepository implements ITicketsRepository {
       where: filter,
       skip,
       take,
-      orderBy: { createdAt: "desc" },
+      // id desempata filas con el mismo createdAt: paginación estable
+      orderBy: [{ createdAt: "desc" }, { id: "asc" }],
     });
     return items.map(mapPrismaTicketToEntity);
   }
@@ -164,12 +165,14 @@ export class PrismaTicketsRepository implements ITicketsRepository {
 
   /**
    * Atomic purchase attempt: decrement quantityAvailable and increment quantitySold
-   * Returns true if update happened (enough stock), false otherwise.
+   * Returns the updated ticket if update happened (enough stock), null otherwise.
    *
-   * We use updateMany with a conditional where quantityAvailable >= qty to ensure atomicity.
+   * We use updateManyAndReturn (UPDATE ... RETURNING) with a conditional where
+   * quantityAvailable >= qty to ensure atomicity; the returned row is the one
+   * this purchase wrote, not a later read that may include other buyers.
    */
-  async purchaseAtomic(ticketId: string, qty: number): Promise<boolean> {
-    const res = await prisma.ticket.updateMany({
+  async purchaseAtomic(ticketId: string, qty: number): Promise<TicketEntity | null> {
+    const rows = await prisma.ticket.updateManyAndReturn({
       where: {
         id: ticketId,
         quantityAvailable: { gte: qty },
@@ -179,6 +182,6 @@ export class PrismaTicketsRepository implements ITicketsRepository {
         quantitySold: { increment: qty },
       },
     });
-    return (res as any).count > 0;
+    return rows.length > 0 ? mapPrismaTicketToEntity(rows[0]) : null;
   }
 }
@@ -26,6 +26,52 @@ const router = Router();
  */
 router.post("/notifications", ctrl.sendNotification);
 
+/**
+ * @openapi
+ * /notifications/bulk:
+ *   post:
+ *     summary: Register already sent notifications in one write
+ *     tags:
+ *       - Notifications
+ *     requestBody:
+ *       required: true
+ *       content:
+ *         application/json:
+ *           schema:
+ *             type: object
+ *             properties:
+ *               notifications:
+ *                 type: array
+ *                 maxItems: 1000
+ *                 items:
+ *                   allOf:
+ *                     - $ref: '#/components/schemas/NotificationCreate'
+ *                     - type: object
+ *                       properties:
+ *                         sentAt:
+ *                           type: string
+ *                           format: date-time
+ *     responses:
+ *       '201':
+ *         description: Notifications created, ids in request order
+ *         content:
+ *           application/json:
+ *             schema:
+ *               type: object
+ *               properties:
+ *                 count:
+ *                   type: integer
+ *                 ids:
+ *                   type: array
+ *                   items:
+ *                     type: string
+ *       '400':
+ *         description: Invalid notification (nothing is stored)
+ *       '413':
+ *         description: Too many notifications
+ */
+router.post("/notifications/bulk", ctrl.sendNotificationsBulk);
+
 /**
  * @openapi
  * /notifications:
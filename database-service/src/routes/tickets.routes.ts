@@ -51,6 +51,11 @@ router.post("/", createTicket);
  *         name: pageSize
  *         schema:
  *           type: integer
+ *       - in: query
+ *         name: ids
+ *         description: Comma-separated ticket ids to fetch in one call
+ *         schema:
+ *           type: string
  *     responses:
  *       '200':
  *         description: List of tickets
@@ -122,8 +127,27 @@ router.get("/availability", availability);
  *             schema:
  *               type: object
  *               properties:
+ *                 ticketId:
+ *                   type: string
+ *                 quantity:
+ *                   type: integer
  *                 status:
  *                   type: string
+ *                 ticket:
+ *                   $ref: '#/components/schemas/Ticket'
+ *       '404':
+ *         description: Ticket not found
+ *       '409':
+ *         description: Not enough tickets available
+ *         content:
+ *           application/json:
+ *             schema:
+ *               type: object
+ *               properties:
+ *                 error:
+ *                   type: string
+ *                 quantityAvailable:
+ *                   type: integer
  */
 router.post("/purchase", purchaseTicket);
 
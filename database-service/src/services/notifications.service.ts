@@ -1,8 +1,18 @@
 import type { INotificationsRepository } from "../repositories/interfaces/i-notifications.repository.js";
-import type { CreateNotificationDTO } from "../dto/notifications/create-notification.dto.js";
+import type {
+  CreateNotificationDTO,
+  CreateNotificationsBulkDTO,
+} from "../dto/notifications/create-notification.dto.js";
 import type { UpdateNotificationDTO } from "../dto/notifications/update-notification.dto.js";
 import { PrismaNotificationsRepository } from "../repositories/prisma/prisma-notifications.repository.js";
 
+// upper bound for POST /notifications/bulk (one INSERT per request)
+export const MAX_BULK_NOTIFICATIONS = 1000;
+
+function httpError(status: number, message: string) {
+  return Object.assign(new Error(message), { status });
+}
+
 export class NotificationsService {
   constructor(private repo: INotificationsRepository) {}
 
@@ -14,13 +24,19 @@ export class NotificationsService {
     return t === "EMAIL" || t === "SMS";
   }
 
-  async sendNotification(dto: CreateNotificationDTO) {
-    if (!this.validateType(dto.type))
-      throw new Error("Invalid notification type");
+  private validationError(dto: CreateNotificationDTO): string | null {
+    if (!dto || !this.validateType(dto.type))
+      return "Invalid notification type";
     if (!dto.message || dto.message.trim().length === 0)
-      throw new Error("Message is required");
+      return "Message is required";
     if (!Array.isArray(dto.recipients) || dto.recipients.length === 0)
-      throw new Error("Recipients required");
+      return "Recipients required";
+    return null;
+  }
+
+  async sendNotification(dto: CreateNotificationDTO) {
+    const error = this.validationError(dto);
+    if (error) throw new Error(error);
 
     // persist unsent
     const created = await this.repo.create({ ...dto, sentAt: null });
@@ -32,6 +48,38 @@ export class NotificationsService {
     return updated;
   }
 
+  // Persist notifications that were already sent (e.g. a campaign batch from
+  // notifications-service) in one write. Every item is validated first, so
+  // an invalid item rejects the whole batch with 400 and nothing is stored
+  async sendNotificationsBulk(dto: CreateNotificationsBulkDTO) {
+    const items = dto?.notifications;
+    if (!Array.isArray(items) || items.length === 0)
+      throw httpError(400, "Notifications required");
+    if (items.length > MAX_BULK_NOTIFICATIONS)
+      throw httpError(
+        413,
+        `Too many notifications (max ${MAX_BULK_NOTIFICATIONS})`
+      );
+
+    const now = new Date();
+    const data = items.map((item, index) => {
+      const error = this.validationError(item);
+      if (error) throw httpError(400, `notifications[${index}]: ${error}`);
+      const sentAt = item.sentAt ? new Date(item.sentAt) : now;
+      if (Number.isNaN(sentAt.getTime()))
+        throw httpError(400, `notifications[${index}]: Invalid sentAt`);
+      return {
+        type: item.type,
+        message: item.message,
+        recipients: item.recipients,
+        sentAt,
+      };
+    });
+
+    const created = await this.repo.createMany(data);
+    return { count: created.length, ids: created.map((n) => n.id) };
+  }
+
   async getNotificationById(id: string) {
     const n = await this.repo.findById(id);
     if (!n) throw new Error("Notification not found");
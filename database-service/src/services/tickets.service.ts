@@ -3,6 +3,14 @@ import type { CreateTicketDTO } from "../dto/tickets/create-ticket.dto.js";
 import type { UpdateTicketDTO } from "../dto/tickets/update-ticket.dto.js";
 import type { PurchaseTicketDTO } from "../dto/tickets/purchase-ticket.dto.js";
 
+/**
+ * Error carrying the HTTP status (and optional extra body fields) picked up
+ * by the error middleware.
+ */
+function httpError(status: number, message: string, details?: Record<string, unknown>) {
+  return Object.assign(new Error(message), { status, details });
+}
+
 export class TicketsService {
   constructor(private repo: ITicketsRepository) {}
 
@@ -70,15 +78,24 @@ export class TicketsService {
       if (!dto.eventId || !dto.ticketType)
         throw new Error("ticketId or (eventId+ticketType) required");
       const t = await this.repo.findByEventAndType(dto.eventId, dto.ticketType);
-      if (!t) throw new Error("Ticket not found");
+      if (!t) throw httpError(404, "Ticket not found");
       ticketId = t.id;
     }
 
     // attempt atomic purchase via repository
-    const ok = await this.repo.purchaseAtomic(ticketId, dto.quantity);
-    if (!ok) throw new Error("Not enough tickets available");
+    const ticket = await this.repo.purchaseAtomic(ticketId, dto.quantity);
+    if (!ticket) {
+      // distinguish unknown ticket from sold out so callers can map the error
+      const existing = await this.repo.findById(ticketId);
+      if (!existing) throw httpError(404, "Ticket not found");
+      throw httpError(409, "Not enough tickets available", {
+        quantityAvailable: existing.quantityAvailable,
+      });
+    }
+    // return the row written by this purchase so callers can price the
+    // receipt without a second round trip (a later read races other buyers)
     // optionally log purchase / associate with attendee — out of scope here
-    return { ticketId, quantity: dto.quantity, status: "purchased" };
+    return { ticketId, quantity: dto.quantity, status: "purchased", ticket };
   }
 
   async deleteTicket(id: string) {
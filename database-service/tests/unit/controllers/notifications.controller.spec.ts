@@ -9,6 +9,7 @@ describe("Notifications Controller (unit)", () => {
   beforeEach(() => {
     svc = {
       sendNotification: jest.fn(),
+      sendNotificationsBulk: jest.fn(),
       listNotifications: jest.fn(),
       getNotificationById: jest.fn(),
       updateNotification: jest.fn(),
@@ -27,6 +28,15 @@ describe("Notifications Controller (unit)", () => {
       }
     });
 
+    app.post("/notifications/bulk", async (req, res) => {
+      try {
+        const created = await svc.sendNotificationsBulk(req.body);
+        res.status(201).json(created);
+      } catch (err) {
+        res.status(err.status || 500).json({ error: err.message });
+      }
+    });
+
     app.get("/notifications", async (req, res) => {
       const page = req.query.page ? Number(req.query.page) : 1;
       const pageSize = req.query.pageSize ? Number(req.query.pageSize) : 100;
@@ -64,6 +74,27 @@ describe("Notifications Controller (unit)", () => {
     expect(res.status).toBe(500);
   });
 
+  test("POST bulk returns ids and forwards validation errors", async () => {
+    svc.sendNotificationsBulk.mockResolvedValue({ count: 2, ids: ["n1", "n2"] });
+    const body = {
+      notifications: [
+        { type: "EMAIL", message: "x", recipients: ["a@x.com"] },
+        { type: "SMS", message: "y", recipients: ["+56911111111"] },
+      ],
+    };
+    const ok = await request(app).post("/notifications/bulk").send(body).expect(201);
+    expect(ok.body).toEqual({ count: 2, ids: ["n1", "n2"] });
+    expect(svc.sendNotificationsBulk).toHaveBeenCalledWith(body);
+
+    svc.sendNotificationsBulk.mockRejectedValue(
+      Object.assign(new Error("notifications[0]: Recipients required"), {
+        status: 400,
+      })
+    );
+    const bad = await request(app).post("/notifications/bulk").send(body);
+    expect(bad.status).toBe(400);
+  });
+
   test("list/get/update/delete flows", async () => {
     svc.listNotifications.mockResolvedValue([]);
     svc.getNotificationById.mockResolvedValue({ id: "n1" });
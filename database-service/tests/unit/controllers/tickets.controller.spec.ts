@@ -45,6 +45,22 @@ describe("Tickets Controller (unit) via factory", () => {
     expect(next).toHaveBeenCalledWith(err);
   });
 
+  test("listTickets -> passes ids filter for bulk lookups", async () => {
+    const req: any = { query: { ids: "t1, t2,,t3", pageSize: "3" } };
+    const json = jest.fn();
+    const res: any = { json };
+    const next = jest.fn();
+    serviceMock.listTickets.mockResolvedValue([{ id: "t1" }]);
+
+    await controller.listTickets(req, res, next);
+
+    expect(serviceMock.listTickets).toHaveBeenCalledWith(
+      { id: { in: ["t1", "t2", "t3"] } },
+      { page: 1, pageSize: 3 }
+    );
+    expect(json).toHaveBeenCalledWith([{ id: "t1" }]);
+  });
+
   test("availability -> returns availability object", async () => {
     const req: any = { query: { eventId: "e1", type: "general" } };
     const json = jest.fn();
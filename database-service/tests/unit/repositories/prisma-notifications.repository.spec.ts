@@ -5,6 +5,7 @@ jest.unstable_mockModule("../../../src/prisma/client.js", () => {
     prisma: {
       notification: {
         create: jest.fn(),
+        createManyAndReturn: jest.fn(),
         findUnique: jest.fn(),
         findMany: jest.fn(),
         update: jest.fn(),
@@ -43,6 +44,38 @@ describe("PrismaNotificationsRepository (unit)", () => {
     expect(res).toEqual({ id: "n1" });
   });
 
+  test("createMany inserts every row in one call", async () => {
+    (prisma.notification.createManyAndReturn as jest.Mock).mockImplementation(
+      async ({ data }: any) => data
+    );
+    const sentAt = new Date();
+    const res = await repo.createMany([
+      { type: "EMAIL", message: "x", recipients: ["a@x.com"], sentAt },
+      { type: "SMS", message: "y", recipients: ["+56911111111"] },
+    ]);
+    expect(prisma.notification.createManyAndReturn).toHaveBeenCalledWith({
+      data: [
+        { id: expect.any(String), type: "EMAIL", message: "x", recipients: ["a@x.com"], sentAt },
+        { id: expect.any(String), type: "SMS", message: "y", recipients: ["+56911111111"], sentAt: null },
+      ],
+    });
+    expect(res.map((n: any) => n.message)).toEqual(["x", "y"]);
+  });
+
+  test("createMany returns rows in input order whatever order RETURNING uses", async () => {
+    (prisma.notification.createManyAndReturn as jest.Mock).mockImplementation(
+      async ({ data }: any) => [...data].reverse()
+    );
+    const res = await repo.createMany([
+      { type: "EMAIL", message: "first", recipients: ["a@x.com"] },
+      { type: "EMAIL", message: "second", recipients: ["b@x.com"] },
+      { type: "SMS", message: "third", recipients: ["+56911111111"] },
+    ]);
+    const { data } = (prisma.notification.createManyAndReturn as jest.Mock).mock.calls[0][0] as any;
+    expect(res.map((n: any) => n.id)).toEqual(data.map((d: any) => d.id));
+    expect(res.map((n: any) => n.message)).toEqual(["first", "second", "third"]);
+  });
+
   test("findById calls findUnique", async () => {
     (prisma.notification.findUnique as jest.Mock).mockResolvedValue({
       id: "n1",
@@ -11,6 +11,7 @@ describe("PrismaTicketsRepository (unit)", () => {
     (prisma as any).ticket = {
       findUnique: jest.fn(),
       updateMany: jest.fn(),
+      updateManyAndReturn: jest.fn(),
       findFirst: jest.fn(),
       create: jest.fn(),
       findMany: jest.fn(),
@@ -48,7 +49,7 @@ describe("PrismaTicketsRepository (unit)", () => {
       where: {},
       skip: 5,
       take: 5,
-      orderBy: { createdAt: "desc" },
+      orderBy: [{ createdAt: "desc" }, { id: "asc" }],
     });
     expect(Array.isArray(items)).toBe(true);
   });
@@ -135,14 +136,22 @@ describe("PrismaTicketsRepository (unit)", () => {
     expect(res2).toBeNull();
   });
 
-  test("purchaseAtomic -> returns true when updateMany affects a row, false otherwise", async () => {
-    (prisma as any).ticket.updateMany.mockResolvedValue({ count: 1 });
-    const ok = await repo.purchaseAtomic("t1", 2);
-    expect((prisma as any).ticket.updateMany).toHaveBeenCalled();
-    expect(ok).toBe(true);
+  test("purchaseAtomic -> returns the updated row when the update applies, null otherwise", async () => {
+    (prisma as any).ticket.updateManyAndReturn.mockResolvedValue([
+      { id: "t1", type: "GENERAL", price: 10, quantityAvailable: 3, quantitySold: 2, eventId: "e1" },
+    ]);
+    const ticket = await repo.purchaseAtomic("t1", 2);
+    expect((prisma as any).ticket.updateManyAndReturn).toHaveBeenCalledWith({
+      where: { id: "t1", quantityAvailable: { gte: 2 } },
+      data: {
+        quantityAvailable: { decrement: 2 },
+        quantitySold: { increment: 2 },
+      },
+    });
+    expect(ticket).toEqual(expect.objectContaining({ id: "t1", quantityAvailable: 3 }));
 
-    (prisma as any).ticket.updateMany.mockResolvedValue({ count: 0 });
-    const nok = await repo.purchaseAtomic("t1", 2);
-    expect(nok).toBe(false);
+    (prisma as any).ticket.updateManyAndReturn.mockResolvedValue([]);
+    const none = await repo.purchaseAtomic("t1", 2);
+    expect(none).toBeNull();
   });
 });
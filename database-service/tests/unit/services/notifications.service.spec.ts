@@ -1,5 +1,8 @@
 import { jest } from "@jest/globals";
-import { NotificationsService } from "../../../src/services/notifications.service.js";
+import {
+  MAX_BULK_NOTIFICATIONS,
+  NotificationsService,
+} from "../../../src/services/notifications.service.js";
 
 describe("NotificationsService (unit)", () => {
   let repo: any;
@@ -18,6 +21,7 @@ describe("NotificationsService (unit)", () => {
   beforeEach(() => {
     repo = {
       create: jest.fn(),
+      createMany: jest.fn(),
       update: jest.fn(),
       findById: jest.fn(),
       findAll: jest.fn(),
@@ -67,6 +71,66 @@ describe("NotificationsService (unit)", () => {
     expect(res.sentAt).toEqual(sentDate);
   });
 
+  test("bulk persists all items in one write and returns ids in order", async () => {
+    repo.createMany.mockResolvedValue([
+      { ...sample, id: "n1" },
+      { ...sample, id: "n2" },
+    ]);
+
+    const res = await svc.sendNotificationsBulk({
+      notifications: [
+        { type: "EMAIL", message: "a", recipients: ["a@x.com"] },
+        {
+          type: "SMS",
+          message: "b",
+          recipients: ["+56911111111"],
+          sentAt: "2026-01-01T00:00:00.000Z",
+        },
+      ],
+    });
+
+    expect(res).toEqual({ count: 2, ids: ["n1", "n2"] });
+    expect(repo.createMany).toHaveBeenCalledTimes(1);
+    const [rows] = repo.createMany.mock.calls[0];
+    expect(rows[0].sentAt).toEqual(expect.any(Date));
+    expect(rows[1].sentAt).toEqual(new Date("2026-01-01T00:00:00.000Z"));
+    expect(repo.create).not.toHaveBeenCalled();
+  });
+
+  test("bulk rejects the whole batch on an invalid item", async () => {
+    await expect(
+      svc.sendNotificationsBulk({
+        notifications: [
+          { type: "EMAIL", message: "a", recipients: ["a@x.com"] },
+          { type: "EMAIL", message: "", recipients: ["a@x.com"] },
+        ],
+      })
+    ).rejects.toMatchObject({
+      status: 400,
+      message: "notifications[1]: Message is required",
+    });
+    await expect(
+      svc.sendNotificationsBulk({
+        notifications: [
+          { type: "EMAIL", message: "a", recipients: ["a@x.com"], sentAt: "nope" },
+        ],
+      })
+    ).rejects.toMatchObject({ status: 400 });
+    await expect(
+      svc.sendNotificationsBulk({ notifications: [] })
+    ).rejects.toMatchObject({ status: 400, message: "Notifications required" });
+    expect(repo.createMany).not.toHaveBeenCalled();
+  });
+
+  test("bulk rejects batches over the limit", async () => {
+    const item = { type: "EMAIL" as const, message: "a", recipients: ["a@x.com"] };
+    await expect(
+      svc.sendNotificationsBulk({
+        notifications: Array(MAX_BULK_NOTIFICATIONS + 1).fill(item),
+      })
+    ).rejects.toMatchObject({ status: 413 });
+  });
+
   test("get/list/update/delete forwarding", async () => {
     repo.findById.mockResolvedValue(sample);
     repo.findAll.mockResolvedValue([sample]);
@@ -47,24 +47,44 @@ describe("TicketsService (unit)", () => {
 
   test("purchaseTicket -> success path when atomic purchase succeeds", async () => {
     repoMock.findByEventAndType.mockResolvedValue(ticket);
-    repoMock.purchaseAtomic.mockResolvedValue(true);
-    repoMock.findById.mockResolvedValue({ ...ticket, quantityAvailable: 3, quantitySold: 2 });
+    repoMock.purchaseAtomic.mockResolvedValue({ ...ticket, quantityAvailable: 3, quantitySold: 2 });
 
     const payload = { eventId: "e1", ticketType: "general", quantity: 2 };
     const res = await service.purchaseTicket(payload);
     expect(repoMock.findByEventAndType).toHaveBeenCalledWith("e1", "general");
     expect(repoMock.purchaseAtomic).toHaveBeenCalledWith("t1", 2);
+    // the receipt comes from the atomic update, not from a later read
+    expect(repoMock.findById).not.toHaveBeenCalled();
     // adapt expectation to actual shape returned by your service
-    expect(res).toEqual({ ticketId: "t1", quantity: 2, status: "purchased" });
+    expect(res).toEqual({
+      ticketId: "t1",
+      quantity: 2,
+      status: "purchased",
+      ticket: { ...ticket, quantityAvailable: 3, quantitySold: 2 },
+    });
   });
 
-  test("purchaseTicket -> throws when not enough stock (atomic returns false)", async () => {
+  test("purchaseTicket -> throws when not enough stock (atomic returns null)", async () => {
     repoMock.findByEventAndType.mockResolvedValue(ticket);
-    repoMock.purchaseAtomic.mockResolvedValue(false);
+    repoMock.purchaseAtomic.mockResolvedValue(null);
+    repoMock.findById.mockResolvedValue(ticket);
 
     await expect(
       service.purchaseTicket({ eventId: "e1", ticketType: "general", quantity: 10 })
-    ).rejects.toThrow("Not enough tickets available");
+    ).rejects.toMatchObject({
+      message: "Not enough tickets available",
+      status: 409,
+      details: { quantityAvailable: 5 },
+    });
+  });
+
+  test("purchaseTicket -> 404 when ticketId does not exist", async () => {
+    repoMock.purchaseAtomic.mockResolvedValue(null);
+    repoMock.findById.mockResolvedValue(null);
+
+    await expect(
+      service.purchaseTicket({ ticketId: "missing", quantity: 1 })
+    ).rejects.toMatchObject({ message: "Ticket not found", status: 404 });
   });
 
   test("createTicket -> validation errors and success", async () => {
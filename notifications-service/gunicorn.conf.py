@@ -0,0 +1,52 @@
+# Configuración de gunicorn para producción:
+#   gunicorn -c gunicorn.conf.py src.app:app
+# `python -m src.app` queda como servidor de desarrollo.
+import os
+import tempfile
+
+# los trabajos 202 se procesan en el worker que los aceptó: compartir su
+# estado para que la consulta responda desde cualquiera (antes de leer Config)
+os.environ.setdefault('DISPATCH_JOBS_PATH',
+                      os.path.join(tempfile.gettempdir(), 'notifications-jobs.db'))
+
+from src.config import Config  # noqa: E402
+
+bind = f"0.0.0.0:{Config.NOTIFICATIONS_PORT}"
+workers = Config.WEB_CONCURRENCY
+worker_class = 'gthread'
+threads = Config.WEB_THREADS
+keepalive = Config.KEEP_ALIVE_TIMEOUT
+
+# reciclar workers cada N solicitudes; el jitter evita reinicios simultáneos
+max_requests = Config.WEB_MAX_REQUESTS
+max_requests_jitter = Config.WEB_MAX_REQUESTS_JITTER
+
+timeout = Config.WEB_TIMEOUT
+graceful_timeout = Config.WEB_GRACEFUL_TIMEOUT
+
+# las llamadas a database-service no usan un pool compartido (requests.post
+# abre su propia conexión) y los hilos de la cola de envíos asíncronos se
+# crean con el primer trabajo, así que importar la app antes de forkear es seguro
+preload_app = Config.WEB_PRELOAD_APP
+
+
+def post_fork(server, worker):
+    """Reanudar el vaciado del outbox que haya dejado un worker anterior"""
+    from src.app import outbox_replayer
+    if outbox_replayer is not None:
+        outbox_replayer.start()
+
+
+def worker_exit(server, worker):
+    """Terminar los envíos encolados y cerrar las conexiones SMTP antes de salir"""
+    from src.app import batch_writer, close_channels, dispatcher, outbox_replayer
+    if not dispatcher.shutdown(Config.DISPATCH_SHUTDOWN_TIMEOUT):
+        server.log.warning("Worker %s exiting with %s queued notifications",
+                           worker.pid, dispatcher.stats()['depth'])
+    # los trabajos que terminaron arriba pueden haber dejado registros en el lote
+    if batch_writer is not None:
+        batch_writer.close(timeout=10)
+    close_channels()
+    # lo que quede en el outbox lo retoma el próximo worker
+    if outbox_replayer is not None:
+        outbox_replayer.stop(timeout=5)
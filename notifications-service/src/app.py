@@ -1,8 +1,25 @@
+from src.batch_writer import BatchWriter
+from src.channels import ChannelDispatcher, simulated_provider
 from src.config import Config
-from flask import Flask, request, jsonify
+from src.dispatch import Dispatcher, QueueFullError
+from src.job_store import JobStore
+from src.metrics import (
+    DB_CALL_DURATION,
+    DISPATCH_JOB_DURATION,
+    DISPATCH_QUEUE_WAIT,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_FLIGHT,
+    HTTP_RESPONSES,
+    REGISTRY
+)
+from src.outbox import Outbox, OutboxReplayer
+from src.smtp_pool import SMTPConnectionPool, SMTPProvider
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
+from metrics_core import CONTENT_TYPE, render_gauge, track_call
 import requests
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -47,95 +64,499 @@ def validate_notification_data(data):
     
     return errors
 
+def build_email_provider(config):
+    """Proveedor del canal EMAIL según EMAIL_PROVIDER"""
+    if config['EMAIL_PROVIDER'] == 'simulated':
+        return simulated_provider
+    if config['EMAIL_PROVIDER'] != 'smtp':
+        raise ValueError(f"Unknown EMAIL_PROVIDER: {config['EMAIL_PROVIDER']}")
+    pool = SMTPConnectionPool(
+        config['SMTP_HOST'], config['SMTP_PORT'],
+        size=config['SMTP_POOL_SIZE'],
+        timeout=config['SMTP_TIMEOUT'],
+        username=config['SMTP_USERNAME'],
+        password=config['SMTP_PASSWORD'],
+        starttls=config['SMTP_STARTTLS'],
+        max_messages=config['SMTP_MAX_MESSAGES_PER_CONNECTION']
+    )
+    return SMTPProvider(pool, config['SMTP_SENDER'], config['SMTP_SUBJECT'],
+                        pipelining=config['SMTP_PIPELINING'])
+
+
+EMAIL_CHANNEL = ChannelDispatcher(
+    'email', build_email_provider(app.config),
+    chunk_size=app.config['CHANNEL_CHUNK_SIZE'],
+    concurrency=app.config['CHANNEL_CONCURRENCY']
+)
+SMS_CHANNEL = ChannelDispatcher(
+    'sms', simulated_provider,
+    chunk_size=app.config['CHANNEL_CHUNK_SIZE'],
+    concurrency=app.config['CHANNEL_CONCURRENCY']
+)
+
+
+def close_channels():
+    """Cerrar los pools de los canales (al apagar el worker)"""
+    for channel in (EMAIL_CHANNEL, SMS_CHANNEL):
+        channel.shutdown()
+        if isinstance(channel.provider, SMTPProvider):
+            channel.provider.pool.close()
+
+
 def send_email(recipients, message):
     """
-    Simula envío de notificaciones por email
+    Envía notificaciones por email (bloques de destinatarios en paralelo)
     
     Args:
         recipients: lista de emails
         message: mensaje a enviar
     
     Returns:
-        True si el envío fue exitoso
+        ChannelResult con los enviados y los fallos por destinatario
     """
     print(f"📧 Sending EMAIL to {len(recipients)} recipients")
     print(f"   Message: {message}")
-    for recipient in recipients:
-        print(f"   → {recipient}")
-    return True
+    return EMAIL_CHANNEL.dispatch(recipients, message)
 
 
 def send_sms(recipients, message):
     """
-    Simula envío de notificaciones por SMS
+    Envía notificaciones por SMS (bloques de destinatarios en paralelo)
     
     Args:
         recipients: lista de números telefónicos
         message: mensaje a enviar
     
     Returns:
-        True si el envío fue exitoso
+        ChannelResult con los enviados y los fallos por destinatario
     """
     print(f"📱 Sending SMS to {len(recipients)} recipients")
     print(f"   Message: {message}")
-    for recipient in recipients:
-        print(f"   → {recipient}")
-    return True
+    return SMS_CHANNEL.dispatch(recipients, message)
 
 
-# =================== ENDPOINTS ===================
+class NotificationError(Exception):
+    """Falla del envío o de su registro en el servicio de BD"""
 
-@app.route('/api/notifications/send', methods=['POST'])
-def send_notification():
+
+def deliver_notification(data):
     """
-    Envía una notificación y la registra en el servicio de BD
+    Envía la notificación y la registra en el servicio de BD
+
+    Args:
+        data: dict validado con type, message, recipients
+
+    Returns:
+        ({'notification_id'} o, con el outbox, {'outbox_id'}; ChannelResult del envío)
+
+    Raises:
+        NotificationError con el mensaje de error para el cliente
     """
-    data = request.get_json()
-    
-    # Validar datos
-    errors = validate_notification_data(data)
-    if errors:
-        return jsonify({'errors': errors}), 400
-    
-    # Simular envío según tipo
+    # Enviar según tipo
     try:
         if data['type'] == 'EMAIL':
-            send_email(data['recipients'], data['message'])
+            result = send_email(data['recipients'], data['message'])
         else:  # SMS
-            send_sms(data['recipients'], data['message'])
+            result = send_sms(data['recipients'], data['message'])
     except Exception as e:
-        return jsonify({'error': f'Failed to send notification: {str(e)}'}), 500
+        raise NotificationError(f'Failed to send notification: {str(e)}')
     
-    # Preparar datos para guardar en BD
+    if result.sent_count == 0:
+        raise NotificationError(
+            f'Failed to send notification: all {result.failed_count} recipients failed')
+    
+    # Preparar datos para guardar en BD (solo los destinatarios alcanzados)
     notification_record = {
         'type': data['type'],
         'message': data['message'],
-        'recipients': data['recipients']
+        'recipients': result.delivered()
     }
     
+    # Con el outbox el registro queda en disco y se guarda en segundo plano
+    if outbox is not None:
+        try:
+            # el envío ya ocurrió: sentAt no debe ser la hora del reintento
+            sent_at = datetime.now(timezone.utc).isoformat(timespec='milliseconds')
+            outbox_id = outbox.append({**notification_record,
+                                       'sentAt': sent_at.replace('+00:00', 'Z')})
+        except Exception as e:
+            raise NotificationError(f'Outbox unavailable: {str(e)}')
+        outbox_replayer.start()
+        outbox_replayer.notify()
+        return {'outbox_id': outbox_id}, result
+    
+    # Con el writer por lotes el registro viaja junto con los de otras
+    # solicitudes en un POST /notifications/bulk
+    if batch_writer is not None:
+        try:
+            notification_id = batch_writer.submit(notification_record).result()
+        except NotificationError:
+            raise
+        except Exception as e:
+            raise NotificationError(f'Database service unavailable: {str(e)}')
+        return {'notification_id': notification_id}, result
+    
     # Guardar en el servicio de BD
     try:
-        response = requests.post(
+        response = post_notification_record(notification_record)
+    except Exception as e:
+        # Captura TODAS las excepciones (RequestException, timeout, etc)
+        raise NotificationError(f'Database service unavailable: {str(e)}')
+    
+    if response.status_code not in [200, 201]:
+        raise NotificationError('Failed to save notification to database')
+    
+    try:
+        return {'notification_id': response.json()['id']}, result
+    except Exception as e:
+        raise NotificationError(f'Database service unavailable: {str(e)}')
+
+
+def post_notification_record(record, operation='create_notification'):
+    """POST de un registro al servicio de BD"""
+    with track_call(DB_CALL_DURATION, operation):
+        return requests.post(
             f"{DB_SERVICE_URL}/notifications",
-            json=notification_record,
+            json=record,
             timeout=5
         )
-        
-        if response.status_code not in [200, 201]:
-            return jsonify({'error': 'Failed to save notification to database'}), 500
-        
-        created_notification = response.json()
-        
+
+
+def post_notification_batch(records, operation='create_notifications_bulk'):
+    """POST de varios registros al servicio de BD en una sola llamada"""
+    with track_call(DB_CALL_DURATION, operation):
+        return requests.post(
+            f"{DB_SERVICE_URL}/notifications/bulk",
+            json={'notifications': records},
+            timeout=5
+        )
+
+
+# =================== ESCRITURA POR LOTES ===================
+
+def save_single_record(record):
+    """id de BD del registro, o el NotificationError para su solicitud"""
+    try:
+        response = post_notification_record(record)
     except Exception as e:
-        # Captura TODAS las excepciones (RequestException, timeout, etc)
-        return jsonify({'error': f'Database service unavailable: {str(e)}'}), 500
+        return NotificationError(f'Database service unavailable: {str(e)}')
+    if response.status_code not in [200, 201]:
+        return NotificationError('Failed to save notification to database')
+    return response.json()['id']
+
+
+def save_notification_batch(records):
+    """
+    Guarda un lote del writer y devuelve el id de BD de cada registro. Si
+    database-service rechaza el lote (4xx: un registro inválido lo anula
+    entero) se guardan de a uno, para que solo falle el registro culpable
+    """
+    response = post_notification_batch(records)
+    if response.status_code in [200, 201]:
+        return response.json()['ids']
+    if 400 <= response.status_code < 500 and len(records) > 1:
+        return [save_single_record(record) for record in records]
+    raise NotificationError('Failed to save notification to database')
+
+
+def build_batch_writer(config):
+    """Writer por lotes, o None si BATCH_WRITER_ENABLED está apagado"""
+    if not config['BATCH_WRITER_ENABLED']:
+        return None
+    return BatchWriter(
+        save_notification_batch,
+        max_items=config['BATCH_WRITER_MAX_ITEMS'],
+        max_wait=config['BATCH_WRITER_MAX_WAIT_MS'] / 1000
+    )
+
+
+batch_writer = build_batch_writer(app.config)
+
+
+def batch_writer_metrics():
+    """Lotes y registros guardados por el writer (vacío si está apagado)"""
+    if batch_writer is None:
+        return []
+    stats = batch_writer.stats()
+    return (
+        render_gauge('notifications_batch_writer_pending',
+                     'Registros esperando lote para guardarse en database-service',
+                     [({}, stats['pending'])])
+        + render_gauge('notifications_batch_writer_batches_total',
+                       'Lotes enviados a POST /notifications/bulk',
+                       [({}, stats['batches'])], kind='counter')
+        + render_gauge('notifications_batch_writer_records_total',
+                       'Registros que salieron en un lote, por resultado',
+                       [({'outcome': 'saved'}, stats['records'] - stats['failed']),
+                        ({'outcome': 'failed'}, stats['failed'])],
+                       kind='counter')
+    )
+
+
+# =================== OUTBOX ===================
+
+def replay_notification_records(records):
+    """
+    Guarda registros del outbox en orden con una sola llamada a
+    /notifications/bulk. Si database-service rechaza el lote (4xx) se
+    guardan de a uno: un 4xx es un rechazo definitivo (False); ante un 5xx
+    o un error de red se detiene y el resto se reintenta
+    """
+    try:
+        response = post_notification_batch(records, 'replay_notifications_bulk')
+    except Exception:
+        return []
+    if response.status_code in [200, 201]:
+        return [True] * len(records)
+    if not 400 <= response.status_code < 500:
+        return []
+    results = []
+    for record in records:
+        try:
+            response = post_notification_record(record, 'replay_notification')
+        except Exception:
+            break
+        if response.status_code in [200, 201]:
+            results.append(True)
+        elif 400 <= response.status_code < 500:
+            results.append(False)
+        else:
+            break
+    return results
+
+
+def build_outbox(config):
+    """Outbox y su replayer, o (None, None) si OUTBOX_ENABLED está apagado"""
+    if not config['OUTBOX_ENABLED']:
+        return None, None
+    store = Outbox(config['OUTBOX_PATH'])
+    replayer = OutboxReplayer(
+        store, replay_notification_records,
+        batch_size=config['OUTBOX_BATCH_SIZE'],
+        interval=config['OUTBOX_INTERVAL'],
+        backoff=config['OUTBOX_BACKOFF'],
+        max_backoff=config['OUTBOX_MAX_BACKOFF'],
+        lease=config['OUTBOX_LEASE']
+    )
+    return store, replayer
+
+
+outbox, outbox_replayer = build_outbox(app.config)
+
+
+def outbox_metrics():
+    """Tamaño y retraso del outbox leídos al exportar (vacío si está apagado)"""
+    if outbox is None:
+        return []
+    stats = {**outbox.stats(), **outbox_replayer.stats()}
+    return (
+        render_gauge('notifications_outbox_size',
+                     'Registros del outbox pendientes de guardar en database-service',
+                     [({}, stats['size'])])
+        + render_gauge('notifications_outbox_lag_seconds',
+                       'Antigüedad del registro pendiente más viejo del outbox',
+                       [({}, stats['lag'])])
+        + render_gauge('notifications_outbox_replayed_total',
+                       'Registros del outbox que salieron por resultado',
+                       [({'outcome': 'saved'}, stats['flushed']),
+                        ({'outcome': 'rejected'}, stats['rejected'])],
+                       kind='counter')
+        + render_gauge('notifications_outbox_replay_errors_total',
+                       'Lotes del outbox que database-service no aceptó y se reintentan',
+                       [({}, stats['errors'])], kind='counter')
+    )
+
+
+# =================== ENVÍO ASÍNCRONO ===================
+
+def delivery_summary(saved, result):
+    """Cuerpo de respuesta común al modo síncrono y al estado del trabajo"""
+    summary = {
+        **saved,
+        'sent_count': result.sent_count,
+        'failed_count': result.failed_count
+    }
+    if result.failed_count:
+        summary['failures'] = result.failures()
+    return summary
+
+
+def run_dispatch_job(data):
+    """Trabajo de la cola: el mismo envío que el modo síncrono"""
+    return delivery_summary(*deliver_notification(data))
+
+
+def observe_dispatch_job(outcome, waited, duration):
+    DISPATCH_QUEUE_WAIT.observe(waited)
+    DISPATCH_JOB_DURATION.observe(duration, outcome)
+
+
+dispatcher = Dispatcher(
+    run_dispatch_job,
+    workers=app.config['DISPATCH_WORKERS'],
+    queue_size=app.config['DISPATCH_QUEUE_SIZE'],
+    max_jobs=app.config['DISPATCH_MAX_JOBS'],
+    retention=app.config['DISPATCH_JOB_RETENTION'],
+    observe=observe_dispatch_job,
+    # con varios workers de gunicorn, el estado compartido deja que cualquiera
+    # responda GET /api/notifications/jobs/<id>
+    store=JobStore(app.config['DISPATCH_JOBS_PATH']) if app.config['DISPATCH_JOBS_PATH'] else None
+)
+
+
+def wants_async_dispatch():
+    """Modo asíncrono por defecto o pedido con "Prefer: respond-async" (RFC 7240)"""
+    if app.config['DISPATCH_ASYNC_DEFAULT']:
+        return True
+    preferences = request.headers.get('Prefer', '')
+    return any(p.split(';')[0].strip().lower() == 'respond-async'
+               for p in preferences.split(','))
+
+
+def dispatch_metrics():
+    """Estado de la cola de envíos asíncronos leído al exportar"""
+    stats = dispatcher.stats()
+    return (
+        render_gauge('notifications_dispatch_queue_depth',
+                     'Envíos asíncronos esperando un worker',
+                     [({}, stats['depth'])])
+        + render_gauge('notifications_dispatch_queue_capacity',
+                       'Capacidad de la cola de envíos asíncronos',
+                       [({}, stats['capacity'])])
+        + render_gauge('notifications_dispatch_workers_busy',
+                       'Workers de la cola enviando en este momento',
+                       [({}, stats['busy'])])
+        + render_gauge('notifications_dispatch_jobs_total',
+                       'Trabajos asíncronos terminados o rechazados por resultado',
+                       [({'outcome': outcome}, stats[outcome])
+                        for outcome in ('sent', 'failed', 'rejected')],
+                       kind='counter')
+        + render_gauge('notifications_dispatch_recipients_total',
+                       'Destinatarios alcanzados por trabajos asíncronos enviados',
+                       [({}, stats['recipients'])],
+                       kind='counter')
+    )
+
+
+def smtp_metrics():
+    """Estado del pool SMTP del canal EMAIL (vacío con el proveedor simulado)"""
+    if not isinstance(EMAIL_CHANNEL.provider, SMTPProvider):
+        return []
+    stats = EMAIL_CHANNEL.provider.pool.stats()
+    return (
+        render_gauge('notifications_smtp_connections_idle',
+                     'Conexiones SMTP abiertas y ociosas en el pool',
+                     [({}, stats['idle'])])
+        + render_gauge('notifications_smtp_connections_opened_total',
+                       'Conexiones SMTP abiertas por el pool',
+                       [({}, stats['opened'])], kind='counter')
+        + render_gauge('notifications_smtp_connection_failures_total',
+                       'Conexiones SMTP que fallaron al abrirse o durante un envío',
+                       [({}, stats['failed'])], kind='counter')
+        + render_gauge('notifications_smtp_messages_total',
+                       'Transacciones SMTP (una por destinatario) enviadas por el pool',
+                       [({}, stats['messages'])], kind='counter')
+    )
+
+
+# =================== MÉTRICAS ===================
+
+@app.before_request
+def start_request_timer():
+    g.metrics_start = time.perf_counter()
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+
+
+@app.after_request
+def record_response_status(response):
+    g.metrics_status = response.status_code
+    return response
+
+
+@app.teardown_request
+def observe_request(error):
+    """Registra latencia y código de estado por plantilla de ruta"""
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return
+    HTTP_REQUESTS_IN_FLIGHT.dec()
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, request.method, route)
+    HTTP_RESPONSES.inc(request.method, route, str(g.pop('metrics_status', 500)))
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Métricas en formato de exposición de Prometheus"""
+    return Response(REGISTRY.render(
+        dispatch_metrics() + smtp_metrics() + outbox_metrics() + batch_writer_metrics()),
+        content_type=CONTENT_TYPE)
+
+
+# =================== ENDPOINTS ===================
+
+@app.route('/api/notifications/send', methods=['POST'])
+def send_notification():
+    """
+    Envía una notificación y la registra en el servicio de BD.
+
+    Con "Prefer: respond-async" (o DISPATCH_ASYNC_DEFAULT) valida, encola
+    y responde 202 con el id del trabajo; 503 si la cola está llena
+    """
+    data = request.get_json()
     
-    return jsonify({
-        'status': 'sent',
-        'notification_id': created_notification['id'],
-        'sent_count': len(data['recipients'])
-    }), 201
+    # Validar datos
+    errors = validate_notification_data(data)
+    if errors:
+        return jsonify({'errors': errors}), 400
+    
+    notification = {
+        'type': data['type'],
+        'message': data['message'],
+        'recipients': data['recipients']
+    }
     
+    # Modo asíncrono: encolar y responder de inmediato
+    if wants_async_dispatch():
+        try:
+            job = dispatcher.submit(notification)
+        except QueueFullError as e:
+            response = jsonify({'error': str(e)})
+            response.headers['Retry-After'] = str(app.config['DISPATCH_RETRY_AFTER'])
+            return response, 503
+        status_url = f"/api/notifications/jobs/{job.id}"
+        response = jsonify({'status': 'queued', 'job_id': job.id, 'status_url': status_url})
+        response.headers['Location'] = status_url
+        response.headers['Preference-Applied'] = 'respond-async'
+        return response, 202
+    
+    try:
+        saved, result = deliver_notification(notification)
+    except NotificationError as e:
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({'status': 'sent', **delivery_summary(saved, result)}), 201
+
+
+@app.route('/api/notifications/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Estado de un envío asíncrono
+
+    Response 200:
+    {
+        "job_id": "uuid",
+        "status": "queued" | "sending" | "sent" | "failed",
+        "notification_id": "uuid",   (si se envió)
+        "error": "string",           (si falló)
+        ...
+    }
+    """
+    job = dispatcher.status(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job), 200
+
 @app.route('/api/notifications/history', methods=['GET'])
 def get_history():
     """
@@ -147,10 +568,11 @@ def get_history():
     }
     """
     try:
-        response = requests.get(
-            f"{DB_SERVICE_URL}/notifications",
-            timeout=5
-        )
+        with track_call(DB_CALL_DURATION, 'list_notifications'):
+            response = requests.get(
+                f"{DB_SERVICE_URL}/notifications",
+                timeout=5
+            )
         
         if response.status_code == 200:
             notifications = response.json()
@@ -176,10 +598,11 @@ def get_notification(notification_id):
     }
     """
     try:
-        response = requests.get(
-            f"{DB_SERVICE_URL}/notifications/{notification_id}",
-            timeout=5
-        )
+        with track_call(DB_CALL_DURATION, 'get_notification'):
+            response = requests.get(
+                f"{DB_SERVICE_URL}/notifications/{notification_id}",
+                timeout=5
+            )
         
         if response.status_code == 200:
             return jsonify(response.json()), 200
@@ -214,7 +637,8 @@ def health_check():
     # Verificar conexión con servicio de BD
     try:
         # Intentar hacer un GET simple al servicio de BD
-        response = requests.get(f"{DB_SERVICE_URL}/notifications", timeout=2)
+        with track_call(DB_CALL_DURATION, 'health_check'):
+            response = requests.get(f"{DB_SERVICE_URL}/notifications", timeout=2)
         
         if response.status_code == 200:
             service_info['database_connection'] = 'ok'
@@ -241,7 +665,9 @@ def index():
             'send': 'POST /api/notifications/send',
             'history': 'GET /api/notifications/history',
             'get_one': 'GET /api/notifications/<id>',
-            'health': 'GET /api/notifications/health'
+            'job_status': 'GET /api/notifications/jobs/<job_id>',
+            'health': 'GET /api/notifications/health',
+            'metrics': 'GET /metrics'
         }
     }), 200
 
@@ -251,4 +677,6 @@ if __name__ == '__main__':
     print(f"🚀 Notifications Service running on http://localhost:{port}")
     print(f"📊 Database Service URL: {DB_SERVICE_URL}")
     print(f"📋 API Documentation: http://localhost:{port}/")
+    if outbox_replayer is not None:
+        outbox_replayer.start()
     app.run(debug=app.config['DEBUG'], port=port, host='0.0.0.0')
\ No newline at end of file
@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+
+class BatchWriterClosed(Exception):
+    """El writer se está apagando y no acepta más registros"""
+
+
+class BatchWriter:
+    """
+    Junta los registros que llegan de varios hilos y los guarda con una sola
+    llamada. Un lote sale al reunir `max_items` o cuando el más viejo lleva
+    `max_wait` segundos esperando, lo que ocurra primero.
+
+    `flush(records)` recibe el lote en orden y devuelve un resultado por
+    registro; un resultado que es una excepción se entrega como error de ese
+    registro, y si `flush` lanza, todo el lote falla. Cada `submit` devuelve
+    un Future con su resultado. El hilo se crea con el primer registro
+    (después del fork de gunicorn).
+    """
+
+    def __init__(self, flush: Callable[[List[dict]], list], max_items: int = 100,
+                 max_wait: float = 0.005):
+        self.flush = flush
+        self.max_items = max(1, max_items)
+        self.max_wait = max_wait
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._counts = {'batches': 0, 'records': 0, 'failed': 0}
+
+    def submit(self, record: dict) -> Future:
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise BatchWriterClosed('Batch writer is closed')
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='batch-writer',
+                                                daemon=True)
+                self._thread.start()
+            self._pending.append((record, future, time.monotonic()))
+            # despertar al hilo con el primer registro (arranca el plazo) y al
+            # completar un lote; los intermedios no cambian nada
+            if len(self._pending) in (1, self.max_items):
+                self._cond.notify()
+        return future
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Guardar lo pendiente sin esperar el plazo y detener el hilo"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {**self._counts, 'pending': len(self._pending)}
+
+    def _next_batch(self) -> list:
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if self._pending:
+                deadline = self._pending[0][2] + self.max_wait
+                while len(self._pending) < self.max_items and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            count = min(len(self._pending), self.max_items)
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            try:
+                results = list(self.flush([record for record, _, _ in batch]))
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f'flush returned {len(results)} results for {len(batch)} records')
+            except Exception as e:
+                results = [e] * len(batch)
+            # contar antes de resolver: quien espera el Future ve stats al día
+            failed = sum(isinstance(result, BaseException) for result in results)
+            with self._cond:
+                self._counts['batches'] += 1
+                self._counts['records'] += len(batch)
+                self._counts['failed'] += failed
+            for (_, future, _), result in zip(batch, results):
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
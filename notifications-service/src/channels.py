@@ -0,0 +1,155 @@
+import asyncio
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Mapping, Optional, Sequence
+
+# Un proveedor recibe un bloque de destinatarios y el mensaje, y devuelve
+# {índice dentro del bloque: error} para los que fallaron (None o {} si todos
+# se enviaron). Si lanza una excepción falla el bloque completo. Puede ser
+# una función bloqueante o una corrutina.
+Provider = Callable[[Sequence[str], str], Optional[Mapping[int, str]]]
+
+
+class ChannelResult:
+    """
+    Resultado compacto de un envío: solo se guarda el error de los
+    destinatarios que fallaron, el resto se da por enviado
+    """
+
+    __slots__ = ('recipients', 'errors')
+
+    def __init__(self, recipients: Sequence[str], errors: Optional[Dict[int, str]] = None):
+        self.recipients = recipients
+        self.errors = errors or {}
+
+    @property
+    def sent_count(self) -> int:
+        return len(self.recipients) - len(self.errors)
+
+    @property
+    def failed_count(self) -> int:
+        return len(self.errors)
+
+    def delivered(self) -> list:
+        """Destinatarios enviados, en el orden original"""
+        if not self.errors:
+            return list(self.recipients)
+        return [r for i, r in enumerate(self.recipients) if i not in self.errors]
+
+    def failures(self, limit: int = 100) -> list:
+        """Muestra de los fallos (los primeros `limit`) para la respuesta"""
+        return [{'recipient': self.recipients[i], 'error': error}
+                for i, error in sorted(self.errors.items())[:limit]]
+
+
+class ChannelDispatcher:
+    """
+    Reparte los destinatarios de un canal en bloques de `chunk_size` y los
+    entrega en paralelo con a lo sumo `concurrency` bloques en curso.
+
+    Los proveedores bloqueantes corren en un pool de hilos propio del canal
+    (compartido por todas las solicitudes del proceso, así que el límite es
+    global); los asíncronos se agendan en un event loop con un semáforo.
+    Una lista que entra en un solo bloque se entrega en el hilo que llama.
+    """
+
+    def __init__(self, name: str, provider: Provider, chunk_size: int = 500,
+                 concurrency: int = 8):
+        self.name = name
+        self.provider = provider
+        self.chunk_size = max(1, chunk_size)
+        self.concurrency = max(1, concurrency)
+        self.is_async = _is_coroutine_function(provider)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def dispatch(self, recipients: Sequence[str], message: str) -> ChannelResult:
+        """Entregar a todos los destinatarios desde código síncrono"""
+        if self.is_async:
+            return asyncio.run(self.dispatch_async(recipients, message))
+
+        result = ChannelResult(recipients)
+        starts = range(0, len(recipients), self.chunk_size)
+        if len(starts) <= 1 or self.concurrency == 1:
+            for start in starts:
+                self._deliver_chunk(recipients, start, message, result.errors)
+            return result
+
+        # las listas grandes no se encolan enteras: a lo sumo 2x concurrency
+        # bloques pendientes para no crear un futuro por bloque de golpe
+        pool = self._executor()
+        window = threading.BoundedSemaphore(2 * self.concurrency)
+        futures = []
+        for start in starts:
+            window.acquire()
+            future = pool.submit(self._deliver_chunk, recipients, start, message, result.errors)
+            future.add_done_callback(lambda _: window.release())
+            futures.append(future)
+        for future in futures:
+            future.result()
+        return result
+
+    async def dispatch_async(self, recipients: Sequence[str], message: str) -> ChannelResult:
+        """Entregar a todos los destinatarios desde un event loop"""
+        result = ChannelResult(recipients)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+
+        async def deliver(start):
+            async with semaphore:
+                chunk = recipients[start:start + self.chunk_size]
+                try:
+                    if self.is_async:
+                        failures = await self.provider(chunk, message)
+                    else:
+                        failures = await loop.run_in_executor(
+                            self._executor(), self.provider, chunk, message)
+                except Exception as e:
+                    failures = dict.fromkeys(range(len(chunk)), str(e))
+                _merge(result.errors, start, failures)
+
+        await asyncio.gather(*(deliver(start)
+                               for start in range(0, len(recipients), self.chunk_size)))
+        return result
+
+    def shutdown(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def _executor(self) -> ThreadPoolExecutor:
+        # el pool se crea con el primer envío (después del fork de gunicorn)
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.concurrency,
+                        thread_name_prefix=f'{self.name}-channel')
+        return self._pool
+
+    def _deliver_chunk(self, recipients: Sequence[str], start: int, message: str,
+                       errors: Dict[int, str]):
+        chunk = recipients[start:start + self.chunk_size]
+        try:
+            failures = self.provider(chunk, message)
+        except Exception as e:
+            failures = dict.fromkeys(range(len(chunk)), str(e))
+        _merge(errors, start, failures)
+
+
+def simulated_provider(chunk: Sequence[str], message: str) -> None:
+    """Proveedor de desarrollo: imprime cada destinatario (una escritura por bloque)"""
+    print('\n'.join(f"   → {recipient}" for recipient in chunk))
+
+
+def _merge(errors: Dict[int, str], start: int, failures: Optional[Mapping[int, str]]):
+    # dict.update es atómico con el GIL: los bloques escriben índices disjuntos
+    if failures:
+        errors.update({start + i: error for i, error in failures.items()})
+
+
+def _is_coroutine_function(fn) -> bool:
+    return inspect.iscoroutinefunction(fn) or inspect.iscoroutinefunction(
+        getattr(fn, '__call__', None))
@@ -11,6 +11,69 @@ class Config:
     # Service ports
     NOTIFICATIONS_PORT = int(os.getenv('NOTIFICATIONS_PORT', 5003))
     DATABASE_SERVICE_URL = os.getenv('DATABASE_SERVICE_URL', 'http://localhost:5000')
+
+    # Servidor de producción (gunicorn, ver gunicorn.conf.py)
+    WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', min(2 * (os.cpu_count() or 1) + 1, 8)))
+    WEB_THREADS = int(os.getenv('WEB_THREADS', 4))
+    KEEP_ALIVE_TIMEOUT = int(os.getenv('KEEP_ALIVE_TIMEOUT', 5))
+    WEB_MAX_REQUESTS = int(os.getenv('WEB_MAX_REQUESTS', 10000))
+    WEB_MAX_REQUESTS_JITTER = int(os.getenv('WEB_MAX_REQUESTS_JITTER', 1000))
+    WEB_TIMEOUT = int(os.getenv('WEB_TIMEOUT', 30))
+    WEB_GRACEFUL_TIMEOUT = int(os.getenv('WEB_GRACEFUL_TIMEOUT', 30))
+    WEB_PRELOAD_APP = os.getenv('WEB_PRELOAD_APP', 'True') == 'True'
+
+    # Canales: los destinatarios se entregan en bloques de CHANNEL_CHUNK_SIZE
+    # con a lo sumo CHANNEL_CONCURRENCY bloques en paralelo por canal
+    CHANNEL_CHUNK_SIZE = int(os.getenv('CHANNEL_CHUNK_SIZE', 500))
+    CHANNEL_CONCURRENCY = int(os.getenv('CHANNEL_CONCURRENCY', 8))
+
+    # Proveedor del canal EMAIL: "simulated" (imprime) o "smtp" (pool de
+    # conexiones persistentes, ver src/smtp_pool.py)
+    EMAIL_PROVIDER = os.getenv('EMAIL_PROVIDER', 'simulated')
+    SMTP_HOST = os.getenv('SMTP_HOST', 'localhost')
+    SMTP_PORT = int(os.getenv('SMTP_PORT', 25))
+    SMTP_USERNAME = os.getenv('SMTP_USERNAME', '')
+    SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', '')
+    SMTP_STARTTLS = os.getenv('SMTP_STARTTLS', 'False') == 'True'
+    SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT', 10))
+    SMTP_POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', CHANNEL_CONCURRENCY))
+    SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv('SMTP_MAX_MESSAGES_PER_CONNECTION', 100))
+    SMTP_PIPELINING = os.getenv('SMTP_PIPELINING', 'True') == 'True'
+    SMTP_SENDER = os.getenv('SMTP_SENDER', 'notifications@localhost')
+    SMTP_SUBJECT = os.getenv('SMTP_SUBJECT', 'Notificación')
+
+    # Outbox local (SQLite en modo WAL): el registro de cada envío se guarda en
+    # disco y un hilo lo lleva a database-service en lotes, con espera
+    # exponencial si falla. La respuesta trae outbox_id en lugar del id de BD
+    OUTBOX_ENABLED = os.getenv('OUTBOX_ENABLED', 'False') == 'True'
+    OUTBOX_PATH = os.getenv('OUTBOX_PATH', 'notifications-outbox.db')
+    OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 100))
+    OUTBOX_INTERVAL = float(os.getenv('OUTBOX_INTERVAL', 1.0))
+    OUTBOX_BACKOFF = float(os.getenv('OUTBOX_BACKOFF', 1.0))
+    OUTBOX_MAX_BACKOFF = float(os.getenv('OUTBOX_MAX_BACKOFF', 60.0))
+    OUTBOX_LEASE = float(os.getenv('OUTBOX_LEASE', 30.0))
+
+    # Writer por lotes: los registros de solicitudes concurrentes se guardan
+    # juntos con POST /notifications/bulk al reunir BATCH_WRITER_MAX_ITEMS
+    # (1000 como máximo) o tras BATCH_WRITER_MAX_WAIT_MS. Sin efecto con el outbox
+    BATCH_WRITER_ENABLED = os.getenv('BATCH_WRITER_ENABLED', 'False') == 'True'
+    BATCH_WRITER_MAX_ITEMS = int(os.getenv('BATCH_WRITER_MAX_ITEMS', 100))
+    BATCH_WRITER_MAX_WAIT_MS = float(os.getenv('BATCH_WRITER_MAX_WAIT_MS', 5))
+
+    # Envío asíncrono (202 Accepted): cola acotada por proceso drenada por un
+    # pool de hilos. Se pide por solicitud con "Prefer: respond-async" o se
+    # vuelve el modo por defecto con DISPATCH_ASYNC_DEFAULT
+    DISPATCH_ASYNC_DEFAULT = os.getenv('DISPATCH_ASYNC_DEFAULT', 'False') == 'True'
+    DISPATCH_WORKERS = int(os.getenv('DISPATCH_WORKERS', 4))
+    DISPATCH_QUEUE_SIZE = int(os.getenv('DISPATCH_QUEUE_SIZE', 1000))
+    DISPATCH_MAX_JOBS = int(os.getenv('DISPATCH_MAX_JOBS', 10000))
+    DISPATCH_JOB_RETENTION = float(os.getenv('DISPATCH_JOB_RETENTION', 3600))
+    DISPATCH_RETRY_AFTER = int(os.getenv('DISPATCH_RETRY_AFTER', 5))
+    # al apagar un worker de gunicorn, cuánto esperar a que se vacíe la cola
+    DISPATCH_SHUTDOWN_TIMEOUT = float(os.getenv('DISPATCH_SHUTDOWN_TIMEOUT', 10))
+    # SQLite donde los workers publican el estado de sus trabajos; vacío lo
+    # deja solo en memoria del proceso (gunicorn.conf.py pone uno por defecto)
+    DISPATCH_JOBS_PATH = os.getenv('DISPATCH_JOBS_PATH', '')
     
 class TestConfig(Config):
     TESTING = True
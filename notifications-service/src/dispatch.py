@@ -0,0 +1,229 @@
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from src.job_store import JobStore
+
+# cada cuántos trabajos terminados se borran del JobStore los vencidos
+PRUNE_EVERY = 100
+
+
+class QueueFullError(Exception):
+    """La cola de envíos está llena (o cerrada) y no admite más trabajos"""
+
+
+class Job:
+    """Estado de un envío encolado"""
+
+    __slots__ = ('id', 'payload', 'status', 'created_at', 'started_at',
+                 'finished_at', 'result', 'error')
+
+    def __init__(self, payload: dict):
+        self.id = str(uuid.uuid4())
+        self.payload = payload
+        self.status = 'queued'
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('sent', 'failed')
+
+    def to_dict(self) -> dict:
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'type': self.payload.get('type'),
+            'recipients_count': len(self.payload.get('recipients', ())),
+            'created_at': _timestamp(self.created_at),
+            'started_at': _timestamp(self.started_at),
+            'finished_at': _timestamp(self.finished_at)
+        }
+        if self.result is not None:
+            data.update(self.result)
+        if self.error is not None:
+            data['error'] = self.error
+        return data
+
+
+class Dispatcher:
+    """
+    Cola acotada en memoria del proceso drenada por un pool de hilos.
+
+    `handler(payload)` hace el envío y devuelve un dict que se agrega al
+    estado del trabajo; si lanza una excepción el trabajo queda "failed".
+    Los hilos se crean con el primer trabajo, así que con preload_app cada
+    worker de gunicorn arranca los suyos después del fork. Los trabajos
+    terminados se conservan `retention` segundos (y a lo sumo `max_jobs`)
+    para consultar su estado. Con un `store` compartido, el estado se publica
+    ahí y `status()` también encuentra los trabajos de otros workers.
+    """
+
+    def __init__(self, handler: Callable[[dict], dict], workers: int = 4,
+                 queue_size: int = 1000, max_jobs: int = 10000, retention: float = 3600.0,
+                 observe: Optional[Callable[[str, float, float], None]] = None,
+                 store: Optional[JobStore] = None):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.max_jobs = max(max_jobs, queue_size + self.workers)
+        self.retention = retention
+        self.observe = observe
+        self.store = store
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._threads: list = []
+        self._pending = 0
+        self._busy = 0
+        self._closed = False
+        self._counts = {'sent': 0, 'failed': 0, 'rejected': 0, 'recipients': 0}
+
+    def submit(self, payload: dict) -> Job:
+        """Encolar un envío; lanza QueueFullError si no hay lugar"""
+        job = Job(payload)
+        with self._lock:
+            if self._closed:
+                self._counts['rejected'] += 1
+                raise QueueFullError('Dispatcher is shutting down')
+            self._start_workers()
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self._counts['rejected'] += 1
+                raise QueueFullError('Dispatch queue is full')
+            self._pending += 1
+            self._jobs[job.id] = job
+            self._evict()
+        self._publish(job, replace=False)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.done and time.time() - job.finished_at > self.retention:
+                del self._jobs[job_id]
+                return None
+            return job
+
+    def status(self, job_id: str) -> Optional[dict]:
+        """Estado del trabajo de este proceso o, con store, de cualquier worker"""
+        job = self.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self.store is None:
+            return None
+        try:
+            return self.store.load(job_id, time.time() - self.retention)
+        except sqlite3.Error:
+            return None
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Esperar a que no queden trabajos encolados ni en curso"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def shutdown(self, timeout: Optional[float] = None) -> bool:
+        """
+        Dejar de aceptar trabajos, terminar los encolados y detener los hilos.
+        Devuelve False si quedaron trabajos sin procesar al vencer el plazo
+        """
+        with self._lock:
+            self._closed = True
+            threads = list(self._threads)
+        drained = self.drain(timeout)
+        if drained:
+            for _ in threads:
+                self._queue.put(None)
+            for thread in threads:
+                thread.join(timeout)
+        return drained
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'depth': self._queue.qsize(),
+                'capacity': self.queue_size,
+                'workers': self.workers,
+                'busy': self._busy,
+                'tracked_jobs': len(self._jobs),
+                **self._counts
+            }
+
+    def _start_workers(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f'dispatch-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _evict(self):
+        # los pendientes nunca superan queue_size + workers <= max_jobs, así que
+        # siempre hay uno terminado; los más viejos están al frente
+        while len(self._jobs) > self.max_jobs:
+            victim = next(job_id for job_id, job in self._jobs.items() if job.done)
+            del self._jobs[victim]
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                self._busy += 1
+            job.started_at = time.time()
+            job.status = 'sending'
+            self._publish(job)
+            try:
+                job.result = self.handler(job.payload)
+                status = 'sent'
+            except Exception as e:
+                job.error = str(e)
+                status = 'failed'
+            # finished_at antes que el estado: get() lee ambos sin el lock del hilo
+            job.finished_at = time.time()
+            job.status = status
+            self._publish(job)
+            if self.observe is not None:
+                self.observe(job.status, job.started_at - job.created_at,
+                             job.finished_at - job.started_at)
+            with self._idle:
+                self._busy -= 1
+                self._pending -= 1
+                self._counts[job.status] += 1
+                if job.status == 'sent' and isinstance(job.result, dict):
+                    # solo los alcanzados: el resto del trabajo pudo fallar
+                    self._counts['recipients'] += job.result.get('sent_count', 0)
+                finished = self._counts['sent'] + self._counts['failed']
+                self._idle.notify_all()
+            if self.store is not None and finished % PRUNE_EVERY == 0:
+                try:
+                    self.store.prune(time.time() - self.retention)
+                except sqlite3.Error:
+                    pass
+
+    def _publish(self, job: Job, replace: bool = True):
+        # el store es para consultas: si falla, el envío sigue y el estado
+        # queda al menos en este proceso
+        if self.store is None:
+            return
+        try:
+            self.store.save(job.id, job.to_dict(), job.finished_at, replace=replace)
+        except sqlite3.Error:
+            pass
+
+
+def _timestamp(value: Optional[float]) -> Optional[str]:
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, timezone.utc).isoformat()
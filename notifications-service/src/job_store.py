@@ -0,0 +1,69 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at);
+'''
+
+
+class JobStore:
+    """
+    Estado de los envíos asíncronos compartido entre los workers de gunicorn
+    (SQLite en modo WAL): el worker que procesa un trabajo lo publica y
+    cualquier otro puede responder GET /api/notifications/jobs/<id>. Cada
+    hilo usa su propia conexión, abierta al primer uso (después del fork).
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+
+    def save(self, job_id: str, state: dict, finished_at: Optional[float] = None,
+             replace: bool = True):
+        """
+        Guardar el estado; con replace=False solo si el trabajo aún no está
+        (el "queued" inicial no pisa un estado que un hilo ya publicó)
+        """
+        verb = 'INSERT OR REPLACE' if replace else 'INSERT OR IGNORE'
+        self._connection().execute(
+            f'{verb} INTO jobs (id, state, finished_at) VALUES (?, ?, ?)',
+            (job_id, json.dumps(state), finished_at))
+
+    def load(self, job_id: str, finished_after: float) -> Optional[dict]:
+        """Estado del trabajo, o None si no existe o terminó antes de `finished_after`"""
+        row = self._connection().execute(
+            'SELECT state FROM jobs WHERE id = ? AND (finished_at IS NULL OR finished_at >= ?)',
+            (job_id, finished_after)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def prune(self, finished_before: float):
+        self._connection().execute('DELETE FROM jobs WHERE finished_at < ?', (finished_before,))
+
+    def close(self):
+        db = getattr(self._local, 'db', None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, 'db', None)
+        if db is None or getattr(self._local, 'pid', None) != os.getpid():
+            db = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                                 isolation_level=None, check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            # perder el estado de un trabajo ante un corte del sistema
+            # operativo es aceptable: no hace falta esperar al disco
+            db.execute('PRAGMA synchronous=OFF')
+            db.executescript(_SCHEMA)
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
@@ -0,0 +1,26 @@
+from metrics_core import MetricsRegistry
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    'notifications_http_request_duration_seconds',
+    'Duración de las solicitudes HTTP atendidas por notifications-service',
+    ('method', 'route'))
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    'notifications_http_requests_in_flight',
+    'Solicitudes HTTP en curso')
+HTTP_RESPONSES = REGISTRY.counter(
+    'notifications_http_responses_total',
+    'Respuestas HTTP por ruta y código de estado',
+    ('method', 'route', 'status'))
+DB_CALL_DURATION = REGISTRY.histogram(
+    'notifications_database_service_call_duration_seconds',
+    'Duración de las llamadas salientes a database-service por operación',
+    ('operation', 'outcome'))
+DISPATCH_QUEUE_WAIT = REGISTRY.histogram(
+    'notifications_dispatch_queue_wait_seconds',
+    'Tiempo que un envío asíncrono esperó en la cola hasta que un worker lo tomó')
+DISPATCH_JOB_DURATION = REGISTRY.histogram(
+    'notifications_dispatch_job_duration_seconds',
+    'Duración del envío y registro de los trabajos asíncronos por resultado',
+    ('outcome',))
@@ -0,0 +1,220 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Sequence, Tuple
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    record TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    claimed_until REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS outbox_next_attempt ON outbox (next_attempt_at);
+'''
+
+
+class Outbox:
+    """
+    Registro local de notificaciones enviadas pendientes de guardar en
+    database-service (SQLite en modo WAL). Cada hilo usa su propia conexión,
+    abierta al primer uso (después del fork de gunicorn); varios workers
+    pueden compartir el archivo porque los lotes se reservan con un plazo.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0, clock=time.time):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.clock = clock
+        self._local = threading.local()
+
+    def append(self, record: dict) -> str:
+        """Guardar un registro (durable al volver) y devolver su id local"""
+        record_id = str(uuid.uuid4())
+        with self._transaction() as db:
+            db.execute('INSERT INTO outbox (id, record, created_at) VALUES (?, ?, ?)',
+                       (record_id, json.dumps(record), self.clock()))
+        return record_id
+
+    def claim(self, limit: int, lease: float) -> List[Tuple[int, str, dict, float]]:
+        """
+        Reservar hasta `limit` registros listos para reintentar, del más
+        viejo al más nuevo: (seq, id, record, created_at). Otro proceso no los
+        toma hasta que vence `lease` o se liberan con complete/retry
+        """
+        now = self.clock()
+        # IMMEDIATE toma el lock de escritura antes de leer: dos procesos no
+        # pueden reservar el mismo lote
+        with self._transaction('IMMEDIATE') as db:
+            rows = db.execute(
+                'SELECT seq, id, record, created_at FROM outbox '
+                'WHERE next_attempt_at <= ? AND claimed_until <= ? ORDER BY seq LIMIT ?',
+                (now, now, limit)).fetchall()
+            if rows:
+                db.executemany('UPDATE outbox SET claimed_until = ? WHERE seq = ?',
+                               [(now + lease, row[0]) for row in rows])
+        return [(seq, record_id, json.loads(record), created_at)
+                for seq, record_id, record, created_at in rows]
+
+    def complete(self, seqs: Sequence[int]):
+        with self._transaction() as db:
+            db.executemany('DELETE FROM outbox WHERE seq = ?', [(seq,) for seq in seqs])
+
+    def retry(self, seqs: Sequence[int], delay: float):
+        with self._transaction() as db:
+            db.executemany(
+                'UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ?, '
+                'claimed_until = 0 WHERE seq = ?',
+                [(self.clock() + delay, seq) for seq in seqs])
+
+    def stats(self) -> dict:
+        """Registros pendientes y antigüedad del más viejo (segundos)"""
+        size, oldest = self._connection().execute(
+            'SELECT COUNT(*), MIN(created_at) FROM outbox').fetchone()
+        return {'size': size, 'lag': max(0.0, self.clock() - oldest) if oldest else 0.0}
+
+    def close(self):
+        db = getattr(self._local, 'db', None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, 'db', None)
+        if db is None or getattr(self._local, 'pid', None) != os.getpid():
+            db = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                                 isolation_level=None, check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            # con WAL, NORMAL no pierde transacciones confirmadas si cae el
+            # proceso (solo ante un corte del sistema operativo)
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.executescript(_SCHEMA)
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    @contextmanager
+    def _transaction(self, mode: str = ''):
+        db = self._connection()
+        db.execute(f'BEGIN {mode}')
+        try:
+            yield db
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+
+
+class OutboxReplayer:
+    """
+    Hilo que vacía el outbox hacia database-service en lotes.
+
+    `flush(records)` guarda los registros en orden y devuelve un resultado
+    por cada uno que procesó: True (guardado) o False (rechazado para
+    siempre, p. ej. un 4xx). Los que no procesó (se detuvo por un error
+    transitorio) se reintentan con espera exponencial y jitter, hasta
+    `max_backoff`.
+    """
+
+    def __init__(self, outbox: Outbox, flush: Callable[[List[dict]], List[bool]],
+                 batch_size: int = 100, interval: float = 1.0, backoff: float = 1.0,
+                 max_backoff: float = 60.0, lease: float = 30.0):
+        self.outbox = outbox
+        self.flush = flush
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.lease = lease
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._failures = 0
+        self._counts = {'flushed': 0, 'rejected': 0, 'errors': 0}
+
+    def start(self):
+        """Arrancar el hilo si no corre (idempotente y barato en el camino caliente)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='outbox-replayer',
+                                                daemon=True)
+                self._thread.start()
+
+    def notify(self):
+        """Avisar que hay registros nuevos (para no esperar al próximo intervalo)"""
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run_once(self) -> int:
+        """
+        Procesar un lote; devuelve cuántos registros salieron del outbox o
+        -1 si database-service falló (y hay que esperar)
+        """
+        batch = self.outbox.claim(self.batch_size, self.lease)
+        if not batch:
+            return 0
+        try:
+            results = list(self.flush([record for _, _, record, _ in batch]))[:len(batch)]
+        except Exception:
+            results = []
+        done = [seq for seq, _, _, _ in batch[:len(results)]]
+        if done:
+            self.outbox.complete(done)
+            rejected = results.count(False)
+            self._counts['flushed'] += len(results) - rejected
+            self._counts['rejected'] += rejected
+        if len(results) < len(batch):
+            self._failures += 1
+            self._counts['errors'] += 1
+            self.outbox.retry([seq for seq, _, _, _ in batch[len(results):]], self.delay())
+            return -1
+        self._failures = 0
+        return len(results)
+
+    def delay(self) -> float:
+        """
+        Espera tras `_failures` errores seguidos: exponencial con jitter,
+        nunca menos que `backoff`
+        """
+        if self._failures == 0:
+            return 0.0
+        base = min(self.max_backoff, self.backoff * 2 ** (self._failures - 1))
+        return max(self.backoff, base / 2 + random.uniform(0, base / 2))
+
+    def stats(self) -> dict:
+        return {**self._counts, 'consecutive_failures': self._failures}
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                processed = self.run_once()
+            except sqlite3.Error:
+                # archivo bloqueado, dañado o disco lleno: también espera
+                self._failures += 1
+                self._counts['errors'] += 1
+                processed = -1
+            if processed == self.batch_size:
+                continue
+            if processed < 0:
+                # con database-service caído los avisos no acortan la espera
+                self._stop.wait(self.delay())
+            else:
+                self._wake.wait(self.interval)
+            self._wake.clear()
@@ -0,0 +1,226 @@
+import queue
+import re
+import smtplib
+import threading
+from contextlib import contextmanager
+from email.message import EmailMessage
+from email.policy import SMTP as SMTP_POLICY
+from typing import Dict, Optional, Sequence
+
+# errores de la conexión (no del destinatario): se descarta y se abre otra
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError,
+                     smtplib.SMTPHeloError, OSError)
+
+_LEADING_DOT = re.compile(rb'(?m)^\.')
+
+
+class SMTPConnectionPool:
+    """
+    Conexiones SMTP persistentes compartidas por los hilos del canal EMAIL.
+
+    Hay a lo sumo `size` conexiones abiertas; las ociosas se reutilizan (la
+    más reciente primero) y se reciclan tras `max_messages` mensajes. Una
+    conexión que falla se descarta y la próxima solicitud abre otra. Se
+    conecta con el primer uso, así que es seguro con preload_app.
+    """
+
+    def __init__(self, host: str, port: int, size: int = 8, timeout: float = 10.0,
+                 username: str = '', password: str = '', starttls: bool = False,
+                 max_messages: int = 100):
+        self.host = host
+        self.port = port
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.max_messages = max(1, max_messages)
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._counts = {'opened': 0, 'failed': 0, 'messages': 0}
+
+    @contextmanager
+    def connection(self, fresh: bool = False):
+        """
+        Tomar una conexión (abriendo una si no hay ociosas, o siempre con
+        `fresh`, p. ej. al reintentar tras una caída) y devolverla al salir
+        """
+        with self._slots:
+            conn = self._open() if fresh else self._take()
+            try:
+                yield conn
+            except BaseException:
+                self._discard(conn, failed=True)
+                raise
+            if self.exhausted(conn):
+                self._discard(conn)
+            else:
+                self._idle.put(conn)
+
+    def exhausted(self, conn: smtplib.SMTP) -> bool:
+        return conn.messages_sent >= self.max_messages
+
+    def used(self, conn: smtplib.SMTP):
+        """Contar una transacción (aceptada o rechazada) en la conexión"""
+        conn.messages_sent += 1
+        with self._lock:
+            self._counts['messages'] += 1
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'idle': self._idle.qsize(), 'size': self.size, **self._counts}
+
+    def _take(self) -> smtplib.SMTP:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._open()
+
+    def _open(self) -> smtplib.SMTP:
+        conn = smtplib.SMTP(timeout=self.timeout)
+        try:
+            conn.connect(self.host, self.port)
+            conn.ehlo()
+            if self.starttls:
+                conn.starttls()
+                conn.ehlo()
+            if self.username:
+                conn.login(self.username, self.password)
+        except BaseException:
+            conn.close()
+            with self._lock:
+                self._counts['failed'] += 1
+            raise
+        conn.messages_sent = 0
+        with self._lock:
+            self._counts['opened'] += 1
+        return conn
+
+    def _discard(self, conn: smtplib.SMTP, failed: bool = False):
+        if failed:
+            with self._lock:
+                self._counts['failed'] += 1
+            conn.close()
+            return
+        try:
+            conn.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.close()
+
+
+class SMTPProvider:
+    """
+    Proveedor EMAIL para ChannelDispatcher: un mensaje por destinatario
+    sobre las conexiones del pool. Si el servidor anuncia PIPELINING, MAIL,
+    RCPT y DATA van en una sola escritura (RFC 2920): dos idas y vueltas
+    por mensaje en lugar de cuatro. Si la conexión se cae, el destinatario
+    en curso se reintenta una vez con una conexión nueva.
+    """
+
+    def __init__(self, pool: SMTPConnectionPool, sender: str, subject: str,
+                 pipelining: bool = True):
+        self.pool = pool
+        self.sender = sender
+        self.subject = subject
+        self.pipelining = pipelining
+
+    def __call__(self, chunk: Sequence[str], message: str) -> Dict[int, str]:
+        body = self._body(message)
+        failures: Dict[int, str] = {}
+        index, retried = 0, False
+        while index < len(chunk):
+            opened = False
+            try:
+                with self.pool.connection(fresh=retried) as conn:
+                    opened = True
+                    while index < len(chunk) and not self.pool.exhausted(conn):
+                        error = self._send(conn, chunk[index], body)
+                        if error:
+                            failures[index] = error
+                        index, retried = index + 1, False
+            except CONNECTION_ERRORS + (smtplib.SMTPResponseException,) as e:
+                if not opened:
+                    # no hay servidor: el resto del bloque falla sin reintentar cada uno
+                    failures.update(dict.fromkeys(range(index, len(chunk)), str(e)))
+                    break
+                if retried:
+                    failures[index] = str(e)
+                    index, retried = index + 1, False
+                else:
+                    retried = True
+        return failures
+
+    def _body(self, message: str) -> tuple:
+        # encabezados comunes y cuerpo se arman una vez por bloque (tal cual
+        # para sendmail y con los puntos duplicados para el envío en tubería);
+        # por destinatario solo se antepone "To:"
+        email = EmailMessage(policy=SMTP_POLICY)
+        email['From'] = self.sender
+        email['Subject'] = self.subject
+        email.set_content(message)
+        raw = email.as_bytes()
+        return raw, _LEADING_DOT.sub(b'..', raw)
+
+    def _send(self, conn: smtplib.SMTP, recipient: str, body: tuple) -> Optional[str]:
+        """Enviar un mensaje; devuelve el error del destinatario o None"""
+        if not _valid_address(recipient):
+            return 'Invalid email address'
+        to = b'To: ' + recipient.encode('ascii') + b'\r\n'
+        if self.pipelining and conn.has_extn('pipelining'):
+            error = self._send_pipelined(conn, recipient, to + body[1])
+        else:
+            error = self._send_sequential(conn, recipient, to + body[0])
+        self.pool.used(conn)
+        return error
+
+    def _send_pipelined(self, conn: smtplib.SMTP, recipient: str, payload: bytes) -> Optional[str]:
+        conn.send(f'MAIL FROM:<{self.sender}>\r\nRCPT TO:<{recipient}>\r\nDATA\r\n'.encode('ascii'))
+        replies = [_reply(conn) for _ in range(3)]
+        if replies[2][0] != 354:
+            if replies[0][0] == 250:
+                conn.rset()
+            return _error(next(r for r in replies if r[0] not in (250, 251)))
+        if not payload.endswith(b'\r\n'):
+            payload += b'\r\n'
+        conn.send(payload + b'.\r\n')
+        reply = _reply(conn)
+        return None if reply[0] == 250 else _error(reply)
+
+    def _send_sequential(self, conn: smtplib.SMTP, recipient: str, payload: bytes) -> Optional[str]:
+        try:
+            conn.sendmail(self.sender, [recipient], payload)
+        except smtplib.SMTPRecipientsRefused as e:
+            return _error(e.recipients[recipient])
+        except (smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+            # sendmail ya envió RSET
+            return _error((e.smtp_code, e.smtp_error))
+        return None
+
+
+def _reply(conn: smtplib.SMTP) -> tuple:
+    code, message = conn.getreply()
+    if code == 421:
+        # el servidor cierra la sesión: tratarlo como conexión caída
+        raise smtplib.SMTPServerDisconnected(_error((code, message)))
+    return code, message
+
+
+def _error(reply: tuple) -> str:
+    code, message = reply
+    if isinstance(message, bytes):
+        message = message.decode('utf-8', 'replace')
+    return f'{code} {message}'
+
+
+def _valid_address(address: str) -> bool:
+    return (isinstance(address, str) and address.isascii() and '@' in address
+            and not any(c in address for c in '\r\n<> '))
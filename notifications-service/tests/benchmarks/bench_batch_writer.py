@@ -0,0 +1,108 @@
+"""
+Benchmark de registros por segundo guardados en database-service.
+
+Compara un POST /notifications por registro (el guardado de siempre) contra
+el writer por lotes de src.batch_writer, que junta los registros de los
+hilos concurrentes en un POST /notifications/bulk (los dos modos abren una
+conexión por llamada, como requests.post en app.py). database-service lo
+simula el stand-in de la raíz del repositorio (tests/stand_in) en el mismo
+proceso, con latencia artificial por solicitud.
+
+Uso:
+    python -m tests.benchmarks.bench_batch_writer --records 4000 --threads 64
+    python -m tests.benchmarks.bench_batch_writer --latency 0.005 --max-items 10 100
+"""
+import argparse
+import importlib.util
+import json
+import threading
+import time
+from pathlib import Path
+
+from src.config import Config
+
+STAND_IN = Path(__file__).resolve().parents[3] / 'tests' / 'stand_in' / 'server.py'
+
+
+def load_stand_in():
+    # el paquete tests de la raíz choca con el de este servicio: cargar por ruta
+    spec = importlib.util.spec_from_file_location('stand_in_server', STAND_IN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(save, records, threads):
+    """Registros por segundo con `threads` hilos guardando de a un registro"""
+    per_thread = [records[i::threads] for i in range(threads)]
+    errors = []
+
+    def worker(chunk):
+        for record in chunk:
+            if isinstance(save(record), Exception):
+                errors.append(record)
+
+    workers = [threading.Thread(target=worker, args=(chunk,)) for chunk in per_thread]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        'records_per_sec': round(len(records) / elapsed),
+        'seconds': round(elapsed, 3),
+        'errors': len(errors)
+    }
+
+
+def run(records, threads, latency, max_items, max_wait_ms):
+    stand_in = load_stand_in()
+    server, base_url = stand_in.start_stand_in(faults=stand_in.Faults(latency=latency))
+    Config.DATABASE_SERVICE_URL = base_url
+
+    # importar después de configurar la URL: app.py la lee al cargar
+    from src.app import save_notification_batch, save_single_record
+    from src.batch_writer import BatchWriter
+
+    batch = [{'type': 'EMAIL', 'message': f'Mensaje {n}',
+              'recipients': [f'user{n}@example.com']} for n in range(records)]
+    results = {
+        'records': records,
+        'threads': threads,
+        'upstream_latency_ms': latency * 1000,
+        'max_wait_ms': max_wait_ms
+    }
+    try:
+        results['single_writes'] = measure(save_single_record, batch, threads)
+        for size in max_items:
+            writer = BatchWriter(save_notification_batch, max_items=size,
+                                 max_wait=max_wait_ms / 1000)
+            results[f'batched_{size}'] = {
+                **measure(lambda record: writer.submit(record).result(), batch, threads),
+                'batches': writer.stats()['batches']
+            }
+            writer.close(timeout=10)
+        results['stored'] = len(server.store.notifications)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=4000)
+    parser.add_argument('--threads', type=int, default=64,
+                        help='solicitudes concurrentes guardando registros')
+    parser.add_argument('--latency', type=float, default=0.002,
+                        help='latencia simulada de database-service en segundos')
+    parser.add_argument('--max-items', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--max-wait-ms', type=float, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.records, args.threads, args.latency, args.max_items,
+                         args.max_wait_ms), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark de destinatarios por segundo del reparto en bloques de src.channels.
+
+Cada llamada al proveedor simula una ida y vuelta a la API del canal
+(`--latency` segundos por bloque, 0 para medir solo el costo del reparto).
+Se compara el envío de un bloque a la vez contra el pool de hilos
+(proveedor bloqueante) y asyncio (proveedor asíncrono), para listas de
+1k, 100k y 1M destinatarios.
+
+Uso:
+    python -m tests.benchmarks.bench_channels --chunk-size 500 --concurrency 8
+    python -m tests.benchmarks.bench_channels --sizes 1000 100000 --latency 0
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from src.channels import ChannelDispatcher
+
+
+def blocking_provider(latency):
+    def provider(chunk, message):
+        if latency:
+            time.sleep(latency)
+    return provider
+
+
+def async_provider(latency):
+    async def provider(chunk, message):
+        await asyncio.sleep(latency)
+    return provider
+
+
+def measure(channel, recipients):
+    start = time.perf_counter()
+    result = channel.dispatch(recipients, 'Bench')
+    elapsed = time.perf_counter() - start
+    assert result.sent_count == len(recipients)
+    return {
+        'seconds': round(elapsed, 4),
+        'recipients_per_sec': round(len(recipients) / elapsed)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.005,
+                        help='segundos por llamada al proveedor (por bloque)')
+    args = parser.parse_args()
+
+    modes = {
+        'sequential': ChannelDispatcher('bench', blocking_provider(args.latency),
+                                        args.chunk_size, concurrency=1),
+        'threads': ChannelDispatcher('bench', blocking_provider(args.latency),
+                                     args.chunk_size, args.concurrency),
+        'asyncio': ChannelDispatcher('bench', async_provider(args.latency),
+                                     args.chunk_size, args.concurrency)
+    }
+    results = {
+        'chunk_size': args.chunk_size,
+        'concurrency': args.concurrency,
+        'latency': args.latency
+    }
+    for size in args.sizes:
+        recipients = [f'user{i}@example.com' for i in range(size)]
+        results[str(size)] = {name: measure(channel, recipients)
+                              for name, channel in modes.items()}
+    for channel in modes.values():
+        channel.shutdown()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark de mensajes por segundo del canal EMAIL contra el SMTP local
+(tests/smtp_stand_in.py), sin servicios externos.
+
+Compara una conexión nueva por mensaje (sin pool) contra el pool de
+conexiones persistentes de src.smtp_pool, con y sin PIPELINING. Todo pasa
+por ChannelDispatcher con los mismos bloques y concurrencia. `--latency`
+simula la ida y vuelta de la red en el servidor (0 = loopback puro; el
+servidor corre en el mismo proceso y comparte el GIL con el cliente).
+
+Uso:
+    python -m tests.benchmarks.bench_smtp --messages 2000 --concurrency 8
+    python -m tests.benchmarks.bench_smtp --messages 500 --latency 0.002
+"""
+import argparse
+import json
+import smtplib
+import time
+
+from src.channels import ChannelDispatcher
+from src.smtp_pool import SMTPConnectionPool, SMTPProvider
+from tests.smtp_stand_in import SMTPStandIn
+
+SENDER = 'bench@example.com'
+
+
+def connection_per_message(server):
+    """Línea base: abrir, enviar y cerrar una conexión por destinatario"""
+    def provider(chunk, message):
+        for recipient in chunk:
+            with smtplib.SMTP(server.host, server.port, timeout=10) as conn:
+                conn.sendmail(SENDER, [recipient],
+                              f'To: {recipient}\r\nSubject: Bench\r\n\r\n{message}\r\n')
+    return provider
+
+
+def pooled(server, concurrency, pipelining):
+    pool = SMTPConnectionPool(server.host, server.port, size=concurrency)
+    return SMTPProvider(pool, SENDER, 'Bench', pipelining=pipelining)
+
+
+def measure(provider, recipients, chunk_size, concurrency):
+    channel = ChannelDispatcher('bench', provider, chunk_size, concurrency)
+    start = time.perf_counter()
+    result = channel.dispatch(recipients, 'Mensaje de prueba del benchmark')
+    elapsed = time.perf_counter() - start
+    channel.shutdown()
+    if isinstance(provider, SMTPProvider):
+        provider.pool.close()
+    assert result.sent_count == len(recipients), result.failures(limit=3)
+    return {
+        'seconds': round(elapsed, 4),
+        'messages_per_sec': round(len(recipients) / elapsed)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--chunk-size', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='ida y vuelta simulada por espera del servidor (segundos)')
+    args = parser.parse_args()
+
+    recipients = [f'user{i}@example.com' for i in range(args.messages)]
+    results = {
+        'messages': args.messages,
+        'chunk_size': args.chunk_size,
+        'concurrency': args.concurrency,
+        'latency': args.latency
+    }
+    with SMTPStandIn(keep_messages=False, latency=args.latency) as server:
+        modes = {
+            'connection_per_message': connection_per_message(server),
+            'pooled': pooled(server, args.concurrency, pipelining=False),
+            'pooled_pipelined': pooled(server, args.concurrency, pipelining=True)
+        }
+        for name, provider in modes.items():
+            results[name] = measure(provider, recipients, args.chunk_size, args.concurrency)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+Servidor SMTP mínimo en el mismo proceso para pruebas y benchmarks.
+
+Acepta EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP y QUIT, anuncia PIPELINING y
+guarda cada mensaje recibido. No entrega nada: solo sirve para medir el
+costo del lado del cliente sin un servicio externo.
+
+Con `latency` se simula la ida y vuelta de la red: las respuestas se
+acumulan y se envían con esa demora cada vez que el servidor tiene que
+esperar al cliente (así los comandos en tubería pagan una sola vez).
+
+Uso:
+    with SMTPStandIn(reject={'bounce@example.com'}) as server:
+        ...  # SMTP_HOST=server.host, SMTP_PORT=server.port
+        server.messages  # [(mail_from, [rcpt, ...], data), ...]
+"""
+import socket
+import socketserver
+import threading
+import time
+
+
+class _Handler(socketserver.BaseRequestHandler):
+
+    def setup(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.pending = []
+        self.buffer = b''
+
+    def reply(self, line):
+        self.pending.append(line.encode('ascii') + b'\r\n')
+
+    def flush(self):
+        if self.pending:
+            if self.server.stand_in.latency:
+                time.sleep(self.server.stand_in.latency)
+            self.request.sendall(b''.join(self.pending))
+            self.pending = []
+
+    def readline(self):
+        while b'\n' not in self.buffer:
+            # sin datos del cliente: enviar lo acumulado y esperar
+            self.flush()
+            data = self.request.recv(65536)
+            if not data:
+                return b''
+            self.buffer += data
+        line, _, self.buffer = self.buffer.partition(b'\n')
+        return line + b'\n'
+
+    def handle(self):
+        server = self.server.stand_in
+        server._opened(self.request)
+        try:
+            self.reply('220 smtp-stand-in ESMTP')
+            self.session()
+            self.flush()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            server._closed(self.request)
+
+    def session(self):
+        server = self.server.stand_in
+        mail_from, rcpts = None, []
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            command, _, argument = line.decode('utf-8', 'replace').strip().partition(' ')
+            command = command.upper()
+            if command == 'EHLO':
+                self.reply('250-smtp-stand-in')
+                self.reply('250-PIPELINING')
+                self.reply('250 8BITMIME')
+            elif command == 'HELO':
+                self.reply('250 smtp-stand-in')
+            elif command == 'MAIL':
+                mail_from, rcpts = _address(argument), []
+                self.reply('250 OK')
+            elif command == 'RCPT':
+                rcpt = _address(argument)
+                if rcpt in server.reject:
+                    self.reply('550 No such user')
+                else:
+                    rcpts.append(rcpt)
+                    self.reply('250 OK')
+            elif command == 'DATA':
+                if not rcpts:
+                    self.reply('554 No valid recipients')
+                    continue
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = self.read_data()
+                server._received(mail_from, rcpts, data)
+                self.reply('250 OK queued')
+                mail_from, rcpts = None, []
+            elif command == 'RSET':
+                mail_from, rcpts = None, []
+                self.reply('250 OK')
+            elif command == 'NOOP':
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+    def read_data(self):
+        lines = []
+        while True:
+            line = self.readline()
+            if not line or line == b'.\r\n':
+                return b''.join(lines)
+            lines.append(line[1:] if line.startswith(b'..') else line)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPStandIn:
+
+    def __init__(self, host='127.0.0.1', port=0, reject=(), keep_messages=True,
+                 latency=0.0):
+        self.reject = set(reject)
+        self.latency = latency
+        self.keep_messages = keep_messages
+        self.messages = []
+        self.received = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._sockets = set()
+        self._server = _Server((host, port), _Handler)
+        self._server.stand_in = self
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,),
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self.drop_connections()
+
+    def drop_connections(self):
+        """Cortar las sesiones abiertas (simula un servidor que se reinicia)"""
+        with self._lock:
+            sockets = list(self._sockets)
+        for sock in sockets:
+            try:
+                sock.shutdown(2)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _opened(self, sock):
+        with self._lock:
+            self.connections += 1
+            self._sockets.add(sock)
+
+    def _closed(self, sock):
+        with self._lock:
+            self._sockets.discard(sock)
+
+    def _received(self, mail_from, rcpts, data):
+        with self._lock:
+            self.received += 1
+            if self.keep_messages:
+                self.messages.append((mail_from, rcpts, data))
+
+
+def _address(argument):
+    # "FROM:<a@b>" / "TO:<a@b> SIZE=..." -> "a@b"
+    value = argument.partition(':')[2].strip().split(' ')[0]
+    return value.strip('<>')
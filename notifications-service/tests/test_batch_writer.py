@@ -0,0 +1,151 @@
+import threading
+import time
+from unittest.mock import patch, Mock
+import pytest
+from src.app import NotificationError, save_notification_batch
+from src.batch_writer import BatchWriter, BatchWriterClosed
+from src.channels import ChannelResult
+
+
+def record(n):
+    return {'type': 'EMAIL', 'message': f'Mensaje {n}', 'recipients': [f'u{n}@example.com']}
+
+
+class TestBatchWriter:
+    """Tests para el writer que agrupa registros de varios hilos"""
+
+    def test_full_batch_is_written_in_one_call(self):
+        """Debe guardar max_items registros juntos sin esperar el plazo"""
+        batches = []
+        writer = BatchWriter(lambda records: batches.append(records) or
+                             [r['message'] for r in records], max_items=4, max_wait=10)
+
+        futures = [writer.submit(record(n)) for n in range(4)]
+
+        assert [f.result(timeout=5) for f in futures] == [f'Mensaje {n}' for n in range(4)]
+        assert batches == [[record(n) for n in range(4)]]
+        writer.close(timeout=5)
+
+    def test_partial_batch_leaves_after_max_wait(self):
+        """Debe guardar un lote incompleto cuando vence el plazo del más viejo"""
+        writer = BatchWriter(lambda records: [True] * len(records), max_items=100,
+                             max_wait=0.02)
+
+        start = time.monotonic()
+        assert writer.submit(record(0)).result(timeout=5) is True
+
+        assert 0.015 <= time.monotonic() - start < 1
+        assert writer.stats()['batches'] == 1
+        writer.close(timeout=5)
+
+    def test_concurrent_submits_share_batches(self):
+        """Las solicitudes concurrentes deben salir en pocos lotes"""
+        calls = []
+        writer = BatchWriter(lambda records: calls.append(len(records)) or
+                             [True] * len(records), max_items=50, max_wait=0.05)
+        results = []
+
+        def submit(n):
+            results.append(writer.submit(record(n)).result(timeout=5))
+
+        threads = [threading.Thread(target=submit, args=(n,)) for n in range(40)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [True] * 40
+        assert sum(calls) == 40 and len(calls) < 40
+        writer.close(timeout=5)
+
+    def test_errors_are_delivered_per_record_or_per_batch(self):
+        """Un resultado excepción falla su registro; si flush lanza, falla el lote"""
+        writer = BatchWriter(lambda records: ['n-1', ValueError('bad record')],
+                             max_items=2, max_wait=10)
+        ok, bad = writer.submit(record(0)), writer.submit(record(1))
+        assert ok.result(timeout=5) == 'n-1'
+        with pytest.raises(ValueError, match='bad record'):
+            bad.result(timeout=5)
+        writer.close(timeout=5)
+
+        broken = BatchWriter(Mock(side_effect=ConnectionError('down')), max_wait=0)
+        with pytest.raises(ConnectionError):
+            broken.submit(record(0)).result(timeout=5)
+        assert broken.stats()['failed'] == 1
+        broken.close(timeout=5)
+
+    def test_close_flushes_pending_and_rejects_new_records(self):
+        """Debe guardar lo pendiente sin esperar el plazo y no aceptar más"""
+        writer = BatchWriter(lambda records: [True] * len(records), max_items=100,
+                             max_wait=60)
+        future = writer.submit(record(0))
+
+        assert writer.close(timeout=5)
+        assert future.result(timeout=0) is True
+        with pytest.raises(BatchWriterClosed):
+            writer.submit(record(1))
+
+
+class TestBatchWriterEndpoint:
+    """Tests para POST /api/notifications/send con el writer por lotes"""
+
+    @pytest.fixture
+    def writer(self):
+        writer = BatchWriter(save_notification_batch, max_items=10, max_wait=0)
+        with patch('src.app.batch_writer', writer):
+            yield writer
+        writer.close(timeout=5)
+
+    @patch('src.app.requests.post')
+    @patch('src.app.send_email')
+    def test_send_saves_through_bulk_route(self, mock_send_email, mock_post, client,
+                                           writer, valid_email_notification):
+        """Debe guardar con POST /notifications/bulk y devolver el id de BD"""
+        mock_send_email.return_value = ChannelResult(valid_email_notification['recipients'])
+        mock_post.return_value = Mock(status_code=201,
+                                      json=lambda: {'count': 1, 'ids': ['notif-123-uuid']})
+
+        response = client.post('/api/notifications/send', json=valid_email_notification)
+
+        assert response.status_code == 201
+        assert response.get_json()['notification_id'] == 'notif-123-uuid'
+        assert mock_post.call_args.args[0].endswith('/notifications/bulk')
+        assert mock_post.call_args.kwargs['json'] == {
+            'notifications': [valid_email_notification]}
+
+    @patch('src.app.requests.post')
+    @patch('src.app.send_email')
+    def test_database_errors_match_single_writes(self, mock_send_email, mock_post, client,
+                                                 writer, valid_email_notification):
+        """Debe responder los mismos errores que el guardado de a uno"""
+        mock_send_email.return_value = ChannelResult(valid_email_notification['recipients'])
+        mock_post.return_value = Mock(status_code=500)
+
+        response = client.post('/api/notifications/send', json=valid_email_notification)
+        assert response.status_code == 500
+        assert response.get_json()['error'] == 'Failed to save notification to database'
+
+        mock_post.side_effect = Exception('Connection refused')
+        response = client.post('/api/notifications/send', json=valid_email_notification)
+        assert response.get_json()['error'] == 'Database service unavailable: Connection refused'
+
+    @patch('src.app.requests.post')
+    def test_rejected_batch_is_saved_one_by_one(self, mock_post):
+        """Si el lote es rechazado (4xx), solo debe fallar el registro inválido"""
+        mock_post.side_effect = [Mock(status_code=400),
+                                 Mock(status_code=201, json=lambda: {'id': 'n-0'}),
+                                 Mock(status_code=500)]
+
+        saved, failed = save_notification_batch([record(0), record(1)])
+
+        assert saved == 'n-0'
+        assert isinstance(failed, NotificationError)
+        assert mock_post.call_args_list[1].args[0].endswith('/notifications')
+
+    def test_metrics_include_batches(self, client, writer):
+        """Debe exponer lotes y registros del writer"""
+        text = client.get('/metrics').get_data(as_text=True)
+
+        assert 'notifications_batch_writer_pending 0' in text
+        assert 'notifications_batch_writer_batches_total 0' in text
+        assert 'notifications_batch_writer_records_total{outcome="saved"} 0' in text
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch, Mock
+from src.channels import ChannelDispatcher, ChannelResult
+
+
+class TestChannelDispatcher:
+    """Tests para el reparto de destinatarios en bloques paralelos"""
+
+    def test_chunks_cover_every_recipient_once(self):
+        """Debe entregar cada destinatario exactamente una vez, en bloques del tamaño pedido"""
+        chunks = []
+        channel = ChannelDispatcher('test', lambda chunk, message: chunks.append(list(chunk)),
+                                    chunk_size=3, concurrency=4)
+        recipients = [f'user{i}@test.com' for i in range(10)]
+
+        result = channel.dispatch(recipients, 'Hola')
+
+        assert sorted(r for chunk in chunks for r in chunk) == sorted(recipients)
+        assert sorted(len(chunk) for chunk in chunks) == [1, 3, 3, 3]
+        assert (result.sent_count, result.failed_count) == (10, 0)
+
+    def test_concurrency_is_bounded(self):
+        """Debe haber a lo sumo `concurrency` bloques en curso a la vez"""
+        lock = threading.Lock()
+        state = {'current': 0, 'peak': 0}
+
+        def provider(chunk, message):
+            with lock:
+                state['current'] += 1
+                state['peak'] = max(state['peak'], state['current'])
+            time.sleep(0.005)
+            with lock:
+                state['current'] -= 1
+
+        channel = ChannelDispatcher('test', provider, chunk_size=1, concurrency=3)
+        channel.dispatch([str(i) for i in range(30)], 'Hola')
+
+        assert state['peak'] == 3
+
+    def test_collects_failures_per_recipient(self):
+        """Debe traducir los índices del bloque y marcar todo el bloque si el proveedor lanza"""
+        def provider(chunk, message):
+            if 'b3' in chunk:
+                raise ConnectionError('provider down')
+            return {i: 'rejected' for i, r in enumerate(chunk) if r == 'b1'}
+
+        channel = ChannelDispatcher('test', provider, chunk_size=2, concurrency=2)
+        recipients = ['b0', 'b1', 'b2', 'b3', 'b4']
+
+        result = channel.dispatch(recipients, 'Hola')
+
+        assert result.errors == {1: 'rejected', 2: 'provider down', 3: 'provider down'}
+        assert result.delivered() == ['b0', 'b4']
+        assert result.failures(limit=1) == [{'recipient': 'b1', 'error': 'rejected'}]
+
+    def test_async_provider_runs_on_event_loop(self):
+        """Debe usar asyncio para proveedores asíncronos, con el mismo resultado"""
+        async def provider(chunk, message):
+            await asyncio.sleep(0)
+            return {0: 'bounced'} if chunk[0] == 'c2' else None
+
+        channel = ChannelDispatcher('test', provider, chunk_size=2, concurrency=2)
+
+        result = channel.dispatch(['c0', 'c1', 'c2', 'c3'], 'Hola')
+
+        assert channel.is_async
+        assert result.errors == {2: 'bounced'}
+
+    def test_dispatch_async_offloads_blocking_provider(self):
+        """Debe ejecutar los proveedores bloqueantes en el pool desde un event loop"""
+        caller = threading.current_thread()
+        seen = []
+        channel = ChannelDispatcher('test', lambda chunk, message: seen.append(threading.current_thread()),
+                                    chunk_size=1, concurrency=2)
+
+        result = asyncio.run(channel.dispatch_async(['a', 'b'], 'Hola'))
+        channel.shutdown()
+
+        assert result.sent_count == 2
+        assert caller not in seen
+
+
+class TestPartialDelivery:
+    """Tests para el envío con fallos parciales en POST /api/notifications/send"""
+
+    @patch('src.app.requests.post')
+    @patch('src.app.send_email')
+    def test_only_delivered_recipients_are_saved(self, mock_send_email, mock_post,
+                                                 client, valid_email_notification):
+        """Debe informar los fallos y registrar solo los destinatarios alcanzados"""
+        recipients = valid_email_notification['recipients']
+        mock_send_email.return_value = ChannelResult(recipients, {1: 'mailbox full'})
+        mock_post.return_value = Mock(status_code=201, json=lambda: {'id': 'notif-1'})
+
+        response = client.post('/api/notifications/send', json=valid_email_notification)
+
+        assert response.status_code == 201
+        data = response.get_json()
+        assert (data['sent_count'], data['failed_count']) == (1, 1)
+        assert data['failures'] == [{'recipient': recipients[1], 'error': 'mailbox full'}]
+        assert mock_post.call_args.kwargs['json']['recipients'] == [recipients[0]]
+
+    @patch('src.app.requests.post')
+    @patch('src.app.send_sms')
+    def test_all_recipients_failed(self, mock_send_sms, mock_post,
+                                   client, valid_sms_notification):
+        """Debe responder 500 sin registrar nada si ningún destinatario se alcanzó"""
+        mock_send_sms.return_value = ChannelResult(
+            valid_sms_notification['recipients'], {0: 'invalid number', 1: 'invalid number'})
+
+        response = client.post('/api/notifications/send', json=valid_sms_notification)
+
+        assert response.status_code == 500
+        assert 'all 2 recipients failed' in response.get_json()['error']
+        mock_post.assert_not_called()
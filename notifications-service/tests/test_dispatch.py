@@ -0,0 +1,233 @@
+import threading
+from unittest.mock import patch, Mock
+import pytest
+from src.app import dispatcher
+from src.channels import ChannelResult
+from src.dispatch import Dispatcher, QueueFullError
+from src.job_store import JobStore
+
+ASYNC = {'Prefer': 'respond-async'}
+
+
+class TestDispatcher:
+    """Tests para la cola acotada con pool de workers"""
+
+    def test_jobs_run_in_workers_and_keep_result(self):
+        """Debe procesar los trabajos fuera del hilo que encola y guardar el resultado"""
+        caller = threading.current_thread()
+        seen = []
+
+        def handler(payload):
+            seen.append(threading.current_thread())
+            # entrega parcial: solo uno de los dos destinatarios
+            return {'notification_id': payload['id'], 'sent_count': 1, 'failed_count': 1}
+
+        queue = Dispatcher(handler, workers=2)
+        jobs = [queue.submit({'id': f'n-{i}', 'recipients': ['a', 'b']}) for i in range(5)]
+
+        assert queue.drain(timeout=5)
+        assert [job.status for job in jobs] == ['sent'] * 5
+        assert queue.get(jobs[0].id).to_dict()['notification_id'] == 'n-0'
+        assert caller not in seen
+        stats = queue.stats()
+        assert (stats['sent'], stats['recipients'], stats['depth']) == (5, 5, 0)
+
+    def test_handler_error_marks_job_failed(self):
+        """Debe registrar el error del envío en el estado del trabajo"""
+        queue = Dispatcher(Mock(side_effect=Exception('Database service unavailable: down')))
+
+        job = queue.submit({'recipients': ['a']})
+        queue.drain(timeout=5)
+
+        data = queue.get(job.id).to_dict()
+        assert data['status'] == 'failed'
+        assert data['error'] == 'Database service unavailable: down'
+        assert queue.stats()['failed'] == 1
+
+    def test_full_queue_rejects(self):
+        """Debe rechazar sin bloquear cuando la cola está llena"""
+        release = threading.Event()
+        queue = Dispatcher(lambda payload: release.wait(5) and {}, workers=1, queue_size=1)
+
+        queue.submit({})
+        # esperar a que el único worker tome el primero y quede ocupado
+        while queue.stats()['busy'] == 0:
+            pass
+        queue.submit({})
+        with pytest.raises(QueueFullError):
+            queue.submit({})
+
+        release.set()
+        assert queue.drain(timeout=5)
+        assert queue.stats()['rejected'] == 1
+
+    def test_finished_jobs_are_bounded_and_expire(self):
+        """Debe olvidar los trabajos terminados más viejos y los vencidos"""
+        queue = Dispatcher(lambda payload: {}, workers=1, queue_size=1, max_jobs=2)
+        jobs = []
+        for _ in range(3):
+            jobs.append(queue.submit({}))
+            queue.drain(timeout=5)
+
+        assert queue.get(jobs[0].id) is None
+        assert queue.get(jobs[2].id).status == 'sent'
+
+        queue.retention = 0
+        jobs[2].finished_at -= 1
+        assert queue.get(jobs[2].id) is None
+
+    def test_shutdown_finishes_queued_jobs(self):
+        """Debe terminar lo encolado, detener los hilos y no aceptar más"""
+        queue = Dispatcher(lambda payload: {}, workers=2)
+        jobs = [queue.submit({}) for _ in range(10)]
+
+        assert queue.shutdown(timeout=5)
+        assert all(job.status == 'sent' for job in jobs)
+        with pytest.raises(QueueFullError):
+            queue.submit({})
+
+    def test_job_state_is_shared_through_store(self, tmp_path):
+        """Otro proceso (otro Dispatcher) debe ver el estado publicado en el store"""
+        path = str(tmp_path / 'jobs.db')
+        accepted = Dispatcher(lambda payload: {'sent_count': 2}, store=JobStore(path))
+        other = Dispatcher(lambda payload: {}, store=JobStore(path))
+
+        job = accepted.submit({'recipients': ['a', 'b']})
+        assert accepted.drain(timeout=5)
+
+        data = other.status(job.id)
+        assert data['status'] == 'sent'
+        assert data['sent_count'] == 2
+        assert other.status('does-not-exist') is None
+
+        accepted.retention = other.retention = 0
+        job.finished_at -= 1
+        assert accepted.status(job.id) is None
+
+    def test_queued_state_does_not_overwrite_progress(self, tmp_path):
+        """El "queued" inicial no debe pisar un estado que el hilo ya publicó"""
+        store = JobStore(str(tmp_path / 'jobs.db'))
+        store.save('job-1', {'status': 'sent'}, finished_at=1e12)
+        store.save('job-1', {'status': 'queued'}, replace=False)
+
+        assert store.load('job-1', 0)['status'] == 'sent'
+
+
+class TestAsyncSendEndpoint:
+    """Tests para el modo 202 Accepted de POST /api/notifications/send"""
+
+    @patch('src.app.requests.post')
+    @patch('src.app.send_email')
+    def test_prefer_respond_async_returns_job(self, mock_send_email, mock_post,
+                                              client, valid_email_notification):
+        """Debe responder 202 con el id del trabajo y enviar en segundo plano"""
+        mock_send_email.return_value = ChannelResult(valid_email_notification['recipients'])
+        mock_post.return_value = Mock(status_code=201, json=lambda: {'id': 'notif-123-uuid'})
+
+        response = client.post('/api/notifications/send', json=valid_email_notification,
+                               headers=ASYNC)
+
+        assert response.status_code == 202
+        data = response.get_json()
+        assert data['status'] == 'queued'
+        assert response.headers['Location'] == data['status_url']
+        assert response.headers['Preference-Applied'] == 'respond-async'
+
+        assert dispatcher.drain(timeout=5)
+        mock_send_email.assert_called_once_with(
+            valid_email_notification['recipients'],
+            valid_email_notification['message']
+        )
+        job = client.get(data['status_url'])
+        assert job.status_code == 200
+        assert job.get_json()['status'] == 'sent'
+        assert job.get_json()['notification_id'] == 'notif-123-uuid'
+        assert job.get_json()['sent_count'] == 2
+
+    @patch('src.app.requests.post')
+    @patch('src.app.send_sms')
+    def test_failed_delivery_is_reported_in_job(self, mock_send_sms, mock_post,
+                                                client, valid_sms_notification):
+        """Debe exponer en el trabajo el mismo error que el modo síncrono"""
+        mock_send_sms.return_value = ChannelResult(valid_sms_notification['recipients'])
+        mock_post.return_value = Mock(status_code=500)
+
+        response = client.post('/api/notifications/send', json=valid_sms_notification,
+                               headers=ASYNC)
+        dispatcher.drain(timeout=5)
+
+        job = client.get(response.get_json()['status_url']).get_json()
+        assert job['status'] == 'failed'
+        assert job['error'] == 'Failed to save notification to database'
+
+    def test_invalid_data_is_rejected_before_enqueue(self, client):
+        """Debe validar antes de encolar"""
+        depth = dispatcher.stats()['tracked_jobs']
+
+        response = client.post('/api/notifications/send', json={'type': 'EMAIL'},
+                               headers=ASYNC)
+
+        assert response.status_code == 400
+        assert dispatcher.stats()['tracked_jobs'] == depth
+
+    def test_full_queue_returns_503(self, client, valid_email_notification):
+        """Debe responder 503 con Retry-After si la cola no tiene lugar"""
+        with patch.object(dispatcher, 'submit', side_effect=QueueFullError('Dispatch queue is full')):
+            response = client.post('/api/notifications/send', json=valid_email_notification,
+                                   headers=ASYNC)
+
+        assert response.status_code == 503
+        assert response.get_json()['error'] == 'Dispatch queue is full'
+        assert response.headers['Retry-After'] == '5'
+
+    @patch('src.app.requests.post')
+    @patch('src.app.send_email')
+    def test_async_default_from_config(self, mock_send_email, mock_post,
+                                       app, client, valid_email_notification):
+        """Debe encolar sin el encabezado cuando DISPATCH_ASYNC_DEFAULT está activo"""
+        mock_send_email.return_value = ChannelResult(valid_email_notification['recipients'])
+        mock_post.return_value = Mock(status_code=201, json=lambda: {'id': 'n-1'})
+        app.config['DISPATCH_ASYNC_DEFAULT'] = True
+        try:
+            response = client.post('/api/notifications/send', json=valid_email_notification)
+        finally:
+            app.config['DISPATCH_ASYNC_DEFAULT'] = False
+        dispatcher.drain(timeout=5)
+
+        assert response.status_code == 202
+
+    def test_unknown_job_returns_404(self, client):
+        """Debe responder 404 para un trabajo inexistente"""
+        response = client.get('/api/notifications/jobs/does-not-exist')
+
+        assert response.status_code == 404
+        assert response.get_json()['error'] == 'Job not found'
+
+    def test_job_from_another_worker_is_found_in_store(self, client, tmp_path):
+        """Debe responder el estado que otro worker publicó en el store"""
+        store = JobStore(str(tmp_path / 'jobs.db'))
+        store.save('job-elsewhere', {'job_id': 'job-elsewhere', 'status': 'sending'})
+
+        with patch.object(dispatcher, 'store', store):
+            response = client.get('/api/notifications/jobs/job-elsewhere')
+
+        assert response.status_code == 200
+        assert response.get_json()['status'] == 'sending'
+
+    @patch('src.app.requests.post')
+    @patch('src.app.send_email')
+    def test_metrics_include_queue_state(self, mock_send_email, mock_post,
+                                         client, valid_email_notification):
+        """Debe exponer profundidad de la cola y trabajos por resultado"""
+        mock_send_email.return_value = ChannelResult(valid_email_notification['recipients'])
+        mock_post.return_value = Mock(status_code=201, json=lambda: {'id': 'n-1'})
+        client.post('/api/notifications/send', json=valid_email_notification, headers=ASYNC)
+        dispatcher.drain(timeout=5)
+
+        text = client.get('/metrics').get_data(as_text=True)
+
+        assert 'notifications_dispatch_queue_depth 0' in text
+        assert 'notifications_dispatch_jobs_total{outcome="sent"}' in text
+        assert 'notifications_dispatch_recipients_total' in text
+        assert 'notifications_dispatch_queue_wait_seconds_count' in text
+        assert 'notifications_dispatch_job_duration_seconds_count{outcome="sent"}' in text
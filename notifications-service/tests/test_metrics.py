@@ -0,0 +1,41 @@
+from unittest.mock import patch, Mock
+from src.channels import ChannelResult
+
+
+class TestMetricsEndpoint:
+    """Tests para endpoint GET /metrics"""
+
+    @patch('src.app.requests.post')
+    @patch('src.app.send_email')
+    def test_metrics_include_route_latency_and_status(self, mock_send, mock_post,
+                                                      client, valid_email_notification):
+        """Debe exponer latencia por ruta y códigos de estado"""
+        mock_send.return_value = ChannelResult(valid_email_notification['recipients'])
+        mock_post.return_value = Mock(status_code=201, json=Mock(return_value={'id': 'n-1'}))
+
+        client.post('/api/notifications/send', json=valid_email_notification)
+        response = client.get('/metrics')
+
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain; version=0.0.4')
+        text = response.get_data(as_text=True)
+        assert ('notifications_http_request_duration_seconds_count'
+                '{method="POST",route="/api/notifications/send"}') in text
+        assert ('notifications_http_responses_total'
+                '{method="POST",route="/api/notifications/send",status="201"}') in text
+        assert 'notifications_http_requests_in_flight 1' in text
+        assert ('notifications_database_service_call_duration_seconds_count'
+                '{operation="create_notification",outcome="ok"}') in text
+
+    @patch('src.app.requests.get')
+    def test_metrics_record_failed_database_calls(self, mock_get, client):
+        """Debe separar las llamadas a BD que fallan"""
+        mock_get.side_effect = Exception('Connection refused')
+
+        client.get('/api/notifications/history')
+        text = client.get('/metrics').get_data(as_text=True)
+
+        assert ('notifications_database_service_call_duration_seconds_count'
+                '{operation="list_notifications",outcome="error"}') in text
+        assert ('notifications_http_responses_total'
+                '{method="GET",route="/api/notifications/history",status="500"}') in text
@@ -1,5 +1,6 @@
 import pytest
 from src.app import validate_notification_data
+from src.channels import ChannelResult
 from unittest.mock import patch, Mock
 import json
 
@@ -92,18 +93,18 @@ class TestValidation:
 class TestSendFunctions:
     """Tests para funciones de envío simulado - TDD Fase RED"""
     
-    def test_send_email_returns_true(self):
-        """send_email debe retornar True al simular envío exitoso"""
+    def test_send_email_returns_result(self):
+        """send_email debe retornar el resultado del envío simulado"""
         from src.app import send_email
         result = send_email(['user@test.com'], 'Test message')
-        assert result is True
+        assert (result.sent_count, result.failed_count) == (1, 0)
     
     def test_send_email_with_multiple_recipients(self):
         """send_email debe manejar múltiples destinatarios"""
         from src.app import send_email
         recipients = ['user1@test.com', 'user2@test.com', 'user3@test.com']
         result = send_email(recipients, 'Hello everyone')
-        assert result is True
+        assert result.delivered() == recipients
     
     def test_send_email_prints_info(self, capsys):
         """send_email debe imprimir información del envío"""
@@ -114,18 +115,18 @@ class TestSendFunctions:
         assert 'EMAIL' in captured.out
         assert '2' in captured.out  # número de destinatarios
     
-    def test_send_sms_returns_true(self):
-        """send_sms debe retornar True al simular envío exitoso"""
+    def test_send_sms_returns_result(self):
+        """send_sms debe retornar el resultado del envío simulado"""
         from src.app import send_sms
         result = send_sms(['+56912345678'], 'Test SMS')
-        assert result is True
+        assert (result.sent_count, result.failed_count) == (1, 0)
     
     def test_send_sms_with_multiple_numbers(self):
         """send_sms debe manejar múltiples números"""
         from src.app import send_sms
         numbers = ['+56912345678', '+56987654321', '+56911111111']
         result = send_sms(numbers, 'SMS test')
-        assert result is True
+        assert result.delivered() == numbers
     
     def test_send_sms_prints_info(self, capsys):
         """send_sms debe imprimir información del envío"""
@@ -145,7 +146,7 @@ class TestSendEndpoint:
                                             client, valid_email_notification):
         """Debe enviar notificación EMAIL y guardar en BD"""
         # Mock del envío
-        mock_send_email.return_value = True
+        mock_send_email.return_value = ChannelResult(valid_email_notification['recipients'])
         
         # Mock de la respuesta del servicio de BD
         mock_post.return_value = Mock(
@@ -189,7 +190,7 @@ class TestSendEndpoint:
     def test_send_sms_notification_success(self, mock_send_sms, mock_post, 
                                           client, valid_sms_notification):
         """Debe enviar notificación SMS y guardar en BD"""
-        mock_send_sms.return_value = True
+        mock_send_sms.return_value = ChannelResult(valid_sms_notification['recipients'])
         mock_post.return_value = Mock(
             status_code=201,
             json=lambda: {
@@ -254,7 +255,7 @@ class TestSendEndpoint:
     def test_send_notification_database_error(self, mock_send_email, mock_post, 
                                              client, valid_email_notification):
         """Debe manejar error al guardar en BD con 500"""
-        mock_send_email.return_value = True
+        mock_send_email.return_value = ChannelResult(valid_email_notification['recipients'])
         
         # Simular error del servicio de BD
         mock_post.return_value = Mock(
@@ -277,7 +278,7 @@ class TestSendEndpoint:
     def test_send_notification_database_unavailable(self, mock_send_email, mock_post, 
                                                     client, valid_email_notification):
         """Debe manejar cuando el servicio de BD no está disponible"""
-        mock_send_email.return_value = True
+        mock_send_email.return_value = ChannelResult(valid_email_notification['recipients'])
         
         # Simular que el servicio de BD no responde
         mock_post.side_effect = Exception('Connection refused')
@@ -0,0 +1,249 @@
+import sqlite3
+import time
+from unittest.mock import patch, Mock
+import pytest
+from src.app import replay_notification_records
+from src.channels import ChannelResult
+from src.outbox import Outbox, OutboxReplayer
+
+
+@pytest.fixture
+def clock():
+    return Mock(return_value=1000.0)
+
+
+@pytest.fixture
+def outbox(tmp_path, clock):
+    store = Outbox(str(tmp_path / 'outbox.db'), clock=clock)
+    yield store
+    store.close()
+
+
+def record(n):
+    return {'type': 'EMAIL', 'message': f'Mensaje {n}', 'recipients': [f'user{n}@test.com']}
+
+
+class TestOutbox:
+    """Tests para el outbox local en SQLite"""
+
+    def test_records_survive_a_new_connection(self, tmp_path, outbox):
+        """Debe conservar los registros en disco y devolverlos en orden"""
+        ids = [outbox.append(record(n)) for n in range(3)]
+
+        reopened = Outbox(outbox.path)
+        batch = reopened.claim(10, lease=30)
+
+        assert [row[1] for row in batch] == ids
+        assert batch[0][2] == record(0)
+        reopened.close()
+
+    def test_claimed_records_are_not_handed_out_twice(self, outbox, clock):
+        """Debe reservar el lote para un solo replayer hasta que venza el plazo"""
+        outbox.append(record(0))
+        other_process = Outbox(outbox.path, clock=clock)
+
+        assert len(outbox.claim(10, lease=30)) == 1
+        assert other_process.claim(10, lease=30) == []
+
+        clock.return_value += 31
+        assert len(other_process.claim(10, lease=30)) == 1
+        other_process.close()
+
+    def test_retry_defers_and_complete_removes(self, outbox, clock):
+        """Debe postergar los reintentos y borrar los guardados"""
+        outbox.append(record(0))
+        outbox.append(record(1))
+        first, second = outbox.claim(10, lease=30)
+
+        outbox.complete([first[0]])
+        outbox.retry([second[0]], delay=5)
+
+        assert outbox.claim(10, lease=30) == []
+        clock.return_value += 5
+        assert [row[1] for row in outbox.claim(10, lease=30)] == [second[1]]
+
+    def test_stats_report_size_and_lag(self, outbox, clock):
+        """Debe informar pendientes y antigüedad del más viejo"""
+        assert outbox.stats() == {'size': 0, 'lag': 0.0}
+
+        outbox.append(record(0))
+        clock.return_value += 12
+        outbox.append(record(1))
+
+        assert outbox.stats() == {'size': 2, 'lag': 12.0}
+
+
+class TestOutboxReplayer:
+    """Tests para el vaciado del outbox en lotes"""
+
+    def test_flushes_in_batches(self, outbox):
+        """Debe mandar lotes de batch_size y vaciar el outbox"""
+        for n in range(5):
+            outbox.append(record(n))
+        batches = []
+        replayer = OutboxReplayer(outbox, lambda records: batches.append(records) or [True] * len(records),
+                                  batch_size=2)
+
+        assert [replayer.run_once() for _ in range(4)] == [2, 2, 1, 0]
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert outbox.stats()['size'] == 0
+        assert replayer.stats()['flushed'] == 5
+
+    def test_partial_failure_backs_off_the_rest(self, outbox, clock):
+        """Debe borrar lo guardado y reintentar el resto más tarde"""
+        for n in range(3):
+            outbox.append(record(n))
+        replayer = OutboxReplayer(outbox, lambda records: [True], backoff=4, max_backoff=60)
+
+        assert replayer.run_once() == -1
+        assert outbox.stats()['size'] == 2
+        assert replayer.stats() == {'flushed': 1, 'rejected': 0, 'errors': 1,
+                                    'consecutive_failures': 1}
+        assert outbox.claim(10, lease=30) == []
+
+        clock.return_value += 4
+        assert len(outbox.claim(10, lease=30)) == 2
+
+    def test_rejected_records_leave_the_outbox(self, outbox):
+        """Debe descartar (y contar) los registros que database-service rechaza"""
+        outbox.append(record(0))
+        outbox.append(record(1))
+        replayer = OutboxReplayer(outbox, lambda records: [False, True])
+
+        assert replayer.run_once() == 2
+        assert replayer.stats()['rejected'] == 1
+        assert outbox.stats()['size'] == 0
+
+    def test_backoff_grows_and_is_capped(self, outbox):
+        """Debe duplicar la espera con cada error seguido hasta max_backoff"""
+        replayer = OutboxReplayer(outbox, Mock(side_effect=Exception('down')),
+                                  backoff=1, max_backoff=8)
+        delays = []
+        for _ in range(6):
+            outbox.append(record(0))
+            outbox.clock.return_value += 100
+            replayer.run_once()
+            delays.append(replayer.delay())
+
+        # espera base 1, 2, 4, 8, 8, 8 con jitter en [base/2, base]
+        for delay, base in zip(delays, [1, 2, 4, 8, 8, 8]):
+            assert base / 2 <= delay <= base
+
+    def test_database_errors_back_off(self, outbox):
+        """Un sqlite3.Error en el hilo debe esperar al menos backoff, no girar en vacío"""
+        replayer = OutboxReplayer(outbox, Mock(), backoff=0.2, max_backoff=1)
+        waits = []
+
+        def wait(timeout=None):
+            waits.append(timeout)
+            if len(waits) == 3:
+                replayer._stop.set()
+            return replayer._stop.is_set()
+
+        with patch.object(replayer, 'run_once', side_effect=sqlite3.OperationalError('locked')), \
+                patch.object(replayer._stop, 'wait', side_effect=wait):
+            replayer._run()
+
+        assert len(waits) == 3
+        assert all(timeout >= 0.2 for timeout in waits)
+        assert replayer.stats()['errors'] == 3
+        assert replayer.stats()['consecutive_failures'] == 3
+
+    def test_background_thread_flushes_on_notify(self, outbox):
+        """Debe vaciar el outbox en segundo plano al recibir un aviso"""
+        outbox.clock = time.time
+        flushed = []
+        replayer = OutboxReplayer(outbox, lambda records: flushed.extend(records) or [True] * len(records),
+                                  interval=60)
+        replayer.start()
+        outbox.append(record(0))
+        replayer.notify()
+
+        for _ in range(200):
+            if flushed:
+                break
+            time.sleep(0.01)
+        replayer.stop(timeout=5)
+
+        assert flushed == [record(0)]
+
+
+class TestOutboxEndpoint:
+    """Tests para POST /api/notifications/send con el outbox activo"""
+
+    @pytest.fixture
+    def app_outbox(self, outbox):
+        replayer = OutboxReplayer(outbox, replay_notification_records)
+        replayer.start = Mock()
+        with patch('src.app.outbox', outbox), patch('src.app.outbox_replayer', replayer):
+            yield outbox, replayer
+
+    @patch('src.app.requests.post')
+    @patch('src.app.send_email')
+    def test_send_does_not_wait_for_database(self, mock_send_email, mock_post, client,
+                                             app_outbox, valid_email_notification):
+        """Debe responder 201 con outbox_id aunque database-service esté caído"""
+        outbox, replayer = app_outbox
+        mock_send_email.return_value = ChannelResult(valid_email_notification['recipients'])
+        mock_post.side_effect = Exception('Read timed out')
+
+        response = client.post('/api/notifications/send', json=valid_email_notification)
+
+        assert response.status_code == 201
+        data = response.get_json()
+        assert data['status'] == 'sent'
+        assert 'outbox_id' in data and 'notification_id' not in data
+        mock_post.assert_not_called()
+        replayer.start.assert_called_once()
+        assert outbox.stats()['size'] == 1
+
+        # el replayer falla mientras la BD siga caída y guarda cuando vuelve
+        assert replayer.run_once() == -1
+        outbox.clock.return_value += 60
+        mock_post.side_effect = None
+        mock_post.return_value = Mock(status_code=201)
+        assert replayer.run_once() == 1
+        assert mock_post.call_args.args[0].endswith('/notifications/bulk')
+        [saved] = mock_post.call_args.kwargs['json']['notifications']
+        assert saved.pop('sentAt').endswith('Z')
+        assert saved == valid_email_notification
+        assert outbox.stats()['size'] == 0
+
+    @patch('src.app.requests.post')
+    def test_replay_saves_batch_in_one_call(self, mock_post):
+        """Debe guardar el lote completo con un solo POST /notifications/bulk"""
+        mock_post.return_value = Mock(status_code=201)
+
+        assert replay_notification_records([record(n) for n in range(3)]) == [True] * 3
+        mock_post.assert_called_once()
+        assert mock_post.call_args.kwargs['json'] == {
+            'notifications': [record(n) for n in range(3)]}
+
+    @patch('src.app.requests.post')
+    def test_replay_stops_at_first_transient_error(self, mock_post):
+        """Si el lote es rechazado, debe distinguir de a uno rechazos (4xx) de errores (5xx)"""
+        mock_post.side_effect = [Mock(status_code=400),
+                                 Mock(status_code=201), Mock(status_code=400),
+                                 Mock(status_code=503), Mock(status_code=201)]
+
+        assert replay_notification_records([record(n) for n in range(4)]) == [True, False]
+
+    @patch('src.app.requests.post')
+    def test_replay_retries_whole_batch_on_server_error(self, mock_post):
+        """Un 5xx del lote no guarda nada: todo se reintenta"""
+        mock_post.return_value = Mock(status_code=503)
+
+        assert replay_notification_records([record(n) for n in range(2)]) == []
+        mock_post.assert_called_once()
+
+    def test_metrics_include_outbox_size_and_lag(self, client, app_outbox):
+        """Debe exponer tamaño y retraso del outbox"""
+        outbox, _ = app_outbox
+        outbox.append(record(0))
+        outbox.clock.return_value += 3
+
+        text = client.get('/metrics').get_data(as_text=True)
+
+        assert 'notifications_outbox_size 1' in text
+        assert 'notifications_outbox_lag_seconds 3' in text
+        assert 'notifications_outbox_replayed_total{outcome="saved"} 0' in text
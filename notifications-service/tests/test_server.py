@@ -0,0 +1,35 @@
+import os
+import runpy
+from gunicorn.config import Config as GunicornConfig
+from src.config import Config
+
+CONF_PATH = os.path.join(os.path.dirname(__file__), '..', 'gunicorn.conf.py')
+
+
+class TestGunicornConf:
+    """Tests para la configuración del servidor de producción"""
+
+    def test_settings_come_from_config(self):
+        """Workers, hilos, reciclado y apagado ordenado deben salir de Config"""
+        settings = runpy.run_path(CONF_PATH)
+
+        assert settings['bind'] == f"0.0.0.0:{Config.NOTIFICATIONS_PORT}"
+        assert settings['workers'] == Config.WEB_CONCURRENCY
+        assert settings['worker_class'] == 'gthread'
+        assert settings['threads'] == Config.WEB_THREADS
+        assert settings['max_requests'] == Config.WEB_MAX_REQUESTS
+        assert settings['max_requests_jitter'] == Config.WEB_MAX_REQUESTS_JITTER
+        assert settings['graceful_timeout'] == Config.WEB_GRACEFUL_TIMEOUT
+
+    def test_settings_are_valid_for_gunicorn(self):
+        """gunicorn debe aceptar cada valor del archivo de configuración"""
+        settings = runpy.run_path(CONF_PATH)
+        config = GunicornConfig()
+
+        for name, value in settings.items():
+            if name in config.settings:
+                config.set(name, value)
+
+        assert config.workers == Config.WEB_CONCURRENCY
+        assert config.worker_class_str == 'gthread'
+        assert config.preload_app == Config.WEB_PRELOAD_APP
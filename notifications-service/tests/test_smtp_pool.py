@@ -0,0 +1,142 @@
+import email
+from unittest.mock import patch, Mock
+import pytest
+from src.app import build_email_provider
+from src.channels import ChannelDispatcher
+from src.smtp_pool import SMTPConnectionPool, SMTPProvider
+from tests.smtp_stand_in import SMTPStandIn
+
+
+@pytest.fixture
+def smtp_server():
+    with SMTPStandIn(reject={'bounce@example.com'}) as server:
+        yield server
+
+
+def make_provider(server, size=2, max_messages=100, pipelining=True):
+    pool = SMTPConnectionPool(server.host, server.port, size=size, timeout=5,
+                              max_messages=max_messages)
+    return SMTPProvider(pool, 'notifications@example.com', 'Aviso', pipelining=pipelining)
+
+
+class TestSMTPProvider:
+    """Tests para el proveedor EMAIL sobre conexiones SMTP persistentes"""
+
+    @pytest.mark.parametrize('pipelining', [True, False])
+    def test_delivers_one_message_per_recipient(self, smtp_server, pipelining):
+        """Debe enviar un mensaje por destinatario con su propio To"""
+        provider = make_provider(smtp_server, pipelining=pipelining)
+
+        failures = provider(['a@example.com', 'b@example.com'], 'Hola\n.línea con punto')
+
+        assert failures == {}
+        assert [rcpts for _, rcpts, _ in smtp_server.messages] == [['a@example.com'], ['b@example.com']]
+        parsed = email.message_from_bytes(smtp_server.messages[1][2])
+        assert parsed['To'] == 'b@example.com'
+        assert parsed['Subject'] == 'Aviso'
+        assert '.línea con punto' in parsed.get_payload(decode=True).decode('utf-8')
+
+    def test_reuses_connections(self, smtp_server):
+        """Debe usar una sola conexión para muchos mensajes de un bloque"""
+        provider = make_provider(smtp_server)
+
+        provider([f'user{i}@example.com' for i in range(20)], 'Hola')
+        provider(['again@example.com'], 'Hola')
+
+        assert smtp_server.received == 21
+        assert smtp_server.connections == 1
+        assert provider.pool.stats()['opened'] == 1
+
+    def test_recycles_after_max_messages(self, smtp_server):
+        """Debe abrir una conexión nueva cada max_messages transacciones"""
+        provider = make_provider(smtp_server, max_messages=3)
+
+        provider([f'user{i}@example.com' for i in range(7)], 'Hola')
+
+        assert smtp_server.received == 7
+        assert smtp_server.connections == 3
+
+    @pytest.mark.parametrize('pipelining', [True, False])
+    def test_rejected_recipient_does_not_break_the_session(self, smtp_server, pipelining):
+        """Debe informar el rechazo del destinatario y seguir con la misma conexión"""
+        provider = make_provider(smtp_server, pipelining=pipelining)
+
+        failures = provider(['a@example.com', 'bounce@example.com', 'bad\r\naddress', 'c@example.com'],
+                            'Hola')
+
+        assert failures[1].startswith('550')
+        assert failures[2] == 'Invalid email address'
+        assert sorted(failures) == [1, 2]
+        assert smtp_server.received == 2
+        assert smtp_server.connections == 1
+
+    def test_reconnects_after_server_drops_connection(self, smtp_server):
+        """Debe reintentar con una conexión nueva si la ociosa fue cortada"""
+        provider = make_provider(smtp_server)
+        provider(['a@example.com'], 'Hola')
+
+        smtp_server.drop_connections()
+        failures = provider(['b@example.com', 'c@example.com'], 'Hola')
+
+        assert failures == {}
+        assert smtp_server.received == 3
+        assert smtp_server.connections == 2
+        assert provider.pool.stats()['failed'] == 1
+
+    def test_unreachable_server_fails_the_rest_of_the_chunk(self):
+        """Debe fallar todo el bloque sin reintentar destinatario por destinatario"""
+        server = SMTPStandIn().start()
+        server.stop()
+        provider = make_provider(server)
+
+        failures = provider(['a@example.com', 'b@example.com'], 'Hola')
+
+        assert sorted(failures) == [0, 1]
+        assert provider.pool.stats()['failed'] == 1
+
+    def test_parallel_chunks_share_the_pool(self, smtp_server):
+        """Debe limitar las conexiones al tamaño del pool con bloques en paralelo"""
+        provider = make_provider(smtp_server, size=3)
+        channel = ChannelDispatcher('email', provider, chunk_size=10, concurrency=6)
+
+        result = channel.dispatch([f'user{i}@example.com' for i in range(200)], 'Hola')
+        channel.shutdown()
+
+        assert result.sent_count == 200
+        assert smtp_server.received == 200
+        assert smtp_server.connections <= 3
+
+
+class TestEmailProviderConfig:
+    """Tests para la selección del proveedor EMAIL desde Config"""
+
+    def test_smtp_provider_from_config(self, app):
+        """Debe construir el pool con los valores de Config"""
+        config = dict(app.config, EMAIL_PROVIDER='smtp', SMTP_HOST='mail.local',
+                      SMTP_PORT=2525, SMTP_POOL_SIZE=5)
+
+        provider = build_email_provider(config)
+
+        assert isinstance(provider, SMTPProvider)
+        assert (provider.pool.host, provider.pool.port, provider.pool.size) == ('mail.local', 2525, 5)
+
+    def test_unknown_provider_is_rejected(self, app):
+        """Debe fallar al arrancar con un proveedor desconocido"""
+        with pytest.raises(ValueError):
+            build_email_provider(dict(app.config, EMAIL_PROVIDER='carrier-pigeon'))
+
+    @patch('src.app.requests.post')
+    def test_send_endpoint_delivers_over_smtp(self, mock_post, client, smtp_server,
+                                              valid_email_notification):
+        """Debe enviar por SMTP y exponer el estado del pool en /metrics"""
+        mock_post.return_value = Mock(status_code=201, json=lambda: {'id': 'notif-1'})
+        smtp = make_provider(smtp_server)
+
+        with patch('src.app.EMAIL_CHANNEL', ChannelDispatcher('email', smtp)):
+            response = client.post('/api/notifications/send', json=valid_email_notification)
+            text = client.get('/metrics').get_data(as_text=True)
+
+        assert response.status_code == 201
+        assert response.get_json()['sent_count'] == 2
+        assert smtp_server.received == 2
+        assert 'notifications_smtp_messages_total 2' in text
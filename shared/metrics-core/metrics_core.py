@@ -0,0 +1,239 @@
+"""
+Núcleo de métricas estilo Prometheus compartido por tickets-service y
+notifications-service: contadores, gauges e histogramas con shards por hilo
+(sin locks en el camino caliente) que se suman al exportar. Cada servicio
+define sus propias métricas sobre un MetricsRegistry.
+"""
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterable, List, Sequence, Tuple
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# cada cuántos hilos registrados se pliegan los de hilos ya terminados
+_PRUNE_EVERY = 64
+
+
+class _ShardedMetric:
+    """
+    Base de las métricas: cada hilo escribe en su propio diccionario de
+    series (sin locks en el camino caliente) y al exportar se suman todos.
+    Los datos de hilos terminados se pliegan en una serie base para que
+    los servidores con un hilo por solicitud no acumulen memoria.
+    """
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[Tuple[threading.Thread, dict]] = []
+        self._retired: dict = {}
+
+    def _new_series(self) -> list:
+        raise NotImplementedError
+
+    def _series(self, labels: tuple) -> list:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+                if len(self._shards) % _PRUNE_EVERY == 0:
+                    self._prune()
+        series = shard.get(labels)
+        if series is None:
+            series = shard[labels] = self._new_series()
+        return series
+
+    @staticmethod
+    def _add_into(target: dict, shard: dict):
+        for labels, series in list(shard.items()):
+            current = target.get(labels)
+            if current is None:
+                target[labels] = list(series)
+            else:
+                for i, value in enumerate(series):
+                    current[i] += value
+
+    def _prune(self):
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                self._add_into(self._retired, shard)
+        self._shards = alive
+
+    def collect(self) -> dict:
+        """Suma de todas las series por combinación de etiquetas"""
+        with self._lock:
+            self._prune()
+            merged = {labels: list(series) for labels, series in self._retired.items()}
+            for _, shard in self._shards:
+                self._add_into(merged, shard)
+        return merged
+
+    def _label_text(self, labels: tuple, extra: str = '') -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}",
+                 f"# TYPE {self.name} {self.kind}"]
+        for labels, series in sorted(self.collect().items()):
+            lines.extend(self._render_series(labels, series))
+        return lines
+
+    def _render_series(self, labels: tuple, series: list) -> List[str]:
+        return [f"{self.name}{self._label_text(labels)} {_number(series[0])}"]
+
+
+class Counter(_ShardedMetric):
+    kind = 'counter'
+
+    def _new_series(self) -> list:
+        return [0]
+
+    def inc(self, *labels, amount: float = 1):
+        self._series(labels)[0] += amount
+
+
+class Gauge(_ShardedMetric):
+    """Gauge sumable entre hilos (p. ej. solicitudes en curso)"""
+
+    kind = 'gauge'
+
+    def _new_series(self) -> list:
+        return [0]
+
+    def inc(self, *labels, amount: float = 1):
+        self._series(labels)[0] += amount
+
+    def dec(self, *labels, amount: float = 1):
+        self._series(labels)[0] -= amount
+
+
+class Histogram(_ShardedMetric):
+    """
+    Histograma con buckets fijos. Cada serie guarda un contador por bucket
+    (no acumulado, el último es +Inf) y la suma de las observaciones
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self) -> list:
+        return [0] * (len(self.buckets) + 2)
+
+    def observe(self, value: float, *labels):
+        series = self._series(labels)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def _render_series(self, labels: tuple, series: list) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), series):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else _number(bound)
+            le_label = 'le="' + le + '"'
+            lines.append(f"{self.name}_bucket{self._label_text(labels, le_label)} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_text(labels)} {_number(series[-1])}")
+        lines.append(f"{self.name}_count{self._label_text(labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_ShardedMetric] = []
+
+    def register(self, metric: _ShardedMetric) -> _ShardedMetric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self, extra_lines: Iterable[str] = ()) -> str:
+        """Texto en formato de exposición de Prometheus"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        lines.extend(extra_lines)
+        return '\n'.join(lines) + '\n'
+
+
+def render_gauge(name: str, documentation: str, samples: Iterable[Tuple[dict, float]],
+                 kind: str = 'gauge') -> List[str]:
+    """Renderizar valores leídos al momento de exportar (estado de caché, breaker, etc.)"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        text = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        lines.append(f"{name}{{{text}}} {_number(value)}" if text else f"{name} {_number(value)}")
+    return lines
+
+
+@contextmanager
+def track_call(histogram: Histogram, operation: str):
+    """
+    Observar la duración del bloque en el histograma con etiquetas
+    (operation, outcome); outcome es "error" si el bloque lanzó una excepción
+    """
+    start = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        histogram.observe(time.perf_counter() - start, operation, outcome)
+
+
+def timed(histogram: Histogram, operation: str) -> Callable:
+    """Decorador equivalente a track_call para funciones y corrutinas"""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with track_call(histogram, operation):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with track_call(histogram, operation):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else repr(value)
+    return str(value)
@@ -0,0 +1,122 @@
+import threading
+import unittest
+from metrics_core import MetricsRegistry, render_gauge, timed, track_call
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        """Configurar un registro aislado por prueba"""
+        self.registry = MetricsRegistry()
+        self.histogram = self.registry.histogram(
+            'test_duration_seconds', 'Duración', ('operation', 'outcome'),
+            buckets=(0.1, 1.0))
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Probar buckets acumulados, suma y conteo en la exportación"""
+        self.histogram.observe(0.05, 'get', 'ok')
+        self.histogram.observe(0.5, 'get', 'ok')
+        self.histogram.observe(3.0, 'get', 'ok')
+
+        lines = self.histogram.render()
+
+        self.assertIn('test_duration_seconds_bucket{operation="get",outcome="ok",le="0.1"} 1', lines)
+        self.assertIn('test_duration_seconds_bucket{operation="get",outcome="ok",le="1"} 2', lines)
+        self.assertIn('test_duration_seconds_bucket{operation="get",outcome="ok",le="+Inf"} 3', lines)
+        self.assertIn('test_duration_seconds_sum{operation="get",outcome="ok"} 3.55', lines)
+        self.assertIn('test_duration_seconds_count{operation="get",outcome="ok"} 3', lines)
+
+    def test_per_thread_shards_are_merged(self):
+        """Probar que las observaciones de varios hilos se suman al exportar"""
+        counter = self.registry.counter('test_total', 'Total', ('route',))
+
+        def work():
+            for _ in range(1000):
+                counter.inc('/a')
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        counter.inc('/a')
+
+        self.assertEqual(counter.collect(), {('/a',): [8001]})
+        # los hilos terminados se pliegan en la serie base
+        self.assertEqual(len(counter._shards), 1)
+
+    def test_histogram_observations_from_threads_are_merged(self):
+        """Probar que los histogramas también suman las series de varios hilos"""
+        histogram = self.registry.histogram('test_seconds', 'Duración', ('route',),
+                                            buckets=(0.1,))
+
+        def work():
+            for _ in range(500):
+                histogram.observe(0.05, '/a')
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        lines = histogram.render()
+        self.assertIn('test_seconds_bucket{route="/a",le="0.1"} 2000', lines)
+        self.assertIn('test_seconds_count{route="/a"} 2000', lines)
+
+    def test_gauge_inc_dec(self):
+        """Probar el gauge de solicitudes en curso"""
+        gauge = self.registry.gauge('test_in_flight', 'En curso')
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+
+        self.assertIn('test_in_flight 1', self.registry.render())
+
+    def test_track_call_records_outcome(self):
+        """Probar que track_call y timed etiquetan errores"""
+        with track_call(self.histogram, 'save'):
+            pass
+        with self.assertRaises(ValueError):
+            with track_call(self.histogram, 'save'):
+                raise ValueError("boom")
+
+        @timed(self.histogram, 'load')
+        def load():
+            return 42
+
+        self.assertEqual(load(), 42)
+        self.assertEqual(
+            sorted(self.histogram.collect()),
+            [('load', 'ok'), ('save', 'error'), ('save', 'ok')])
+
+    def test_render_escapes_labels_and_extra_lines(self):
+        """Probar el escape de etiquetas y las métricas leídas al exportar"""
+        self.histogram.observe(0.2, 'a"b', 'ok')
+        extra = render_gauge('test_state', 'Estado', [({"state": "open"}, 1)])
+
+        text = self.registry.render(extra)
+
+        self.assertIn('operation="a\\"b"', text)
+        self.assertIn('# TYPE test_state gauge\ntest_state{state="open"} 1', text)
+        self.assertTrue(text.endswith('\n'))
+
+
+class TestTimedCoroutines(unittest.IsolatedAsyncioTestCase):
+
+    async def test_timed_coroutine(self):
+        """Probar el decorador timed sobre corrutinas"""
+        histogram = MetricsRegistry().histogram('t', 't', ('operation', 'outcome'))
+
+        @timed(histogram, 'fetch')
+        async def fetch():
+            raise ConnectionError("caído")
+
+        with self.assertRaises(ConnectionError):
+            await fetch()
+
+        self.assertEqual(list(histogram.collect()), [('fetch', 'error')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Generar carga de lazo abierto contra tickets-service y notifications-service.
+
+Uso (desde la raíz del repositorio, con los servicios levantados):
+    python -m tests.load --rate 2000 --duration 60 --processes 4 \
+        --mix availability=70,listing=15,purchase=10,notification=5
+
+El reporte JSON queda en test-reports/load/ para comparar corridas.
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from tests.load.generator import DEFAULT_MIX, LoadConfig, fetch_ticket_ids, parse_mix, run_load, write_report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickets-url',
+                        default=os.getenv('TICKETS_SERVICE_URL', 'http://localhost:5002'))
+    parser.add_argument('--notifications-url',
+                        default=os.getenv('NOTIFICATIONS_SERVICE_URL', 'http://localhost:5003'))
+    parser.add_argument('--rate', type=float, default=200.0, help='solicitudes por segundo')
+    parser.add_argument('--duration', type=float, default=30.0, help='segundos de carga')
+    parser.add_argument('--mix', default=DEFAULT_MIX)
+    parser.add_argument('--arrival', choices=('poisson', 'uniform'), default='poisson')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='procesos generadores (un event loop por proceso)')
+    parser.add_argument('--max-in-flight', type=int, default=2000,
+                        help='tope de solicitudes en curso; las llegadas por encima se descartan')
+    parser.add_argument('--timeout', type=float, default=5.0)
+    parser.add_argument('--ticket-ids', help='IDs separados por coma (default: tomados del listado)')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--output', type=Path, help='ruta del reporte JSON')
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    ticket_ids = (args.ticket_ids.split(',') if args.ticket_ids
+                  else fetch_ticket_ids(args.tickets_url) if {'availability', 'purchase'} & set(mix)
+                  else [])
+
+    config = LoadConfig(
+        tickets_url=args.tickets_url.rstrip('/'),
+        notifications_url=args.notifications_url.rstrip('/'),
+        rate=args.rate,
+        duration=args.duration,
+        mix=mix,
+        ticket_ids=ticket_ids,
+        arrival=args.arrival,
+        timeout=args.timeout,
+        max_in_flight=args.max_in_flight,
+        processes=args.processes,
+        seed=args.seed
+    )
+    report = run_load(config)
+    path = write_report(report, args.output)
+
+    print(json.dumps({k: report[k] for k in ('achieved_send_rps', 'dropped', 'overall', 'services')},
+                     indent=2))
+    print(f"Reporte: {path}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
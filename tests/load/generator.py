@@ -0,0 +1,252 @@
+"""
+Generador de carga de lazo abierto para tickets-service y notifications-service.
+
+Las solicitudes se disparan según una tasa de llegada fija (uniforme o
+Poisson) sin esperar a que terminen las anteriores, como llega el tráfico
+real en una apertura de venta. La latencia se mide desde el instante en que
+la solicitud debía salir, así que las demoras del propio generador o de un
+servidor saturado no se esconden (coordinated omission).
+"""
+import asyncio
+import itertools
+import json
+import math
+import multiprocessing
+import random
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+REPORTS_DIR = Path(__file__).resolve().parents[2] / 'test-reports' / 'load'
+
+# operación -> servicio al que pega
+OPERATIONS = {
+    'availability': 'tickets',
+    'listing': 'tickets',
+    'purchase': 'tickets',
+    'notification': 'notifications',
+}
+
+DEFAULT_MIX = 'availability=70,listing=15,purchase=10,notification=5'
+
+PERCENTILES = (('p50', 0.50), ('p95', 0.95), ('p99', 0.99), ('p999', 0.999))
+
+
+@dataclass
+class LoadConfig:
+    tickets_url: str
+    notifications_url: str
+    rate: float
+    duration: float
+    mix: Dict[str, float]
+    ticket_ids: List[str] = field(default_factory=list)
+    arrival: str = 'poisson'
+    timeout: float = 5.0
+    max_in_flight: int = 2000
+    processes: int = 1
+    seed: Optional[int] = None
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """
+    Leer el mix de tráfico ("availability=70,purchase=10,...") y normalizarlo
+    a proporciones; lanza ValueError ante operaciones desconocidas
+    """
+    weights = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Operación desconocida en el mix: {name!r} "
+                             f"(válidas: {', '.join(OPERATIONS)})")
+        weights[name] = float(weight)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("El mix debe tener al menos una operación con peso positivo")
+    return {name: weight / total for name, weight in weights.items() if weight > 0}
+
+
+def arrival_offsets(rate: float, duration: float, arrival: str,
+                    rng: random.Random) -> List[float]:
+    """Instantes de llegada (segundos desde el inicio) para la tasa pedida"""
+    if arrival == 'uniform':
+        return [i / rate for i in range(int(rate * duration))]
+    offsets, t = [], 0.0
+    while True:
+        t += rng.expovariate(rate)
+        if t >= duration:
+            return offsets
+        offsets.append(t)
+
+
+def build_request(operation: str, config: LoadConfig, rng: random.Random) -> Tuple[str, str, Optional[dict]]:
+    """(método, URL, cuerpo JSON) de una solicitud de la operación dada"""
+    ticket_id = rng.choice(config.ticket_ids) if config.ticket_ids else '1'
+    if operation == 'availability':
+        return 'GET', f"{config.tickets_url}/api/tickets/availability/{ticket_id}", None
+    if operation == 'listing':
+        return 'GET', f"{config.tickets_url}/api/tickets/?page=1&page_size=50", None
+    if operation == 'purchase':
+        return 'POST', f"{config.tickets_url}/api/tickets/purchase", {
+            'ticket_id': ticket_id, 'quantity': 1}
+    return 'POST', f"{config.notifications_url}/api/notifications/send", {
+        'type': 'EMAIL',
+        'message': 'Tu compra fue confirmada',
+        'recipients': [f"user{rng.randrange(10 ** 6)}@example.com"]
+    }
+
+
+def outcome_of(status: int) -> str:
+    return 'ok' if 200 <= status < 300 else str(status)
+
+
+async def _run_schedule(config: LoadConfig, worker: int) -> dict:
+    rng = random.Random(None if config.seed is None else config.seed + worker)
+    operations = list(config.mix)
+    weights = [config.mix[name] for name in operations]
+    offsets = arrival_offsets(config.rate, config.duration, config.arrival, rng)
+
+    samples: List[Tuple[str, float, str]] = []
+    dropped = 0
+    in_flight = set()
+    limits = httpx.Limits(max_connections=config.max_in_flight,
+                          max_keepalive_connections=config.max_in_flight)
+
+    async with httpx.AsyncClient(timeout=config.timeout, limits=limits) as client:
+        async def fire(operation, scheduled):
+            method, url, body = build_request(operation, config, rng)
+            try:
+                response = await client.request(method, url, json=body)
+                outcome = outcome_of(response.status_code)
+            except httpx.TimeoutException:
+                outcome = 'timeout'
+            except httpx.HTTPError as e:
+                outcome = type(e).__name__
+            samples.append((operation, time.perf_counter() - scheduled, outcome))
+
+        start = time.perf_counter()
+        for offset, operation in zip(offsets, rng.choices(operations, weights, k=len(offsets))):
+            delay = start + offset - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= config.max_in_flight:
+                # lazo abierto: no se espera a que se libere un lugar
+                dropped += 1
+                continue
+            task = asyncio.ensure_future(fire(operation, start + offset))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        sent_for = time.perf_counter() - start
+        if in_flight:
+            await asyncio.wait(in_flight)
+
+    return {'samples': samples, 'dropped': dropped, 'scheduled': len(offsets),
+            'send_seconds': sent_for, 'elapsed_seconds': time.perf_counter() - start}
+
+
+def _run_worker(args) -> dict:
+    config, worker = args
+    return asyncio.run(_run_schedule(config, worker))
+
+
+def run_load(config: LoadConfig) -> dict:
+    """Ejecutar la carga (repartida en config.processes procesos) y armar el reporte"""
+    share = LoadConfig(**{**config.__dict__, 'rate': config.rate / config.processes,
+                          'max_in_flight': max(1, config.max_in_flight // config.processes)})
+    jobs = [(share, worker) for worker in range(config.processes)]
+    if config.processes == 1:
+        results = [_run_worker(jobs[0])]
+    else:
+        with multiprocessing.get_context('spawn').Pool(config.processes) as pool:
+            results = pool.map(_run_worker, jobs)
+    return build_report(config, results)
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(p * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: List[Tuple[str, float, str]], elapsed: float) -> dict:
+    latencies = sorted(latency for _, latency, _ in samples)
+    errors: Dict[str, int] = {}
+    for _, _, outcome in samples:
+        if outcome != 'ok':
+            errors[outcome] = errors.get(outcome, 0) + 1
+    return {
+        'requests': len(samples),
+        'throughput_rps': round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        'success_rate': round(1 - sum(errors.values()) / len(samples), 4) if samples else 0.0,
+        'latency_ms': {name: round(percentile(latencies, p) * 1000, 2) for name, p in PERCENTILES},
+        'errors': dict(sorted(errors.items()))
+    }
+
+
+def build_report(config: LoadConfig, results: List[dict]) -> dict:
+    samples = list(itertools.chain.from_iterable(r['samples'] for r in results))
+    elapsed = max(r['elapsed_seconds'] for r in results)
+    send_seconds = max(r['send_seconds'] for r in results)
+    scheduled = sum(r['scheduled'] for r in results)
+
+    by_operation = {op: [s for s in samples if s[0] == op] for op in config.mix}
+    by_service = {}
+    for operation, op_samples in by_operation.items():
+        by_service.setdefault(OPERATIONS[operation], []).extend(op_samples)
+
+    return {
+        'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'config': {
+            'tickets_url': config.tickets_url,
+            'notifications_url': config.notifications_url,
+            'target_rps': config.rate,
+            'duration_seconds': config.duration,
+            'arrival': config.arrival,
+            'mix': config.mix,
+            'processes': config.processes,
+            'max_in_flight': config.max_in_flight,
+            'timeout_seconds': config.timeout,
+        },
+        'scheduled': scheduled,
+        # tasa a la que el generador logró emitir; si queda por debajo de la
+        # pedida, el cuello de botella es el generador y no el servicio
+        'achieved_send_rps': round(scheduled / send_seconds, 1) if send_seconds else 0.0,
+        'dropped': sum(r['dropped'] for r in results),
+        'overall': summarize(samples, elapsed),
+        'services': {name: summarize(s, elapsed) for name, s in sorted(by_service.items())},
+        'operations': {name: summarize(s, elapsed) for name, s in by_operation.items()},
+    }
+
+
+def write_report(report: dict, output: Optional[Path] = None) -> Path:
+    if output is None:
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        output = REPORTS_DIR / f"load-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + '\n')
+    return output
+
+
+def fetch_ticket_ids(tickets_url: str, limit: int = 200) -> List[str]:
+    """IDs de entradas para las compras y consultas, tomados del listado"""
+    response = httpx.get(f"{tickets_url}/api/tickets/",
+                         params={'page': 1, 'page_size': limit}, timeout=5)
+    response.raise_for_status()
+    return [ticket['id'] for ticket in response.json()['items']]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=Path(__file__).parent,
+            stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
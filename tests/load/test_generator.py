@@ -0,0 +1,95 @@
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tests.load.generator import (LoadConfig, arrival_offsets, parse_mix, percentile, run_load,
+                                  summarize, write_report)
+
+
+class FakeServiceHandler(BaseHTTPRequestHandler):
+    """Responde 200 a todo salvo a las compras, que rechaza con 409"""
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        status = 409 if self.path.endswith('/purchase') else 200
+        self.send_response(status)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fake_service():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeServiceHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestMixAndSchedule:
+    """Tests para el mix de tráfico y las llegadas de lazo abierto"""
+
+    def test_parse_mix_normalizes_weights(self):
+        assert parse_mix('availability=3,purchase=1') == {'availability': 0.75, 'purchase': 0.25}
+
+    def test_parse_mix_rejects_unknown_operation(self):
+        with pytest.raises(ValueError, match='refund'):
+            parse_mix('availability=1,refund=1')
+
+    def test_uniform_arrivals_follow_rate(self):
+        offsets = arrival_offsets(100, 2.0, 'uniform', random.Random(1))
+
+        assert len(offsets) == 200
+        assert offsets[1] - offsets[0] == pytest.approx(0.01)
+
+    def test_poisson_arrivals_average_the_rate(self):
+        offsets = arrival_offsets(1000, 5.0, 'poisson', random.Random(1))
+
+        assert 4700 < len(offsets) < 5300
+        assert offsets == sorted(offsets)
+
+
+class TestReport:
+    """Tests para percentiles y el desglose de errores"""
+
+    def test_percentile_nearest_rank(self):
+        values = [i / 1000 for i in range(1, 1001)]
+
+        assert percentile(values, 0.5) == 0.5
+        assert percentile(values, 0.999) == 0.999
+        assert percentile([], 0.99) == 0.0
+
+    def test_summarize_counts_errors_by_outcome(self):
+        samples = [('purchase', 0.01, 'ok'), ('purchase', 0.02, '409'), ('purchase', 5.0, 'timeout')]
+
+        summary = summarize(samples, elapsed=1.0)
+
+        assert summary['requests'] == 3
+        assert summary['errors'] == {'409': 1, 'timeout': 1}
+        assert summary['success_rate'] == pytest.approx(0.3333, abs=1e-4)
+
+    def test_run_load_reports_per_service(self, fake_service, tmp_path):
+        config = LoadConfig(tickets_url=fake_service, notifications_url=fake_service,
+                            rate=100, duration=0.5, arrival='uniform', seed=3, ticket_ids=['a', 'b'],
+                            mix=parse_mix('availability=2,purchase=1,notification=1'))
+
+        report = run_load(config)
+        path = write_report(report, tmp_path / 'load.json')
+
+        assert report['scheduled'] == 50
+        assert report['overall']['requests'] == 50
+        assert set(report['services']) == {'tickets', 'notifications'}
+        assert set(report['operations']['purchase']['errors']) == {'409'}
+        assert report['operations']['availability']['errors'] == {}
+        assert json.loads(path.read_text())['config']['target_rps'] == 100
@@ -0,0 +1,47 @@
+"""
+Levantar el stand-in de database-service en primer plano.
+
+Uso (desde la raíz del repositorio):
+    python -m tests.stand_in --port 3000 --events 10 --tickets-per-event 2 \
+        --latency 0.002 --jitter 0.001 --error-rate 0.01
+"""
+import argparse
+
+from tests.stand_in.server import Faults, create_server, load_spec, seed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=3000)
+    parser.add_argument('--spec', help='archivo o URL /api-docs-json (default: openapi.json)')
+    parser.add_argument('--latency', type=float, default=0.0, help='segundos por request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='segundos extra aleatorios')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='fracción de requests que fallan (0-1)')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--seed', type=int, help='semilla del generador de fallas')
+    parser.add_argument('--events', type=int, default=0)
+    parser.add_argument('--tickets-per-event', type=int, default=2)
+    parser.add_argument('--quantity', type=int, default=1000)
+    parser.add_argument('--notifications', type=int, default=0)
+    args = parser.parse_args()
+
+    faults = Faults(args.latency, args.jitter, args.error_rate, args.error_status, args.seed)
+    server = create_server(args.host, args.port, load_spec(args.spec), faults)
+    seed(server.store, args.events, args.tickets_per_event, args.quantity, args.notifications)
+
+    host, port = server.server_address[:2]
+    print(f"database-service stand-in en http://{host}:{port} "
+          f"({len(server.routes)} operaciones, {len(server.store.tickets)} entradas)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,613 @@
+"""
+Stand-in en memoria de database-service.
+
+Las rutas salen de la especificación OpenAPI del servicio (el JSON que
+expone en /api-docs-json, guardado en openapi.json): cada operación de
+/tickets, /notifications, /events y /attendees se enruta a un handler que
+reproduce la lógica de los servicios en TypeScript, incluidos los códigos
+de error (los errores sin status del servicio real responden 500). Si la
+especificación declara una operación sin handler el servidor no arranca.
+
+La compra es atómica (verificación y decremento bajo un mismo lock, como el
+updateMany condicional de Prisma) y se puede inyectar latencia y errores,
+al arrancar o en caliente con PUT /__stand_in/faults.
+"""
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from urllib.request import urlopen
+
+SPEC_PATH = Path(__file__).with_name('openapi.json')
+
+RESOURCES = ('/tickets', '/notifications', '/events', '/attendees')
+
+
+class ApiError(Exception):
+    """Error con el status HTTP que el middleware de errores devolvería"""
+
+    def __init__(self, message: str, status: int = 500, details: Optional[dict] = None):
+        super().__init__(message)
+        self.status = status
+        self.details = details or {}
+
+
+def load_spec(source: Optional[str] = None) -> dict:
+    """Leer la especificación desde un archivo o desde /api-docs-json de un servicio real"""
+    if source and source.startswith(('http://', 'https://')):
+        with urlopen(source, timeout=5) as response:
+            return json.load(response)
+    return json.loads(Path(source or SPEC_PATH).read_text())
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def ticket_type(value) -> str:
+    """Normalización de toPrismaTicketType: GENERAL o VIP en mayúsculas"""
+    if not value:
+        return 'GENERAL'
+    normalized = str(value).strip().upper()
+    if normalized not in ('GENERAL', 'VIP'):
+        raise ApiError(f"Invalid ticket type: {value}")
+    return normalized
+
+
+def is_positive_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def is_non_negative_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def paginate(items: List[dict], query: dict) -> List[dict]:
+    try:
+        page = int(query.get('page', 1))
+        page_size = int(query.get('pageSize', 100))
+    except ValueError:
+        raise ApiError("Invalid pagination")
+    start = max(page - 1, 0) * page_size
+    return items[start:start + page_size]
+
+
+class Store:
+    """Tablas en memoria; un único lock serializa las escrituras como una transacción"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tickets: Dict[str, dict] = {}
+        self.events: Dict[str, dict] = {}
+        self.attendees: Dict[str, dict] = {}
+        self.notifications: Dict[str, dict] = {}
+        self._sequence = 0
+
+    def new_row(self, **fields) -> dict:
+        # la secuencia desempata filas creadas en el mismo milisegundo
+        self._sequence += 1
+        now = now_iso()
+        return {'id': str(uuid.uuid4()), **fields, 'createdAt': now, 'updatedAt': now,
+                '_seq': self._sequence}
+
+    def reset(self):
+        with self.lock:
+            for table in (self.tickets, self.events, self.attendees, self.notifications):
+                table.clear()
+
+
+def public(row: dict, fields: Optional[Tuple[str, ...]] = None) -> dict:
+    """Fila tal como la devuelve la API (sin campos internos)"""
+    if fields:
+        return {field: row.get(field) for field in fields}
+    return {k: v for k, v in row.items() if not k.startswith('_')}
+
+
+TICKET_FIELDS = ('id', 'type', 'price', 'quantityAvailable', 'quantitySold', 'eventId')
+ATTENDEE_FIELDS = ('id', 'name', 'email', 'phone', 'status', 'eventId', 'createdAt')
+
+
+def newest_first(rows) -> List[dict]:
+    return sorted(rows, key=lambda row: (-row['_seq'], row['id']))
+
+
+def find_or_fail(table: Dict[str, dict], row_id: str, message: str) -> dict:
+    row = table.get(row_id)
+    if row is None:
+        raise ApiError(message)
+    return row
+
+
+# =================== TICKETS ===================
+
+def create_ticket(store: Store, body: dict, params: dict, query: dict):
+    if body.get('type') not in ('general', 'VIP'):
+        raise ApiError("Invalid ticket type")
+    if body.get('price', 0) < 0:
+        raise ApiError("Invalid price")
+    if not is_non_negative_int(body.get('quantityAvailable')):
+        raise ApiError("Invalid quantity")
+    with store.lock:
+        event_id = body.get('eventId')
+        if event_id is not None and event_id not in store.events:
+            raise ApiError("Foreign key constraint failed on the field: `eventId`")
+        row = store.new_row(type=ticket_type(body['type']), price=float(body['price']),
+                            quantityAvailable=body['quantityAvailable'], quantitySold=0,
+                            eventId=event_id)
+        store.tickets[row['id']] = row
+        return 201, public(row, TICKET_FIELDS)
+
+
+def list_tickets(store: Store, body: dict, params: dict, query: dict):
+    ids = [i.strip() for i in query.get('ids', '').split(',') if i.strip()]
+    with store.lock:
+        rows = [store.tickets[i] for i in ids if i in store.tickets] if ids else store.tickets.values()
+        return 200, [public(row, TICKET_FIELDS) for row in paginate(newest_first(rows), query)]
+
+
+def ticket_availability(store: Store, body: dict, params: dict, query: dict):
+    event_id, requested_type = query.get('eventId'), query.get('type')
+    if not event_id or not requested_type:
+        raise ApiError("eventId and type are required")
+    with store.lock:
+        ticket = find_by_event_and_type(store, event_id, requested_type)
+        if ticket is None:
+            return 200, {'available': False, 'quantityAvailable': 0}
+        return 200, {'available': ticket['quantityAvailable'] > 0,
+                     'quantityAvailable': ticket['quantityAvailable']}
+
+
+def find_by_event_and_type(store: Store, event_id: str, requested_type: str) -> Optional[dict]:
+    try:
+        normalized = ticket_type(requested_type)
+    except ApiError:
+        return None
+    for row in store.tickets.values():
+        if row['eventId'] == event_id and row['type'] == normalized:
+            return row
+    return None
+
+
+def purchase_ticket(store: Store, body: dict, params: dict, query: dict):
+    quantity = body.get('quantity')
+    if not is_positive_int(quantity):
+        raise ApiError("Invalid quantity")
+    with store.lock:
+        ticket_id = body.get('ticketId')
+        if not ticket_id:
+            if not body.get('eventId') or not body.get('ticketType'):
+                raise ApiError("ticketId or (eventId+ticketType) required")
+            ticket = find_by_event_and_type(store, body['eventId'], body['ticketType'])
+            if ticket is None:
+                raise ApiError("Ticket not found", 404)
+            ticket_id = ticket['id']
+
+        # verificación y decremento en la misma sección crítica: no hay sobreventa
+        ticket = store.tickets.get(ticket_id)
+        if ticket is None:
+            raise ApiError("Ticket not found", 404)
+        if ticket['quantityAvailable'] < quantity:
+            raise ApiError("Not enough tickets available", 409,
+                           {'quantityAvailable': ticket['quantityAvailable']})
+        ticket['quantityAvailable'] -= quantity
+        ticket['quantitySold'] += quantity
+        ticket['updatedAt'] = now_iso()
+        return 201, {'ticketId': ticket_id, 'quantity': quantity, 'status': 'purchased',
+                     'ticket': public(ticket, TICKET_FIELDS)}
+
+
+def get_ticket(store: Store, body: dict, params: dict, query: dict):
+    with store.lock:
+        return 200, public(find_or_fail(store.tickets, params['id'], "Ticket not found"),
+                           TICKET_FIELDS)
+
+
+def update_ticket(store: Store, body: dict, params: dict, query: dict):
+    if 'price' in body and body['price'] < 0:
+        raise ApiError("Invalid price")
+    if 'quantityAvailable' in body and not is_non_negative_int(body['quantityAvailable']):
+        raise ApiError("Invalid quantity")
+    with store.lock:
+        row = find_or_fail(store.tickets, params['id'], "Record to update not found.")
+        changes = {k: body[k] for k in ('price', 'quantityAvailable', 'quantitySold') if k in body}
+        if isinstance(body.get('type'), str):
+            changes['type'] = ticket_type(body['type'])
+        row.update(changes, updatedAt=now_iso())
+        return 200, public(row, TICKET_FIELDS)
+
+
+def delete_ticket(store: Store, body: dict, params: dict, query: dict):
+    with store.lock:
+        find_or_fail(store.tickets, params['id'], "Record to delete does not exist.")
+        del store.tickets[params['id']]
+        return 204, None
+
+
+# =================== NOTIFICATIONS ===================
+
+MAX_BULK_NOTIFICATIONS = 1000
+
+
+def notification_error(body) -> Optional[str]:
+    """validationError de NotificationsService"""
+    if not isinstance(body, dict) or body.get('type') not in ('EMAIL', 'SMS'):
+        return "Invalid notification type"
+    if not str(body.get('message') or '').strip():
+        return "Message is required"
+    if not isinstance(body.get('recipients'), list) or not body['recipients']:
+        return "Recipients required"
+    return None
+
+
+def send_notification(store: Store, body: dict, params: dict, query: dict):
+    error = notification_error(body)
+    if error:
+        raise ApiError(error)
+    with store.lock:
+        row = store.new_row(type=body['type'], message=body['message'],
+                            recipients=list(body['recipients']), sentAt=None)
+        # el servicio real persiste sin enviar y luego marca sentAt
+        row['sentAt'] = now_iso()
+        store.notifications[row['id']] = row
+        return 201, public(row)
+
+
+def send_notifications_bulk(store: Store, body: dict, params: dict, query: dict):
+    items = body.get('notifications')
+    if not isinstance(items, list) or not items:
+        raise ApiError("Notifications required", status=400)
+    if len(items) > MAX_BULK_NOTIFICATIONS:
+        raise ApiError(f"Too many notifications (max {MAX_BULK_NOTIFICATIONS})", status=413)
+    now = now_iso()
+    sent = []
+    for index, item in enumerate(items):
+        error = notification_error(item)
+        if error:
+            raise ApiError(f"notifications[{index}]: {error}", status=400)
+        try:
+            sent.append(parse_date(item['sentAt']) if item.get('sentAt') else now)
+        except ApiError:
+            raise ApiError(f"notifications[{index}]: Invalid sentAt", status=400)
+    # todo o nada, como el INSERT único de createManyAndReturn
+    with store.lock:
+        ids = []
+        for item, sent_at in zip(items, sent):
+            row = store.new_row(type=item['type'], message=item['message'],
+                                recipients=list(item['recipients']), sentAt=sent_at)
+            store.notifications[row['id']] = row
+            ids.append(row['id'])
+        return 201, {'count': len(ids), 'ids': ids}
+
+
+def list_notifications(store: Store, body: dict, params: dict, query: dict):
+    with store.lock:
+        rows = newest_first(store.notifications.values())
+        return 200, [public(row) for row in paginate(rows, query)]
+
+
+def get_notification(store: Store, body: dict, params: dict, query: dict):
+    with store.lock:
+        return 200, public(find_or_fail(store.notifications, params['id'],
+                                        "Notification not found"))
+
+
+def update_notification(store: Store, body: dict, params: dict, query: dict):
+    with store.lock:
+        row = find_or_fail(store.notifications, params['id'], "Record to update not found.")
+        row.update({k: v for k, v in body.items() if k in ('message', 'sentAt')},
+                   updatedAt=now_iso())
+        return 200, public(row)
+
+
+def delete_notification(store: Store, body: dict, params: dict, query: dict):
+    with store.lock:
+        find_or_fail(store.notifications, params['id'], "Record to delete does not exist.")
+        del store.notifications[params['id']]
+        return 204, None
+
+
+# =================== EVENTS ===================
+
+def parse_date(value) -> str:
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        raise ApiError("Invalid date")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def create_event(store: Store, body: dict, params: dict, query: dict):
+    date = parse_date(body.get('date'))
+    with store.lock:
+        row = store.new_row(name=body.get('name'), date=date, location=body.get('location'),
+                            type=body.get('type'), description=body.get('description'))
+        store.events[row['id']] = row
+        return 201, public(row)
+
+
+def list_events(store: Store, body: dict, params: dict, query: dict):
+    with store.lock:
+        rows = sorted(store.events.values(), key=lambda row: row['date'])
+        return 200, [public(row) for row in paginate(rows, query)]
+
+
+def get_event(store: Store, body: dict, params: dict, query: dict):
+    with store.lock:
+        return 200, public(find_or_fail(store.events, params['id'], "Event not found"))
+
+
+def update_event(store: Store, body: dict, params: dict, query: dict):
+    changes = {k: body[k] for k in ('name', 'location', 'type', 'description') if k in body}
+    if body.get('date'):
+        changes['date'] = parse_date(body['date'])
+    with store.lock:
+        row = find_or_fail(store.events, params['id'], "Record to update not found.")
+        row.update(changes, updatedAt=now_iso())
+        return 200, public(row)
+
+
+def delete_event(store: Store, body: dict, params: dict, query: dict):
+    with store.lock:
+        find_or_fail(store.events, params['id'], "Record to delete does not exist.")
+        del store.events[params['id']]
+        # onDelete: Cascade de entradas y asistentes del evento
+        for table in (store.tickets, store.attendees):
+            for row_id in [i for i, row in table.items() if row['eventId'] == params['id']]:
+                del table[row_id]
+        return 204, None
+
+
+# =================== ATTENDEES ===================
+
+EMAIL_PATTERN = re.compile(r'^[^\s@]+@[^\s@]+\.[^\s@]+$')
+
+
+def attendee_status(value) -> str:
+    if value not in ('confirmed', 'unconfirmed'):
+        raise ApiError("Invalid status")
+    return value
+
+
+def create_attendee(store: Store, body: dict, params: dict, query: dict):
+    if not isinstance(body.get('name'), str) or not body['name']:
+        raise ApiError("Invalid name")
+    if not EMAIL_PATTERN.match(str(body.get('email') or '')):
+        raise ApiError("Invalid email")
+    status = attendee_status(str(body.get('status') or 'unconfirmed').lower())
+    with store.lock:
+        if any(row['email'] == body['email'] for row in store.attendees.values()):
+            raise ApiError("Unique constraint failed on the fields: (`email`)")
+        row = store.new_row(name=body['name'], email=body['email'], phone=body.get('phone'),
+                            status=status, eventId=body.get('eventId'))
+        store.attendees[row['id']] = row
+        return 201, public(row, ATTENDEE_FIELDS)
+
+
+def list_attendees(store: Store, body: dict, params: dict, query: dict):
+    with store.lock:
+        rows = newest_first(store.attendees.values())
+        return 200, [public(row, ATTENDEE_FIELDS) for row in paginate(rows, query)]
+
+
+def get_attendee(store: Store, body: dict, params: dict, query: dict):
+    with store.lock:
+        return 200, public(find_or_fail(store.attendees, params['id'], "Attendee not found"),
+                           ATTENDEE_FIELDS)
+
+
+def patch_attendee_status(store: Store, body: dict, params: dict, query: dict):
+    status = attendee_status(body.get('status'))
+    with store.lock:
+        row = find_or_fail(store.attendees, params['id'], "Record to update not found.")
+        row.update(status=status, updatedAt=now_iso())
+        return 200, public(row, ATTENDEE_FIELDS)
+
+
+HANDLERS: Dict[Tuple[str, str], Callable] = {
+    ('POST', '/tickets'): create_ticket,
+    ('GET', '/tickets'): list_tickets,
+    ('GET', '/tickets/availability'): ticket_availability,
+    ('POST', '/tickets/purchase'): purchase_ticket,
+    ('GET', '/tickets/{id}'): get_ticket,
+    ('PUT', '/tickets/{id}'): update_ticket,
+    ('DELETE', '/tickets/{id}'): delete_ticket,
+    ('POST', '/notifications'): send_notification,
+    ('POST', '/notifications/bulk'): send_notifications_bulk,
+    ('GET', '/notifications'): list_notifications,
+    ('GET', '/notifications/{id}'): get_notification,
+    ('PUT', '/notifications/{id}'): update_notification,
+    ('DELETE', '/notifications/{id}'): delete_notification,
+    ('POST', '/events'): create_event,
+    ('GET', '/events'): list_events,
+    ('GET', '/events/{id}'): get_event,
+    ('PUT', '/events/{id}'): update_event,
+    ('DELETE', '/events/{id}'): delete_event,
+    ('POST', '/attendees'): create_attendee,
+    ('GET', '/attendees'): list_attendees,
+    ('GET', '/attendees/{id}'): get_attendee,
+    ('PATCH', '/attendees/{id}/status'): patch_attendee_status,
+}
+
+
+def build_routes(spec: dict) -> List[Tuple[str, re.Pattern, Callable]]:
+    """
+    Tabla de rutas a partir de los paths de la especificación
+    Las rutas literales van antes que las parametrizadas (/tickets/purchase
+    antes que /tickets/{id}), como en el router de Express
+    """
+    routes = []
+    missing = []
+    for path, operations in spec.get('paths', {}).items():
+        if not path.startswith(RESOURCES):
+            continue
+        pattern = re.compile('^' + re.sub(r'\{(\w+)\}', r'(?P<\1>[^/]+)', path) + '$')
+        for method in operations:
+            handler = HANDLERS.get((method.upper(), path))
+            if handler is None:
+                missing.append(f"{method.upper()} {path}")
+            else:
+                routes.append((method.upper(), pattern, handler))
+    if missing:
+        raise ValueError(f"Operaciones de la especificación sin handler: {', '.join(missing)}")
+    return sorted(routes, key=lambda route: '(?P<' in route[1].pattern)
+
+
+class Faults:
+    """Latencia (fija + jitter uniforme) y tasa de errores inyectados por request"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+
+    def update(self, settings: dict):
+        for name in ('latency', 'jitter', 'error_rate', 'error_status'):
+            if name in settings:
+                setattr(self, name, type(getattr(self, name))(settings[name]))
+
+    def as_dict(self) -> dict:
+        return {'latency': self.latency, 'jitter': self.jitter,
+                'error_rate': self.error_rate, 'error_status': self.error_status}
+
+    def apply(self) -> Optional[int]:
+        """Dormir la latencia configurada; retorna un status de error si toca fallar"""
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        if self.error_rate and self._random.random() < self.error_rate:
+            return self.error_status
+        return None
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def _dispatch(self, method: str):
+        url = urlparse(self.path)
+        body = self._read_json()
+        server = self.server
+
+        if url.path.startswith('/__stand_in/'):
+            return self._control(method, url.path, body)
+        if url.path == '/api-docs-json' and method == 'GET':
+            return self._reply(200, server.spec)
+
+        injected = server.faults.apply()
+        if injected is not None:
+            return self._reply(injected, {'error': 'Injected failure'})
+
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        for route_method, pattern, handler in server.routes:
+            match = pattern.match(url.path.rstrip('/') or '/')
+            if match and route_method == method:
+                try:
+                    status, payload = handler(server.store, body or {}, match.groupdict(), query)
+                except ApiError as e:
+                    status, payload = e.status, {'error': str(e), **e.details}
+                except (TypeError, ValueError, KeyError) as e:
+                    status, payload = 500, {'error': str(e)}
+                return self._reply(status, payload)
+
+        self._reply(404, {'error': f"Cannot {method} {url.path}"})
+
+    def _control(self, method: str, path: str, body: Optional[dict]):
+        server = self.server
+        if path == '/__stand_in/faults' and method == 'GET':
+            return self._reply(200, server.faults.as_dict())
+        if path == '/__stand_in/faults' and method == 'PUT':
+            server.faults.update(body or {})
+            return self._reply(200, server.faults.as_dict())
+        if path == '/__stand_in/reset' and method == 'POST':
+            server.store.reset()
+            return self._reply(204, None)
+        self._reply(404, {'error': f"Cannot {method} {path}"})
+
+    def _read_json(self) -> Optional[dict]:
+        length = int(self.headers.get('Content-Length', 0))
+        if not length:
+            return None
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return None
+
+    def _reply(self, status: int, payload):
+        data = b'' if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        if payload is not None:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def seed(store: Store, events: int = 0, tickets_per_event: int = 0,
+         quantity: int = 1000, notifications: int = 0) -> None:
+    """Cargar datos de ejemplo: eventos con entradas GENERAL/VIP y notificaciones"""
+    for i in range(events):
+        _, event = create_event(store, {'name': f"Evento {i + 1}", 'date': now_iso(),
+                                        'location': 'Sala principal', 'type': 'concierto'}, {}, {})
+        for j in range(tickets_per_event):
+            create_ticket(store, {'eventId': event['id'], 'type': 'VIP' if j % 2 else 'general',
+                                  'price': 20.0 + j, 'quantityAvailable': quantity}, {}, {})
+    for i in range(notifications):
+        send_notification(store, {'type': 'EMAIL', 'message': f"Mensaje {i + 1}",
+                                  'recipients': ['user@example.com']}, {}, {})
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # el backlog por defecto (5) resetea conexiones con muchos clientes a la vez
+    request_queue_size = 128
+
+
+def create_server(host: str = '127.0.0.1', port: int = 0, spec: Optional[dict] = None,
+                  faults: Optional[Faults] = None) -> ThreadingHTTPServer:
+    server = StandInServer((host, port), StandInHandler)
+    server.spec = spec or load_spec()
+    server.routes = build_routes(server.spec)
+    server.store = Store()
+    server.faults = faults or Faults()
+    return server
+
+
+def start_stand_in(**kwargs) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Levantar el servidor en un hilo y retornar (server, base_url).
+    Acepta los argumentos de create_server; llamar a server.shutdown() al terminar.
+    """
+    server = create_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
@@ -0,0 +1,189 @@
+import threading
+
+import pytest
+import requests
+
+from tests.stand_in.server import HANDLERS, Faults, build_routes, load_spec, seed, start_stand_in
+
+
+@pytest.fixture
+def stand_in():
+    server, base_url = start_stand_in()
+    yield server, base_url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def ticket(stand_in):
+    server, base_url = stand_in
+    seed(server.store, events=1, tickets_per_event=1, quantity=50)
+    return requests.get(f"{base_url}/tickets").json()[0]
+
+
+class TestSpecRouting:
+    """Tests para las rutas generadas desde la especificación"""
+
+    def test_every_spec_operation_has_handler(self):
+        """Cada operación de /tickets, /notifications, /events y /attendees debe estar cubierta"""
+        routes = build_routes(load_spec())
+
+        assert len(routes) == len(HANDLERS)
+
+    def test_unknown_spec_operation_fails_fast(self):
+        """Una operación nueva en la especificación sin handler debe impedir el arranque"""
+        spec = load_spec()
+        spec['paths']['/tickets/{id}']['patch'] = {}
+
+        with pytest.raises(ValueError, match='PATCH /tickets/{id}'):
+            build_routes(spec)
+
+    def test_serves_spec_and_rejects_undeclared_routes(self, stand_in):
+        """Debe exponer /api-docs-json y responder 404 a rutas fuera de la especificación"""
+        _, base_url = stand_in
+
+        assert '/tickets/purchase' in requests.get(f"{base_url}/api-docs-json").json()['paths']
+        assert requests.patch(f"{base_url}/tickets/1").status_code == 404
+
+
+class TestTickets:
+    """Tests para /tickets con la semántica de database-service"""
+
+    def test_purchase_decrements_stock(self, stand_in, ticket):
+        _, base_url = stand_in
+
+        response = requests.post(f"{base_url}/tickets/purchase",
+                                 json={'ticketId': ticket['id'], 'quantity': 3})
+
+        assert response.status_code == 201
+        assert response.json()['ticket']['quantityAvailable'] == 47
+        assert response.json()['ticket']['quantitySold'] == 3
+
+    def test_purchase_errors_match_real_service(self, stand_in, ticket):
+        """404 para entrada inexistente, 409 sin stock y 500 para cantidad inválida"""
+        _, base_url = stand_in
+        url = f"{base_url}/tickets/purchase"
+
+        assert requests.post(url, json={'ticketId': 'nope', 'quantity': 1}).status_code == 404
+        sold_out = requests.post(url, json={'ticketId': ticket['id'], 'quantity': 51})
+        assert sold_out.status_code == 409
+        assert sold_out.json() == {'error': 'Not enough tickets available',
+                                   'quantityAvailable': 50}
+        assert requests.post(url, json={'ticketId': ticket['id'], 'quantity': 0}).status_code == 500
+
+    def test_concurrent_purchases_never_oversell(self, stand_in, ticket):
+        """Compras concurrentes no deben vender más que el stock disponible"""
+        _, base_url = stand_in
+        statuses = []
+
+        def buy():
+            response = requests.post(f"{base_url}/tickets/purchase",
+                                     json={'ticketId': ticket['id'], 'quantity': 1})
+            statuses.append(response.status_code)
+
+        threads = [threading.Thread(target=buy) for _ in range(80)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        final = requests.get(f"{base_url}/tickets/{ticket['id']}").json()
+        assert statuses.count(201) == 50
+        assert statuses.count(409) == 30
+        assert final['quantityAvailable'] == 0
+        assert final['quantitySold'] == 50
+
+    def test_list_supports_ids_and_pagination(self, stand_in):
+        server, base_url = stand_in
+        seed(server.store, events=1, tickets_per_event=4)
+        ids = [t['id'] for t in requests.get(f"{base_url}/tickets").json()]
+
+        page = requests.get(f"{base_url}/tickets", params={'page': 2, 'pageSize': 3}).json()
+        selected = requests.get(f"{base_url}/tickets", params={'ids': ','.join(ids[:2])}).json()
+
+        assert [t['id'] for t in page] == ids[3:]
+        assert sorted(t['id'] for t in selected) == sorted(ids[:2])
+
+
+class TestOtherResources:
+    """Tests para /notifications, /events y /attendees"""
+
+    def test_notification_round_trip(self, stand_in):
+        _, base_url = stand_in
+
+        created = requests.post(f"{base_url}/notifications", json={
+            'type': 'EMAIL', 'message': 'Hola', 'recipients': ['a@example.com']})
+        fetched = requests.get(f"{base_url}/notifications/{created.json()['id']}")
+
+        assert created.status_code == 201
+        assert fetched.json()['sentAt'] is not None
+        assert requests.post(f"{base_url}/notifications", json={
+            'type': 'FAX', 'message': 'x', 'recipients': ['a']}).status_code == 500
+
+    def test_bulk_notifications_are_all_or_nothing(self, stand_in):
+        server, base_url = stand_in
+        item = {'type': 'SMS', 'message': 'Hola', 'recipients': ['+56911111111']}
+
+        created = requests.post(f"{base_url}/notifications/bulk", json={'notifications': [
+            item, {**item, 'sentAt': '2026-01-01T00:00:00Z'}]})
+        invalid = requests.post(f"{base_url}/notifications/bulk", json={'notifications': [
+            item, {**item, 'recipients': []}]})
+
+        assert created.status_code == 201
+        ids = created.json()['ids']
+        assert created.json()['count'] == 2
+        assert requests.get(f"{base_url}/notifications/{ids[1]}").json()['sentAt'] == \
+            '2026-01-01T00:00:00.000Z'
+        assert invalid.status_code == 400
+        assert invalid.json()['error'] == 'notifications[1]: Recipients required'
+        assert len(server.store.notifications) == 2
+
+    def test_deleting_event_cascades(self, stand_in, ticket):
+        _, base_url = stand_in
+
+        response = requests.delete(f"{base_url}/events/{ticket['eventId']}")
+
+        assert response.status_code == 204
+        assert requests.get(f"{base_url}/tickets").json() == []
+
+    def test_attendee_status_update(self, stand_in):
+        _, base_url = stand_in
+        attendee = requests.post(f"{base_url}/attendees",
+                                 json={'name': 'Ana', 'email': 'ana@example.com'}).json()
+
+        response = requests.patch(f"{base_url}/attendees/{attendee['id']}/status",
+                                  json={'status': 'confirmed'})
+
+        assert attendee['status'] == 'unconfirmed'
+        assert response.json()['status'] == 'confirmed'
+
+
+class TestFaultInjection:
+    """Tests para la inyección de latencia y errores"""
+
+    def test_error_rate_returns_configured_status(self, stand_in):
+        _, base_url = stand_in
+        requests.put(f"{base_url}/__stand_in/faults", json={'error_rate': 1.0, 'error_status': 502})
+
+        response = requests.get(f"{base_url}/tickets")
+
+        assert response.status_code == 502
+        assert response.json() == {'error': 'Injected failure'}
+
+    def test_latency_is_applied(self):
+        faults = Faults(latency=0.02, seed=1)
+        server, base_url = start_stand_in(faults=faults)
+        try:
+            elapsed = requests.get(f"{base_url}/tickets").elapsed.total_seconds()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert elapsed >= 0.02
+
+    def test_partial_error_rate_is_seeded(self):
+        faults = Faults(error_rate=0.5, seed=7)
+
+        failures = sum(faults.apply() is not None for _ in range(1000))
+
+        assert 400 < failures < 600
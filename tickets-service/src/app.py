@@ -1,7 +1,21 @@
-from flask import Flask
+import time
+from flask import Flask, Response, g, request
 from flask_cors import CORS
+from metrics_core import CONTENT_TYPE
 from src.config import Config
-from src.controllers.tickets_controller import tickets_bp
+from src.controllers.tickets_controller import (
+    idempotency_store,
+    rate_limiter,
+    tickets_bp,
+    tickets_service
+)
+from src.service_metrics import build_service_metrics
+from src.utils.metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_FLIGHT,
+    HTTP_RESPONSES,
+    REGISTRY
+)
 
 
 def create_app():
@@ -10,14 +24,50 @@ def create_app():
     app.config.from_object(Config)
     CORS(app)
     app.register_blueprint(tickets_bp, url_prefix='/api/tickets')
+    register_metrics(app)
 
     return app
 
 
+def register_metrics(app):
+    """Medir cada solicitud (latencia, en curso, códigos) y exponer GET /metrics"""
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_start = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+
+    @app.after_request
+    def record_response_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def observe_request(error):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        # la plantilla de la ruta (no la URL) mantiene acotadas las etiquetas
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, request.method, route)
+        HTTP_RESPONSES.inc(request.method, route, str(g.pop('metrics_status', 500)))
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Métricas en formato de exposición de Prometheus"""
+        body = REGISTRY.render(build_service_metrics(tickets_service, idempotency_store, rate_limiter))
+        return Response(body, content_type=CONTENT_TYPE)
+
+
 if __name__ == '__main__':
-    app = create_app()
-    app.run(
-        host='0.0.0.0',
-        port=Config.PORT,
-        debug=Config.DEBUG
-    )
+    if Config.SERVER_MODE == 'async':
+        from src.asgi import app as asgi_app, serve
+        serve(asgi_app)
+    else:
+        app = create_app()
+        app.run(
+            host='0.0.0.0',
+            port=Config.PORT,
+            debug=Config.DEBUG
+        )
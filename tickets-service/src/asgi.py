@@ -0,0 +1,73 @@
+import asyncio
+import time
+from hypercorn.asyncio import serve as hypercorn_serve
+from hypercorn.config import Config as HypercornConfig
+from metrics_core import CONTENT_TYPE
+from quart import Quart, Response, g, request
+from quart_cors import cors
+from src.config import Config
+from src.controllers.async_tickets_controller import (
+    async_tickets_bp,
+    idempotency_store,
+    rate_limiter,
+    tickets_service
+)
+from src.service_metrics import build_service_metrics
+from src.utils.metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_FLIGHT,
+    HTTP_RESPONSES,
+    REGISTRY
+)
+
+
+def create_asgi_app():
+    app = Quart(__name__)
+
+    app.config.from_object(Config)
+    app = cors(app)
+    app.register_blueprint(async_tickets_bp, url_prefix='/api/tickets')
+    register_metrics(app)
+
+    return app
+
+
+def register_metrics(app):
+    """Variante para Quart de src.app.register_metrics (hooks asíncronos)"""
+
+    @app.before_request
+    async def start_request_timer():
+        g.metrics_start = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+
+    @app.after_request
+    async def record_response_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    async def observe_request(error):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, request.method, route)
+        HTTP_RESPONSES.inc(request.method, route, str(g.pop('metrics_status', 500)))
+
+    @app.route('/metrics', methods=['GET'])
+    async def metrics():
+        """Métricas en formato de exposición de Prometheus"""
+        body = REGISTRY.render(build_service_metrics(tickets_service, idempotency_store, rate_limiter))
+        return Response(body, content_type=CONTENT_TYPE)
+
+
+def serve(app):
+    """Servir la aplicación ASGI con Hypercorn en un solo event loop"""
+    hypercorn_config = HypercornConfig()
+    hypercorn_config.bind = [f"0.0.0.0:{Config.PORT}"]
+    hypercorn_config.keep_alive_timeout = Config.KEEP_ALIVE_TIMEOUT
+    asyncio.run(hypercorn_serve(app, hypercorn_config))
+
+
+app = create_asgi_app()
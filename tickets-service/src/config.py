@@ -9,3 +9,98 @@ class Config:
         'DATABASE_SERVICE_URL', 'http://localhost:3000')
     PORT = int(os.getenv('PORT', 5002))
     DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
+
+    # Modo de servidor: 'sync' (Flask/WSGI) o 'async' (Quart/ASGI con Hypercorn)
+    SERVER_MODE = os.getenv('SERVER_MODE', 'sync').lower()
+    KEEP_ALIVE_TIMEOUT = float(os.getenv('KEEP_ALIVE_TIMEOUT', 5.0))
+
+    # Pool de conexiones HTTP hacia database-service
+    DB_POOL_CONNECTIONS = int(os.getenv('DB_POOL_CONNECTIONS', 10))
+    DB_POOL_MAXSIZE = int(os.getenv('DB_POOL_MAXSIZE', 50))
+    DB_POOL_BLOCK = os.getenv('DB_POOL_BLOCK', 'False').lower() == 'true'
+    DB_CONNECT_TIMEOUT = float(os.getenv('DB_CONNECT_TIMEOUT', 2.0))
+    DB_READ_TIMEOUT = float(os.getenv('DB_READ_TIMEOUT', 5.0))
+    DB_MAX_RETRIES = int(os.getenv('DB_MAX_RETRIES', 2))
+    DB_RETRY_BACKOFF = float(os.getenv('DB_RETRY_BACKOFF', 0.1))
+
+    # Caché de lecturas de entradas (LRU + TTL); tamaño 0 la deshabilita
+    TICKET_CACHE_MAXSIZE = int(os.getenv('TICKET_CACHE_MAXSIZE', 1024))
+    TICKET_CACHE_TTL = float(os.getenv('TICKET_CACHE_TTL', 1.0))
+
+    # Compras en lote (carrito con varios tipos de entrada)
+    BATCH_PURCHASE_MAX_ITEMS = int(os.getenv('BATCH_PURCHASE_MAX_ITEMS', 20))
+    BATCH_PURCHASE_CONCURRENCY = int(os.getenv('BATCH_PURCHASE_CONCURRENCY', 4))
+
+    # Listado paginado y en streaming de entradas
+    TICKETS_PAGE_SIZE = int(os.getenv('TICKETS_PAGE_SIZE', 100))
+    TICKETS_MAX_PAGE_SIZE = int(os.getenv('TICKETS_MAX_PAGE_SIZE', 1000))
+
+    # Circuit breaker hacia database-service
+    BREAKER_WINDOW_SIZE = int(os.getenv('BREAKER_WINDOW_SIZE', 20))
+    BREAKER_MIN_CALLS = int(os.getenv('BREAKER_MIN_CALLS', 10))
+    BREAKER_FAILURE_RATE = float(os.getenv('BREAKER_FAILURE_RATE', 0.5))
+    BREAKER_SLOW_CALL_SECONDS = float(os.getenv('BREAKER_SLOW_CALL_SECONDS', 2.0))
+    BREAKER_COOLDOWN = float(os.getenv('BREAKER_COOLDOWN', 5.0))
+    BREAKER_HALF_OPEN_CALLS = int(os.getenv('BREAKER_HALF_OPEN_CALLS', 1))
+    # Tiempo extra que una entrada vencida puede servirse con el circuito abierto
+    TICKET_CACHE_STALE_TTL = float(os.getenv('TICKET_CACHE_STALE_TTL', 30.0))
+
+    # Servidor de producción (python -m src.server): gunicorn pre-fork en modo
+    # sync, hypercorn con varios procesos en modo async
+    WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', min(2 * (os.cpu_count() or 1) + 1, 8)))
+    WEB_THREADS = int(os.getenv('WEB_THREADS', 4))
+    WEB_MAX_REQUESTS = int(os.getenv('WEB_MAX_REQUESTS', 10000))
+    WEB_MAX_REQUESTS_JITTER = int(os.getenv('WEB_MAX_REQUESTS_JITTER', 1000))
+    WEB_TIMEOUT = int(os.getenv('WEB_TIMEOUT', 30))
+    WEB_GRACEFUL_TIMEOUT = int(os.getenv('WEB_GRACEFUL_TIMEOUT', 30))
+    WEB_PRELOAD_APP = os.getenv('WEB_PRELOAD_APP', 'True').lower() == 'true'
+
+    # Stream SSE de cambios de disponibilidad (por proceso worker)
+    # (en modo sync, como mucho WEB_THREADS - 1: ver sync_stream_limit)
+    AVAILABILITY_STREAM_MAX_SUBSCRIBERS = int(os.getenv('AVAILABILITY_STREAM_MAX_SUBSCRIBERS', 500))
+    AVAILABILITY_STREAM_HEARTBEAT = float(os.getenv('AVAILABILITY_STREAM_HEARTBEAT', 15.0))
+    # Cada cuánto se relee en una sola consulta lo que siguen los suscriptores
+    # (cambios hechos por otros workers o instancias); 0 lo deshabilita
+    AVAILABILITY_STREAM_POLL_INTERVAL = float(os.getenv('AVAILABILITY_STREAM_POLL_INTERVAL', 1.0))
+    # Duración máxima de un stream; el cliente (EventSource) se reconecta solo
+    AVAILABILITY_STREAM_MAX_SECONDS = float(os.getenv('AVAILABILITY_STREAM_MAX_SECONDS', 300.0))
+
+    # Cola de compras por entrada: las compras concurrentes de una misma entrada
+    # se agrupan en micro-lotes con un solo decremento atómico en database-service
+    PURCHASE_QUEUE_ENABLED = os.getenv('PURCHASE_QUEUE_ENABLED', 'True').lower() == 'true'
+    PURCHASE_QUEUE_MAX_BATCH = int(os.getenv('PURCHASE_QUEUE_MAX_BATCH', 50))
+    # Compras en espera por entrada antes de rechazar con 503
+    PURCHASE_QUEUE_MAX_PENDING = int(os.getenv('PURCHASE_QUEUE_MAX_PENDING', 1000))
+
+    # Idempotency-Key en las compras: respuestas recordadas por proceso
+    IDEMPOTENCY_MAX_KEYS = int(os.getenv('IDEMPOTENCY_MAX_KEYS', 10000))
+    IDEMPOTENCY_KEY_TTL = float(os.getenv('IDEMPOTENCY_KEY_TTL', 86400.0))
+
+    # Control de admisión por cliente (token bucket): tokens por segundo y
+    # ráfaga máxima por clase de ruta; tasa 0 deja la clase sin límite.
+    # Apagado por defecto: detrás de un proxy sin RATE_LIMIT_TRUSTED_PROXIES
+    # todos los clientes comparten la IP del proxy
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'False').lower() == 'true'
+    RATE_LIMIT_PURCHASE_RATE = float(os.getenv('RATE_LIMIT_PURCHASE_RATE', 5.0))
+    RATE_LIMIT_PURCHASE_BURST = float(os.getenv('RATE_LIMIT_PURCHASE_BURST', 10.0))
+    RATE_LIMIT_READ_RATE = float(os.getenv('RATE_LIMIT_READ_RATE', 50.0))
+    RATE_LIMIT_READ_BURST = float(os.getenv('RATE_LIMIT_READ_BURST', 100.0))
+    # Clientes recordados por proceso, o casilleros de la tabla compartida
+    RATE_LIMIT_MAX_CLIENTS = int(os.getenv('RATE_LIMIT_MAX_CLIENTS', 100000))
+    # Cubetas compartidas entre los workers de gunicorn (requiere WEB_PRELOAD_APP)
+    RATE_LIMIT_SHARED = os.getenv('RATE_LIMIT_SHARED', 'False').lower() == 'true'
+    # Header con la identidad del cliente (p. ej. la API key que valida un
+    # gateway); vacío usa la IP de la conexión
+    RATE_LIMIT_CLIENT_HEADER = os.getenv('RATE_LIMIT_CLIENT_HEADER', '')
+    # Proxies de confianza delante del servicio: con N > 0 el cliente es la
+    # N-ésima dirección desde el final de X-Forwarded-For; 0 ignora el header
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv('RATE_LIMIT_TRUSTED_PROXIES', 0))
+
+    # Formato de los IDs de entrada (UUID de Prisma): los que no coinciden se
+    # rechazan con 400 sin consultar a database-service; vacío acepta cualquiera
+    TICKET_ID_PATTERN = os.getenv(
+        'TICKET_ID_PATTERN',
+        r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}')
+    # Caché negativa de IDs inexistentes (404 confirmados); tamaño 0 la deshabilita
+    TICKET_NEGATIVE_CACHE_MAXSIZE = int(os.getenv('TICKET_NEGATIVE_CACHE_MAXSIZE', 10000))
+    TICKET_NEGATIVE_CACHE_TTL = float(os.getenv('TICKET_NEGATIVE_CACHE_TTL', 5.0))
@@ -0,0 +1,391 @@
+import functools
+import json
+import math
+import time
+from quart import Blueprint, Response, make_response, request, jsonify
+from src.config import Config
+from src.controllers.common import (
+    IDEMPOTENCY_HEADER,
+    NDJSON_MIMETYPE,
+    SSE_HEADERS,
+    SSE_KEEP_ALIVE,
+    SSE_MIMETYPE,
+    SSE_RETRY_MS,
+    build_bulk_availability,
+    client_identity,
+    create_rate_limiter,
+    is_valid_ticket_id,
+    parse_page_args,
+    parse_stream_ids,
+    rate_limit_wait,
+    sse_event,
+    stored_response,
+    validate_idempotency_key,
+    validate_batch_purchase_data,
+    validate_purchase_data,
+    validate_ticket_ids,
+    wants_ndjson
+)
+from src.services.async_tickets_service import AsyncTicketsService
+from src.services.tickets_service import build_ticket_info, ticket_etag
+from src.utils.batch_queue import QueueFullError
+from src.utils.change_feed import FeedFullError
+from src.utils.circuit_breaker import CircuitOpenError
+from src.utils.etag import compute_etag
+from src.utils.idempotency import AsyncIdempotencyStore, IdempotencyKeyMismatchError
+
+async_tickets_bp = Blueprint('tickets_async', __name__)
+tickets_service = AsyncTicketsService()
+idempotency_store = AsyncIdempotencyStore(Config.IDEMPOTENCY_MAX_KEYS, Config.IDEMPOTENCY_KEY_TTL)
+rate_limiter = create_rate_limiter()
+
+
+@async_tickets_bp.after_app_serving
+async def close_database_client():
+    """Liberar el pool de conexiones hacia database-service al apagar"""
+    await tickets_service.db_service.aclose()
+
+
+def service_unavailable(error):
+    """Variante para Quart de tickets_controller.service_unavailable"""
+    return (jsonify({"error": "database-service no disponible temporalmente"}), 503,
+            {"Retry-After": str(math.ceil(error.retry_after))})
+
+
+def too_many_requests(wait):
+    """Variante para Quart de tickets_controller.too_many_requests"""
+    return (jsonify({"error": "Demasiadas solicitudes, reintente más tarde"}), 429,
+            {"Retry-After": str(math.ceil(wait))})
+
+
+def purchase_queue_full(error):
+    """Variante para Quart de tickets_controller.purchase_queue_full"""
+    return (jsonify({"error": "Demasiadas compras en espera para esta entrada"}), 503,
+            {"Retry-After": "1"})
+
+
+def stream_unavailable():
+    """Variante para Quart de tickets_controller.stream_unavailable"""
+    return (jsonify({"error": "Demasiados streams de disponibilidad abiertos"}), 503,
+            {"Retry-After": str(math.ceil(Config.AVAILABILITY_STREAM_HEARTBEAT))})
+
+
+def idempotency_conflict():
+    """Variante para Quart de tickets_controller.idempotency_conflict"""
+    return jsonify({"error": f"{IDEMPOTENCY_HEADER} ya se usó con una solicitud distinta"}), 422
+
+
+def idempotent(view):
+    """Variante para Quart de tickets_controller.idempotent"""
+    @functools.wraps(view)
+    async def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return await view(*args, **kwargs)
+
+        error = validate_idempotency_key(key)
+        if error:
+            return jsonify({"error": error}), 400
+
+        async def execute():
+            response = await make_response(await view(*args, **kwargs))
+            return stored_response(response.status_code, await response.get_data(), response.headers)
+
+        try:
+            stored, replayed = await idempotency_store.run(
+                (client_identity(request), request.path, key),
+                compute_etag(await request.get_data()), execute)
+        except IdempotencyKeyMismatchError:
+            return idempotency_conflict()
+
+        response = Response(stored.body, status=stored.status, headers=list(stored.headers))
+        if replayed:
+            response.headers['Idempotent-Replayed'] = 'true'
+        return response
+    return wrapper
+
+
+def conditional_jsonify(etag, build_body):
+    """Variante para Quart de tickets_controller.conditional_jsonify"""
+    if request.if_none_match.contains_weak(etag):
+        response = Response("", status=304)
+    else:
+        response = jsonify(build_body())
+    response.set_etag(etag)
+    return response
+
+
+async def ndjson_lines(summaries):
+    """Variante asíncrona de tickets_controller.ndjson_lines"""
+    try:
+        async for summary in summaries:
+            yield (json.dumps(summary) + "\n").encode()
+    except Exception as e:
+        yield (json.dumps({"error": f"Error interno del servidor: {str(e)}"}) + "\n").encode()
+
+
+async def availability_events(subscription, snapshot):
+    """
+    Variante asíncrona de tickets_controller.availability_events; la
+    suscripción se libera al terminar o cuando el cliente se desconecta
+    """
+    deadline = time.monotonic() + Config.AVAILABILITY_STREAM_MAX_SECONDS
+    try:
+        yield (f"retry: {SSE_RETRY_MS}\n" + sse_event(build_bulk_availability(snapshot))).encode()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            changes = await subscription.wait(min(Config.AVAILABILITY_STREAM_HEARTBEAT, remaining))
+            yield (sse_event(build_bulk_availability(changes)) if changes else SSE_KEEP_ALIVE).encode()
+    finally:
+        tickets_service.unsubscribe_availability(subscription)
+
+
+@async_tickets_bp.before_request
+async def enforce_rate_limit():
+    """Variante para Quart de tickets_controller.enforce_rate_limit"""
+    wait = rate_limit_wait(rate_limiter, request)
+    if wait > 0:
+        return too_many_requests(wait)
+
+
+@async_tickets_bp.route('/availability', methods=['POST'])
+async def check_availability_bulk():
+    """Verificar disponibilidad de varias entradas en una sola solicitud"""
+    try:
+        if not request.is_json:
+            return jsonify({"error": "Content-Type debe ser application/json"}), 400
+
+        data = await request.get_json()
+
+        if not data:
+            return jsonify({"error": "Datos JSON requeridos"}), 400
+
+        error = validate_ticket_ids(data)
+        if error:
+            return jsonify({"error": error}), 400
+
+        availability = await tickets_service.check_availability_many(data['ticket_ids'])
+        return jsonify(build_bulk_availability(availability))
+    except CircuitOpenError as e:
+        return service_unavailable(e)
+    except Exception as e:
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+
+
+@async_tickets_bp.route('/availability/stream', methods=['GET'])
+async def stream_availability():
+    """
+    Stream (Server-Sent Events) de la disponibilidad de varias entradas:
+    ?ids=a,b,c. Envía la foto inicial y luego cada cambio de cantidad
+    """
+    ticket_ids, error = parse_stream_ids(request.args)
+    if error:
+        return jsonify({"error": error}), 400
+
+    try:
+        subscription = tickets_service.subscribe_availability(ticket_ids)
+    except FeedFullError:
+        return stream_unavailable()
+
+    try:
+        snapshot = await tickets_service.check_availability_many(ticket_ids)
+    except CircuitOpenError as e:
+        tickets_service.unsubscribe_availability(subscription)
+        return service_unavailable(e)
+    except Exception as e:
+        tickets_service.unsubscribe_availability(subscription)
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+    subscription.mark_seen(snapshot)
+
+    response = Response(availability_events(subscription, snapshot),
+                        mimetype=SSE_MIMETYPE, headers=SSE_HEADERS)
+    # el stream dura más que el RESPONSE_TIMEOUT por defecto de Quart
+    response.timeout = None
+    return response
+
+
+@async_tickets_bp.route('/availability/<ticket_id>', methods=['GET'])
+async def check_availability(ticket_id):
+    """Verificar disponibilidad de una entrada específica"""
+    try:
+        if not is_valid_ticket_id(ticket_id):
+            return jsonify({"error": "ID de entrada inválido"}), 400
+
+        available = await tickets_service.check_availability(ticket_id)
+        if available is None:
+            return jsonify({"error": "Entrada no encontrada"}), 404
+
+        return conditional_jsonify(compute_etag(ticket_id, available), lambda: {
+            "ticket_id": ticket_id,
+            "available_quantity": available,
+            "available": available > 0
+        })
+    except CircuitOpenError as e:
+        return service_unavailable(e)
+    except Exception as e:
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+
+
+@async_tickets_bp.route('/purchase', methods=['POST'])
+@idempotent
+async def purchase_tickets():
+    """Procesar compra de entradas"""
+    try:
+        if not request.is_json:
+            return jsonify({"error": "Content-Type debe ser application/json"}), 400
+
+        data = await request.get_json()
+
+        if not data:
+            return jsonify({"error": "Datos JSON requeridos"}), 400
+
+        error = validate_purchase_data(data)
+        if error:
+            return jsonify({"error": error}), 400
+
+        result = await tickets_service.purchase_tickets(
+            data['ticket_id'], data['quantity'])
+        return jsonify({
+            "success": True,
+            "purchase": result
+        })
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except QueueFullError as e:
+        return purchase_queue_full(e)
+    except CircuitOpenError as e:
+        return service_unavailable(e)
+    except Exception as e:
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+
+
+@async_tickets_bp.route('/purchase/batch', methods=['POST'])
+@idempotent
+async def purchase_tickets_batch():
+    """Procesar la compra de varias entradas en una sola solicitud"""
+    try:
+        if not request.is_json:
+            return jsonify({"error": "Content-Type debe ser application/json"}), 400
+
+        data = await request.get_json()
+
+        if not data:
+            return jsonify({"error": "Datos JSON requeridos"}), 400
+
+        errors = validate_batch_purchase_data(data)
+        if errors:
+            return jsonify({"error": "Datos de compra inválidos", "errors": errors}), 400
+
+        receipt = await tickets_service.purchase_tickets_batch(data['items'])
+        return jsonify(receipt), 200 if receipt["success"] else 207
+
+    except CircuitOpenError as e:
+        return service_unavailable(e)
+    except Exception as e:
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+
+
+@async_tickets_bp.route('/', methods=['GET'])
+async def get_all_tickets():
+    """
+    Obtener todas las entradas disponibles
+    Admite paginación (?page=&page_size=) y streaming NDJSON (?format=ndjson)
+    """
+    try:
+        page, page_size, error = parse_page_args(request.args)
+        if error:
+            return jsonify({"error": error}), 400
+
+        if wants_ndjson(request):
+            summaries = tickets_service.iter_ticket_summaries(
+                page_size or Config.TICKETS_PAGE_SIZE)
+            return Response(ndjson_lines(summaries), mimetype=NDJSON_MIMETYPE)
+
+        if page is not None:
+            result = await tickets_service.get_tickets_page(page, page_size)
+            return conditional_jsonify(compute_etag(result), lambda: result)
+
+        tickets = await tickets_service.get_all_tickets()
+        if tickets is None:
+            return jsonify({"error": "No se pudieron obtener las entradas"}), 500
+
+        return conditional_jsonify(compute_etag(tickets), lambda: tickets)
+    except CircuitOpenError as e:
+        return service_unavailable(e)
+    except Exception as e:
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+
+
+@async_tickets_bp.route('/<ticket_id>', methods=['GET'])
+async def get_ticket_info(ticket_id):
+    """Obtener información de una entrada específica"""
+    try:
+        if not is_valid_ticket_id(ticket_id):
+            return jsonify({"error": "ID de entrada inválido"}), 400
+
+        ticket = await tickets_service.get_ticket(ticket_id)
+        if not ticket:
+            return jsonify({"error": "Entrada no encontrada"}), 404
+
+        return conditional_jsonify(ticket_etag(ticket), lambda: build_ticket_info(ticket))
+    except CircuitOpenError as e:
+        return service_unavailable(e)
+    except Exception as e:
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+
+
+@async_tickets_bp.route('/<ticket_id>', methods=['PUT'])
+async def update_ticket(ticket_id):
+    """Actualizar información de una entrada"""
+    try:
+        if not request.is_json:
+            return jsonify({"error": "Content-Type debe ser application/json"}), 400
+
+        if not is_valid_ticket_id(ticket_id):
+            return jsonify({"error": "ID de entrada inválido"}), 400
+
+        data = await request.get_json()
+
+        if not data:
+            return jsonify({"error": "Datos JSON requeridos"}), 400
+
+        if not any(data.values()):
+            return jsonify({"error": "Al menos un campo debe ser proporcionado para actualizar"}), 400
+
+        result = await tickets_service.update_ticket_info(ticket_id, data)
+        if result is None:
+            return jsonify({"error": "Entrada no encontrada"}), 404
+
+        return jsonify(result)
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except CircuitOpenError as e:
+        return service_unavailable(e)
+    except Exception as e:
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+
+
+@async_tickets_bp.route('/health', methods=['GET'])
+async def health_check():
+    """Endpoint de verificación de salud del servicio"""
+    breaker = tickets_service.db_service.breaker.stats()
+    return jsonify({
+        "service": "tickets-service",
+        # degradado: el servicio responde, pero database-service no está disponible
+        "status": "healthy" if breaker["state"] == "closed" else "degraded",
+        "mode": "async",
+        "message": "Servicio de gestión de entradas funcionando correctamente",
+        "ticket_cache": tickets_service.ticket_cache.stats(),
+        "missing_tickets_cache": tickets_service.missing_tickets.stats(),
+        "singleflight": tickets_service.db_service.singleflight.stats(),
+        "circuit_breaker": breaker,
+        "availability_stream": tickets_service.availability_feed.stats(),
+        "purchase_queue": (tickets_service.purchase_queue.stats()
+                           if tickets_service.purchase_queue else None),
+        "idempotency": idempotency_store.stats(),
+        "rate_limit": rate_limiter.stats() if rate_limiter else None
+    })
@@ -0,0 +1,233 @@
+import json
+import re
+from src.config import Config
+from src.utils.idempotency import StoredResponse
+from src.utils.rate_limiter import build_rate_limiter
+
+# Validaciones y helpers sin dependencias del framework web, compartidos por
+# el controlador síncrono (Flask) y el asíncrono (Quart)
+
+MAX_BULK_TICKET_IDS = 100
+TICKET_ID_RE = re.compile(Config.TICKET_ID_PATTERN) if Config.TICKET_ID_PATTERN else None
+NDJSON_MIMETYPE = 'application/x-ndjson'
+SSE_MIMETYPE = 'text/event-stream'
+# sin caché ni buffering en proxies (nginx) para que cada evento salga al instante
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+SSE_KEEP_ALIVE = ": keep-alive\n\n"
+# espera sugerida al cliente (EventSource) antes de reconectarse, en milisegundos
+SSE_RETRY_MS = 3000
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+# headers que se repiten junto con el cuerpo al reenviar una respuesta guardada
+REPLAYED_HEADERS = ('Content-Type', 'Retry-After')
+# clase de límite de cada ruta (por nombre de la vista); las demás no se limitan
+ROUTE_CLASSES = {
+    'purchase_tickets': 'purchase',
+    'purchase_tickets_batch': 'purchase',
+    'check_availability_bulk': 'read',
+    'stream_availability': 'read',
+    'check_availability': 'read',
+    'get_all_tickets': 'read',
+    'get_ticket_info': 'read'
+}
+
+
+def create_rate_limiter():
+    """Limitador por cliente y clase de ruta según Config (None si está deshabilitado)"""
+    if not Config.RATE_LIMIT_ENABLED:
+        return None
+    return build_rate_limiter({
+        'purchase': (Config.RATE_LIMIT_PURCHASE_RATE, Config.RATE_LIMIT_PURCHASE_BURST),
+        'read': (Config.RATE_LIMIT_READ_RATE, Config.RATE_LIMIT_READ_BURST)
+    }, Config.RATE_LIMIT_MAX_CLIENTS, shared=Config.RATE_LIMIT_SHARED)
+
+def is_valid_ticket_id(ticket_id):
+    """Validación del formato del ID antes de cualquier llamada a database-service"""
+    if not ticket_id or not isinstance(ticket_id, str):
+        return False
+    return TICKET_ID_RE is None or TICKET_ID_RE.fullmatch(ticket_id) is not None
+
+
+def validate_purchase_data(data):
+    """
+    Validar el cuerpo de una compra
+    Retorna el mensaje de error o None si los datos son válidos
+    """
+    ticket_id = data.get('ticket_id')
+    quantity = data.get('quantity')
+
+    if not ticket_id:
+        return "ticket_id es requerido"
+
+    if not isinstance(ticket_id, str):
+        return "ticket_id debe ser una cadena"
+
+    if not is_valid_ticket_id(ticket_id):
+        return "ticket_id no tiene un formato válido"
+
+    if not quantity:
+        return "quantity es requerido"
+
+    if not isinstance(quantity, int):
+        return "quantity debe ser un número entero"
+
+    if quantity <= 0:
+        return "La cantidad debe ser mayor a 0"
+
+    if quantity > 100:  # Límite máximo por compra
+        return "No se pueden comprar más de 100 entradas por transacción"
+
+    return None
+
+
+def validate_batch_purchase_data(data):
+    """
+    Validar todos los ítems de una compra en lote en una sola pasada
+    Retorna la lista de errores (vacía si los datos son válidos)
+    """
+    items = data.get('items')
+
+    if not isinstance(items, list) or not items:
+        return ["items debe ser una lista no vacía"]
+
+    if len(items) > Config.BATCH_PURCHASE_MAX_ITEMS:
+        return [f"No se pueden comprar más de {Config.BATCH_PURCHASE_MAX_ITEMS} ítems por transacción"]
+
+    errors = []
+    seen = set()
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append(f"items[{index}]: debe ser un objeto")
+            continue
+
+        error = validate_purchase_data(item)
+        if error:
+            errors.append(f"items[{index}]: {error}")
+        elif item['ticket_id'] in seen:
+            errors.append(f"items[{index}]: ticket_id duplicado")
+        else:
+            seen.add(item['ticket_id'])
+
+    return errors
+
+
+def validate_ticket_ids(data):
+    """
+    Validar el cuerpo de una consulta masiva de disponibilidad
+    Retorna el mensaje de error o None si los datos son válidos
+    """
+    ticket_ids = data.get('ticket_ids')
+
+    if not isinstance(ticket_ids, list) or not ticket_ids:
+        return "ticket_ids debe ser una lista no vacía"
+
+    if not all(is_valid_ticket_id(ticket_id) for ticket_id in ticket_ids):
+        return "Cada ticket_id debe ser una cadena con formato de ID válido"
+
+    if len(ticket_ids) > MAX_BULK_TICKET_IDS:
+        return f"No se pueden consultar más de {MAX_BULK_TICKET_IDS} entradas por solicitud"
+
+    return None
+
+def client_identity(req):
+    """
+    Identidad del cliente: el header configurado (API key) o la IP. Detrás de
+    RATE_LIMIT_TRUSTED_PROXIES proxies la IP sale de X-Forwarded-For (cada
+    proxy agrega la dirección que lo llamó, así que solo las últimas N son
+    confiables); sin proxies configurados el header se ignora
+    """
+    if Config.RATE_LIMIT_CLIENT_HEADER:
+        client = req.headers.get(Config.RATE_LIMIT_CLIENT_HEADER)
+        if client:
+            return f"key:{client}"
+    trusted = Config.RATE_LIMIT_TRUSTED_PROXIES
+    if trusted > 0:
+        forwarded = [addr.strip() for addr in req.headers.get('X-Forwarded-For', '').split(',')
+                     if addr.strip()]
+        if len(forwarded) >= trusted:
+            return f"ip:{forwarded[-trusted]}"
+    return f"ip:{req.remote_addr}"
+
+
+def rate_limit_wait(limiter, req):
+    """
+    Decisión de admisión de la solicitud
+    Retorna 0 si se admite o los segundos que el cliente debe esperar
+    """
+    route_class = ROUTE_CLASSES.get((req.endpoint or '').rsplit('.', 1)[-1])
+    if limiter is None or route_class not in limiter.buckets:
+        return 0.0
+    return limiter.check(route_class, client_identity(req))
+
+def validate_idempotency_key(key):
+    """
+    Validar el header Idempotency-Key
+    Retorna el mensaje de error o None si es válido
+    """
+    if not key or len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        return f"{IDEMPOTENCY_HEADER} debe tener entre 1 y {MAX_IDEMPOTENCY_KEY_LENGTH} caracteres"
+    return None
+
+
+def stored_response(status, body, headers):
+    return StoredResponse(status, body, tuple(
+        (name, headers[name]) for name in REPLAYED_HEADERS if name in headers))
+
+def parse_page_args(args):
+    """
+    Leer page/page_size del query string
+    Retorna (page, page_size, error); page es None si no se pidió paginación
+    """
+    if 'page' not in args and 'page_size' not in args:
+        return None, None, None
+
+    try:
+        page = int(args.get('page', 1))
+        page_size = int(args.get('page_size', Config.TICKETS_PAGE_SIZE))
+    except ValueError:
+        return None, None, "page y page_size deben ser números enteros"
+
+    if page < 1 or not 1 <= page_size <= Config.TICKETS_MAX_PAGE_SIZE:
+        return None, None, (f"page debe ser mayor a 0 y page_size estar entre 1 "
+                            f"y {Config.TICKETS_MAX_PAGE_SIZE}")
+
+    return page, page_size, None
+
+
+def wants_ndjson(req):
+    """El listado se transmite como NDJSON con ?format=ndjson o Accept: application/x-ndjson"""
+    return (req.args.get('format') == 'ndjson'
+            or NDJSON_MIMETYPE in req.accept_mimetypes.values())
+
+def build_bulk_availability(availability):
+    """Separar las entradas encontradas de las inexistentes"""
+    return {
+        "availability": {
+            ticket_id: {
+                "available_quantity": available,
+                "available": available > 0
+            }
+            for ticket_id, available in availability.items()
+            if available is not None
+        },
+        "not_found": [
+            ticket_id for ticket_id, available in availability.items()
+            if available is None
+        ]
+    }
+
+
+def parse_stream_ids(args):
+    """
+    Leer ?ids=a,b,c del stream de disponibilidad
+    Retorna (ticket_ids sin duplicados, error)
+    """
+    ticket_ids = [ticket_id.strip() for ticket_id in args.get('ids', '').split(',')]
+    error = validate_ticket_ids({'ticket_ids': ticket_ids})
+    if error:
+        return None, error
+    return list(dict.fromkeys(ticket_ids)), None
+
+
+def sse_event(data, event='availability'):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -1,8 +1,221 @@
-from flask import Blueprint, request, jsonify
-from src.services.tickets_service import TicketsService
+import functools
+import json
+import math
+import time
+from flask import Blueprint, Response, make_response, request, jsonify
+from src.config import Config
+from src.controllers.common import (
+    IDEMPOTENCY_HEADER,
+    NDJSON_MIMETYPE,
+    SSE_HEADERS,
+    SSE_KEEP_ALIVE,
+    SSE_MIMETYPE,
+    SSE_RETRY_MS,
+    build_bulk_availability,
+    client_identity,
+    create_rate_limiter,
+    is_valid_ticket_id,
+    parse_page_args,
+    parse_stream_ids,
+    rate_limit_wait,
+    sse_event,
+    stored_response,
+    validate_batch_purchase_data,
+    validate_idempotency_key,
+    validate_purchase_data,
+    validate_ticket_ids,
+    wants_ndjson
+)
+from src.services.tickets_service import TicketsService, build_ticket_info, ticket_etag
+from src.utils.batch_queue import QueueFullError
+from src.utils.change_feed import FeedFullError
+from src.utils.circuit_breaker import CircuitOpenError
+from src.utils.etag import compute_etag
+from src.utils.idempotency import IdempotencyKeyMismatchError, IdempotencyStore
 
 tickets_bp = Blueprint('tickets', __name__)
 tickets_service = TicketsService()
+idempotency_store = IdempotencyStore(Config.IDEMPOTENCY_MAX_KEYS, Config.IDEMPOTENCY_KEY_TTL)
+
+
+# con WEB_PRELOAD_APP se crea en el proceso maestro, antes del fork de los workers
+rate_limiter = create_rate_limiter()
+
+
+
+def service_unavailable(error):
+    """Falla rápida (503) mientras el circuito hacia database-service está abierto"""
+    return (jsonify({"error": "database-service no disponible temporalmente"}), 503,
+            {"Retry-After": str(math.ceil(error.retry_after))})
+
+
+
+def too_many_requests(wait):
+    """Rechazo (429) de un cliente que agotó su cubeta de tokens"""
+    return (jsonify({"error": "Demasiadas solicitudes, reintente más tarde"}), 429,
+            {"Retry-After": str(math.ceil(wait))})
+
+
+def purchase_queue_full(error):
+    """Rechazo (503) de una compra cuando la cola de su entrada está llena"""
+    return (jsonify({"error": "Demasiadas compras en espera para esta entrada"}), 503,
+            {"Retry-After": "1"})
+
+
+def stream_unavailable():
+    """Rechazo (503) de un stream nuevo cuando se alcanzó el máximo de suscriptores"""
+    return (jsonify({"error": "Demasiados streams de disponibilidad abiertos"}), 503,
+            {"Retry-After": str(math.ceil(Config.AVAILABILITY_STREAM_HEARTBEAT))})
+
+
+
+def idempotency_conflict():
+    return jsonify({"error": f"{IDEMPOTENCY_HEADER} ya se usó con una solicitud distinta"}), 422
+
+
+def idempotent(view):
+    """
+    Con el header Idempotency-Key, la ruta se ejecuta una sola vez por clave:
+    un reintento concurrente espera a la original y uno posterior recibe la
+    respuesta guardada (con Idempotent-Replayed: true) sin llamar a
+    database-service. Reusar la clave con otro cuerpo responde 422. Las
+    claves son por cliente (client_identity): la misma clave de otro cliente
+    es otra operación y nunca recibe la respuesta ajena
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return view(*args, **kwargs)
+
+        error = validate_idempotency_key(key)
+        if error:
+            return jsonify({"error": error}), 400
+
+        def execute():
+            response = make_response(view(*args, **kwargs))
+            return stored_response(response.status_code, response.get_data(), response.headers)
+
+        try:
+            stored, replayed = idempotency_store.run(
+                (client_identity(request), request.path, key),
+                compute_etag(request.get_data()), execute)
+        except IdempotencyKeyMismatchError:
+            return idempotency_conflict()
+
+        response = Response(stored.body, status=stored.status, headers=list(stored.headers))
+        if replayed:
+            response.headers['Idempotent-Replayed'] = 'true'
+        return response
+    return wrapper
+
+
+def conditional_jsonify(etag, build_body):
+    """
+    Responder 304 sin cuerpo si el cliente ya tiene la versión (If-None-Match);
+    si no, serializar el cuerpo. En ambos casos se envía el ETag
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(build_body())
+    response.set_etag(etag)
+    return response
+
+
+
+def ndjson_lines(summaries):
+    """
+    Serializar una entrada por línea a medida que llegan las páginas
+    Un error a mitad del stream se informa como última línea
+    """
+    try:
+        for summary in summaries:
+            yield json.dumps(summary) + "\n"
+    except Exception as e:
+        yield json.dumps({"error": f"Error interno del servidor: {str(e)}"}) + "\n"
+
+
+
+def availability_events(subscription, snapshot):
+    """
+    Eventos SSE de un suscriptor: primero la foto inicial y después solo las
+    entradas que cambiaron, con comentarios keep-alive cuando no hay cambios.
+    Tras AVAILABILITY_STREAM_MAX_SECONDS se cierra y el cliente se reconecta
+    """
+    deadline = time.monotonic() + Config.AVAILABILITY_STREAM_MAX_SECONDS
+    yield f"retry: {SSE_RETRY_MS}\n" + sse_event(build_bulk_availability(snapshot))
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        changes = subscription.wait(min(Config.AVAILABILITY_STREAM_HEARTBEAT, remaining))
+        yield sse_event(build_bulk_availability(changes)) if changes else SSE_KEEP_ALIVE
+
+
+@tickets_bp.before_request
+def enforce_rate_limit():
+    """Control de admisión antes de cualquier llamada a database-service"""
+    wait = rate_limit_wait(rate_limiter, request)
+    if wait > 0:
+        return too_many_requests(wait)
+
+
+@tickets_bp.route('/availability', methods=['POST'])
+def check_availability_bulk():
+    """Verificar disponibilidad de varias entradas en una sola solicitud"""
+    try:
+        if not request.is_json:
+            return jsonify({"error": "Content-Type debe ser application/json"}), 400
+
+        data = request.get_json()
+
+        if not data:
+            return jsonify({"error": "Datos JSON requeridos"}), 400
+
+        error = validate_ticket_ids(data)
+        if error:
+            return jsonify({"error": error}), 400
+
+        availability = tickets_service.check_availability_many(data['ticket_ids'])
+        return jsonify(build_bulk_availability(availability))
+    except CircuitOpenError as e:
+        return service_unavailable(e)
+    except Exception as e:
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+
+
+@tickets_bp.route('/availability/stream', methods=['GET'])
+def stream_availability():
+    """
+    Stream (Server-Sent Events) de la disponibilidad de varias entradas:
+    ?ids=a,b,c. Envía la foto inicial y luego cada cambio de cantidad
+    """
+    ticket_ids, error = parse_stream_ids(request.args)
+    if error:
+        return jsonify({"error": error}), 400
+
+    try:
+        # suscribirse antes de la foto inicial para no perder cambios intermedios
+        subscription = tickets_service.subscribe_availability(ticket_ids)
+    except FeedFullError:
+        return stream_unavailable()
+
+    try:
+        snapshot = tickets_service.check_availability_many(ticket_ids)
+    except CircuitOpenError as e:
+        tickets_service.unsubscribe_availability(subscription)
+        return service_unavailable(e)
+    except Exception as e:
+        tickets_service.unsubscribe_availability(subscription)
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+    subscription.mark_seen(snapshot)
+
+    response = Response(availability_events(subscription, snapshot),
+                        mimetype=SSE_MIMETYPE, headers=SSE_HEADERS)
+    # se ejecuta también si el cliente corta antes del primer evento
+    response.call_on_close(lambda: tickets_service.unsubscribe_availability(subscription))
+    return response
 
 
 @tickets_bp.route('/availability/<ticket_id>', methods=['GET'])
@@ -10,23 +223,26 @@ def check_availability(ticket_id):
     """Verificar disponibilidad de una entrada específica"""
     try:
         # Validar formato de ticket_id
-        if not ticket_id or not isinstance(ticket_id, str):
+        if not is_valid_ticket_id(ticket_id):
             return jsonify({"error": "ID de entrada inválido"}), 400
 
         available = tickets_service.check_availability(ticket_id)
         if available is None:
             return jsonify({"error": "Entrada no encontrada"}), 404
 
-        return jsonify({
+        return conditional_jsonify(compute_etag(ticket_id, available), lambda: {
             "ticket_id": ticket_id,
             "available_quantity": available,
             "available": available > 0
         })
+    except CircuitOpenError as e:
+        return service_unavailable(e)
     except Exception as e:
         return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
 
 
 @tickets_bp.route('/purchase', methods=['POST'])
+@idempotent
 def purchase_tickets():
     """Procesar compra de entradas"""
     try:
@@ -38,28 +254,12 @@ def purchase_tickets():
         if not data:
             return jsonify({"error": "Datos JSON requeridos"}), 400
 
-        ticket_id = data.get('ticket_id')
-        quantity = data.get('quantity')
-
-        if not ticket_id:
-            return jsonify({"error": "ticket_id es requerido"}), 400
-
-        if not isinstance(ticket_id, str):
-            return jsonify({"error": "ticket_id debe ser una cadena"}), 400
-
-        if not quantity:
-            return jsonify({"error": "quantity es requerido"}), 400
-
-        if not isinstance(quantity, int):
-            return jsonify({"error": "quantity debe ser un número entero"}), 400
+        error = validate_purchase_data(data)
+        if error:
+            return jsonify({"error": error}), 400
 
-        if quantity <= 0:
-            return jsonify({"error": "La cantidad debe ser mayor a 0"}), 400
-
-        if quantity > 100:  # Límite máximo por compra
-            return jsonify({"error": "No se pueden comprar más de 100 entradas por transacción"}), 400
-
-        result = tickets_service.purchase_tickets(ticket_id, quantity)
+        result = tickets_service.purchase_tickets(
+            data['ticket_id'], data['quantity'])
         return jsonify({
             "success": True,
             "purchase": result
@@ -67,19 +267,68 @@ def purchase_tickets():
 
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except QueueFullError as e:
+        return purchase_queue_full(e)
+    except CircuitOpenError as e:
+        return service_unavailable(e)
+    except Exception as e:
+        return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+
+
+@tickets_bp.route('/purchase/batch', methods=['POST'])
+@idempotent
+def purchase_tickets_batch():
+    """Procesar la compra de varias entradas en una sola solicitud"""
+    try:
+        if not request.is_json:
+            return jsonify({"error": "Content-Type debe ser application/json"}), 400
+
+        data = request.get_json()
+
+        if not data:
+            return jsonify({"error": "Datos JSON requeridos"}), 400
+
+        errors = validate_batch_purchase_data(data)
+        if errors:
+            return jsonify({"error": "Datos de compra inválidos", "errors": errors}), 400
+
+        receipt = tickets_service.purchase_tickets_batch(data['items'])
+        # 207: el comprobante trae ítems exitosos y fallidos
+        return jsonify(receipt), 200 if receipt["success"] else 207
+
+    except CircuitOpenError as e:
+        return service_unavailable(e)
     except Exception as e:
         return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
 
 
 @tickets_bp.route('/', methods=['GET'])
 def get_all_tickets():
-    """Obtener todas las entradas disponibles"""
+    """
+    Obtener todas las entradas disponibles
+    Admite paginación (?page=&page_size=) y streaming NDJSON (?format=ndjson)
+    """
     try:
+        page, page_size, error = parse_page_args(request.args)
+        if error:
+            return jsonify({"error": error}), 400
+
+        if wants_ndjson(request):
+            summaries = tickets_service.iter_ticket_summaries(
+                page_size or Config.TICKETS_PAGE_SIZE)
+            return Response(ndjson_lines(summaries), mimetype=NDJSON_MIMETYPE)
+
+        if page is not None:
+            result = tickets_service.get_tickets_page(page, page_size)
+            return conditional_jsonify(compute_etag(result), lambda: result)
+
         tickets = tickets_service.get_all_tickets()
         if tickets is None:
             return jsonify({"error": "No se pudieron obtener las entradas"}), 500
 
-        return jsonify(tickets)
+        return conditional_jsonify(compute_etag(tickets), lambda: tickets)
+    except CircuitOpenError as e:
+        return service_unavailable(e)
     except Exception as e:
         return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
 
@@ -88,14 +337,17 @@ def get_all_tickets():
 def get_ticket_info(ticket_id):
     """Obtener información de una entrada específica"""
     try:
-        if not ticket_id or not isinstance(ticket_id, str):
+        if not is_valid_ticket_id(ticket_id):
             return jsonify({"error": "ID de entrada inválido"}), 400
 
-        ticket_info = tickets_service.get_ticket_info(ticket_id)
-        if not ticket_info:
+        # con la entrada en caché, un 304 no requiere llamar a database-service
+        ticket = tickets_service.get_ticket(ticket_id)
+        if not ticket:
             return jsonify({"error": "Entrada no encontrada"}), 404
 
-        return jsonify(ticket_info)
+        return conditional_jsonify(ticket_etag(ticket), lambda: build_ticket_info(ticket))
+    except CircuitOpenError as e:
+        return service_unavailable(e)
     except Exception as e:
         return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
 
@@ -107,7 +359,7 @@ def update_ticket(ticket_id):
         if not request.is_json:
             return jsonify({"error": "Content-Type debe ser application/json"}), 400
 
-        if not ticket_id or not isinstance(ticket_id, str):
+        if not is_valid_ticket_id(ticket_id):
             return jsonify({"error": "ID de entrada inválido"}), 400
 
         data = request.get_json()
@@ -127,6 +379,8 @@ def update_ticket(ticket_id):
 
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except CircuitOpenError as e:
+        return service_unavailable(e)
     except Exception as e:
         return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
 
@@ -134,8 +388,19 @@ def update_ticket(ticket_id):
 @tickets_bp.route('/health', methods=['GET'])
 def health_check():
     """Endpoint de verificación de salud del servicio"""
+    breaker = tickets_service.db_service.breaker.stats()
     return jsonify({
         "service": "tickets-service",
-        "status": "healthy",
-        "message": "Servicio de gestión de entradas funcionando correctamente"
+        # degradado: el servicio responde, pero database-service no está disponible
+        "status": "healthy" if breaker["state"] == "closed" else "degraded",
+        "message": "Servicio de gestión de entradas funcionando correctamente",
+        "ticket_cache": tickets_service.ticket_cache.stats(),
+        "missing_tickets_cache": tickets_service.missing_tickets.stats(),
+        "singleflight": tickets_service.db_service.singleflight.stats(),
+        "circuit_breaker": breaker,
+        "availability_stream": tickets_service.availability_feed.stats(),
+        "purchase_queue": (tickets_service.purchase_queue.stats()
+                           if tickets_service.purchase_queue else None),
+        "idempotency": idempotency_store.stats(),
+        "rate_limit": rate_limiter.stats() if rate_limiter else None
     })
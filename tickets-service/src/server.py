@@ -0,0 +1,74 @@
+"""
+Punto de entrada de producción de tickets-service.
+
+- SERVER_MODE=sync: gunicorn pre-fork con workers gthread (varios hilos por
+  proceso) sobre la app Flask.
+- SERVER_MODE=async: hypercorn con varios procesos worker sobre la app Quart.
+
+Uso:
+    python -m src.server
+
+`python -m src.app` queda como servidor de desarrollo.
+"""
+from gunicorn.app.base import BaseApplication
+from hypercorn.config import Config as HypercornConfig
+from hypercorn.run import run as hypercorn_run
+from src.config import Config
+
+
+def gunicorn_options() -> dict:
+    """Configuración de gunicorn tomada de Config"""
+    return {
+        'bind': f"0.0.0.0:{Config.PORT}",
+        'workers': Config.WEB_CONCURRENCY,
+        'worker_class': 'gthread',
+        'threads': Config.WEB_THREADS,
+        'keepalive': int(Config.KEEP_ALIVE_TIMEOUT),
+        # reciclar workers cada N solicitudes acota fugas de memoria; el
+        # jitter evita que todos se reinicien a la vez
+        'max_requests': Config.WEB_MAX_REQUESTS,
+        'max_requests_jitter': Config.WEB_MAX_REQUESTS_JITTER,
+        'timeout': Config.WEB_TIMEOUT,
+        'graceful_timeout': Config.WEB_GRACEFUL_TIMEOUT,
+        'preload_app': Config.WEB_PRELOAD_APP
+    }
+
+
+def hypercorn_config() -> HypercornConfig:
+    """Configuración de hypercorn con varios workers tomada de Config"""
+    config = HypercornConfig()
+    config.application_path = 'src.asgi:app'
+    config.bind = [f"0.0.0.0:{Config.PORT}"]
+    config.workers = Config.WEB_CONCURRENCY
+    config.keep_alive_timeout = Config.KEEP_ALIVE_TIMEOUT
+    config.max_requests = Config.WEB_MAX_REQUESTS
+    config.max_requests_jitter = Config.WEB_MAX_REQUESTS_JITTER
+    config.graceful_timeout = Config.WEB_GRACEFUL_TIMEOUT
+    return config
+
+
+class GunicornServer(BaseApplication):
+    """Aplicación gunicorn configurada desde Config en lugar de la línea de comandos"""
+
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from src.app import create_app
+        return create_app()
+
+
+def main():
+    if Config.SERVER_MODE == 'async':
+        hypercorn_run(hypercorn_config())
+    else:
+        GunicornServer(gunicorn_options()).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+from metrics_core import render_gauge
+
+
+def build_service_metrics(service, idempotency=None, limiter=None):
+    """
+    Métricas leídas al exportar: estado del circuit breaker, caché de
+    entradas y coalescencia de lecturas del servicio dado (y de las claves
+    de idempotencia y el control de admisión, si se indican)
+    """
+    breaker = service.db_service.breaker.stats()
+    cache = service.ticket_cache.stats()
+    singleflight = service.db_service.singleflight.stats()
+    feed = service.availability_feed.stats()
+    states = ("closed", "open", "half_open")
+
+    lines = []
+    lines += render_gauge(
+        'tickets_circuit_breaker_state', 'Estado actual del circuit breaker (1 = activo)',
+        [({"state": state}, int(breaker["state"] == state)) for state in states])
+    lines += render_gauge(
+        'tickets_circuit_breaker_transitions_total', 'Transiciones del circuit breaker por estado destino',
+        [({"state": state}, breaker["transitions"][state]) for state in states], kind='counter')
+    lines += render_gauge(
+        'tickets_circuit_breaker_rejected_total', 'Llamadas rechazadas con el circuito abierto',
+        [({}, breaker["rejected"])], kind='counter')
+    lines += render_gauge(
+        'tickets_cache_size', 'Entradas en la caché de entradas', [({}, cache["size"])])
+    for counter in ("hits", "misses", "evictions", "expirations"):
+        lines += render_gauge(
+            f'tickets_cache_{counter}_total', f'Caché de entradas: {counter}',
+            [({}, cache[counter])], kind='counter')
+    missing = service.missing_tickets.stats()
+    lines += render_gauge(
+        'tickets_missing_cache_size', 'IDs inexistentes recordados en la caché negativa',
+        [({}, missing["size"])])
+    lines += render_gauge(
+        'tickets_missing_cache_hits_total', 'Lecturas de IDs inexistentes respondidas sin consultar',
+        [({}, missing["hits"])], kind='counter')
+    lines += render_gauge(
+        'tickets_singleflight_calls_total', 'Lecturas por ID ejecutadas o coalescidas',
+        [({"result": "executed"}, singleflight["executions"]),
+         ({"result": "coalesced"}, singleflight["coalesced"])], kind='counter')
+    lines += render_gauge(
+        'tickets_availability_stream_subscribers', 'Streams de disponibilidad abiertos',
+        [({}, feed["subscribers"])])
+    lines += render_gauge(
+        'tickets_availability_stream_events_total', 'Cambios de disponibilidad publicados y entregados',
+        [({"stage": "published"}, feed["published"]),
+         ({"stage": "delivered"}, feed["delivered"])], kind='counter')
+    lines += render_gauge(
+        'tickets_availability_stream_rejected_total', 'Streams rechazados por límite de suscriptores',
+        [({}, feed["rejected"])], kind='counter')
+    if service.purchase_queue is not None:
+        queue = service.purchase_queue.stats()
+        lines += render_gauge(
+            'tickets_purchase_queue_pending', 'Compras en espera en las colas por entrada',
+            [({}, queue["pending"])])
+        lines += render_gauge(
+            'tickets_purchase_queue_rejected_total', 'Compras rechazadas con la cola de su entrada llena',
+            [({}, queue["rejected"])], kind='counter')
+    if idempotency is not None:
+        stored = idempotency.stats()
+        lines += render_gauge(
+            'tickets_idempotency_keys', 'Respuestas guardadas por clave de idempotencia',
+            [({}, stored["stored"])])
+        lines += render_gauge(
+            'tickets_idempotency_requests_total', 'Reintentos con Idempotency-Key por resultado',
+            [({"result": "replayed"}, stored["replayed"]),
+             ({"result": "mismatched"}, stored["mismatched"])], kind='counter')
+    if limiter is not None:
+        decisions = limiter.stats()
+        lines += render_gauge(
+            'tickets_rate_limit_decisions_total', 'Decisiones de admisión por clase de ruta y resultado',
+            [({"class": name, "result": result}, counts[result])
+             for name, counts in decisions.items() for result in ("allowed", "limited")],
+            kind='counter')
+    return lines
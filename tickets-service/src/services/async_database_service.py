@@ -0,0 +1,167 @@
+import httpx
+from metrics_core import timed
+from typing import AsyncIterator, List, Optional
+from src.models.ticket import Ticket
+from src.config import Config
+from src.services.database_service import create_circuit_breaker, insufficient_stock_error
+from src.utils.circuit_breaker import CircuitBreaker
+from src.utils.metrics import DB_CALL_DURATION
+from src.utils.singleflight import AsyncSingleFlight
+
+
+class CircuitBreakerTransport(httpx.AsyncBaseTransport):
+    """Transporte httpx que pasa cada envío por el circuit breaker"""
+
+    def __init__(self, breaker: CircuitBreaker, transport: httpx.AsyncBaseTransport):
+        self.breaker = breaker
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.breaker.acall(
+            lambda: self.transport.handle_async_request(request),
+            is_success=lambda response: response.status_code < 500)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class AsyncDatabaseService:
+    """
+    Cliente asíncrono de database-service para el modo ASGI.
+    Expone los mismos métodos que DatabaseService como corrutinas.
+    """
+
+    def __init__(self):
+        self.base_url = Config.DATABASE_SERVICE_URL
+        self.timeout = httpx.Timeout(
+            Config.DB_READ_TIMEOUT, connect=Config.DB_CONNECT_TIMEOUT)
+        self._client: Optional[httpx.AsyncClient] = None
+        self.breaker = create_circuit_breaker()
+        self.singleflight = AsyncSingleFlight()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Cliente HTTP con pool keep-alive, creado de forma perezosa para que
+        quede asociado al event loop del servidor ASGI
+        """
+        if self._client is None or self._client.is_closed:
+            # con un transporte propio, httpx toma los límites del transporte
+            transport = httpx.AsyncHTTPTransport(
+                retries=Config.DB_MAX_RETRIES,
+                limits=httpx.Limits(
+                    max_connections=Config.DB_POOL_MAXSIZE,
+                    max_keepalive_connections=Config.DB_POOL_MAXSIZE
+                )
+            )
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                transport=CircuitBreakerTransport(self.breaker, transport)
+            )
+        return self._client
+
+    async def aclose(self):
+        """Cerrar las conexiones abiertas del pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @timed(DB_CALL_DURATION, 'get_all_tickets')
+    async def get_all_tickets(self) -> List[Ticket]:
+        """Obtener todas las entradas disponibles"""
+        try:
+            response = await self.client.get("/tickets")
+            response.raise_for_status()
+            return [Ticket.from_dict(ticket) for ticket in response.json()]
+        except httpx.HTTPError as e:
+            raise Exception(f"Error al obtener entradas: {str(e)}")
+
+    @timed(DB_CALL_DURATION, 'get_tickets_page')
+    async def get_tickets_page(self, page: int, page_size: int) -> List[Ticket]:
+        """Obtener una página de entradas usando la paginación de database-service"""
+        try:
+            response = await self.client.get(
+                "/tickets", params={"page": page, "pageSize": page_size})
+            response.raise_for_status()
+            return [Ticket.from_dict(ticket) for ticket in response.json()]
+        except httpx.HTTPError as e:
+            raise Exception(f"Error al obtener entradas: {str(e)}")
+
+    async def iter_all_tickets(self, page_size: int) -> AsyncIterator[Ticket]:
+        """
+        Recorrer todas las entradas pidiendo páginas a database-service
+        solo a medida que se consumen
+        """
+        page = 1
+        while True:
+            tickets = await self.get_tickets_page(page, page_size)
+            for ticket in tickets:
+                yield ticket
+            if len(tickets) < page_size:
+                return
+            page += 1
+
+    @timed(DB_CALL_DURATION, 'get_tickets_by_ids')
+    async def get_tickets_by_ids(self, ticket_ids: List[str]) -> List[Ticket]:
+        """Obtener varias entradas por ID en una sola llamada"""
+        try:
+            response = await self.client.get(
+                "/tickets",
+                params={"ids": ",".join(ticket_ids), "pageSize": len(ticket_ids)}
+            )
+            response.raise_for_status()
+            return [Ticket.from_dict(ticket) for ticket in response.json()]
+        except httpx.HTTPError as e:
+            raise Exception(f"Error al obtener entradas: {str(e)}")
+
+    async def get_ticket_by_id(self, ticket_id: str) -> Optional[Ticket]:
+        """
+        Obtener una entrada específica por ID
+        Las lecturas concurrentes del mismo ID comparten una sola llamada
+        """
+        return await self.singleflight.do(
+            ('get_ticket_by_id', ticket_id),
+            lambda: self._fetch_ticket_by_id(ticket_id))
+
+    @timed(DB_CALL_DURATION, 'get_ticket_by_id')
+    async def _fetch_ticket_by_id(self, ticket_id: str) -> Optional[Ticket]:
+        try:
+            response = await self.client.get(f"/tickets/{ticket_id}")
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            return Ticket.from_dict(response.json())
+        except httpx.HTTPError as e:
+            raise Exception(f"Error al obtener entrada {ticket_id}: {str(e)}")
+
+    @timed(DB_CALL_DURATION, 'update_ticket')
+    async def update_ticket(self, ticket_id: str, ticket_data: dict) -> Ticket:
+        """Actualizar una entrada específica"""
+        try:
+            response = await self.client.put(
+                f"/tickets/{ticket_id}", json=ticket_data)
+            response.raise_for_status()
+            return Ticket.from_dict(response.json())
+        except httpx.HTTPError as e:
+            raise Exception(f"Error al actualizar entrada {ticket_id}: {str(e)}")
+
+    @timed(DB_CALL_DURATION, 'purchase_ticket')
+    async def purchase_ticket(self, ticket_id: str, quantity: int) -> Optional[Ticket]:
+        """
+        Comprar entradas con el decremento atómico de database-service
+        Retorna la entrada actualizada o None si no existe
+        """
+        try:
+            response = await self.client.post(
+                "/tickets/purchase",
+                json={"ticketId": ticket_id, "quantity": quantity}
+            )
+            if response.status_code == 404:
+                return None
+            if response.status_code == 409:
+                raise insufficient_stock_error(response.json())
+            response.raise_for_status()
+            return Ticket.from_dict(response.json()['ticket'])
+        except httpx.HTTPError as e:
+            raise Exception(f"Error al comprar entrada {ticket_id}: {str(e)}")
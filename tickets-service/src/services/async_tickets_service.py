@@ -0,0 +1,313 @@
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Union
+from src.config import Config
+from src.models.ticket import Ticket
+from src.services.async_database_service import AsyncDatabaseService
+from src.services.database_service import InsufficientTicketsError
+from src.services.tickets_service import (
+    AVAILABILITY_POLL_BATCH,
+    allocate_in_order,
+    build_batch_receipt,
+    build_line_item_result,
+    build_purchase_receipt,
+    build_ticket_info,
+    build_ticket_page,
+    build_ticket_summary,
+    chunked,
+    fill_from_stale_cache,
+    insufficient_tickets,
+    map_update_fields,
+    split_batch_purchase,
+    ticket_not_found
+)
+from src.utils.batch_queue import AsyncBatchQueue
+from src.utils.change_feed import AsyncChangeFeed, AsyncSubscription
+from src.utils.circuit_breaker import CircuitOpenError
+from src.utils.metrics import observe_purchase_batch
+from src.utils.ttl_cache import TTLCache
+
+
+class AsyncTicketsService:
+    """Variante asíncrona de TicketsService usada por el modo ASGI"""
+
+    def __init__(self):
+        self.db_service = AsyncDatabaseService()
+        self.ticket_cache = TTLCache(
+            Config.TICKET_CACHE_MAXSIZE, Config.TICKET_CACHE_TTL,
+            stale_ttl=Config.TICKET_CACHE_STALE_TTL)
+        # IDs que database-service confirmó inexistentes (404), con TTL corto
+        self.missing_tickets = TTLCache(
+            Config.TICKET_NEGATIVE_CACHE_MAXSIZE, Config.TICKET_NEGATIVE_CACHE_TTL)
+        self.availability_feed = AsyncChangeFeed(Config.AVAILABILITY_STREAM_MAX_SUBSCRIBERS)
+        self._poller: Optional[asyncio.Task] = None
+        self.purchase_queue = AsyncBatchQueue(
+            self._purchase_in_arrival_order, max_batch=Config.PURCHASE_QUEUE_MAX_BATCH,
+            max_pending=Config.PURCHASE_QUEUE_MAX_PENDING,
+            observe=observe_purchase_batch) if Config.PURCHASE_QUEUE_ENABLED else None
+
+    def _store_ticket(self, ticket_id: str, ticket: Ticket):
+        """Guardar en caché una versión recién escrita y avisar a los streams"""
+        self.ticket_cache.set(ticket_id, ticket)
+        self.missing_tickets.invalidate(ticket_id)
+        self.availability_feed.publish(ticket_id, ticket.quantity_available)
+
+    def _remember_missing(self, ticket_id: str):
+        """Registrar un 404: las próximas lecturas del ID no salen del proceso"""
+        self.ticket_cache.invalidate(ticket_id)
+        self.missing_tickets.set(ticket_id, True)
+
+    async def get_ticket(self, ticket_id: str) -> Optional[Ticket]:
+        """
+        Lectura a través de la caché: solo consulta database-service
+        si la entrada no está o expiró. Con el circuito abierto se responde
+        con la última versión conocida, si todavía está en caché. Un ID
+        que dio 404 hace menos de TICKET_NEGATIVE_CACHE_TTL se responde sin consultar
+        """
+        ticket = self.ticket_cache.get(ticket_id)
+        if ticket is None:
+            if self.missing_tickets.get(ticket_id):
+                return None
+            try:
+                ticket = await self.db_service.get_ticket_by_id(ticket_id)
+            except CircuitOpenError:
+                ticket = self.ticket_cache.get_stale(ticket_id)
+                if ticket is None:
+                    raise
+                return ticket
+            if ticket:
+                self.ticket_cache.set(ticket_id, ticket)
+            else:
+                self._remember_missing(ticket_id)
+        return ticket
+
+    async def get_tickets(self, ticket_ids: List[str]) -> Dict[str, Optional[Ticket]]:
+        """
+        Lectura masiva a través de la caché: las entradas que no están en
+        caché se piden a database-service en una sola llamada
+        Retorna un mapa de ID a entrada (None si no existe)
+        """
+        tickets = {}
+        missing = []
+        for ticket_id in dict.fromkeys(ticket_ids):
+            ticket = self.ticket_cache.get(ticket_id)
+            tickets[ticket_id] = ticket
+            if ticket is None and not self.missing_tickets.get(ticket_id):
+                missing.append(ticket_id)
+
+        if missing:
+            try:
+                fetched = await self.db_service.get_tickets_by_ids(missing)
+            except CircuitOpenError as e:
+                return fill_from_stale_cache(self.ticket_cache, tickets, missing, e)
+            for ticket in fetched:
+                if ticket.id in tickets:
+                    tickets[ticket.id] = ticket
+                    self.ticket_cache.set(ticket.id, ticket)
+            for ticket_id in missing:
+                if tickets[ticket_id] is None:
+                    self._remember_missing(ticket_id)
+
+        return tickets
+
+    async def check_availability(self, ticket_id: str) -> Optional[int]:
+        """
+        Verificar disponibilidad de entradas
+        Retorna la cantidad disponible o None si no existe la entrada
+        """
+        ticket = await self.get_ticket(ticket_id)
+        if not ticket:
+            return None
+
+        return ticket.quantity_available
+
+    async def check_availability_many(self, ticket_ids: List[str]) -> Dict[str, Optional[int]]:
+        """
+        Verificar disponibilidad de varias entradas con una sola consulta
+        Retorna un mapa de ID a cantidad disponible (None si no existe)
+        """
+        tickets = await self.get_tickets(ticket_ids)
+        return {
+            ticket_id: ticket.quantity_available if ticket else None
+            for ticket_id, ticket in tickets.items()
+        }
+
+    async def purchase_tickets(self, ticket_id: str, quantity: int) -> dict:
+        """
+        Procesar compra de entradas con una sola llamada atómica, compartida
+        con las compras simultáneas de la misma entrada si la cola está habilitada
+        Retorna información de la compra o lanza excepción si no es posible
+        """
+        if self.missing_tickets.get(ticket_id):
+            raise ticket_not_found(ticket_id)
+        if self.purchase_queue is not None:
+            ticket = await self.purchase_queue.submit(ticket_id, quantity)
+        else:
+            ticket = (await self._purchase_in_arrival_order(ticket_id, [quantity]))[0]
+            if isinstance(ticket, Exception):
+                raise ticket
+        return build_purchase_receipt(ticket_id, quantity, ticket)
+
+    async def _purchase_in_arrival_order(self, ticket_id: str,
+                                         quantities: List[int]) -> List[Union[Ticket, Exception]]:
+        """Variante asíncrona de TicketsService._purchase_in_arrival_order"""
+        outcomes: List[Union[Ticket, Exception, None]] = [None] * len(quantities)
+        group = list(range(len(quantities)))
+        try:
+            ticket = await self.db_service.purchase_ticket(ticket_id, sum(quantities))
+        except InsufficientTicketsError as e:
+            if len(quantities) == 1:
+                return [insufficient_tickets(quantities[0], e.available)]
+            try:
+                current = await self.db_service.get_ticket_by_id(ticket_id)
+                if current is None:
+                    self._remember_missing(ticket_id)
+                    return [ticket_not_found(ticket_id)] * len(quantities)
+                group = allocate_in_order(quantities, current.quantity_available, outcomes)
+                if not group:
+                    return outcomes
+                ticket = await self.db_service.purchase_ticket(
+                    ticket_id, sum(quantities[index] for index in group))
+            except InsufficientTicketsError:
+                for index in group:
+                    outcomes[index] = await self._purchase_single(ticket_id, quantities[index])
+                return outcomes
+            except Exception as e:
+                return [outcome or e for outcome in outcomes]
+        except Exception as e:
+            return [e] * len(quantities)
+
+        if not ticket:
+            self._remember_missing(ticket_id)
+            return [outcome or ticket_not_found(ticket_id) for outcome in outcomes]
+
+        self._store_ticket(ticket_id, ticket)
+        views = split_batch_purchase(ticket, [quantities[index] for index in group])
+        for index, view in zip(group, views):
+            outcomes[index] = view
+        return outcomes
+
+    async def _purchase_single(self, ticket_id: str, quantity: int) -> Union[Ticket, Exception]:
+        try:
+            ticket = await self.db_service.purchase_ticket(ticket_id, quantity)
+        except InsufficientTicketsError as e:
+            return insufficient_tickets(quantity, e.available)
+        except Exception as e:
+            return e
+        if not ticket:
+            self._remember_missing(ticket_id)
+            return ticket_not_found(ticket_id)
+        self._store_ticket(ticket_id, ticket)
+        return ticket
+
+    async def purchase_tickets_batch(self, items: List[dict]) -> dict:
+        """
+        Procesar una compra de varias entradas (carrito) con concurrencia
+        acotada; retorna un comprobante único con el resultado de cada ítem
+        """
+        semaphore = asyncio.Semaphore(max(1, Config.BATCH_PURCHASE_CONCURRENCY))
+
+        async def purchase_line_item(item):
+            ticket_id = item['ticket_id']
+            async with semaphore:
+                try:
+                    purchase = await self.purchase_tickets(ticket_id, item['quantity'])
+                    return build_line_item_result(ticket_id, purchase=purchase)
+                except ValueError as e:
+                    return build_line_item_result(ticket_id, error=str(e))
+                except Exception as e:
+                    return build_line_item_result(
+                        ticket_id, error=f"Error al procesar la compra: {str(e)}")
+
+        results = await asyncio.gather(*[purchase_line_item(item) for item in items])
+        return build_batch_receipt(list(results))
+
+    async def get_all_tickets(self) -> List[dict]:
+        """
+        Obtener todas las entradas con información de disponibilidad
+        """
+        tickets = await self.db_service.get_all_tickets()
+        return [build_ticket_summary(ticket) for ticket in tickets]
+
+    async def get_tickets_page(self, page: int, page_size: int) -> dict:
+        """
+        Obtener una página del listado de entradas
+        """
+        tickets = await self.db_service.get_tickets_page(page, page_size)
+        return build_ticket_page(tickets, page, page_size)
+
+    async def iter_ticket_summaries(self, page_size: int) -> AsyncIterator[dict]:
+        """
+        Recorrer el listado completo de entradas página por página, sin
+        cargar la tabla entera en memoria
+        """
+        async for ticket in self.db_service.iter_all_tickets(page_size):
+            yield build_ticket_summary(ticket)
+
+    async def get_ticket_info(self, ticket_id: str) -> Optional[dict]:
+        """
+        Obtener información detallada de una entrada específica
+        """
+        ticket = await self.get_ticket(ticket_id)
+        if not ticket:
+            return None
+
+        return build_ticket_info(ticket)
+
+    async def update_ticket_info(self, ticket_id: str, update_data: dict) -> dict:
+        """
+        Actualizar información de una entrada (precio, tipo, etc.)
+        """
+        ticket = await self.get_ticket(ticket_id)
+        if not ticket:
+            raise ticket_not_found(ticket_id)
+
+        filtered_data = map_update_fields(update_data)
+
+        updated_ticket = await self.db_service.update_ticket(
+            ticket_id, filtered_data)
+        self._store_ticket(ticket_id, updated_ticket)
+
+        return build_ticket_summary(updated_ticket)
+
+    def subscribe_availability(self, ticket_ids: List[str]) -> AsyncSubscription:
+        """
+        Suscribirse a los cambios de disponibilidad de varias entradas
+        Lanza FeedFullError si se alcanzó el máximo de suscriptores
+        """
+        subscription = self.availability_feed.subscribe(ticket_ids)
+        self._ensure_availability_poller()
+        return subscription
+
+    def unsubscribe_availability(self, subscription: AsyncSubscription):
+        self.availability_feed.unsubscribe(subscription)
+
+    async def refresh_watched_availability(self):
+        """Variante asíncrona de TicketsService.refresh_watched_availability"""
+        for chunk in chunked(self.availability_feed.watched_keys(), AVAILABILITY_POLL_BATCH):
+            fetched = await self.db_service.get_tickets_by_ids(chunk)
+            found = {ticket.id: ticket for ticket in fetched}
+            for ticket_id in chunk:
+                ticket = found.get(ticket_id)
+                if ticket is None:
+                    self._remember_missing(ticket_id)
+                    self.availability_feed.publish(ticket_id, None)
+                else:
+                    self._store_ticket(ticket_id, ticket)
+
+    def _ensure_availability_poller(self):
+        if Config.AVAILABILITY_STREAM_POLL_INTERVAL <= 0:
+            return
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.get_running_loop().create_task(self._poll_availability())
+
+    async def _poll_availability(self):
+        """Tarea de sondeo: corre mientras quede algún suscriptor"""
+        while True:
+            await asyncio.sleep(Config.AVAILABILITY_STREAM_POLL_INTERVAL)
+            if not self.availability_feed.subscribers:
+                self._poller = None
+                return
+            try:
+                await self.refresh_watched_availability()
+            except Exception:
+                pass
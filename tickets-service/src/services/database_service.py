@@ -1,27 +1,193 @@
+import os
+import weakref
 import requests
-from typing import List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from metrics_core import timed
+from typing import Iterator, List, Optional
 from src.models.ticket import Ticket
 from src.config import Config
+from src.utils.circuit_breaker import CircuitBreaker
+from src.utils.metrics import DB_CALL_DURATION
+from src.utils.singleflight import SingleFlight
+
+
+class InsufficientTicketsError(Exception):
+    """database-service rechazó la compra por falta de stock (409)"""
+
+    def __init__(self, message: str, available: Optional[int] = None):
+        super().__init__(message)
+        # stock que informó database-service al rechazar, si lo informó
+        self.available = available
+
+
+def insufficient_stock_error(body: dict) -> InsufficientTicketsError:
+    """InsufficientTicketsError a partir del cuerpo de un 409 de database-service"""
+    return InsufficientTicketsError(body.get('error', 'Not enough tickets available'),
+                                    body.get('quantityAvailable'))
+
+
+def create_circuit_breaker() -> CircuitBreaker:
+    """Circuit breaker hacia database-service configurado por entorno"""
+    return CircuitBreaker(
+        failure_rate_threshold=Config.BREAKER_FAILURE_RATE,
+        window_size=Config.BREAKER_WINDOW_SIZE,
+        min_calls=Config.BREAKER_MIN_CALLS,
+        slow_call_seconds=Config.BREAKER_SLOW_CALL_SECONDS,
+        cooldown=Config.BREAKER_COOLDOWN,
+        half_open_max_calls=Config.BREAKER_HALF_OPEN_CALLS
+    )
+
+
+class CircuitBreakerAdapter(HTTPAdapter):
+    """
+    HTTPAdapter que pasa cada envío por el circuit breaker
+    Los errores de conexión, los 5xx y las llamadas lentas cuentan como fallos;
+    con el circuito abierto lanza CircuitOpenError sin abrir conexión
+    """
+
+    def __init__(self, breaker: CircuitBreaker, **kwargs):
+        self.breaker = breaker
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        send = super().send
+        return self.breaker.call(
+            lambda: send(request, **kwargs),
+            is_success=lambda response: response.status_code < 500)
+
+
+# instancias vivas cuyo estado de conexión se rehace en cada proceso hijo
+_live_services = weakref.WeakSet()
+
+
+def _reset_services_after_fork():
+    for service in list(_live_services):
+        service._reset_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_services_after_fork)
 
 
 class DatabaseService:
     def __init__(self):
         self.base_url = Config.DATABASE_SERVICE_URL
+        self.timeout = (Config.DB_CONNECT_TIMEOUT, Config.DB_READ_TIMEOUT)
+        self.breaker = create_circuit_breaker()
+        self.session = self._create_session(self.breaker)
+        self.singleflight = SingleFlight()
+        _live_services.add(self)
 
+    def _reset_after_fork(self):
+        """
+        Rehacer sesión, breaker y single-flight en un worker recién forkeado
+        (gunicorn con preload_app). El pool heredado comparte sockets con el
+        proceso padre y los locks pueden haber quedado tomados, así que se
+        descartan sin cerrarlos y el worker arma los suyos
+        """
+        self.breaker = create_circuit_breaker()
+        self.session = self._create_session(self.breaker)
+        self.singleflight = SingleFlight()
+
+    @staticmethod
+    def _create_session(breaker: CircuitBreaker) -> requests.Session:
+        """
+        Crear una sesión HTTP con pool de conexiones keep-alive, reintentos
+        para métodos idempotentes ante fallos transitorios de database-service
+        y circuit breaker
+        """
+        retry = Retry(
+            total=Config.DB_MAX_RETRIES,
+            backoff_factor=Config.DB_RETRY_BACKOFF,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'PUT', 'DELETE']),
+            raise_on_status=False
+        )
+        adapter = CircuitBreakerAdapter(
+            breaker,
+            pool_connections=Config.DB_POOL_CONNECTIONS,
+            pool_maxsize=Config.DB_POOL_MAXSIZE,
+            pool_block=Config.DB_POOL_BLOCK,
+            max_retries=retry
+        )
+        session = requests.Session()
+        session.headers.update({'Connection': 'keep-alive'})
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def close(self):
+        """Cerrar las conexiones abiertas del pool"""
+        self.session.close()
+
+    @timed(DB_CALL_DURATION, 'get_all_tickets')
     def get_all_tickets(self) -> List[Ticket]:
         """Obtener todas las entradas disponibles"""
         try:
-            response = requests.get(f"{self.base_url}/tickets")
+            response = self.session.get(
+                f"{self.base_url}/tickets", timeout=self.timeout)
             response.raise_for_status()
             tickets_data = response.json()
             return [Ticket.from_dict(ticket) for ticket in tickets_data]
         except requests.RequestException as e:
             raise Exception(f"Error al obtener entradas: {str(e)}")
 
+    @timed(DB_CALL_DURATION, 'get_tickets_page')
+    def get_tickets_page(self, page: int, page_size: int) -> List[Ticket]:
+        """Obtener una página de entradas usando la paginación de database-service"""
+        try:
+            response = self.session.get(
+                f"{self.base_url}/tickets",
+                params={"page": page, "pageSize": page_size},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            return [Ticket.from_dict(ticket) for ticket in response.json()]
+        except requests.RequestException as e:
+            raise Exception(f"Error al obtener entradas: {str(e)}")
+
+    def iter_all_tickets(self, page_size: int) -> Iterator[Ticket]:
+        """
+        Recorrer todas las entradas pidiendo páginas a database-service
+        solo a medida que se consumen
+        """
+        page = 1
+        while True:
+            tickets = self.get_tickets_page(page, page_size)
+            yield from tickets
+            if len(tickets) < page_size:
+                return
+            page += 1
+
+    @timed(DB_CALL_DURATION, 'get_tickets_by_ids')
+    def get_tickets_by_ids(self, ticket_ids: List[str]) -> List[Ticket]:
+        """Obtener varias entradas por ID en una sola llamada"""
+        try:
+            response = self.session.get(
+                f"{self.base_url}/tickets",
+                params={"ids": ",".join(ticket_ids), "pageSize": len(ticket_ids)},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            return [Ticket.from_dict(ticket) for ticket in response.json()]
+        except requests.RequestException as e:
+            raise Exception(f"Error al obtener entradas: {str(e)}")
+
     def get_ticket_by_id(self, ticket_id: str) -> Optional[Ticket]:
-        """Obtener una entrada específica por ID"""
+        """
+        Obtener una entrada específica por ID
+        Las lecturas concurrentes del mismo ID comparten una sola llamada
+        """
+        return self.singleflight.do(
+            ('get_ticket_by_id', ticket_id),
+            lambda: self._fetch_ticket_by_id(ticket_id))
+
+    @timed(DB_CALL_DURATION, 'get_ticket_by_id')
+    def _fetch_ticket_by_id(self, ticket_id: str) -> Optional[Ticket]:
         try:
-            response = requests.get(f"{self.base_url}/tickets/{ticket_id}")
+            response = self.session.get(
+                f"{self.base_url}/tickets/{ticket_id}", timeout=self.timeout)
             if response.status_code == 404:
                 return None
             response.raise_for_status()
@@ -29,35 +195,61 @@ class DatabaseService:
         except requests.RequestException as e:
             raise Exception(f"Error al obtener entrada {ticket_id}: {str(e)}")
 
+    @timed(DB_CALL_DURATION, 'update_ticket')
     def update_ticket(self, ticket_id: str, ticket_data: dict) -> Ticket:
         """Actualizar una entrada específica"""
         try:
-            response = requests.put(
+            response = self.session.put(
                 f"{self.base_url}/tickets/{ticket_id}",
-                json=ticket_data
+                json=ticket_data,
+                timeout=self.timeout
             )
             response.raise_for_status()
             return Ticket.from_dict(response.json())
         except requests.RequestException as e:
             raise Exception(f"Error al actualizar entrada {ticket_id}: {str(e)}")
 
+    @timed(DB_CALL_DURATION, 'purchase_ticket')
+    def purchase_ticket(self, ticket_id: str, quantity: int) -> Optional[Ticket]:
+        """
+        Comprar entradas con el decremento atómico de database-service
+        Retorna la entrada actualizada o None si no existe
+        """
+        try:
+            response = self.session.post(
+                f"{self.base_url}/tickets/purchase",
+                json={"ticketId": ticket_id, "quantity": quantity},
+                timeout=self.timeout
+            )
+            if response.status_code == 404:
+                return None
+            if response.status_code == 409:
+                raise insufficient_stock_error(response.json())
+            response.raise_for_status()
+            return Ticket.from_dict(response.json()['ticket'])
+        except requests.RequestException as e:
+            raise Exception(f"Error al comprar entrada {ticket_id}: {str(e)}")
+
+    @timed(DB_CALL_DURATION, 'create_ticket')
     def create_ticket(self, ticket_data: dict) -> Ticket:
         """Crear una nueva entrada"""
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/tickets",
-                json=ticket_data
+                json=ticket_data,
+                timeout=self.timeout
             )
             response.raise_for_status()
             return Ticket.from_dict(response.json())
         except requests.RequestException as e:
             raise Exception(f"Error al crear entrada: {str(e)}")
 
+    @timed(DB_CALL_DURATION, 'delete_ticket')
     def delete_ticket(self, ticket_id: str) -> bool:
         """Eliminar una entrada"""
         try:
-            response = requests.delete(
-                f"{self.base_url}/tickets/{ticket_id}")
+            response = self.session.delete(
+                f"{self.base_url}/tickets/{ticket_id}", timeout=self.timeout)
             return response.status_code == 200
         except requests.RequestException as e:
             raise Exception(f"Error al eliminar entrada {ticket_id}: {str(e)}")
@@ -1,23 +1,281 @@
-from typing import List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Dict, Iterator, List, Optional, Union
+from src.config import Config
 from src.models.ticket import Ticket, TicketPurchase
-from src.services.database_service import DatabaseService
+from src.services.database_service import DatabaseService, InsufficientTicketsError
+from src.utils.batch_queue import BatchQueue
+from src.utils.change_feed import ChangeFeed, Subscription
+from src.utils.circuit_breaker import CircuitOpenError
+from src.utils.etag import compute_etag
+from src.utils.metrics import observe_purchase_batch
+from src.utils.ttl_cache import TTLCache
+
+UPDATE_FIELD_MAPPING = {
+    'type': 'type',
+    'price': 'price',
+    'quantity_available': 'quantityAvailable'
+}
+
+# tamaño de cada lectura masiva del sondeo de disponibilidad
+AVAILABILITY_POLL_BATCH = 100
+
+
+def build_purchase_receipt(ticket_id: str, quantity: int, ticket: Ticket) -> dict:
+    """Armar el comprobante de compra a partir de la entrada ya actualizada"""
+    return {
+        "ticket_id": ticket_id,
+        "ticket_type": ticket.type,
+        "quantity_purchased": quantity,
+        "unit_price": ticket.price,
+        "total_amount": ticket.price * quantity,
+        "remaining_available": ticket.quantity_available
+    }
+
+
+def split_batch_purchase(ticket: Ticket, quantities: List[int]) -> List[Ticket]:
+    """
+    Repartir el resultado de un decremento agrupado: cada compra ve la entrada
+    como si las compras del lote se hubieran hecho una tras otra en orden de
+    llegada (la última ve el estado que devolvió database-service)
+    """
+    views = []
+    after = 0
+    for quantity in reversed(quantities):
+        views.append(replace(ticket, quantity_available=ticket.quantity_available + after,
+                             quantity_sold=ticket.quantity_sold - after))
+        after += quantity
+    return views[::-1]
+
+
+def allocate_in_order(quantities: List[int], available: int, outcomes: list) -> List[int]:
+    """
+    Asignar el stock disponible en orden de llegada: retorna los índices de las
+    compras que entran y marca en outcomes como rechazadas las que no
+    """
+    group = []
+    for index, quantity in enumerate(quantities):
+        if quantity <= available:
+            group.append(index)
+            available -= quantity
+        else:
+            outcomes[index] = insufficient_tickets(quantity, available)
+    return group
+
+
+def insufficient_tickets(quantity: int, available: Optional[int] = None) -> ValueError:
+    if available is None:
+        return ValueError(f"No hay suficientes entradas disponibles. Solicitadas: {quantity}")
+    return ValueError(f"No hay suficientes entradas disponibles. "
+                      f"Disponibles: {available}, Solicitadas: {quantity}")
+
+
+def ticket_not_found(ticket_id: str) -> ValueError:
+    return ValueError(f"Entrada con ID {ticket_id} no encontrada")
+
+
+def build_batch_receipt(results: List[dict]) -> dict:
+    """Comprobante único de una compra en lote con el resultado de cada ítem"""
+    purchases = [r["purchase"] for r in results if r["success"]]
+    return {
+        "success": len(purchases) == len(results),
+        "items": results,
+        "total_quantity": sum(p["quantity_purchased"] for p in purchases),
+        "total_amount": sum(p["total_amount"] for p in purchases),
+        "failed_count": len(results) - len(purchases)
+    }
+
+
+def build_line_item_result(ticket_id: str, purchase: dict = None, error: str = None) -> dict:
+    if error is not None:
+        return {"ticket_id": ticket_id, "success": False, "error": error}
+    return {"ticket_id": ticket_id, "success": True, "purchase": purchase}
+
+
+def build_ticket_page(tickets: List[Ticket], page: int, page_size: int) -> dict:
+    """Página del listado; next_page es None cuando la página vino incompleta"""
+    return {
+        "items": [build_ticket_summary(ticket) for ticket in tickets],
+        "page": page,
+        "page_size": page_size,
+        "next_page": page + 1 if len(tickets) == page_size else None
+    }
+
+
+def ticket_etag(ticket: Ticket) -> str:
+    """ETag de una entrada: cambia cuando cambian su precio, tipo o cantidades"""
+    return compute_etag(ticket.id, ticket.type, ticket.price,
+                        ticket.quantity_available, ticket.quantity_sold)
+
+
+def build_ticket_info(ticket: Ticket) -> dict:
+    """Información detallada de una entrada con su disponibilidad"""
+    return {
+        **ticket.to_dict(),
+        "available": ticket.quantity_available > 0,
+        "sold_out": ticket.quantity_available == 0
+    }
+
+
+def build_ticket_summary(ticket: Ticket) -> dict:
+    """Entrada con la marca de disponibilidad usada en listados"""
+    return {
+        **ticket.to_dict(),
+        "available": ticket.quantity_available > 0
+    }
+
+
+def map_update_fields(update_data: dict) -> dict:
+    """
+    Traducir los campos actualizables al formato de database-service
+    Lanza ValueError si no queda ningún campo válido
+    """
+    filtered_data = {}
+    for k, v in update_data.items():
+        if k in UPDATE_FIELD_MAPPING:
+            db_field = UPDATE_FIELD_MAPPING[k]
+            filtered_data[db_field] = v
+
+    if not filtered_data:
+        raise ValueError(
+            "No se proporcionaron campos válidos para actualizar")
+
+    return filtered_data
+
+
+def fill_from_stale_cache(cache: TTLCache, tickets: Dict[str, Optional[Ticket]],
+                          missing: List[str],
+                          error: CircuitOpenError) -> Dict[str, Optional[Ticket]]:
+    """
+    Completar una lectura masiva con versiones vencidas de la caché cuando el
+    circuito está abierto; si falta alguna, se propaga el error
+    """
+    for ticket_id in missing:
+        tickets[ticket_id] = cache.get_stale(ticket_id)
+        if tickets[ticket_id] is None:
+            raise error
+    return tickets
+
+
+def chunked(items: List[str], size: int) -> Iterator[List[str]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def sync_stream_limit():
+    """
+    Streams SSE abiertos como máximo por proceso en modo sync: cada uno ocupa
+    un hilo del worker (gthread) mientras dura, así que se deja al menos un
+    hilo libre para compras y consultas
+    """
+    return min(Config.AVAILABILITY_STREAM_MAX_SUBSCRIBERS, max(Config.WEB_THREADS - 1, 0))
 
 
 class TicketsService:
     def __init__(self):
         self.db_service = DatabaseService()
+        self.ticket_cache = TTLCache(
+            Config.TICKET_CACHE_MAXSIZE, Config.TICKET_CACHE_TTL,
+            stale_ttl=Config.TICKET_CACHE_STALE_TTL)
+        # IDs que database-service confirmó inexistentes (404), con TTL corto
+        self.missing_tickets = TTLCache(
+            Config.TICKET_NEGATIVE_CACHE_MAXSIZE, Config.TICKET_NEGATIVE_CACHE_TTL)
+        self.availability_feed = ChangeFeed(sync_stream_limit())
+        self._poller_lock = threading.Lock()
+        self._poller: Optional[threading.Thread] = None
+        self.purchase_queue = BatchQueue(
+            self._purchase_in_arrival_order, max_batch=Config.PURCHASE_QUEUE_MAX_BATCH,
+            max_pending=Config.PURCHASE_QUEUE_MAX_PENDING,
+            observe=observe_purchase_batch) if Config.PURCHASE_QUEUE_ENABLED else None
+
+    def _store_ticket(self, ticket_id: str, ticket: Ticket):
+        """Guardar en caché una versión recién escrita y avisar a los streams"""
+        self.ticket_cache.set(ticket_id, ticket)
+        self.missing_tickets.invalidate(ticket_id)
+        self.availability_feed.publish(ticket_id, ticket.quantity_available)
+
+    def _remember_missing(self, ticket_id: str):
+        """Registrar un 404: las próximas lecturas del ID no salen del proceso"""
+        self.ticket_cache.invalidate(ticket_id)
+        self.missing_tickets.set(ticket_id, True)
+
+    def get_ticket(self, ticket_id: str) -> Optional[Ticket]:
+        """
+        Lectura a través de la caché: solo consulta database-service
+        si la entrada no está o expiró. Con el circuito abierto se responde
+        con la última versión conocida, si todavía está en caché. Un ID
+        que dio 404 hace menos de TICKET_NEGATIVE_CACHE_TTL se responde sin consultar
+        """
+        ticket = self.ticket_cache.get(ticket_id)
+        if ticket is None:
+            if self.missing_tickets.get(ticket_id):
+                return None
+            try:
+                ticket = self.db_service.get_ticket_by_id(ticket_id)
+            except CircuitOpenError:
+                ticket = self.ticket_cache.get_stale(ticket_id)
+                if ticket is None:
+                    raise
+                return ticket
+            if ticket:
+                self.ticket_cache.set(ticket_id, ticket)
+            else:
+                self._remember_missing(ticket_id)
+        return ticket
+
+    def get_tickets(self, ticket_ids: List[str]) -> Dict[str, Optional[Ticket]]:
+        """
+        Lectura masiva a través de la caché: las entradas que no están en
+        caché se piden a database-service en una sola llamada
+        Retorna un mapa de ID a entrada (None si no existe)
+        """
+        tickets = {}
+        missing = []
+        for ticket_id in dict.fromkeys(ticket_ids):
+            ticket = self.ticket_cache.get(ticket_id)
+            tickets[ticket_id] = ticket
+            if ticket is None and not self.missing_tickets.get(ticket_id):
+                missing.append(ticket_id)
+
+        if missing:
+            try:
+                fetched = self.db_service.get_tickets_by_ids(missing)
+            except CircuitOpenError as e:
+                return fill_from_stale_cache(self.ticket_cache, tickets, missing, e)
+            for ticket in fetched:
+                if ticket.id in tickets:
+                    tickets[ticket.id] = ticket
+                    self.ticket_cache.set(ticket.id, ticket)
+            for ticket_id in missing:
+                if tickets[ticket_id] is None:
+                    self._remember_missing(ticket_id)
+
+        return tickets
 
     def check_availability(self, ticket_id: str) -> Optional[int]:
         """
         Verificar disponibilidad de entradas
         Retorna la cantidad disponible o None si no existe la entrada
         """
-        ticket = self.db_service.get_ticket_by_id(ticket_id)
+        ticket = self.get_ticket(ticket_id)
         if not ticket:
             return None
 
         return ticket.quantity_available
 
+    def check_availability_many(self, ticket_ids: List[str]) -> Dict[str, Optional[int]]:
+        """
+        Verificar disponibilidad de varias entradas con una sola consulta
+        Retorna un mapa de ID a cantidad disponible (None si no existe)
+        """
+        tickets = self.get_tickets(ticket_ids)
+        return {
+            ticket_id: ticket.quantity_available if ticket else None
+            for ticket_id, ticket in tickets.items()
+        }
+
     def check_availability_for_quantity(self, ticket_id: str, quantity: int) -> bool:
         """
         Verificar si hay suficientes entradas disponibles para una cantidad específica
@@ -32,93 +290,203 @@ class TicketsService:
         """
         Procesar compra de entradas
         Retorna información de la compra o lanza excepción si no es posible
+
+        La verificación de stock y el decremento ocurren en una sola llamada
+        atómica a database-service, por lo que compras concurrentes no
+        pueden sobrevender la entrada. Con la cola de compras habilitada, las
+        compras simultáneas de una misma entrada comparten esa llamada; si la
+        cola de la entrada está llena se lanza QueueFullError
         """
-        ticket = self.db_service.get_ticket_by_id(ticket_id)
-        if not ticket:
-            raise ValueError(f"Entrada con ID {ticket_id} no encontrada")
+        if self.missing_tickets.get(ticket_id):
+            raise ticket_not_found(ticket_id)
+        if self.purchase_queue is not None:
+            ticket = self.purchase_queue.submit(ticket_id, quantity)
+        else:
+            ticket = self._purchase_in_arrival_order(ticket_id, [quantity])[0]
+            if isinstance(ticket, Exception):
+                raise ticket
+        return build_purchase_receipt(ticket_id, quantity, ticket)
 
-        # Verificar disponibilidad (usar el ticket ya obtenido)
-        if ticket.quantity_available < quantity:
-            raise ValueError(f"No hay suficientes entradas disponibles. Disponibles: {ticket.quantity_available}, Solicitadas: {quantity}")
+    def _purchase_in_arrival_order(self, ticket_id: str,
+                                   quantities: List[int]) -> List[Union[Ticket, Exception]]:
+        """
+        Comprar un lote de cantidades de la misma entrada respetando el orden de llegada
+        Retorna por cada compra la entrada resultante o la excepción a relanzar
 
-        # Actualizar cantidades
-        new_quantity_available = ticket.quantity_available - quantity
-        new_quantity_sold = ticket.quantity_sold + quantity
+        Primero se intenta el lote entero con un solo decremento. Si no alcanza
+        el stock, se lee la disponibilidad actual y se asigna en orden de
+        llegada lo que entra (una compra que no entra se rechaza y las
+        siguientes, si son más chicas, todavía pueden entrar) con un segundo
+        decremento. Si otra instancia compró en el medio y tampoco alcanza,
+        las compras asignadas se hacen de a una
+        """
+        outcomes: List[Union[Ticket, Exception, None]] = [None] * len(quantities)
+        group = list(range(len(quantities)))
+        try:
+            ticket = self.db_service.purchase_ticket(ticket_id, sum(quantities))
+        except InsufficientTicketsError as e:
+            if len(quantities) == 1:
+                return [insufficient_tickets(quantities[0], e.available)]
+            try:
+                current = self.db_service.get_ticket_by_id(ticket_id)
+                if current is None:
+                    self._remember_missing(ticket_id)
+                    return [ticket_not_found(ticket_id)] * len(quantities)
+                group = allocate_in_order(quantities, current.quantity_available, outcomes)
+                if not group:
+                    return outcomes
+                ticket = self.db_service.purchase_ticket(
+                    ticket_id, sum(quantities[index] for index in group))
+            except InsufficientTicketsError:
+                for index in group:
+                    outcomes[index] = self._purchase_single(ticket_id, quantities[index])
+                return outcomes
+            except Exception as e:
+                return [outcome or e for outcome in outcomes]
+        except Exception as e:
+            return [e] * len(quantities)
 
-        updated_ticket_data = {
-            "quantityAvailable": new_quantity_available,
-            "quantitySold": new_quantity_sold
-        }
+        if not ticket:
+            self._remember_missing(ticket_id)
+            return [outcome or ticket_not_found(ticket_id) for outcome in outcomes]
 
-        updated_ticket = self.db_service.update_ticket(
-            ticket_id, updated_ticket_data)
+        self._store_ticket(ticket_id, ticket)
+        views = split_batch_purchase(ticket, [quantities[index] for index in group])
+        for index, view in zip(group, views):
+            outcomes[index] = view
+        return outcomes
 
-        total_amount = ticket.price * quantity
+    def _purchase_single(self, ticket_id: str, quantity: int) -> Union[Ticket, Exception]:
+        try:
+            ticket = self.db_service.purchase_ticket(ticket_id, quantity)
+        except InsufficientTicketsError as e:
+            return insufficient_tickets(quantity, e.available)
+        except Exception as e:
+            return e
+        if not ticket:
+            self._remember_missing(ticket_id)
+            return ticket_not_found(ticket_id)
+        self._store_ticket(ticket_id, ticket)
+        return ticket
 
-        return {
-            "ticket_id": ticket_id,
-            "ticket_type": ticket.type,
-            "quantity_purchased": quantity,
-            "unit_price": ticket.price,
-            "total_amount": total_amount,
-            "remaining_available": updated_ticket.quantity_available
-        }
+    def purchase_tickets_batch(self, items: List[dict]) -> dict:
+        """
+        Procesar una compra de varias entradas (carrito)
+        Cada ítem se compra de forma atómica y en paralelo con concurrencia
+        acotada; retorna un comprobante único con el resultado de cada ítem
+        """
+        workers = max(1, min(Config.BATCH_PURCHASE_CONCURRENCY, len(items)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(self._purchase_line_item, items))
+
+        return build_batch_receipt(results)
+
+    def _purchase_line_item(self, item: dict) -> dict:
+        ticket_id = item['ticket_id']
+        try:
+            purchase = self.purchase_tickets(ticket_id, item['quantity'])
+            return build_line_item_result(ticket_id, purchase=purchase)
+        except ValueError as e:
+            return build_line_item_result(ticket_id, error=str(e))
+        except Exception as e:
+            return build_line_item_result(
+                ticket_id, error=f"Error al procesar la compra: {str(e)}")
 
     def get_all_tickets(self) -> List[dict]:
         """
         Obtener todas las entradas con información de disponibilidad
         """
         tickets = self.db_service.get_all_tickets()
-        return [
-            {
-                **ticket.to_dict(),
-                "available": ticket.quantity_available > 0
-            }
-            for ticket in tickets
-        ]
+        return [build_ticket_summary(ticket) for ticket in tickets]
+
+    def get_tickets_page(self, page: int, page_size: int) -> dict:
+        """
+        Obtener una página del listado de entradas
+        """
+        tickets = self.db_service.get_tickets_page(page, page_size)
+        return build_ticket_page(tickets, page, page_size)
+
+    def iter_ticket_summaries(self, page_size: int) -> Iterator[dict]:
+        """
+        Recorrer el listado completo de entradas página por página, sin
+        cargar la tabla entera en memoria
+        """
+        for ticket in self.db_service.iter_all_tickets(page_size):
+            yield build_ticket_summary(ticket)
 
     def get_ticket_info(self, ticket_id: str) -> Optional[dict]:
         """
         Obtener información detallada de una entrada específica
         """
-        ticket = self.db_service.get_ticket_by_id(ticket_id)
+        ticket = self.get_ticket(ticket_id)
         if not ticket:
             return None
 
-        return {
-            **ticket.to_dict(),
-            "available": ticket.quantity_available > 0,
-            "sold_out": ticket.quantity_available == 0
-        }
+        return build_ticket_info(ticket)
 
     def update_ticket_info(self, ticket_id: str, update_data: dict) -> dict:
         """
         Actualizar información de una entrada (precio, tipo, etc.)
         """
-        ticket = self.db_service.get_ticket_by_id(ticket_id)
+        ticket = self.get_ticket(ticket_id)
         if not ticket:
-            raise ValueError(f"Entrada con ID {ticket_id} no encontrada")
-
-        field_mapping = {
-            'type': 'type',
-            'price': 'price',
-            'quantity_available': 'quantityAvailable'
-        }
+            raise ticket_not_found(ticket_id)
 
-        filtered_data = {}
-        for k, v in update_data.items():
-            if k in field_mapping:
-                db_field = field_mapping[k]
-                filtered_data[db_field] = v
-
-        if not filtered_data:
-            raise ValueError(
-                "No se proporcionaron campos válidos para actualizar")
+        filtered_data = map_update_fields(update_data)
 
         updated_ticket = self.db_service.update_ticket(
             ticket_id, filtered_data)
+        self._store_ticket(ticket_id, updated_ticket)
 
-        return {
-            **updated_ticket.to_dict(),
-            "available": updated_ticket.quantity_available > 0
-        }
+        return build_ticket_summary(updated_ticket)
+
+    def subscribe_availability(self, ticket_ids: List[str]) -> Subscription:
+        """
+        Suscribirse a los cambios de disponibilidad de varias entradas
+        Lanza FeedFullError si se alcanzó el máximo de suscriptores
+        """
+        subscription = self.availability_feed.subscribe(ticket_ids)
+        self._ensure_availability_poller()
+        return subscription
+
+    def unsubscribe_availability(self, subscription: Subscription):
+        self.availability_feed.unsubscribe(subscription)
+
+    def refresh_watched_availability(self):
+        """
+        Releer en lotes las entradas que siguen los streams y publicar las que
+        cambiaron; así llegan también las compras hechas en otros workers o
+        instancias. Las entradas que dejaron de existir se publican como None
+        """
+        for chunk in chunked(self.availability_feed.watched_keys(), AVAILABILITY_POLL_BATCH):
+            found = {ticket.id: ticket for ticket in self.db_service.get_tickets_by_ids(chunk)}
+            for ticket_id in chunk:
+                ticket = found.get(ticket_id)
+                if ticket is None:
+                    self._remember_missing(ticket_id)
+                    self.availability_feed.publish(ticket_id, None)
+                else:
+                    self._store_ticket(ticket_id, ticket)
+
+    def _ensure_availability_poller(self):
+        if Config.AVAILABILITY_STREAM_POLL_INTERVAL <= 0:
+            return
+        with self._poller_lock:
+            if self._poller is None:
+                self._poller = threading.Thread(
+                    target=self._poll_availability, name='availability-poller', daemon=True)
+                self._poller.start()
+
+    def _poll_availability(self):
+        """Hilo de sondeo: corre mientras quede algún suscriptor"""
+        while True:
+            time.sleep(Config.AVAILABILITY_STREAM_POLL_INTERVAL)
+            with self._poller_lock:
+                if not self.availability_feed.subscribers:
+                    self._poller = None
+                    return
+            try:
+                self.refresh_watched_availability()
+            except Exception:
+                # database-service caído no corta los streams; se reintenta en el próximo ciclo
+                pass
@@ -0,0 +1 @@
+# utils/__init__.py
\ No newline at end of file
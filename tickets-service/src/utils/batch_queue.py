@@ -0,0 +1,193 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Set
+
+# process_batch(clave, ítems) -> un resultado o una excepción por ítem, en orden
+BatchProcessor = Callable[[Hashable, List[Any]], List[Any]]
+# observe(tamaño del lote, segundos que esperó cada ítem antes de procesarse)
+BatchObserver = Callable[[int, List[float]], None]
+
+
+class QueueFullError(Exception):
+    """La cola de la clave alcanzó su máximo de pendientes"""
+
+    def __init__(self, key: Hashable, max_pending: int):
+        self.key = key
+        self.max_pending = max_pending
+        super().__init__(f"Hay {max_pending} solicitudes en cola para {key}")
+
+
+class _Entry:
+    __slots__ = ('item', 'enqueued', 'result', 'error', 'lead', 'signal')
+
+    def __init__(self, item: Any, enqueued: float):
+        self.item = item
+        self.enqueued = enqueued
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.lead = False
+        self.signal = None
+
+
+class _BaseBatchQueue:
+    def __init__(self, max_batch: int = 50, max_pending: int = 1000,
+                 observe: Optional[BatchObserver] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self._observe = observe
+        self._clock = clock
+        self._queues: Dict[Hashable, Deque[_Entry]] = {}
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+        self.largest_batch = 0
+
+    def _enqueue(self, key: Hashable, entry: _Entry) -> bool:
+        """Encolar; retorna True si la clave estaba ociosa (el llamador la procesa)"""
+        queue = self._queues.get(key)
+        idle = queue is None
+        if idle:
+            queue = self._queues[key] = deque()
+        elif len(queue) >= self.max_pending:
+            self.rejected += 1
+            raise QueueFullError(key, self.max_pending)
+        queue.append(entry)
+        return idle
+
+    def _take_batch(self, key: Hashable) -> List[_Entry]:
+        queue = self._queues[key]
+        return [queue.popleft() for _ in range(min(len(queue), self.max_batch))]
+
+    def _resolve(self, batch: List[_Entry], outcomes: List[Any], started: float):
+        for entry, outcome in zip(batch, outcomes):
+            if isinstance(outcome, BaseException):
+                entry.error = outcome
+            else:
+                entry.result = outcome
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        if self._observe is not None:
+            self._observe(len(batch), [started - entry.enqueued for entry in batch])
+
+    def _pending(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._queues),
+            "pending": self._pending(),
+            "batches": self.batches,
+            "items": self.items,
+            "rejected": self.rejected,
+            "largest_batch": self.largest_batch,
+            "max_batch": self.max_batch,
+            "max_pending": self.max_pending
+        }
+
+
+class BatchQueue(_BaseBatchQueue):
+    """
+    Cola FIFO por clave que procesa los pendientes en micro-lotes (modo con hilos).
+    No usa hilos propios: quien llega a una clave ociosa procesa un lote que lo
+    incluye y, al terminar, cede el turno al primero que quedó esperando. Mientras
+    un lote está en curso, los que llegan se acumulan y forman el siguiente
+    """
+
+    def __init__(self, process_batch: BatchProcessor, **kwargs):
+        super().__init__(**kwargs)
+        self._process_batch = process_batch
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable, item: Any) -> Any:
+        """
+        Encolar un ítem y esperar su resultado (o relanzar su excepción)
+        Lanza QueueFullError si la cola de la clave está llena
+        """
+        entry = _Entry(item, self._clock())
+        entry.signal = threading.Event()
+        with self._lock:
+            leader = self._enqueue(key, entry)
+
+        if not leader:
+            entry.signal.wait()
+        if leader or entry.lead:
+            self._run_batch(key)
+
+        if entry.error is not None:
+            raise entry.error
+        return entry.result
+
+    def _run_batch(self, key: Hashable):
+        with self._lock:
+            batch = self._take_batch(key)
+        started = self._clock()
+        outcomes = [RuntimeError("El lote se interrumpió antes de terminar")] * len(batch)
+        try:
+            try:
+                outcomes = self._process_batch(key, [entry.item for entry in batch])
+            except Exception as e:
+                outcomes = [e] * len(batch)
+        finally:
+            with self._lock:
+                self._resolve(batch, outcomes, started)
+                queue = self._queues[key]
+                if queue:
+                    queue[0].lead = True
+                    queue[0].signal.set()
+                else:
+                    del self._queues[key]
+            for entry in batch:
+                entry.signal.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return super().stats()
+
+
+class AsyncBatchQueue(_BaseBatchQueue):
+    """
+    Variante para un event loop: una tarea por clave con pendientes drena la
+    cola lote por lote y termina cuando la cola queda vacía
+    """
+
+    def __init__(self, process_batch: Callable[[Hashable, List[Any]], Awaitable[List[Any]]],
+                 **kwargs):
+        super().__init__(**kwargs)
+        self._process_batch = process_batch
+        self._drainers: Set[asyncio.Task] = set()
+
+    async def submit(self, key: Hashable, item: Any) -> Any:
+        entry = _Entry(item, self._clock())
+        entry.signal = asyncio.get_running_loop().create_future()
+        if self._enqueue(key, entry):
+            task = asyncio.get_running_loop().create_task(self._drain(key))
+            # referencia fuerte: el loop solo guarda referencias débiles a las tareas
+            self._drainers.add(task)
+            task.add_done_callback(self._drainers.discard)
+        await asyncio.shield(entry.signal)
+        if entry.error is not None:
+            raise entry.error
+        return entry.result
+
+    async def _drain(self, key: Hashable):
+        batch: List[_Entry] = []
+        try:
+            while self._queues[key]:
+                batch = self._take_batch(key)
+                started = self._clock()
+                try:
+                    outcomes = await self._process_batch(key, [entry.item for entry in batch])
+                except Exception as e:
+                    outcomes = [e] * len(batch)
+                self._resolve(batch, outcomes, started)
+                for entry in batch:
+                    entry.signal.set_result(None)
+        finally:
+            # si la tarea se cancela (apagado), los que esperan no quedan colgados
+            for entry in [*batch, *self._queues.pop(key)]:
+                if not entry.signal.done():
+                    entry.signal.cancel()
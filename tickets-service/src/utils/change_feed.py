@@ -0,0 +1,180 @@
+import asyncio
+import threading
+from typing import Any, Dict, Hashable, Iterable, List, Set
+
+_MISSING = object()
+
+
+class FeedFullError(Exception):
+    """Se alcanzó el máximo de suscriptores del feed"""
+
+
+class _BaseSubscription:
+    """
+    Cambios pendientes de un suscriptor, plegados al último valor por clave:
+    un cliente lento no acumula memoria y nunca recibe un valor que ya vio
+    """
+
+    def __init__(self, keys: Iterable[Hashable]):
+        self.keys = frozenset(keys)
+        self._pending: Dict[Hashable, Any] = {}
+        self._seen: Dict[Hashable, Any] = {}
+
+    def _stage(self, key: Hashable, value: Any) -> bool:
+        if self._seen.get(key, _MISSING) == value:
+            self._pending.pop(key, None)
+            return False
+        self._pending[key] = value
+        return True
+
+    def _mark_seen(self, values: Dict[Hashable, Any]):
+        self._seen.update(values)
+        for key, value in values.items():
+            if self._pending.get(key, _MISSING) == value:
+                del self._pending[key]
+
+    def _take(self) -> Dict[Hashable, Any]:
+        changes, self._pending = self._pending, {}
+        self._seen.update(changes)
+        return changes
+
+
+class Subscription(_BaseSubscription):
+    def __init__(self, keys: Iterable[Hashable]):
+        super().__init__(keys)
+        self._cond = threading.Condition()
+
+    def mark_seen(self, values: Dict[Hashable, Any]):
+        """Registrar los valores que el cliente ya recibió (p. ej. la foto inicial)"""
+        with self._cond:
+            self._mark_seen(values)
+
+    def push(self, key: Hashable, value: Any) -> bool:
+        with self._cond:
+            staged = self._stage(key, value)
+            if staged:
+                self._cond.notify()
+            return staged
+
+    def wait(self, timeout: float) -> Dict[Hashable, Any]:
+        """Esperar cambios hasta timeout segundos; retorna {} si no hubo ninguno"""
+        with self._cond:
+            if not self._pending:
+                self._cond.wait(timeout)
+            return self._take()
+
+
+class AsyncSubscription(_BaseSubscription):
+    def __init__(self, keys: Iterable[Hashable]):
+        super().__init__(keys)
+        self._event = asyncio.Event()
+
+    def mark_seen(self, values: Dict[Hashable, Any]):
+        self._mark_seen(values)
+
+    def push(self, key: Hashable, value: Any) -> bool:
+        staged = self._stage(key, value)
+        if staged:
+            self._event.set()
+        return staged
+
+    async def wait(self, timeout: float) -> Dict[Hashable, Any]:
+        if not self._pending:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._event.clear()
+        return self._take()
+
+
+class ChangeFeed:
+    """
+    Fuente única de cambios con fan-out a muchos suscriptores (modo con hilos).
+    Cada suscriptor declara las claves que le interesan y publish solo
+    despierta a los interesados, y solo si el valor cambió respecto del
+    último publicado.
+    """
+
+    subscription_class = Subscription
+
+    def __init__(self, max_subscribers: int = 100):
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._by_key: Dict[Hashable, Set[_BaseSubscription]] = {}
+        self._last: Dict[Hashable, Any] = {}
+        self._subscribers = 0
+        self.published = 0
+        self.delivered = 0
+        self.rejected = 0
+
+    def subscribe(self, keys: Iterable[Hashable]):
+        """Registrar un suscriptor; lanza FeedFullError si no hay lugar"""
+        subscription = self.subscription_class(keys)
+        with self._lock:
+            if self._subscribers >= self.max_subscribers:
+                self.rejected += 1
+                raise FeedFullError(
+                    f"Se alcanzó el máximo de {self.max_subscribers} suscriptores")
+            self._subscribers += 1
+            for key in subscription.keys:
+                self._by_key.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: _BaseSubscription):
+        with self._lock:
+            if not any(subscription in self._by_key.get(key, ()) for key in subscription.keys):
+                return
+            self._subscribers -= 1
+            for key in subscription.keys:
+                subscribers = self._by_key.get(key)
+                subscribers.discard(subscription)
+                if not subscribers:
+                    # sin interesados se olvida el último valor de la clave
+                    del self._by_key[key]
+                    self._last.pop(key, None)
+
+    def publish(self, key: Hashable, value: Any) -> int:
+        """
+        Publicar el valor actual de una clave
+        Retorna a cuántos suscriptores se entregó (0 si no cambió o nadie la sigue)
+        """
+        with self._lock:
+            subscribers = self._by_key.get(key)
+            if not subscribers or self._last.get(key, _MISSING) == value:
+                return 0
+            self._last[key] = value
+            self.published += 1
+            # entregar bajo el lock mantiene el orden entre publicaciones concurrentes
+            delivered = sum(1 for subscription in subscribers if subscription.push(key, value))
+            self.delivered += delivered
+            return delivered
+
+    def watched_keys(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._by_key)
+
+    @property
+    def subscribers(self) -> int:
+        return self._subscribers
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": self._subscribers,
+                "max_subscribers": self.max_subscribers,
+                "watched_keys": len(self._by_key),
+                "published": self.published,
+                "delivered": self.delivered,
+                "rejected": self.rejected
+            }
+
+
+class AsyncChangeFeed(ChangeFeed):
+    """
+    Variante para un event loop: publish y los suscriptores se usan desde el
+    mismo loop; el lock solo protege las estructuras compartidas y nunca se
+    toma a través de un await
+    """
+
+    subscription_class = AsyncSubscription
@@ -0,0 +1,175 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+
+class CircuitOpenError(Exception):
+    """El circuito está abierto: la llamada se rechaza sin intentarla"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            f"Circuito abierto hacia database-service, reintentar en {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker con estados cerrado, abierto y semiabierto.
+
+    - Cerrado: las llamadas pasan y su resultado entra en una ventana
+      deslizante; si la tasa de fallos (errores o llamadas más lentas que
+      slow_call_seconds) alcanza el umbral, el circuito se abre.
+    - Abierto: las llamadas fallan de inmediato con CircuitOpenError hasta
+      que pasa el cool-down.
+    - Semiabierto: deja pasar half_open_max_calls llamadas de prueba; si
+      salen bien se cierra y ante el primer fallo vuelve a abrirse.
+
+    Con window_size <= 0 el breaker queda deshabilitado.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_rate_threshold: float = 0.5, window_size: int = 20,
+                 min_calls: int = 10, slow_call_seconds: float = 1.0,
+                 cooldown: float = 5.0, half_open_max_calls: int = 1,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = max(1, min_calls)
+        self.slow_call_seconds = slow_call_seconds
+        self.cooldown = cooldown
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._window = deque(maxlen=max(0, window_size))
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.state = self.CLOSED
+        self.rejected = 0
+        self.transitions = {self.OPEN: 0, self.HALF_OPEN: 0, self.CLOSED: 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self._window.maxlen > 0
+
+    def before_call(self) -> bool:
+        """
+        Admitir o rechazar una llamada
+        Retorna True si la llamada es de prueba (semiabierto); lanza
+        CircuitOpenError si el circuito no la deja pasar
+        """
+        if not self.enabled:
+            return False
+
+        with self._lock:
+            if self.state == self.OPEN:
+                remaining = self._opened_at + self.cooldown - self._clock()
+                if remaining > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(remaining)
+                self._transition(self.HALF_OPEN)
+
+            if self.state == self.HALF_OPEN:
+                if self._probes_in_flight >= self.half_open_max_calls:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.cooldown)
+                self._probes_in_flight += 1
+                return True
+
+            return False
+
+    def record(self, probe: bool, success: bool, duration: float):
+        """Registrar el resultado de una llamada admitida por before_call"""
+        if not self.enabled:
+            return
+
+        failed = not success or duration >= self.slow_call_seconds
+        with self._lock:
+            if probe:
+                if self.state != self.HALF_OPEN:
+                    return
+                self._probes_in_flight -= 1
+                if failed:
+                    self._transition(self.OPEN)
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_max_calls:
+                        self._transition(self.CLOSED)
+                return
+
+            # llamadas admitidas antes de abrirse el circuito no cuentan
+            if self.state != self.CLOSED:
+                return
+
+            self._window.append(failed)
+            if (len(self._window) >= self.min_calls
+                    and self._failure_rate() >= self.failure_rate_threshold):
+                self._transition(self.OPEN)
+
+    def release(self, probe: bool):
+        """Liberar el lugar de una llamada cancelada sin registrar resultado"""
+        if probe:
+            with self._lock:
+                if self.state == self.HALF_OPEN:
+                    self._probes_in_flight -= 1
+
+    def call(self, fn: Callable[[], Any],
+             is_success: Callable[[Any], bool] = lambda result: True) -> Any:
+        probe = self.before_call()
+        start = self._clock()
+        try:
+            result = fn()
+        except Exception:
+            self.record(probe, False, self._clock() - start)
+            raise
+        except BaseException:
+            self.release(probe)
+            raise
+        self.record(probe, is_success(result), self._clock() - start)
+        return result
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]],
+                    is_success: Callable[[Any], bool] = lambda result: True) -> Any:
+        probe = self.before_call()
+        start = self._clock()
+        try:
+            result = await fn()
+        except Exception:
+            self.record(probe, False, self._clock() - start)
+            raise
+        except BaseException:
+            self.release(probe)
+            raise
+        self.record(probe, is_success(result), self._clock() - start)
+        return result
+
+    def _failure_rate(self) -> float:
+        if not self._window:
+            return 0.0
+        return sum(self._window) / len(self._window)
+
+    def _transition(self, state: str):
+        self.state = state
+        self.transitions[state] += 1
+        self._window.clear()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if state == self.OPEN:
+            self._opened_at = self._clock()
+
+    def stats(self) -> dict:
+        with self._lock:
+            retry_after = 0.0
+            if self.state == self.OPEN:
+                retry_after = max(0.0, self._opened_at + self.cooldown - self._clock())
+            return {
+                "state": self.state,
+                "failure_rate": round(self._failure_rate(), 3),
+                "window_calls": len(self._window),
+                "rejected": self.rejected,
+                "transitions": dict(self.transitions),
+                "retry_after_seconds": round(retry_after, 3)
+            }
@@ -0,0 +1,15 @@
+import hashlib
+from typing import Any
+
+
+def compute_etag(*parts: Any) -> str:
+    """
+    ETag fuerte (sin comillas) derivado del contenido de una representación.
+    Las partes deben ser valores simples con repr estable (str, int, float,
+    tuplas, listas o dicts de estos).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(repr(part).encode())
+        digest.update(b'\x1f')
+    return digest.hexdigest()
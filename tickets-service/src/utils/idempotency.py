@@ -0,0 +1,108 @@
+import time
+from typing import Awaitable, Callable, Hashable, NamedTuple, Tuple
+from src.utils.singleflight import AsyncSingleFlight, SingleFlight
+from src.utils.ttl_cache import TTLCache
+
+
+class IdempotencyKeyMismatchError(Exception):
+    """La clave de idempotencia ya se usó con una solicitud distinta"""
+
+
+class StoredResponse(NamedTuple):
+    status: int
+    body: bytes
+    headers: Tuple[Tuple[str, str], ...] = ()
+
+
+class _BaseIdempotencyStore:
+    """
+    Respuestas ya emitidas por clave de idempotencia, acotadas (LRU) y con
+    TTL. Solo se guardan las respuestas definitivas: las 5xx se pueden reintentar
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.responses = TTLCache(maxsize, ttl, clock=clock)
+        self.replayed = 0
+        self.mismatched = 0
+
+    def _remember(self, key: Hashable, entry: Tuple[str, StoredResponse]):
+        if entry[1].status < 500:
+            self.responses.set(key, entry)
+
+    def _check(self, key: Hashable, fingerprint: str,
+               entry: Tuple[str, StoredResponse], replayed: bool) -> Tuple[StoredResponse, bool]:
+        stored_fingerprint, response = entry
+        if stored_fingerprint != fingerprint:
+            self.mismatched += 1
+            raise IdempotencyKeyMismatchError(key)
+        if replayed:
+            self.replayed += 1
+        return response, replayed
+
+    def stats(self) -> dict:
+        cache = self.responses.stats()
+        return {
+            "stored": cache["size"],
+            "maxsize": cache["maxsize"],
+            "ttl_seconds": cache["ttl_seconds"],
+            "in_flight": self._flight.stats()["in_flight"],
+            "replayed": self.replayed,
+            "mismatched": self.mismatched
+        }
+
+
+class IdempotencyStore(_BaseIdempotencyStore):
+    """
+    Ejecución única por clave de idempotencia (modo con hilos): un reintento
+    que llega mientras la original sigue en curso espera su resultado, y uno
+    posterior recibe la respuesta guardada sin volver a ejecutar
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        super().__init__(maxsize, ttl, clock)
+        self._flight = SingleFlight()
+
+    def run(self, key: Hashable, fingerprint: str,
+            execute: Callable[[], StoredResponse]) -> Tuple[StoredResponse, bool]:
+        """
+        Retorna (respuesta, si es una repetición de una ejecución anterior)
+        Lanza IdempotencyKeyMismatchError si la clave se usó con otra solicitud
+        """
+        ran = False
+
+        def first_run():
+            nonlocal ran
+            # se vuelve a mirar: la original pudo terminar entre la lectura y el do
+            entry = self.responses.get(key)
+            if entry is None:
+                ran = True
+                entry = (fingerprint, execute())
+                self._remember(key, entry)
+            return entry
+
+        entry = self.responses.get(key) or self._flight.do(key, first_run)
+        return self._check(key, fingerprint, entry, replayed=not ran)
+
+
+class AsyncIdempotencyStore(_BaseIdempotencyStore):
+    """Variante de IdempotencyStore para un event loop"""
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        super().__init__(maxsize, ttl, clock)
+        self._flight = AsyncSingleFlight()
+
+    async def run(self, key: Hashable, fingerprint: str,
+                  execute: Callable[[], Awaitable[StoredResponse]]) -> Tuple[StoredResponse, bool]:
+        ran = False
+
+        async def first_run():
+            nonlocal ran
+            entry = self.responses.get(key)
+            if entry is None:
+                ran = True
+                entry = (fingerprint, await execute())
+                self._remember(key, entry)
+            return entry
+
+        entry = self.responses.get(key) or await self._flight.do(key, first_run)
+        return self._check(key, fingerprint, entry, replayed=not ran)
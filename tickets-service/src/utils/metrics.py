@@ -0,0 +1,34 @@
+from typing import List
+from metrics_core import MetricsRegistry
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    'tickets_http_request_duration_seconds',
+    'Duración de las solicitudes HTTP atendidas por tickets-service',
+    ('method', 'route'))
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    'tickets_http_requests_in_flight',
+    'Solicitudes HTTP en curso')
+HTTP_RESPONSES = REGISTRY.counter(
+    'tickets_http_responses_total',
+    'Respuestas HTTP por ruta y código de estado',
+    ('method', 'route', 'status'))
+DB_CALL_DURATION = REGISTRY.histogram(
+    'tickets_database_service_call_duration_seconds',
+    'Duración de las llamadas salientes a database-service por operación',
+    ('operation', 'outcome'))
+PURCHASE_BATCH_SIZE = REGISTRY.histogram(
+    'tickets_purchase_batch_size',
+    'Compras agrupadas en cada decremento enviado a database-service',
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200))
+PURCHASE_QUEUE_WAIT = REGISTRY.histogram(
+    'tickets_purchase_queue_wait_seconds',
+    'Tiempo que una compra esperó en la cola de su entrada antes de procesarse')
+
+
+def observe_purchase_batch(size: int, waits: List[float]):
+    """Registrar un lote de la cola de compras (ver BatchQueue)"""
+    PURCHASE_BATCH_SIZE.observe(size)
+    for wait in waits:
+        PURCHASE_QUEUE_WAIT.observe(wait)
@@ -0,0 +1,161 @@
+import hashlib
+import mmap
+import multiprocessing
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+
+class TokenBuckets:
+    """
+    Cubetas de tokens por cliente en memoria del proceso.
+    Cada cliente ocupa una tupla (tokens, instante de la última recarga) en un
+    OrderedDict por orden de uso: al superar max_clients se descarta el
+    cliente inactivo hace más tiempo (si vuelve, empieza con la cubeta llena).
+    """
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 100000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._clock = clock
+        self._buckets: 'OrderedDict[str, Tuple[float, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, client: str, cost: float = 1.0) -> float:
+        """
+        Consumir cost tokens de la cubeta del cliente
+        Retorna 0 si se admite o los segundos hasta que haya tokens suficientes
+        """
+        with self._lock:
+            now = self._clock()
+            entry = self._buckets.get(client)
+            tokens = self.burst if entry is None else \
+                min(self.burst, entry[0] + (now - entry[1]) * self.rate)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / self.rate
+            self._buckets[client] = (tokens, now)
+            if entry is not None:
+                self._buckets.move_to_end(client)
+            elif len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+_SLOT = struct.Struct('dd')
+
+
+class SharedTokenBuckets:
+    """
+    Variante compartida entre los workers de un mismo servidor: una tabla de
+    tamaño fijo en memoria compartida (mmap anónimo) que los workers heredan
+    al hacer fork, así que debe crearse antes (WEB_PRELOAD_APP). Cada cliente
+    cae en un casillero según un hash con clave `secret` (aleatoria por
+    defecto). Dos clientes en el mismo casillero comparten la cubeta: en
+    producción se limitan juntos (nunca se saltean el límite, pero uno puede
+    recibir 429 por el consumo del otro), con una probabilidad que baja al
+    subir `slots`.
+    """
+
+    def __init__(self, rate: float, burst: float, slots: int = 100000,
+                 clock: Callable[[], float] = time.monotonic,
+                 secret: Optional[bytes] = None):
+        self.rate = rate
+        self.burst = burst
+        self.slots = slots
+        # CLOCK_MONOTONIC es el mismo para todos los procesos del sistema
+        self._clock = clock
+        self._secret = os.urandom(16) if secret is None else secret
+        self._table = mmap.mmap(-1, slots * _SLOT.size)
+        self._lock = multiprocessing.Lock()
+
+    def _offset(self, client: str) -> int:
+        digest = hashlib.blake2b(client.encode(), digest_size=8, key=self._secret).digest()
+        return int.from_bytes(digest, 'little') % self.slots * _SLOT.size
+
+    def acquire(self, client: str, cost: float = 1.0) -> float:
+        offset = self._offset(client)
+        with self._lock:
+            now = self._clock()
+            tokens, stamp = _SLOT.unpack_from(self._table, offset)
+            # casillero sin usar: stamp == 0 y la cubeta arranca llena
+            tokens = self.burst if stamp == 0 else \
+                min(self.burst, tokens + (now - stamp) * self.rate)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / self.rate
+            _SLOT.pack_into(self._table, offset, tokens, now)
+            return wait
+
+    def clear(self):
+        with self._lock:
+            self._table[:] = bytes(len(self._table))
+
+    def __len__(self):
+        return sum(1 for _, stamp in _SLOT.iter_unpack(self._table) if stamp)
+
+
+class RateLimiter:
+    """
+    Control de admisión por clase de ruta (p. ej. compra y lectura) y
+    cliente, con una familia de cubetas de tokens por clase
+    """
+
+    def __init__(self, buckets: Dict[str, TokenBuckets]):
+        self.buckets = buckets
+        self.allowed = {name: 0 for name in buckets}
+        self.limited = {name: 0 for name in buckets}
+
+    def check(self, route_class: str, client: str) -> float:
+        """Retorna 0 si se admite o los segundos que el cliente debe esperar"""
+        wait = self.buckets[route_class].acquire(client)
+        if wait > 0:
+            self.limited[route_class] += 1
+        else:
+            self.allowed[route_class] += 1
+        return wait
+
+    def reset(self):
+        for buckets in self.buckets.values():
+            buckets.clear()
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "rate": buckets.rate,
+                "burst": buckets.burst,
+                "allowed": self.allowed[name],
+                "limited": self.limited[name]
+            }
+            for name, buckets in self.buckets.items()
+        }
+
+
+def build_rate_limiter(limits: Dict[str, Tuple[float, float]], max_clients: int,
+                       shared: bool = False) -> Optional[RateLimiter]:
+    """
+    Armar el limitador a partir de {clase: (tokens por segundo, ráfaga)}
+    Las clases con tasa <= 0 quedan sin límite; sin ninguna retorna None
+    """
+    buckets_class = SharedTokenBuckets if shared else TokenBuckets
+    buckets = {
+        name: buckets_class(rate, burst, max_clients)
+        for name, (rate, burst) in limits.items() if rate > 0
+    }
+    return RateLimiter(buckets) if buckets else None
@@ -0,0 +1,80 @@
+"""
+Benchmark de compra de un carrito con varios tipos de entrada.
+
+Compara N solicitudes POST /api/tickets/purchase secuenciales (lo que hacía
+el cliente antes) contra una sola solicitud POST /api/tickets/purchase/batch,
+con database-service simulado por un servidor local con latencia artificial.
+
+Uso:
+    python -m tests.benchmarks.bench_batch_purchase --items 5 --latency 0.005
+"""
+import argparse
+import json
+import statistics
+import time
+
+from src.config import Config
+from tests.benchmarks.stand_in import bench_ticket_id, make_ticket, start_stand_in
+
+
+def measure(call, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'rounds': rounds,
+        'p50_ms': round(statistics.median(samples), 3),
+        'mean_ms': round(statistics.mean(samples), 3),
+        'max_ms': round(max(samples), 3)
+    }
+
+
+def run(items, rounds, latency):
+    tickets = [make_ticket(bench_ticket_id(i), quantity_available=10 ** 9) for i in range(items)]
+    server, base_url = start_stand_in(tickets, latency=latency)
+    Config.DATABASE_SERVICE_URL = base_url
+    # todas las compras salen del mismo cliente: sin límite por cliente
+    Config.RATE_LIMIT_ENABLED = False
+
+    # importar después de configurar la URL: el controlador crea el servicio al cargar
+    from src.app import create_app
+    client = create_app().test_client()
+    cart = [{'ticket_id': t['id'], 'quantity': 1} for t in tickets]
+
+    def sequential():
+        for item in cart:
+            assert client.post('/api/tickets/purchase', json=item).status_code == 200
+
+    def batch():
+        response = client.post('/api/tickets/purchase/batch', json={'items': cart})
+        assert response.status_code == 200
+
+    try:
+        sequential()  # calentar el pool
+        results = {
+            'items': items,
+            'upstream_latency_ms': latency * 1000,
+            'concurrency': Config.BATCH_PURCHASE_CONCURRENCY,
+            'sequential_single_purchases': measure(sequential, rounds),
+            'one_batch_purchase': measure(batch, rounds)
+        }
+    finally:
+        server.shutdown()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=5)
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.005,
+                        help='latencia simulada de database-service en segundos')
+    args = parser.parse_args()
+    print(json.dumps(run(args.items, args.rounds, args.latency), indent=2))
+
+
+if __name__ == '__main__':
+    main()
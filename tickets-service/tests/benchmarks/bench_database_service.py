@@ -0,0 +1,71 @@
+"""
+Benchmark de latencia del cliente DatabaseService contra un servidor local
+que imita database-service.
+
+Compara el comportamiento anterior (una conexión TCP nueva por llamada con
+requests.get) contra la sesión con pool keep-alive de DatabaseService.
+
+Uso:
+    python -m tests.benchmarks.bench_database_service --requests 2000
+"""
+import argparse
+import json
+import statistics
+import time
+
+import requests
+
+from src.config import Config
+from src.services.database_service import DatabaseService
+from tests.benchmarks.stand_in import start_stand_in
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(call, total):
+    samples = []
+    for _ in range(total):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'requests': total,
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+        'mean_ms': round(statistics.mean(samples), 3)
+    }
+
+
+def run(total):
+    server, base_url = start_stand_in()
+    Config.DATABASE_SERVICE_URL = base_url
+
+    try:
+        url = f"{base_url}/tickets/1"
+        before = measure(lambda: requests.get(url).json(), total)
+
+        service = DatabaseService()
+        service.get_ticket_by_id('1')  # calentar el pool
+        after = measure(lambda: service.get_ticket_by_id('1'), total)
+        service.close()
+    finally:
+        server.shutdown()
+
+    return {'before_new_connection': before, 'after_pooled_session': after}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    results = run(args.requests)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,330 @@
+"""
+Micro-benchmarks de los caminos calientes de tickets-service.
+
+Cubre la serialización del modelo (Ticket.from_dict / to_dict), el servicio
+(TicketsService.purchase_tickets / get_all_tickets) con un DatabaseService en
+memoria, el costo por decisión del control de admisión (cubetas locales y
+compartidas) y el ciclo completo de Flask de cada ruta de tickets_bp a través
+del test client. No hay red: lo que se mide es el costo propio del servicio.
+
+Los resultados se escriben como JSON en test-reports/. Con --compare se
+comparan contra una línea base guardada con --save-baseline y el proceso
+termina con código 1 si algún caso empeoró más que --threshold.
+
+Uso:
+    python -m tests.benchmarks.bench_hot_paths --save-baseline
+    python -m tests.benchmarks.bench_hot_paths --compare --threshold 0.15
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+from src.models.ticket import Ticket
+from src.services.database_service import DatabaseService, InsufficientTicketsError
+from src.utils.rate_limiter import SharedTokenBuckets, TokenBuckets, build_rate_limiter
+from tests.benchmarks.stand_in import bench_ticket_id
+
+REPORTS_DIR = Path(__file__).resolve().parents[3] / 'test-reports'
+DEFAULT_OUTPUT = REPORTS_DIR / 'tickets-service-benchmarks.json'
+DEFAULT_BASELINE = REPORTS_DIR / 'tickets-service-benchmarks.baseline.json'
+
+TICKET_ID, SECOND_TICKET_ID, THIRD_TICKET_ID = (bench_ticket_id(i) for i in (1, 2, 3))
+
+TICKET_PAYLOAD = {
+    'id': TICKET_ID,
+    'type': 'VIP',
+    'price': 150.0,
+    'quantityAvailable': 10 ** 9,
+    'quantitySold': 0
+}
+
+
+class StubDatabaseService(DatabaseService):
+    """
+    DatabaseService en memoria: mantiene sesión, breaker y single-flight del
+    original (los usan health y /metrics) pero responde sin salir a la red
+    """
+
+    def __init__(self, count: int = 200):
+        super().__init__()
+        self.tickets = {
+            bench_ticket_id(i): Ticket.from_dict(dict(TICKET_PAYLOAD, id=bench_ticket_id(i)))
+            for i in range(1, count + 1)
+        }
+
+    def get_all_tickets(self) -> List[Ticket]:
+        return list(self.tickets.values())
+
+    def get_tickets_page(self, page: int, page_size: int) -> List[Ticket]:
+        start = (page - 1) * page_size
+        return list(self.tickets.values())[start:start + page_size]
+
+    def get_tickets_by_ids(self, ticket_ids: List[str]) -> List[Ticket]:
+        return [self.tickets[i] for i in ticket_ids if i in self.tickets]
+
+    def get_ticket_by_id(self, ticket_id: str) -> Optional[Ticket]:
+        return self.tickets.get(ticket_id)
+
+    def purchase_ticket(self, ticket_id: str, quantity: int) -> Optional[Ticket]:
+        ticket = self.tickets.get(ticket_id)
+        if ticket is None:
+            return None
+        if ticket.quantity_available < quantity:
+            raise InsufficientTicketsError(ticket_id)
+        ticket.quantity_available -= quantity
+        ticket.quantity_sold += quantity
+        return Ticket(**ticket.__dict__)
+
+    def update_ticket(self, ticket_id: str, ticket_data: dict) -> Ticket:
+        ticket = self.tickets[ticket_id]
+        ticket.price = ticket_data.get('price', ticket.price)
+        ticket.type = ticket_data.get('type', ticket.type)
+        return Ticket(**ticket.__dict__)
+
+
+def measure(fn: Callable[[], object], min_time: float, repeats: int) -> dict:
+    """
+    Calibrar la cantidad de iteraciones para que cada repetición dure al
+    menos min_time y reportar el mejor tiempo y la mediana por operación
+    """
+    def timed_loops(loops):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        return time.perf_counter() - start
+
+    loops = 1
+    while True:
+        elapsed = timed_loops(loops)
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9) * 1.2))
+
+    samples = [timed_loops(loops) / loops * 1e6 for _ in range(repeats)]
+    return {
+        'loops': loops,
+        'best_us': round(min(samples), 3),
+        'median_us': round(statistics.median(samples), 3)
+    }
+
+
+def model_cases() -> Dict[str, Callable]:
+    ticket = Ticket.from_dict(TICKET_PAYLOAD)
+    return {
+        'model.ticket_from_dict': lambda: Ticket.from_dict(TICKET_PAYLOAD),
+        'model.ticket_to_dict': ticket.to_dict
+    }
+
+
+def service_cases() -> Dict[str, Callable]:
+    from src.services.tickets_service import TicketsService
+    service = TicketsService()
+    service.db_service = StubDatabaseService()
+    return {
+        'service.purchase_tickets': lambda: service.purchase_tickets(TICKET_ID, 1),
+        'service.get_all_tickets': service.get_all_tickets
+    }
+
+
+def unlimited_rate_limiter():
+    """Limitador con cubetas que nunca se agotan: decide siempre, nunca rechaza"""
+    return build_rate_limiter({'purchase': (1e12, 1e12), 'read': (1e12, 1e12)}, 1000)
+
+
+def limiter_cases() -> Dict[str, Callable]:
+    """
+    Costo por decisión del control de admisión: admitir, rechazar, rotar entre
+    más clientes que el máximo (expulsiones) y la decisión completa del
+    controlador (clase de ruta + identidad del cliente)
+    """
+    from src.controllers.tickets_controller import rate_limit_wait
+
+    cases = {}
+    for kind, buckets_class in (('local', TokenBuckets), ('shared', SharedTokenBuckets)):
+        admit = buckets_class(1e12, 1e12, 10000)
+        reject = buckets_class(1e-6, 1, 10000)
+        reject.acquire('ip:10.0.0.1')
+        clients = [f'ip:10.0.{i // 256}.{i % 256}' for i in range(20000)]
+        rotating = buckets_class(1e12, 1e12, 10000)
+        position = iter(range(10 ** 12))
+        cases[f'limiter.{kind} admit'] = lambda b=admit: b.acquire('ip:10.0.0.1')
+        cases[f'limiter.{kind} reject'] = lambda b=reject: b.acquire('ip:10.0.0.1')
+        cases[f'limiter.{kind} 20k clients'] = \
+            lambda b=rotating, c=clients, p=position: b.acquire(c[next(p) % len(c)])
+
+    limiter = unlimited_rate_limiter()
+    request = SimpleNamespace(endpoint='tickets.purchase_tickets', headers={},
+                              remote_addr='10.0.0.1')
+    cases['limiter.rate_limit_wait'] = lambda: rate_limit_wait(limiter, request)
+    return cases
+
+
+def first_stream_event(response) -> bytes:
+    """Leer solo el primer evento de un stream SSE y cerrarlo"""
+    try:
+        return next(iter(response.response))
+    finally:
+        response.close()
+
+
+def route_cases() -> Dict[str, Callable]:
+    """
+    Un caso por ruta de tickets_bp (más variantes del listado y el 304);
+    falla si alguna ruta del blueprint quedó sin cubrir
+    """
+    from src.app import create_app
+    from src.controllers import tickets_controller
+    tickets_service = tickets_controller.tickets_service
+    tickets_service.db_service = StubDatabaseService()
+    tickets_service.ticket_cache.clear()
+    # cada ruta paga la decisión de admisión, pero el bucle no debe recibir 429
+    tickets_controller.rate_limiter = unlimited_rate_limiter()
+
+    app = create_app()
+    client = app.test_client()
+    etag = client.get(f'/api/tickets/{TICKET_ID}').headers['ETag']
+    bulk_ids = [TICKET_ID, SECOND_TICKET_ID, THIRD_TICKET_ID]
+
+    requests_by_rule = {
+        ('POST', '/api/tickets/availability'): [
+            ('', lambda: client.post('/api/tickets/availability',
+                                     json={'ticket_ids': bulk_ids}))],
+        ('GET', '/api/tickets/availability/stream'): [
+            ('', lambda: first_stream_event(
+                client.get('/api/tickets/availability/stream?ids=' + ','.join(bulk_ids))))],
+        ('GET', '/api/tickets/availability/<ticket_id>'): [
+            ('', lambda: client.get(f'/api/tickets/availability/{TICKET_ID}'))],
+        ('POST', '/api/tickets/purchase'): [
+            ('', lambda: client.post('/api/tickets/purchase',
+                                     json={'ticket_id': TICKET_ID, 'quantity': 1})),
+            (' idempotent replay', lambda: client.post(
+                '/api/tickets/purchase', json={'ticket_id': TICKET_ID, 'quantity': 1},
+                headers={'Idempotency-Key': 'bench'}))],
+        ('POST', '/api/tickets/purchase/batch'): [
+            ('', lambda: client.post('/api/tickets/purchase/batch', json={'items': [
+                {'ticket_id': TICKET_ID, 'quantity': 1},
+                {'ticket_id': SECOND_TICKET_ID, 'quantity': 1}]}))],
+        ('GET', '/api/tickets/'): [
+            ('', lambda: client.get('/api/tickets/')),
+            (' page', lambda: client.get('/api/tickets/?page=1&page_size=50')),
+            (' ndjson', lambda: client.get('/api/tickets/?format=ndjson').get_data())],
+        ('GET', '/api/tickets/<ticket_id>'): [
+            ('', lambda: client.get(f'/api/tickets/{TICKET_ID}')),
+            (' 304', lambda: client.get(f'/api/tickets/{TICKET_ID}',
+                                        headers={'If-None-Match': etag}))],
+        ('PUT', '/api/tickets/<ticket_id>'): [
+            ('', lambda: client.put(f'/api/tickets/{TICKET_ID}', json={'price': 150.0}))],
+        ('GET', '/api/tickets/health'): [
+            ('', lambda: client.get('/api/tickets/health'))]
+    }
+
+    blueprint_rules = {
+        (method, rule.rule)
+        for rule in app.url_map.iter_rules() if rule.endpoint.startswith('tickets.')
+        for method in rule.methods - {'HEAD', 'OPTIONS'}
+    }
+    missing = blueprint_rules - set(requests_by_rule)
+    if missing:
+        raise RuntimeError(f"Rutas de tickets_bp sin benchmark: {sorted(missing)}")
+
+    cases = {}
+    for (method, rule), variants in requests_by_rule.items():
+        for suffix, call in variants:
+            response = call()
+            if getattr(response, 'status_code', 200) >= 400:
+                raise RuntimeError(f"{method} {rule}{suffix} respondió {response.status_code}")
+            cases[f"route.{method} {rule}{suffix}"] = call
+    return cases
+
+
+def compare_results(current: dict, baseline: dict, threshold: float) -> dict:
+    """
+    Comparar el mejor tiempo de cada caso contra la línea base
+    Un caso es regresión si es más lento que la base en más de threshold
+    """
+    regressions, improvements, new = [], [], []
+    for name, result in current.items():
+        base = baseline.get(name)
+        if base is None:
+            new.append(name)
+            continue
+        change = result['best_us'] / base['best_us'] - 1
+        entry = {
+            'case': name,
+            'baseline_us': base['best_us'],
+            'current_us': result['best_us'],
+            'change': round(change, 3)
+        }
+        if change > threshold:
+            regressions.append(entry)
+        elif change < -threshold:
+            improvements.append(entry)
+    return {
+        'threshold': threshold,
+        'regressions': regressions,
+        'improvements': improvements,
+        'new_cases': new,
+        'missing_cases': sorted(set(baseline) - set(current))
+    }
+
+
+def write_json(path: Path, data: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='segundos mínimos por repetición')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--filter', default='', help='solo casos cuyo nombre contiene el texto')
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='guardar estos resultados como línea base')
+    parser.add_argument('--compare', action='store_true',
+                        help='comparar contra la línea base y fallar ante regresiones')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='empeoramiento relativo tolerado (0.15 = 15%%)')
+    args = parser.parse_args()
+
+    cases = {**model_cases(), **service_cases(), **limiter_cases(), **route_cases()}
+    results = {}
+    for name, fn in cases.items():
+        if args.filter in name:
+            results[name] = measure(fn, args.min_time, args.repeats)
+            print(f"{name:60s} {results[name]['best_us']:>12.3f} us", file=sys.stderr)
+
+    report = {
+        'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results
+    }
+
+    exit_code = 0
+    if args.compare:
+        baseline = {name: result
+                    for name, result in json.loads(args.baseline.read_text())['results'].items()
+                    if args.filter in name}
+        report['comparison'] = compare_results(results, baseline, args.threshold)
+        exit_code = 1 if report['comparison']['regressions'] else 0
+
+    write_json(args.output, report)
+    if args.save_baseline:
+        write_json(args.baseline, report)
+    print(json.dumps(report.get('comparison', results), indent=2))
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark del costo de registrar una observación en el histograma.
+
+Compara los shards por hilo de metrics_core contra un histograma
+equivalente protegido por un único lock, con varios hilos escribiendo.
+
+Uso:
+    python -m tests.benchmarks.bench_metrics --threads 8 --observations 200000
+"""
+import argparse
+import json
+import threading
+import time
+from bisect import bisect_left
+
+from metrics_core import DEFAULT_BUCKETS, Histogram
+
+
+class LockedHistogram:
+    """Línea base: un solo diccionario compartido protegido por un lock"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def observe(self, value, *labels):
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [0] * (len(self.buckets) + 2)
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+
+def measure(histogram, threads, observations):
+    def work():
+        for i in range(observations):
+            histogram.observe(0.003, 'GET', '/api/tickets/<ticket_id>')
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    return {
+        'observations': threads * observations,
+        'ns_per_observation': round(elapsed / (threads * observations) * 1e9, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--observations', type=int, default=200000)
+    args = parser.parse_args()
+
+    results = {
+        'threads': args.threads,
+        'single_lock': measure(LockedHistogram(), args.threads, args.observations),
+        'per_thread_shards': measure(
+            Histogram('bench_seconds', 'bench', ('method', 'route')),
+            args.threads, args.observations)
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
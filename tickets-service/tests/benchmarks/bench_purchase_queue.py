@@ -0,0 +1,79 @@
+"""
+Benchmark de compras paralelas de una misma entrada (flash sale).
+
+Compara la cola de compras por entrada (PURCHASE_QUEUE_ENABLED), que agrupa
+las compras simultáneas en un solo decremento atómico, contra un decremento
+por compra. database-service lo simula un servidor local con latencia
+artificial; se reporta compras por segundo y llamadas de compra upstream.
+
+Uso:
+    python -m tests.benchmarks.bench_purchase_queue --purchases 400 --workers 32
+    python -m tests.benchmarks.bench_purchase_queue --stock 250 --latency 0.005
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import Config
+from src.services.tickets_service import TicketsService
+from tests.benchmarks.stand_in import bench_ticket_id, make_ticket, start_stand_in
+
+
+def measure(queue_enabled, purchases, workers, stock, latency):
+    ticket = make_ticket(bench_ticket_id(1), quantity_available=stock)
+    server, base_url = start_stand_in([ticket], latency=latency)
+    Config.DATABASE_SERVICE_URL = base_url
+    Config.PURCHASE_QUEUE_ENABLED = queue_enabled
+    service = TicketsService()
+
+    def purchase(_):
+        try:
+            return service.purchase_tickets(ticket['id'], 1)
+        except ValueError:
+            return None
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(purchase, range(purchases)))
+        elapsed = time.perf_counter() - start
+    finally:
+        service.db_service.close()
+        server.shutdown()
+        server.server_close()
+
+    return {
+        'purchases_per_sec': round(purchases / elapsed),
+        'seconds': round(elapsed, 3),
+        'succeeded': sum(result is not None for result in results),
+        'upstream_purchase_calls': server.purchase_calls
+    }
+
+
+def run(purchases, workers, stock, latency):
+    results = {
+        'purchases': purchases,
+        'workers': workers,
+        'stock': stock,
+        'upstream_latency_ms': latency * 1000
+    }
+    results['one_decrement_per_purchase'] = measure(False, purchases, workers, stock, latency)
+    results['purchase_queue'] = measure(True, purchases, workers, stock, latency)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--purchases', type=int, default=400)
+    parser.add_argument('--workers', type=int, default=32,
+                        help='compras concurrentes contra la misma entrada')
+    parser.add_argument('--stock', type=int, default=250)
+    parser.add_argument('--latency', type=float, default=0.002,
+                        help='latencia simulada de database-service en segundos')
+    args = parser.parse_args()
+    print(json.dumps(run(args.purchases, args.workers, args.stock, args.latency), indent=2))
+
+
+if __name__ == '__main__':
+    main()
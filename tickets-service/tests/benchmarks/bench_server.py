@@ -0,0 +1,136 @@
+"""
+Benchmark de throughput del servidor de desarrollo contra el de producción.
+
+Levanta el stand-in de database-service, arranca tickets-service en un
+subproceso con `python -m src.app` (Werkzeug) y con `python -m src.server`
+(gunicorn o hypercorn con varios workers) y mide solicitudes por segundo y
+latencias con varios clientes keep-alive concurrentes.
+
+Uso:
+    python -m tests.benchmarks.bench_server --clients 16 --duration 10 --workers 4
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+from tests.benchmarks.stand_in import bench_ticket_id, make_ticket, start_stand_in
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(module, env):
+    process = subprocess.Popen(
+        [sys.executable, '-m', module], env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    health_url = f"http://127.0.0.1:{env['PORT']}/api/tickets/health"
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            requests.get(health_url, timeout=0.5)
+            return process
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{module} no respondió en {health_url}")
+
+
+def drive_load(url, clients, duration):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client():
+        session = requests.Session()
+        local, failed = [], 0
+        while time.monotonic() < stop_at:
+            start = time.perf_counter()
+            try:
+                if session.get(url, timeout=5).status_code != 200:
+                    failed += 1
+            except requests.RequestException:
+                failed += 1
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    percentile = lambda p: round(latencies[int(p * (len(latencies) - 1))] * 1000, 2)
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'requests_per_second': round(len(latencies) / duration, 1),
+        'p50_ms': percentile(0.50),
+        'p99_ms': percentile(0.99)
+    }
+
+
+def measure(module, base_env, args):
+    env = dict(base_env, PORT=str(free_port()))
+    process = start_server(module, env)
+    try:
+        url = f"http://127.0.0.1:{env['PORT']}{args.path}"
+        return drive_load(url, args.clients, args.duration)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--mode', choices=('sync', 'async'), default='sync')
+    parser.add_argument('--latency', type=float, default=0.002,
+                        help='latencia simulada de database-service en segundos')
+    parser.add_argument('--path', default=f'/api/tickets/availability/{bench_ticket_id(1)}')
+    args = parser.parse_args()
+
+    server, base_url = start_stand_in([make_ticket(bench_ticket_id(1))], latency=args.latency)
+    base_env = dict(
+        os.environ,
+        DATABASE_SERVICE_URL=base_url,
+        SERVER_MODE=args.mode,
+        DEBUG='False',
+        # sin caché cada solicitud cruza hasta database-service
+        TICKET_CACHE_TTL='0',
+        # todos los clientes salen de 127.0.0.1: sin límite por cliente
+        RATE_LIMIT_ENABLED='False',
+        WEB_CONCURRENCY=str(args.workers),
+        WEB_THREADS=str(args.threads)
+    )
+    try:
+        results = {
+            'clients': args.clients,
+            'mode': args.mode,
+            'workers': args.workers,
+            'dev_server': measure('src.app', base_env, args),
+            'production_server': measure('src.server', base_env, args)
+        }
+    finally:
+        server.shutdown()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
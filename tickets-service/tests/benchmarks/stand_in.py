@@ -0,0 +1,125 @@
+"""
+Servidor local en memoria que imita las rutas /tickets de database-service
+para los benchmarks. Soporta keep-alive (HTTP/1.1), compra atómica y una
+latencia artificial por request para simular el salto de red.
+"""
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def bench_ticket_id(number):
+    """ID con formato UUID (como los de database-service) a partir de un número"""
+    return str(uuid.UUID(int=number))
+
+
+def make_ticket(ticket_id, quantity_available=1000, price=20.0, ticket_type='GENERAL'):
+    return {
+        'id': ticket_id,
+        'type': ticket_type,
+        'price': price,
+        'quantityAvailable': quantity_available,
+        'quantitySold': 0
+    }
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._delay()
+        url = urlparse(self.path)
+        parts = url.path.strip('/').split('/')
+        store = self.server.tickets
+
+        if parts == ['tickets']:
+            query = parse_qs(url.query)
+            page = int(query.get('page', ['1'])[0])
+            page_size = int(query.get('pageSize', ['100'])[0])
+            if 'ids' in query:
+                ids = query['ids'][0].split(',')
+                items = [store[i] for i in ids if i in store]
+            else:
+                items = list(store.values())
+            start = (page - 1) * page_size
+            return self._reply(200, items[start:start + page_size])
+
+        if len(parts) == 2 and parts[0] == 'tickets' and parts[1] in store:
+            return self._reply(200, store[parts[1]])
+
+        self._reply(404, {'error': 'Ticket not found'})
+
+    def do_PUT(self):
+        self._delay()
+        parts = self.path.strip('/').split('/')
+        payload = self._read_json()
+        with self.server.lock:
+            ticket = self.server.tickets.get(parts[-1])
+            if ticket is None:
+                return self._reply(404, {'error': 'Ticket not found'})
+            ticket.update(payload)
+            snapshot = dict(ticket)
+        self._reply(200, snapshot)
+
+    def do_POST(self):
+        self._delay()
+        if self.path != '/tickets/purchase':
+            return self._reply(404, {'error': 'Not found'})
+
+        payload = self._read_json()
+        with self.server.lock:
+            self.server.purchase_calls += 1
+            ticket = self.server.tickets.get(payload['ticketId'])
+            if ticket is None:
+                status, body = 404, {'error': 'Ticket not found'}
+            elif ticket['quantityAvailable'] < payload['quantity']:
+                status, body = 409, {'error': 'Not enough tickets available',
+                                     'quantityAvailable': ticket['quantityAvailable']}
+            else:
+                ticket['quantityAvailable'] -= payload['quantity']
+                ticket['quantitySold'] += payload['quantity']
+                status, body = 201, {
+                    'ticketId': payload['ticketId'],
+                    'quantity': payload['quantity'],
+                    'status': 'purchased',
+                    'ticket': dict(ticket)
+                }
+        self._reply(status, body)
+
+    def _delay(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in(tickets=None, latency=0.0):
+    """
+    Levantar el servidor en un hilo y retornar (server, base_url).
+    Llamar a server.shutdown() al terminar.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.latency = latency
+    server.purchase_calls = 0
+    server.tickets = {t['id']: t for t in (tickets or [make_ticket(bench_ticket_id(1))])}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
@@ -0,0 +1,381 @@
+import subprocess
+import sys
+import unittest
+from unittest.mock import AsyncMock, patch
+from src.asgi import create_asgi_app
+from src.models.ticket import Ticket
+from src.controllers import async_tickets_controller
+
+DB_SERVICE = 'src.services.async_database_service.AsyncDatabaseService'
+TICKET_ID = '3f1d2c4b-8a6e-4b7f-9c2d-5e8a1b3c7d90'
+OTHER_TICKET_ID = '9b7e4a12-3c5d-4f6e-8a1b-2c3d4e5f6a7b'
+MISSING_TICKET_ID = '00000000-0000-4000-8000-000000000000'
+
+
+class TestTicketsAsyncIntegration(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        """Configurar la aplicación ASGI de prueba"""
+        self.app = create_asgi_app()
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+        async_tickets_controller.tickets_service.ticket_cache.clear()
+        async_tickets_controller.tickets_service.missing_tickets.clear()
+        async_tickets_controller.idempotency_store.responses.clear()
+        if async_tickets_controller.rate_limiter is not None:
+            async_tickets_controller.rate_limiter.reset()
+
+        self.sample_ticket = {
+            'id': TICKET_ID,
+            'type': 'VIP',
+            'price': 150.0,
+            'quantity_available': 50,
+            'quantity_sold': 10
+        }
+
+    @patch(f'{DB_SERVICE}.get_ticket_by_id', new_callable=AsyncMock)
+    async def test_check_availability_endpoint(self, mock_get_ticket):
+        """Probar disponibilidad en modo asíncrono"""
+        mock_get_ticket.return_value = Ticket.from_dict(self.sample_ticket)
+
+        response = await self.client.get(f'/api/tickets/availability/{TICKET_ID}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(await response.get_json(), {
+            "ticket_id": TICKET_ID,
+            "available_quantity": 50,
+            "available": True
+        })
+
+    @patch(f'{DB_SERVICE}.get_ticket_by_id', new_callable=AsyncMock)
+    async def test_check_availability_endpoint_not_found(self, mock_get_ticket):
+        """Probar disponibilidad para ticket inexistente en modo asíncrono"""
+        mock_get_ticket.return_value = None
+
+        response = await self.client.get(f'/api/tickets/availability/{MISSING_TICKET_ID}')
+
+        self.assertEqual(response.status_code, 404)
+
+    @patch(f'{DB_SERVICE}.get_ticket_by_id', new_callable=AsyncMock)
+    async def test_upstream_error_returns_500(self, mock_get_ticket):
+        """Probar que un fallo de database-service responde 500"""
+        mock_get_ticket.side_effect = Exception("boom")
+
+        response = await self.client.get(f'/api/tickets/availability/{TICKET_ID}')
+        self.assertEqual(response.status_code, 500)
+
+        response = await self.client.get(f'/api/tickets/{TICKET_ID}')
+        self.assertEqual(response.status_code, 500)
+
+    @patch(f'{DB_SERVICE}.get_tickets_by_ids', new_callable=AsyncMock)
+    async def test_bulk_availability_endpoint(self, mock_get_tickets):
+        """Probar disponibilidad masiva en modo asíncrono"""
+        mock_get_tickets.return_value = [Ticket.from_dict(self.sample_ticket)]
+
+        response = await self.client.post(
+            '/api/tickets/availability', json={'ticket_ids': [TICKET_ID, MISSING_TICKET_ID]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(await response.get_json(), {
+            "availability": {TICKET_ID: {"available_quantity": 50, "available": True}},
+            "not_found": [MISSING_TICKET_ID]
+        })
+
+        response = await self.client.post('/api/tickets/availability', data="x")
+        self.assertEqual(response.status_code, 400)
+        response = await self.client.post('/api/tickets/availability', json={})
+        self.assertEqual(response.status_code, 400)
+        response = await self.client.post(
+            '/api/tickets/availability', json={'ticket_ids': []})
+        self.assertEqual(response.status_code, 400)
+
+        mock_get_tickets.side_effect = Exception("boom")
+        response = await self.client.post(
+            '/api/tickets/availability', json={'ticket_ids': [OTHER_TICKET_ID]})
+        self.assertEqual(response.status_code, 500)
+
+    @patch(f'{DB_SERVICE}.purchase_ticket', new_callable=AsyncMock)
+    async def test_purchase_tickets_endpoint(self, mock_purchase):
+        """Probar compra en modo asíncrono"""
+        mock_purchase.return_value = Ticket.from_dict({
+            **self.sample_ticket, 'quantity_available': 45})
+
+        response = await self.client.post(
+            '/api/tickets/purchase', json={'ticket_id': TICKET_ID, 'quantity': 5})
+
+        self.assertEqual(response.status_code, 200)
+        data = await response.get_json()
+        self.assertTrue(data["success"])
+        self.assertEqual(data["purchase"]["remaining_available"], 45)
+
+    @patch(f'{DB_SERVICE}.purchase_ticket', new_callable=AsyncMock)
+    async def test_purchase_tickets_endpoint_errors(self, mock_purchase):
+        """Probar validaciones y errores de compra en modo asíncrono"""
+        response = await self.client.post('/api/tickets/purchase', data="x")
+        self.assertEqual(response.status_code, 400)
+
+        response = await self.client.post(
+            '/api/tickets/purchase', json={'ticket_id': TICKET_ID, 'quantity': 0})
+        self.assertEqual(response.status_code, 400)
+
+        mock_purchase.return_value = None
+        response = await self.client.post(
+            '/api/tickets/purchase', json={'ticket_id': MISSING_TICKET_ID, 'quantity': 1})
+        self.assertEqual(response.status_code, 400)
+
+        mock_purchase.side_effect = Exception("boom")
+        response = await self.client.post(
+            '/api/tickets/purchase', json={'ticket_id': TICKET_ID, 'quantity': 1})
+        self.assertEqual(response.status_code, 500)
+
+    @patch(f'{DB_SERVICE}.get_all_tickets', new_callable=AsyncMock)
+    async def test_get_all_tickets_endpoint(self, mock_get_all):
+        """Probar listado en modo asíncrono"""
+        mock_get_all.return_value = [Ticket.from_dict(self.sample_ticket)]
+
+        response = await self.client.get('/api/tickets/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((await response.get_json())[0]["type"], "VIP")
+
+        mock_get_all.side_effect = Exception("boom")
+        response = await self.client.get('/api/tickets/')
+        self.assertEqual(response.status_code, 500)
+
+    @patch(f'{DB_SERVICE}.get_tickets_page', new_callable=AsyncMock)
+    async def test_get_all_tickets_paginated_and_ndjson(self, mock_get_page):
+        """Probar listado paginado y en streaming en modo asíncrono"""
+        ticket = Ticket.from_dict(self.sample_ticket)
+        mock_get_page.return_value = [ticket]
+
+        response = await self.client.get('/api/tickets/?page=1&page_size=5')
+        data = await response.get_json()
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(data["next_page"])
+
+        mock_get_page.side_effect = [[ticket, ticket], []]
+        response = await self.client.get('/api/tickets/?format=ndjson&page_size=2')
+        body = await response.get_data()
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual(len(body.splitlines()), 2)
+
+        mock_get_page.side_effect = Exception("boom")
+        response = await self.client.get('/api/tickets/?format=ndjson')
+        body = await response.get_data()
+        self.assertIn(b"boom", body)
+
+        response = await self.client.get('/api/tickets/?page=-1')
+        self.assertEqual(response.status_code, 400)
+
+    @patch(f'{DB_SERVICE}.get_ticket_by_id', new_callable=AsyncMock)
+    async def test_get_ticket_info_endpoint(self, mock_get_ticket):
+        """Probar información de ticket en modo asíncrono"""
+        mock_get_ticket.return_value = Ticket.from_dict(self.sample_ticket)
+        response = await self.client.get(f'/api/tickets/{TICKET_ID}')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse((await response.get_json())["sold_out"])
+
+        mock_get_ticket.return_value = None
+        response = await self.client.get(f'/api/tickets/{MISSING_TICKET_ID}')
+        self.assertEqual(response.status_code, 404)
+
+    @patch(f'{DB_SERVICE}.get_ticket_by_id', new_callable=AsyncMock)
+    async def test_conditional_ticket_read(self, mock_get_ticket):
+        """Probar 304 con If-None-Match en modo asíncrono"""
+        mock_get_ticket.return_value = Ticket.from_dict(self.sample_ticket)
+
+        for path in (f'/api/tickets/{TICKET_ID}', f'/api/tickets/availability/{TICKET_ID}'):
+            first = await self.client.get(path)
+            response = await self.client.get(
+                path, headers={'If-None-Match': first.headers['ETag']})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(await response.get_data(), b'')
+
+        mock_get_ticket.assert_awaited_once_with(TICKET_ID)
+
+    @patch(f'{DB_SERVICE}.update_ticket', new_callable=AsyncMock)
+    @patch(f'{DB_SERVICE}.get_ticket_by_id', new_callable=AsyncMock)
+    async def test_update_ticket_endpoint(self, mock_get_ticket, mock_update):
+        """Probar actualización en modo asíncrono"""
+        mock_get_ticket.return_value = Ticket.from_dict(self.sample_ticket)
+        mock_update.return_value = Ticket.from_dict(
+            {**self.sample_ticket, 'price': 200.0})
+
+        response = await self.client.put(f'/api/tickets/{TICKET_ID}', json={'price': 200.0})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((await response.get_json())["price"], 200.0)
+
+    @patch(f'{DB_SERVICE}.get_ticket_by_id', new_callable=AsyncMock)
+    async def test_update_ticket_endpoint_errors(self, mock_get_ticket):
+        """Probar validaciones y errores de actualización en modo asíncrono"""
+        response = await self.client.put(f'/api/tickets/{TICKET_ID}', data="x")
+        self.assertEqual(response.status_code, 400)
+
+        response = await self.client.put(f'/api/tickets/{TICKET_ID}', json={'price': None})
+        self.assertEqual(response.status_code, 400)
+
+        mock_get_ticket.return_value = None
+        response = await self.client.put(f'/api/tickets/{MISSING_TICKET_ID}', json={'price': 1.0})
+        self.assertEqual(response.status_code, 400)
+
+        mock_get_ticket.side_effect = Exception("boom")
+        response = await self.client.put(f'/api/tickets/{TICKET_ID}', json={'price': 1.0})
+        self.assertEqual(response.status_code, 500)
+
+    @patch(f'{DB_SERVICE}.get_ticket_by_id', new_callable=AsyncMock)
+    async def test_open_circuit_returns_503(self, mock_get_ticket):
+        """Probar falla rápida con 503 en modo asíncrono"""
+        from src.utils.circuit_breaker import CircuitOpenError
+        mock_get_ticket.side_effect = CircuitOpenError(1.0)
+
+        response = await self.client.get(f'/api/tickets/{TICKET_ID}')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], "1")
+
+    async def test_metrics_endpoint(self):
+        """Probar /metrics en modo asíncrono"""
+        await self.client.get('/api/tickets/health')
+
+        response = await self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        text = (await response.get_data()).decode()
+        self.assertIn('tickets_http_responses_total'
+                      '{method="GET",route="/api/tickets/health",status="200"}', text)
+        self.assertIn('tickets_singleflight_calls_total{result="executed"}', text)
+
+    def test_asgi_app_does_not_load_sync_controller(self):
+        """Probar que el modo asíncrono no crea el servicio ni el limitador síncronos"""
+        # en un proceso aparte: este módulo de tests ya pudo importar el síncrono
+        code = ("import sys, src.asgi; "
+                "sys.exit('src.controllers.tickets_controller' in sys.modules)")
+        result = subprocess.run([sys.executable, '-c', code])
+
+        self.assertEqual(result.returncode, 0)
+
+    async def test_health_check_endpoint(self):
+        """Probar health check en modo asíncrono"""
+        response = await self.client.get('/api/tickets/health')
+
+        self.assertEqual(response.status_code, 200)
+        data = await response.get_json()
+        self.assertEqual(data["status"], "healthy")
+        self.assertEqual(data["mode"], "async")
+
+    @patch(f'{DB_SERVICE}.purchase_ticket', new_callable=AsyncMock)
+    async def test_purchase_batch_endpoint(self, mock_purchase):
+        """Probar compra en lote en modo asíncrono"""
+        mock_purchase.side_effect = [Ticket.from_dict(self.sample_ticket), None]
+
+        response = await self.client.post('/api/tickets/purchase/batch', json={'items': [
+            {'ticket_id': TICKET_ID, 'quantity': 2},
+            {'ticket_id': MISSING_TICKET_ID, 'quantity': 1}
+        ]})
+
+        self.assertEqual(response.status_code, 207)
+        data = await response.get_json()
+        self.assertEqual(data["total_quantity"], 2)
+        self.assertFalse(data["items"][1]["success"])
+
+        response = await self.client.post(
+            '/api/tickets/purchase/batch', json={'items': "x"})
+        self.assertEqual(response.status_code, 400)
+
+
+    @patch('src.controllers.async_tickets_controller.Config.AVAILABILITY_STREAM_MAX_SECONDS', 0)
+    @patch(f'{DB_SERVICE}.get_tickets_by_ids', new_callable=AsyncMock)
+    async def test_availability_stream(self, mock_get_tickets):
+        """Probar el stream SSE en modo asíncrono y la liberación de la suscripción"""
+        mock_get_tickets.return_value = [Ticket.from_dict(self.sample_ticket)]
+
+        response = await self.client.get(
+            f'/api/tickets/availability/stream?ids={TICKET_ID},{OTHER_TICKET_ID}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        body = (await response.get_data()).decode()
+        self.assertTrue(body.startswith('retry: 3000\nevent: availability\n'))
+        self.assertIn(f'"not_found": ["{OTHER_TICKET_ID}"]', body)
+        self.assertEqual(
+            async_tickets_controller.tickets_service.availability_feed.subscribers, 0)
+
+    async def test_availability_stream_invalid_ids(self):
+        """Probar que el stream exige al menos un ID"""
+        response = await self.client.get('/api/tickets/availability/stream?ids=')
+
+        self.assertEqual(response.status_code, 400)
+
+
+    @patch(f'{DB_SERVICE}.purchase_ticket', new_callable=AsyncMock)
+    async def test_purchase_with_idempotency_key(self, mock_purchase):
+        """Probar reintentos con Idempotency-Key en modo asíncrono"""
+        mock_purchase.return_value = Ticket.from_dict(self.sample_ticket)
+        headers = {'Idempotency-Key': 'compra-789'}
+        body = {'ticket_id': TICKET_ID, 'quantity': 2}
+
+        first = await self.client.post('/api/tickets/purchase', json=body, headers=headers)
+        retry = await self.client.post('/api/tickets/purchase', json=body, headers=headers)
+        reused = await self.client.post('/api/tickets/purchase', headers=headers,
+                                        json={'ticket_id': TICKET_ID, 'quantity': 3})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(retry.headers['Idempotent-Replayed'], 'true')
+        self.assertEqual(await retry.get_json(), await first.get_json())
+        self.assertEqual(reused.status_code, 422)
+        mock_purchase.assert_awaited_once_with(TICKET_ID, 2)
+
+    @patch(f'{DB_SERVICE}.purchase_ticket', new_callable=AsyncMock)
+    async def test_idempotency_key_is_scoped_per_client(self, mock_purchase):
+        """Probar que otro cliente con la misma clave no recibe la respuesta ajena"""
+        mock_purchase.return_value = Ticket.from_dict(self.sample_ticket)
+        headers = {'Idempotency-Key': 'compartida'}
+        body = {'ticket_id': TICKET_ID, 'quantity': 1}
+
+        await self.client.post('/api/tickets/purchase', json=body, headers=headers,
+                               scope_base={'client': ('198.51.100.1', 1234)})
+        other = await self.client.post('/api/tickets/purchase', headers=headers,
+                                       json={**body, 'quantity': 3},
+                                       scope_base={'client': ('198.51.100.2', 1234)})
+
+        self.assertEqual(other.status_code, 200)
+        self.assertNotIn('Idempotent-Replayed', other.headers)
+        self.assertEqual(mock_purchase.await_count, 2)
+
+    @patch(f'{DB_SERVICE}.purchase_ticket', new_callable=AsyncMock)
+    async def test_rate_limit(self, mock_purchase):
+        """Probar el 429 con Retry-After al agotar la cubeta de compras en modo asíncrono"""
+        from src.utils.rate_limiter import build_rate_limiter
+        mock_purchase.return_value = Ticket.from_dict(self.sample_ticket)
+        limiter = build_rate_limiter({'purchase': (1, 1)}, 100)
+        body = {'ticket_id': TICKET_ID, 'quantity': 1}
+
+        with patch.object(async_tickets_controller, 'rate_limiter', limiter):
+            first = await self.client.post('/api/tickets/purchase', json=body)
+            limited = await self.client.post('/api/tickets/purchase', json=body)
+            # health no tiene clase de límite
+            health = await self.client.get('/api/tickets/health')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(limited.status_code, 429)
+        self.assertEqual(limited.headers['Retry-After'], '1')
+        self.assertEqual((await health.get_json())["rate_limit"]["purchase"]["limited"], 1)
+        mock_purchase.assert_awaited_once()
+
+    @patch(f'{DB_SERVICE}.get_ticket_by_id', new_callable=AsyncMock)
+    async def test_malformed_ids_and_negative_cache(self, mock_get_ticket):
+        """Probar el 400 sin I/O para IDs mal formados y la caché negativa en modo asíncrono"""
+        mock_get_ticket.return_value = None
+
+        malformed = await self.client.get('/api/tickets/availability/1')
+        misses = [(await self.client.get(f'/api/tickets/{MISSING_TICKET_ID}')).status_code
+                  for _ in range(2)]
+
+        self.assertEqual(malformed.status_code, 400)
+        self.assertEqual(misses, [404, 404])
+        mock_get_ticket.assert_awaited_once_with(MISSING_TICKET_ID)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,11 @@ import unittest
 from unittest.mock import Mock, patch
 import json
 from src.app import create_app
+from src.controllers import tickets_controller
+
+TICKET_ID = '3f1d2c4b-8a6e-4b7f-9c2d-5e8a1b3c7d90'
+OTHER_TICKET_ID = '9b7e4a12-3c5d-4f6e-8a1b-2c3d4e5f6a7b'
+MISSING_TICKET_ID = '00000000-0000-4000-8000-000000000000'
 
 
 class TestTicketsIntegration(unittest.TestCase):
@@ -11,10 +16,15 @@ class TestTicketsIntegration(unittest.TestCase):
         self.app = create_app()
         self.app.config['TESTING'] = True
         self.client = self.app.test_client()
+        tickets_controller.tickets_service.ticket_cache.clear()
+        tickets_controller.tickets_service.missing_tickets.clear()
+        tickets_controller.idempotency_store.responses.clear()
+        if tickets_controller.rate_limiter is not None:
+            tickets_controller.rate_limiter.reset()
 
         # Datos de prueba
         self.sample_ticket = {
-            'id': "1",
+            'id': TICKET_ID,
             'type': 'VIP',
             'price': 150.0,
             'quantity_available': 50,
@@ -27,13 +37,13 @@ class TestTicketsIntegration(unittest.TestCase):
         from src.models.ticket import Ticket
         mock_get_ticket.return_value = Ticket.from_dict(self.sample_ticket)
 
-        response = self.client.get('/api/tickets/availability/1')
+        response = self.client.get(f'/api/tickets/availability/{TICKET_ID}')
 
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.data)
 
         expected = {
-            "ticket_id": "1",
+            "ticket_id": TICKET_ID,
             "available_quantity": 50,
             "available": True
         }
@@ -44,30 +54,82 @@ class TestTicketsIntegration(unittest.TestCase):
         """Probar endpoint de verificación de disponibilidad para ticket inexistente"""
         mock_get_ticket.return_value = None
 
-        response = self.client.get('/api/tickets/availability/999')
+        response = self.client.get(f'/api/tickets/availability/{MISSING_TICKET_ID}')
 
         self.assertEqual(response.status_code, 404)
         data = json.loads(response.data)
         self.assertIn("error", data)
         self.assertIn("Entrada no encontrada", data["error"])
 
-    @patch('src.services.database_service.DatabaseService.update_ticket')
-    @patch('src.services.database_service.DatabaseService.get_ticket_by_id')
-    def test_purchase_tickets_endpoint_successful(self, mock_get_ticket, mock_update_ticket):
+    @patch('src.services.database_service.DatabaseService.get_tickets_by_ids')
+    def test_bulk_availability_endpoint(self, mock_get_tickets):
+        """Probar disponibilidad de varias entradas en una sola solicitud"""
+        from src.models.ticket import Ticket
+        mock_get_tickets.return_value = [
+            Ticket.from_dict(self.sample_ticket),
+            Ticket.from_dict({**self.sample_ticket, 'id': OTHER_TICKET_ID, 'quantity_available': 0})
+        ]
+
+        response = self.client.post(
+            '/api/tickets/availability',
+            data=json.dumps({'ticket_ids': [TICKET_ID, OTHER_TICKET_ID, MISSING_TICKET_ID]}),
+            content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data), {
+            "availability": {
+                TICKET_ID: {"available_quantity": 50, "available": True},
+                OTHER_TICKET_ID: {"available_quantity": 0, "available": False}
+            },
+            "not_found": [MISSING_TICKET_ID]
+        })
+        mock_get_tickets.assert_called_once_with([TICKET_ID, OTHER_TICKET_ID, MISSING_TICKET_ID])
+
+    @patch('src.services.database_service.DatabaseService.get_tickets_by_ids')
+    def test_bulk_availability_endpoint_invalid_data(self, mock_get_tickets):
+        """Probar validaciones de la consulta masiva de disponibilidad"""
+        invalid_bodies = [
+            {},
+            {'ticket_ids': []},
+            {'ticket_ids': TICKET_ID},
+            {'ticket_ids': [TICKET_ID, 2]},
+            {'ticket_ids': [str(i) for i in range(101)]}
+        ]
+        response = self.client.post('/api/tickets/availability', data="x")
+        self.assertEqual(response.status_code, 400)
+
+        for body in invalid_bodies:
+            response = self.client.post(
+                '/api/tickets/availability',
+                data=json.dumps(body),
+                content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 400)
+
+        mock_get_tickets.side_effect = Exception("boom")
+        response = self.client.post(
+            '/api/tickets/availability',
+            data=json.dumps({'ticket_ids': [TICKET_ID]}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 500)
+        mock_get_tickets.assert_called_once()
+
+    @patch('src.services.database_service.DatabaseService.purchase_ticket')
+    def test_purchase_tickets_endpoint_successful(self, mock_purchase_ticket):
         """Probar endpoint de compra exitosa de tickets"""
         from src.models.ticket import Ticket
-        original_ticket = Ticket.from_dict(self.sample_ticket)
         updated_ticket = Ticket.from_dict({
             **self.sample_ticket,
             'quantity_available': 45,
             'quantity_sold': 15
         })
 
-        mock_get_ticket.return_value = original_ticket
-        mock_update_ticket.return_value = updated_ticket
+        mock_purchase_ticket.return_value = updated_ticket
 
         request_data = {
-            'ticket_id': "1",
+            'ticket_id': TICKET_ID,
             'quantity': 5
         }
 
@@ -103,7 +165,7 @@ class TestTicketsIntegration(unittest.TestCase):
 
         # Solicitud con cantidad inválida
         request_data = {
-            'ticket_id': "1",
+            'ticket_id': TICKET_ID,
             'quantity': 0
         }
         response = self.client.post(
@@ -126,22 +188,101 @@ class TestTicketsIntegration(unittest.TestCase):
         data = json.loads(response.data)
 
         self.assertEqual(len(data), 1)
-        self.assertEqual(data[0]["id"], "1")
+        self.assertEqual(data[0]["id"], TICKET_ID)
         self.assertEqual(data[0]["type"], "VIP")
         self.assertTrue(data[0]["available"])
 
+    @patch('src.services.database_service.DatabaseService.get_ticket_by_id')
+    def test_conditional_ticket_read_uses_cache(self, mock_get_ticket):
+        """Probar 304 con If-None-Match sin llamar a database-service"""
+        from src.models.ticket import Ticket
+        mock_get_ticket.return_value = Ticket.from_dict(self.sample_ticket)
+
+        response = self.client.get(f'/api/tickets/{TICKET_ID}')
+        etag = response.headers['ETag']
+        self.assertEqual(response.status_code, 200)
+
+        for path in (f'/api/tickets/{TICKET_ID}', f'/api/tickets/availability/{TICKET_ID}'):
+            first = self.client.get(path)
+            response = self.client.get(
+                path, headers={'If-None-Match': first.headers['ETag']})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.data, b'')
+            self.assertEqual(response.headers['ETag'], first.headers['ETag'])
+
+        mock_get_ticket.assert_called_once_with(TICKET_ID)
+
+        tickets_controller.tickets_service.ticket_cache.set(TICKET_ID, Ticket.from_dict({
+            **self.sample_ticket, 'quantity_available': 49}))
+        response = self.client.get(f'/api/tickets/{TICKET_ID}', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    @patch('src.services.database_service.DatabaseService.get_all_tickets')
+    def test_conditional_ticket_listing(self, mock_get_all):
+        """Probar 304 en el listado cuando no cambió ninguna entrada"""
+        from src.models.ticket import Ticket
+        mock_get_all.return_value = [Ticket.from_dict(self.sample_ticket)]
+
+        etag = self.client.get('/api/tickets/').headers['ETag']
+        response = self.client.get('/api/tickets/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get('/api/tickets/', headers={'If-None-Match': '"otro"'})
+        self.assertEqual(response.status_code, 200)
+
+    @patch('src.services.database_service.DatabaseService.get_tickets_page')
+    def test_get_all_tickets_paginated(self, mock_get_page):
+        """Probar listado paginado de entradas"""
+        from src.models.ticket import Ticket
+        mock_get_page.return_value = [Ticket.from_dict(self.sample_ticket)]
+
+        response = self.client.get('/api/tickets/?page=2&page_size=1')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['page'], 2)
+        self.assertEqual(data['next_page'], 3)
+        self.assertEqual(data['items'][0]['id'], TICKET_ID)
+        mock_get_page.assert_called_once_with(2, 1)
+
+        for query in ('page=0', 'page_size=abc', 'page_size=100000'):
+            response = self.client.get(f'/api/tickets/?{query}')
+            self.assertEqual(response.status_code, 400)
+
+    @patch('src.services.database_service.DatabaseService.get_tickets_page')
+    def test_get_all_tickets_ndjson_stream(self, mock_get_page):
+        """Probar listado en streaming NDJSON recorriendo varias páginas"""
+        from src.models.ticket import Ticket
+        ticket = Ticket.from_dict(self.sample_ticket)
+        mock_get_page.side_effect = [[ticket, ticket], [ticket]]
+
+        response = self.client.get('/api/tickets/?format=ndjson&page_size=2')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = [json.loads(line) for line in response.data.splitlines()]
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(mock_get_page.call_count, 2)
+
+        mock_get_page.side_effect = Exception("Connection error")
+        response = self.client.get(
+            '/api/tickets/', headers={'Accept': 'application/x-ndjson'})
+        last = json.loads(response.data.splitlines()[-1])
+        self.assertIn("Connection error", last['error'])
+
     @patch('src.services.database_service.DatabaseService.get_ticket_by_id')
     def test_get_ticket_info_endpoint(self, mock_get_ticket):
         """Probar endpoint para obtener información de ticket específico"""
         from src.models.ticket import Ticket
         mock_get_ticket.return_value = Ticket.from_dict(self.sample_ticket)
 
-        response = self.client.get('/api/tickets/1')
+        response = self.client.get(f'/api/tickets/{TICKET_ID}')
 
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.data)
 
-        self.assertEqual(data["id"], "1")
+        self.assertEqual(data["id"], TICKET_ID)
         self.assertEqual(data["type"], "VIP")
         self.assertTrue(data["available"])
         self.assertFalse(data["sold_out"])
@@ -164,7 +305,7 @@ class TestTicketsIntegration(unittest.TestCase):
         update_data = {'price': 200.0}
 
         response = self.client.put(
-            '/api/tickets/1',
+            f'/api/tickets/{TICKET_ID}',
             data=json.dumps(update_data),
             content_type='application/json'
         )
@@ -175,6 +316,51 @@ class TestTicketsIntegration(unittest.TestCase):
         self.assertEqual(data["price"], 200.0)
         self.assertTrue(data["available"])
 
+    @patch('src.services.database_service.DatabaseService.get_ticket_by_id')
+    def test_open_circuit_returns_503(self, mock_get_ticket):
+        """Probar falla rápida con 503 y Retry-After con el circuito abierto"""
+        from src.utils.circuit_breaker import CircuitOpenError
+        mock_get_ticket.side_effect = CircuitOpenError(2.5)
+
+        response = self.client.get(f'/api/tickets/availability/{TICKET_ID}')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], "3")
+
+    def test_health_check_reports_open_circuit(self):
+        """Probar que el health check publica el estado del circuit breaker"""
+        breaker = tickets_controller.tickets_service.db_service.breaker
+        self.assertEqual(
+            json.loads(self.client.get('/api/tickets/health').data)
+            ["circuit_breaker"]["state"], "closed")
+
+        with patch.object(breaker, 'state', 'open'):
+            data = json.loads(self.client.get('/api/tickets/health').data)
+
+        self.assertEqual(data["status"], "degraded")
+        self.assertEqual(data["circuit_breaker"]["state"], "open")
+
+    @patch('requests.Session.get')
+    def test_metrics_endpoint(self, mock_get):
+        """Probar /metrics: latencia por ruta, códigos y llamadas a database-service"""
+        mock_get.return_value = Mock(status_code=200, json=Mock(return_value=self.sample_ticket))
+
+        self.client.get(f'/api/tickets/{TICKET_ID}')
+        self.client.get('/api/tickets/availability/')
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain; version=0.0.4'))
+        text = response.data.decode()
+        self.assertIn('tickets_http_request_duration_seconds_count'
+                      '{method="GET",route="/api/tickets/<ticket_id>"}', text)
+        self.assertIn('tickets_http_responses_total'
+                      '{method="GET",route="/api/tickets/<ticket_id>",status="200"}', text)
+        self.assertIn('tickets_http_requests_in_flight 1', text)
+        self.assertIn('tickets_database_service_call_duration_seconds_count'
+                      '{operation="get_ticket_by_id",outcome="ok"}', text)
+        self.assertIn('tickets_circuit_breaker_state{state="closed"} 1', text)
+
     def test_health_check_endpoint(self):
         """Probar endpoint de verificación de salud"""
         response = self.client.get('/api/tickets/health')
@@ -185,6 +371,262 @@ class TestTicketsIntegration(unittest.TestCase):
         self.assertEqual(data["service"], "tickets-service")
         self.assertEqual(data["status"], "healthy")
 
+    @patch('src.services.database_service.DatabaseService.purchase_ticket')
+    def test_purchase_batch_endpoint(self, mock_purchase_ticket):
+        """Probar compra en lote: 200 si todo se compra, 207 si es parcial"""
+        from src.models.ticket import Ticket
+        mock_purchase_ticket.return_value = Ticket.from_dict(self.sample_ticket)
+
+        items = [{'ticket_id': TICKET_ID, 'quantity': 2}, {'ticket_id': OTHER_TICKET_ID, 'quantity': 1}]
+        response = self.client.post(
+            '/api/tickets/purchase/batch', json={'items': items})
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertTrue(data['success'])
+        self.assertEqual(data['total_quantity'], 3)
+        self.assertEqual(data['total_amount'], 450.0)
+
+        mock_purchase_ticket.side_effect = [Ticket.from_dict(self.sample_ticket), None]
+        response = self.client.post(
+            '/api/tickets/purchase/batch', json={'items': items})
+
+        self.assertEqual(response.status_code, 207)
+        data = json.loads(response.data)
+        self.assertEqual(data['failed_count'], 1)
+
+    @patch('src.services.database_service.DatabaseService.purchase_ticket')
+    def test_purchase_batch_endpoint_invalid_data(self, mock_purchase_ticket):
+        """Probar que la validación reporta todos los ítems inválidos a la vez"""
+        response = self.client.post(
+            '/api/tickets/purchase/batch', json={'items': []})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/tickets/purchase/batch', json={'items': [
+            {'ticket_id': TICKET_ID, 'quantity': 0},
+            {'ticket_id': OTHER_TICKET_ID, 'quantity': 1},
+            {'ticket_id': OTHER_TICKET_ID, 'quantity': 1},
+            "x"
+        ]})
+        self.assertEqual(response.status_code, 400)
+        errors = json.loads(response.data)['errors']
+        self.assertEqual(len(errors), 3)
+        self.assertTrue(errors[0].startswith("items[0]"))
+        self.assertIn("duplicado", errors[1])
+
+        too_many = [{'ticket_id': str(i), 'quantity': 1} for i in range(21)]
+        response = self.client.post(
+            '/api/tickets/purchase/batch', json={'items': too_many})
+        self.assertEqual(response.status_code, 400)
+        mock_purchase_ticket.assert_not_called()
+
+    @patch('src.controllers.tickets_controller.Config.AVAILABILITY_STREAM_HEARTBEAT', 0.05)
+    @patch('src.services.tickets_service.Config.AVAILABILITY_STREAM_POLL_INTERVAL', 0)
+    @patch('src.services.database_service.DatabaseService.purchase_ticket')
+    @patch('src.services.database_service.DatabaseService.get_tickets_by_ids')
+    def test_availability_stream(self, mock_get_tickets, mock_purchase_ticket):
+        """Probar el stream SSE: foto inicial, cambio tras una compra y keep-alive"""
+        from src.models.ticket import Ticket
+        mock_get_tickets.return_value = [Ticket.from_dict(self.sample_ticket)]
+        mock_purchase_ticket.return_value = Ticket.from_dict(
+            {**self.sample_ticket, 'quantity_available': 48})
+        feed = tickets_controller.tickets_service.availability_feed
+
+        response = self.client.get(
+            f'/api/tickets/availability/stream?ids={TICKET_ID},{MISSING_TICKET_ID},{TICKET_ID}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        events = iter(response.response)
+
+        first = next(events)
+        self.assertTrue(first.startswith(b'retry: 3000\nevent: availability\ndata: '))
+        self.assertEqual(json.loads(first.split(b'data: ')[1]), {
+            "availability": {TICKET_ID: {"available_quantity": 50, "available": True}},
+            "not_found": [MISSING_TICKET_ID]
+        })
+        self.assertEqual(feed.subscribers, 1)
+
+        self.client.post('/api/tickets/purchase', json={'ticket_id': TICKET_ID, 'quantity': 2})
+        self.assertEqual(json.loads(next(events).split(b'data: ')[1]), {
+            "availability": {TICKET_ID: {"available_quantity": 48, "available": True}},
+            "not_found": []
+        })
+        self.assertEqual(next(events), b': keep-alive\n\n')
+
+        response.close()
+        self.assertEqual(feed.subscribers, 0)
+
+    def test_availability_stream_rejections(self):
+        """Probar 400 sin IDs válidos y 503 al superar el máximo de streams"""
+        self.assertEqual(self.client.get('/api/tickets/availability/stream').status_code, 400)
+        self.assertEqual(
+            self.client.get(
+                f'/api/tickets/availability/stream?ids={TICKET_ID},,{OTHER_TICKET_ID}').status_code,
+            400)
+
+        feed = tickets_controller.tickets_service.availability_feed
+        with patch.object(feed, 'max_subscribers', 0):
+            response = self.client.get(f'/api/tickets/availability/stream?ids={TICKET_ID}')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response.headers)
+
+
+    def test_purchase_with_full_queue_returns_503(self):
+        """Probar que una compra rechazada por la cola de su entrada responde 503"""
+        from src.utils.batch_queue import QueueFullError
+        queue = tickets_controller.tickets_service.purchase_queue
+        with patch.object(queue, 'submit', side_effect=QueueFullError(TICKET_ID, 1000)):
+            response = self.client.post('/api/tickets/purchase',
+                                        json={'ticket_id': TICKET_ID, 'quantity': 1})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '1')
+
+
+    @patch('src.services.database_service.DatabaseService.purchase_ticket')
+    def test_purchase_with_idempotency_key(self, mock_purchase_ticket):
+        """Probar que un reintento con la misma Idempotency-Key no vuelve a comprar"""
+        from src.models.ticket import Ticket
+        mock_purchase_ticket.return_value = Ticket.from_dict(self.sample_ticket)
+        headers = {'Idempotency-Key': 'compra-123'}
+        body = {'ticket_id': TICKET_ID, 'quantity': 2}
+
+        first = self.client.post('/api/tickets/purchase', json=body, headers=headers)
+        retry = self.client.post('/api/tickets/purchase', json=body, headers=headers)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertNotIn('Idempotent-Replayed', first.headers)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry.headers['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.get_json(), first.get_json())
+        self.assertEqual(retry.content_type, 'application/json')
+        mock_purchase_ticket.assert_called_once_with(TICKET_ID, 2)
+
+        # la misma clave en la compra en lote es otra operación
+        batch = self.client.post('/api/tickets/purchase/batch', headers=headers,
+                                 json={'items': [body]})
+        self.assertEqual(batch.status_code, 200)
+        self.assertEqual(mock_purchase_ticket.call_count, 2)
+
+    @patch('src.services.database_service.DatabaseService.purchase_ticket')
+    def test_idempotency_key_is_scoped_per_client(self, mock_purchase_ticket):
+        """Probar que dos clientes con la misma Idempotency-Key no comparten compras"""
+        from src.models.ticket import Ticket
+        mock_purchase_ticket.return_value = Ticket.from_dict(self.sample_ticket)
+        body = {'ticket_id': TICKET_ID, 'quantity': 1}
+
+        first = self.client.post('/api/tickets/purchase', json=body,
+                                 headers={'Idempotency-Key': 'compartida'},
+                                 environ_base={'REMOTE_ADDR': '198.51.100.1'})
+        other = self.client.post('/api/tickets/purchase', json={**body, 'quantity': 3},
+                                 headers={'Idempotency-Key': 'compartida'},
+                                 environ_base={'REMOTE_ADDR': '198.51.100.2'})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(other.status_code, 200)
+        self.assertNotIn('Idempotent-Replayed', other.headers)
+        self.assertEqual(mock_purchase_ticket.call_count, 2)
+        mock_purchase_ticket.assert_called_with(TICKET_ID, 3)
+
+    @patch('src.services.database_service.DatabaseService.purchase_ticket')
+    def test_idempotency_key_errors(self, mock_purchase_ticket):
+        """Probar la clave reutilizada con otro cuerpo (422) y la clave inválida (400)"""
+        from src.models.ticket import Ticket
+        mock_purchase_ticket.return_value = Ticket.from_dict(self.sample_ticket)
+        headers = {'Idempotency-Key': 'compra-456'}
+
+        self.client.post('/api/tickets/purchase', headers=headers,
+                         json={'ticket_id': TICKET_ID, 'quantity': 1})
+        reused = self.client.post('/api/tickets/purchase', headers=headers,
+                                  json={'ticket_id': TICKET_ID, 'quantity': 5})
+        invalid = self.client.post('/api/tickets/purchase', headers={'Idempotency-Key': 'x' * 256},
+                                   json={'ticket_id': TICKET_ID, 'quantity': 1})
+
+        self.assertEqual(reused.status_code, 422)
+        self.assertEqual(invalid.status_code, 400)
+        mock_purchase_ticket.assert_called_once()
+
+    @patch('src.services.database_service.DatabaseService.get_ticket_by_id')
+    @patch('src.services.database_service.DatabaseService.purchase_ticket')
+    def test_rate_limit_per_client_and_route_class(self, mock_purchase_ticket, mock_get_ticket):
+        """Probar el 429 al agotar la cubeta de compras sin afectar lecturas ni a otros clientes"""
+        from src.models.ticket import Ticket
+        from src.utils.rate_limiter import build_rate_limiter
+        mock_purchase_ticket.return_value = Ticket.from_dict(self.sample_ticket)
+        mock_get_ticket.return_value = Ticket.from_dict(self.sample_ticket)
+        limiter = build_rate_limiter({'purchase': (0.5, 2), 'read': (100, 100)}, 100)
+        body = {'ticket_id': TICKET_ID, 'quantity': 1}
+
+        with patch.object(tickets_controller, 'rate_limiter', limiter), \
+                patch.object(tickets_controller.Config, 'RATE_LIMIT_CLIENT_HEADER', 'X-API-Key'):
+            statuses = [self.client.post('/api/tickets/purchase', json=body).status_code
+                        for _ in range(3)]
+            limited = self.client.post('/api/tickets/purchase', json=body)
+            read = self.client.get(f'/api/tickets/availability/{TICKET_ID}')
+            other_client = self.client.post('/api/tickets/purchase', json=body,
+                                            headers={'X-API-Key': 'otro'})
+            health = self.client.get('/api/tickets/health')
+
+        self.assertEqual(statuses, [200, 200, 429])
+        self.assertEqual(limited.status_code, 429)
+        self.assertEqual(limited.headers['Retry-After'], '2')
+        self.assertEqual(read.status_code, 200)
+        self.assertEqual(other_client.status_code, 200)
+        self.assertEqual(mock_purchase_ticket.call_count, 3)
+        self.assertEqual(health.get_json()["rate_limit"]["purchase"]["limited"], 2)
+
+    def test_client_identity_trusts_forwarded_for_only_behind_proxies(self):
+        """Probar que X-Forwarded-For se usa solo con proxies de confianza configurados"""
+        headers = {'X-Forwarded-For': '198.51.100.7, 203.0.113.9'}
+        environ = {'REMOTE_ADDR': '10.0.0.2'}
+
+        with self.app.test_request_context(headers=headers, environ_base=environ):
+            from flask import request
+            self.assertEqual(tickets_controller.client_identity(request), 'ip:10.0.0.2')
+            with patch.object(tickets_controller.Config, 'RATE_LIMIT_TRUSTED_PROXIES', 1):
+                self.assertEqual(tickets_controller.client_identity(request), 'ip:203.0.113.9')
+            with patch.object(tickets_controller.Config, 'RATE_LIMIT_TRUSTED_PROXIES', 2):
+                self.assertEqual(tickets_controller.client_identity(request), 'ip:198.51.100.7')
+            # menos direcciones que proxies: el header no es confiable
+            with patch.object(tickets_controller.Config, 'RATE_LIMIT_TRUSTED_PROXIES', 3):
+                self.assertEqual(tickets_controller.client_identity(request), 'ip:10.0.0.2')
+
+    @patch('src.services.database_service.DatabaseService.purchase_ticket')
+    @patch('src.services.database_service.DatabaseService.get_tickets_by_ids')
+    @patch('src.services.database_service.DatabaseService.get_ticket_by_id')
+    def test_malformed_ticket_ids_are_rejected_without_io(self, mock_get_ticket,
+                                                          mock_get_tickets, mock_purchase_ticket):
+        """Probar que los IDs que no son UUID responden 400 sin llamar a database-service"""
+        responses = [
+            self.client.get('/api/tickets/availability/1'),
+            self.client.get('/api/tickets/wp-login.php'),
+            self.client.put(f'/api/tickets/{TICKET_ID[:-1]}', json={'price': 1.0}),
+            self.client.post('/api/tickets/availability', json={'ticket_ids': [TICKET_ID, 'x']}),
+            self.client.post('/api/tickets/purchase', json={'ticket_id': '1', 'quantity': 1})
+        ]
+
+        self.assertEqual([response.status_code for response in responses], [400] * 5)
+        mock_get_ticket.assert_not_called()
+        mock_get_tickets.assert_not_called()
+        mock_purchase_ticket.assert_not_called()
+
+    @patch('src.services.database_service.DatabaseService.get_ticket_by_id')
+    def test_repeated_misses_use_negative_cache(self, mock_get_ticket):
+        """Probar que un 404 confirmado no vuelve a consultar a database-service"""
+        mock_get_ticket.return_value = None
+
+        statuses = [self.client.get(path).status_code for path in (
+            f'/api/tickets/{MISSING_TICKET_ID}',
+            f'/api/tickets/availability/{MISSING_TICKET_ID}',
+            f'/api/tickets/{MISSING_TICKET_ID}')]
+        health = self.client.get('/api/tickets/health').get_json()
+
+        self.assertEqual(statuses, [404, 404, 404])
+        mock_get_ticket.assert_called_once_with(MISSING_TICKET_ID)
+        self.assertEqual(health["missing_tickets_cache"]["hits"], 2)
+
 
 if __name__ == '__main__':
     unittest.main()
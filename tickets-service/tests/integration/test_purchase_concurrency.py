@@ -0,0 +1,142 @@
+import json
+import re
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from src.services.tickets_service import TicketsService
+
+
+class AtomicPurchaseHandler(BaseHTTPRequestHandler):
+    """
+    Imita POST /tickets/purchase de database-service: decremento atómico
+    condicionado a que haya stock suficiente (updateMany ... gte qty)
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length))
+        store = self.server.store
+
+        with self.server.lock:
+            store['purchase_calls'] += 1
+            ticket = store['tickets'].get(payload['ticketId'])
+            if ticket is None:
+                return self._reply(404, {'error': 'Ticket not found'})
+            if ticket['quantityAvailable'] < payload['quantity']:
+                return self._reply(409, {'error': 'Not enough tickets available',
+                                         'quantityAvailable': ticket['quantityAvailable']})
+            ticket['quantityAvailable'] -= payload['quantity']
+            ticket['quantitySold'] += payload['quantity']
+            snapshot = dict(ticket)
+
+        self._reply(201, {
+            'ticketId': payload['ticketId'],
+            'quantity': payload['quantity'],
+            'status': 'purchased',
+            'ticket': snapshot
+        })
+
+    def do_GET(self):
+        match = re.fullmatch(r'/tickets/([^/]+)', self.path)
+        ticket = self.server.store['tickets'].get(match.group(1)) if match else None
+        if ticket is None:
+            return self._reply(404, {'error': 'Ticket not found'})
+        self._reply(200, ticket)
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestPurchaseConcurrency(unittest.TestCase):
+    """Compras concurrentes contra una misma entrada no deben sobrevender"""
+
+    STOCK = 250
+    PURCHASES = 400
+    WORKERS = 32
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), AtomicPurchaseHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.store = {
+            'purchase_calls': 0,
+            'tickets': {
+                'hot': {
+                    'id': 'hot',
+                    'type': 'GENERAL',
+                    'price': 20.0,
+                    'quantityAvailable': self.STOCK,
+                    'quantitySold': 0
+                }
+            }
+        }
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.tickets_service = self.build_service()
+
+    def build_service(self):
+        tickets_service = TicketsService()
+        tickets_service.db_service.base_url = \
+            f"http://127.0.0.1:{self.server.server_address[1]}"
+        return tickets_service
+
+    def tearDown(self):
+        self.tickets_service.db_service.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _purchase(self, _):
+        try:
+            return self.tickets_service.purchase_tickets('hot', 1)
+        except ValueError:
+            return None
+
+    def run_purchases(self):
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            results = list(pool.map(self._purchase, range(self.PURCHASES)))
+
+        succeeded = [r for r in results if r is not None]
+        ticket = self.server.store['tickets']['hot']
+
+        self.assertEqual(len(succeeded), self.STOCK)
+        self.assertEqual(ticket['quantityAvailable'], 0)
+        self.assertEqual(ticket['quantitySold'], self.STOCK)
+        # cada comprobante ve el stock como si las compras se hubieran hecho en serie
+        self.assertEqual(sorted(r['remaining_available'] for r in succeeded),
+                         list(range(self.STOCK)))
+
+    def test_parallel_purchases_never_oversell(self):
+        """Probar cientos de compras paralelas agrupadas por la cola de compras"""
+        self.run_purchases()
+
+        # la cola agrupa las compras simultáneas en menos decrementos
+        self.assertLess(self.server.store['purchase_calls'], self.PURCHASES)
+        stats = self.tickets_service.purchase_queue.stats()
+        self.assertEqual(stats["items"], self.PURCHASES)
+        self.assertEqual(stats["pending"], 0)
+
+    def test_parallel_purchases_without_queue(self):
+        """Probar que sin la cola cada compra hace su propio decremento atómico"""
+        self.tickets_service.db_service.close()
+        with patch('src.services.tickets_service.Config.PURCHASE_QUEUE_ENABLED', False):
+            self.tickets_service = self.build_service()
+
+        self.run_purchases()
+
+        self.assertEqual(self.server.store['purchase_calls'], self.PURCHASES)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+import inspect
+import unittest
+import httpx
+from src.services.async_database_service import AsyncDatabaseService
+from src.services.database_service import InsufficientTicketsError
+from src.models.ticket import Ticket
+
+
+class TestAsyncDatabaseService(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        """Configurar el cliente asíncrono con un transporte simulado"""
+        self.service = AsyncDatabaseService()
+        self.sample_ticket_data = {
+            'id': "1",
+            'type': 'VIP',
+            'price': 150.0,
+            'quantity_available': 50,
+            'quantity_sold': 10
+        }
+        self.requests = []
+
+    async def asyncTearDown(self):
+        await self.service.aclose()
+
+    def use_handler(self, handler):
+        """Reemplazar el transporte del cliente por uno en memoria"""
+        async def record(request):
+            self.requests.append(request)
+            response = handler(request)
+            if inspect.isawaitable(response):
+                response = await response
+            return response
+
+        self.service._client = httpx.AsyncClient(
+            base_url=self.service.base_url,
+            transport=httpx.MockTransport(record)
+        )
+
+    async def test_get_all_tickets_success(self):
+        """Probar obtención asíncrona de todas las entradas"""
+        self.use_handler(lambda request: httpx.Response(
+            200, json=[self.sample_ticket_data]))
+
+        result = await self.service.get_all_tickets()
+
+        self.assertEqual(len(result), 1)
+        self.assertIsInstance(result[0], Ticket)
+        self.assertEqual(self.requests[0].url.path, "/tickets")
+
+    async def test_get_all_tickets_error(self):
+        """Probar manejo de error HTTP en get_all_tickets"""
+        self.use_handler(lambda request: httpx.Response(500))
+
+        with self.assertRaises(Exception) as context:
+            await self.service.get_all_tickets()
+
+        self.assertIn("Error al obtener entradas", str(context.exception))
+
+    async def test_iter_all_tickets_stops_on_short_page(self):
+        """Probar el recorrido asíncrono por páginas"""
+        def handler(request):
+            page = int(request.url.params["page"])
+            count = 2 if page == 1 else 1
+            return httpx.Response(200, json=[
+                {**self.sample_ticket_data, 'id': f"{page}-{i}"} for i in range(count)])
+        self.use_handler(handler)
+
+        ids = [ticket.id async for ticket in self.service.iter_all_tickets(2)]
+
+        self.assertEqual(ids, ["1-0", "1-1", "2-0"])
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.requests[1].url.params["pageSize"], "2")
+
+        self.use_handler(lambda request: httpx.Response(500))
+        with self.assertRaises(Exception):
+            await self.service.get_tickets_page(1, 2)
+
+    async def test_get_tickets_by_ids(self):
+        """Probar obtención masiva asíncrona de entradas"""
+        self.use_handler(lambda request: httpx.Response(
+            200, json=[self.sample_ticket_data]))
+
+        result = await self.service.get_tickets_by_ids(["1", "2"])
+
+        self.assertEqual(len(result), 1)
+        self.assertEqual(self.requests[0].url.params["ids"], "1,2")
+
+        self.use_handler(lambda request: httpx.Response(500))
+        with self.assertRaises(Exception):
+            await self.service.get_tickets_by_ids(["1"])
+
+    async def test_get_ticket_by_id_success(self):
+        """Probar obtención asíncrona de ticket por ID"""
+        self.use_handler(lambda request: httpx.Response(
+            200, json=self.sample_ticket_data))
+
+        result = await self.service.get_ticket_by_id("1")
+
+        self.assertEqual(result.id, "1")
+        self.assertEqual(self.requests[0].url.path, "/tickets/1")
+
+    async def test_get_ticket_by_id_not_found(self):
+        """Probar manejo de ticket no encontrado"""
+        self.use_handler(lambda request: httpx.Response(404))
+
+        self.assertIsNone(await self.service.get_ticket_by_id("999"))
+
+    async def test_get_ticket_by_id_connection_error(self):
+        """Probar manejo de errores de conexión"""
+        def fail(request):
+            raise httpx.ConnectError("Network error", request=request)
+        self.use_handler(fail)
+
+        with self.assertRaises(Exception) as context:
+            await self.service.get_ticket_by_id("1")
+
+        self.assertIn("Error al obtener entrada 1", str(context.exception))
+
+    async def test_get_ticket_by_id_coalesces_concurrent_calls(self):
+        """Probar que corrutinas concurrentes por el mismo ID hacen una sola llamada"""
+        import asyncio
+
+        async def slow_response(request):
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json=self.sample_ticket_data)
+        self.use_handler(slow_response)
+
+        results = await asyncio.gather(
+            *[self.service.get_ticket_by_id("1") for _ in range(20)])
+
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(len(results), 20)
+        self.assertEqual(self.service.singleflight.coalesced, 19)
+
+    async def test_update_ticket_success(self):
+        """Probar actualización asíncrona de ticket"""
+        self.use_handler(lambda request: httpx.Response(
+            200, json={**self.sample_ticket_data, 'price': 200.0}))
+
+        result = await self.service.update_ticket("1", {'price': 200.0})
+
+        self.assertEqual(result.price, 200.0)
+        self.assertEqual(self.requests[0].method, "PUT")
+
+    async def test_update_ticket_error(self):
+        """Probar manejo de error en update_ticket"""
+        self.use_handler(lambda request: httpx.Response(500))
+
+        with self.assertRaises(Exception) as context:
+            await self.service.update_ticket("1", {'price': 200.0})
+
+        self.assertIn("Error al actualizar entrada 1", str(context.exception))
+
+    async def test_purchase_ticket_success(self):
+        """Probar compra atómica asíncrona"""
+        self.use_handler(lambda request: httpx.Response(201, json={
+            'ticketId': "1", 'quantity': 5, 'status': 'purchased',
+            'ticket': {**self.sample_ticket_data, 'quantity_available': 45}
+        }))
+
+        result = await self.service.purchase_ticket("1", 5)
+
+        self.assertEqual(result.quantity_available, 45)
+        self.assertEqual(self.requests[0].url.path, "/tickets/purchase")
+
+    async def test_purchase_ticket_not_found_and_sold_out(self):
+        """Probar los rechazos 404 y 409 de la compra"""
+        self.use_handler(lambda request: httpx.Response(404))
+        self.assertIsNone(await self.service.purchase_ticket("999", 1))
+
+        self.use_handler(lambda request: httpx.Response(
+            409, json={'error': 'Not enough tickets available', 'quantityAvailable': 50}))
+        with self.assertRaises(InsufficientTicketsError) as context:
+            await self.service.purchase_ticket("1", 60)
+        self.assertEqual(context.exception.available, 50)
+
+    async def test_purchase_ticket_error(self):
+        """Probar manejo de error en purchase_ticket"""
+        self.use_handler(lambda request: httpx.Response(500))
+
+        with self.assertRaises(Exception) as context:
+            await self.service.purchase_ticket("1", 1)
+
+        self.assertIn("Error al comprar entrada 1", str(context.exception))
+
+    async def test_client_is_created_lazily_with_pool_limits(self):
+        """Probar que el cliente se crea bajo demanda y se puede cerrar"""
+        self.assertIsNone(self.service._client)
+
+        client = self.service.client
+
+        self.assertIs(client, self.service.client)
+        await self.service.aclose()
+        self.assertIsNone(self.service._client)
+
+
+if __name__ == '__main__':
+    unittest.main()
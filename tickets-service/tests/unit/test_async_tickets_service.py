@@ -0,0 +1,230 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+from src.services.async_tickets_service import AsyncTicketsService
+from src.services.database_service import InsufficientTicketsError
+from src.models.ticket import Ticket
+from src.utils.circuit_breaker import CircuitOpenError
+
+
+class TestAsyncTicketsService(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        """Configurar mocks asíncronos y datos de prueba"""
+        self.tickets_service = AsyncTicketsService()
+        self.tickets_service.db_service = AsyncMock()
+
+        self.sample_ticket = Ticket(
+            id="1",
+            type='VIP',
+            price=150.0,
+            quantity_available=50,
+            quantity_sold=10
+        )
+
+    async def test_check_availability(self):
+        """Probar verificación asíncrona de disponibilidad"""
+        self.tickets_service.db_service.get_ticket_by_id.return_value = self.sample_ticket
+
+        self.assertEqual(await self.tickets_service.check_availability("1"), 50)
+
+    async def test_check_availability_non_existing(self):
+        """Probar verificación de disponibilidad para ticket inexistente"""
+        self.tickets_service.db_service.get_ticket_by_id.return_value = None
+
+        self.assertIsNone(await self.tickets_service.check_availability("999"))
+
+    async def test_missing_ticket_is_cached_briefly(self):
+        """Probar que un 404 reciente no vuelve a consultar ni al leer ni al comprar"""
+        self.tickets_service.db_service.get_ticket_by_id.return_value = None
+
+        await self.tickets_service.check_availability("999")
+        self.assertIsNone(await self.tickets_service.check_availability("999"))
+        with self.assertRaises(ValueError):
+            await self.tickets_service.purchase_tickets("999", 1)
+
+        self.tickets_service.db_service.get_ticket_by_id.assert_awaited_once_with("999")
+        self.tickets_service.db_service.purchase_ticket.assert_not_called()
+
+    async def test_check_availability_many(self):
+        """Probar disponibilidad masiva en modo asíncrono"""
+        self.tickets_service.db_service.get_tickets_by_ids.return_value = [
+            self.sample_ticket]
+
+        result = await self.tickets_service.check_availability_many(["1", "2"])
+
+        self.assertEqual(result, {"1": 50, "2": None})
+        self.tickets_service.db_service.get_tickets_by_ids.assert_awaited_once_with(
+            ["1", "2"])
+
+    async def test_purchase_tickets_successful(self):
+        """Probar compra asíncrona exitosa"""
+        self.tickets_service.db_service.purchase_ticket.return_value = Ticket(
+            id="1", type='VIP', price=150.0, quantity_available=45, quantity_sold=15)
+
+        result = await self.tickets_service.purchase_tickets("1", 5)
+
+        self.assertEqual(result["total_amount"], 750.0)
+        self.assertEqual(result["remaining_available"], 45)
+
+    async def test_purchase_tickets_rejections(self):
+        """Probar compra de ticket inexistente y sin stock"""
+        self.tickets_service.db_service.purchase_ticket.return_value = None
+        with self.assertRaises(ValueError):
+            await self.tickets_service.purchase_tickets("999", 5)
+
+        self.tickets_service.db_service.purchase_ticket.side_effect = \
+            InsufficientTicketsError("Not enough tickets available", available=50)
+        with self.assertRaises(ValueError) as context:
+            await self.tickets_service.purchase_tickets("1", 60)
+        self.assertIn("Disponibles: 50, Solicitadas: 60", str(context.exception))
+
+    async def test_get_all_tickets(self):
+        """Probar listado asíncrono de entradas"""
+        self.tickets_service.db_service.get_all_tickets.return_value = [
+            self.sample_ticket]
+
+        result = await self.tickets_service.get_all_tickets()
+
+        self.assertEqual(result, [{**self.sample_ticket.to_dict(), "available": True}])
+
+    async def test_get_tickets_page_and_summaries(self):
+        """Probar listado paginado y recorrido asíncrono de entradas"""
+        self.tickets_service.db_service.get_tickets_page.return_value = [
+            self.sample_ticket]
+
+        page = await self.tickets_service.get_tickets_page(1, 1)
+        self.assertEqual(page["next_page"], 2)
+
+        async def iter_all_tickets(page_size):
+            yield self.sample_ticket
+        self.tickets_service.db_service.iter_all_tickets = iter_all_tickets
+
+        summaries = [s async for s in self.tickets_service.iter_ticket_summaries(10)]
+        self.assertEqual(summaries[0]["id"], "1")
+
+    async def test_get_ticket_info(self):
+        """Probar información de ticket existente e inexistente"""
+        self.tickets_service.db_service.get_ticket_by_id.return_value = self.sample_ticket
+        result = await self.tickets_service.get_ticket_info("1")
+        self.assertFalse(result["sold_out"])
+
+        self.tickets_service.db_service.get_ticket_by_id.return_value = None
+        self.assertIsNone(await self.tickets_service.get_ticket_info("999"))
+
+    async def test_update_ticket_info(self):
+        """Probar actualización asíncrona de información de ticket"""
+        updated_ticket = Ticket(
+            id="1", type='VIP', price=200.0, quantity_available=50, quantity_sold=10)
+        self.tickets_service.db_service.get_ticket_by_id.return_value = self.sample_ticket
+        self.tickets_service.db_service.update_ticket.return_value = updated_ticket
+
+        result = await self.tickets_service.update_ticket_info("1", {"price": 200.0})
+
+        self.assertEqual(result["price"], 200.0)
+        self.tickets_service.db_service.update_ticket.assert_awaited_once_with(
+            "1", {"price": 200.0})
+
+    async def test_update_ticket_info_errors(self):
+        """Probar actualización de ticket inexistente o con campos inválidos"""
+        self.tickets_service.db_service.get_ticket_by_id.return_value = None
+        with self.assertRaises(ValueError):
+            await self.tickets_service.update_ticket_info("999", {"price": 1.0})
+
+        self.tickets_service.db_service.get_ticket_by_id.return_value = self.sample_ticket
+        with self.assertRaises(ValueError):
+            await self.tickets_service.update_ticket_info("1", {"invalid": 1})
+
+    async def test_reads_are_served_from_cache(self):
+        """Probar que la caché también evita lecturas repetidas en modo asíncrono"""
+        self.tickets_service.db_service.get_ticket_by_id.return_value = self.sample_ticket
+
+        await self.tickets_service.check_availability("1")
+        await self.tickets_service.get_ticket_info("1")
+
+        self.tickets_service.db_service.get_ticket_by_id.assert_awaited_once_with(
+            "1")
+
+    async def test_open_circuit_serves_stale_ticket(self):
+        """Probar el respaldo en caché vencida con el circuito abierto"""
+        self.tickets_service.ticket_cache.set("1", self.sample_ticket, ttl=0.0001)
+        self.tickets_service.ticket_cache.stale_ttl = 60
+        await asyncio.sleep(0.001)
+        self.tickets_service.db_service.get_ticket_by_id.side_effect = \
+            CircuitOpenError(3.0)
+
+        self.assertEqual(await self.tickets_service.check_availability("1"), 50)
+        with self.assertRaises(CircuitOpenError):
+            await self.tickets_service.check_availability("2")
+
+    async def test_purchase_tickets_batch(self):
+        """Probar compra en lote asíncrona con un ítem fallido"""
+        async def purchase(ticket_id, quantity):
+            if ticket_id == "9":
+                return None
+            return self.sample_ticket
+        self.tickets_service.db_service.purchase_ticket.side_effect = purchase
+
+        result = await self.tickets_service.purchase_tickets_batch([
+            {"ticket_id": "1", "quantity": 2},
+            {"ticket_id": "9", "quantity": 1}
+        ])
+
+        self.assertFalse(result["success"])
+        self.assertEqual(result["total_quantity"], 2)
+        self.assertEqual(result["total_amount"], 300.0)
+        self.assertIn("Entrada con ID 9 no encontrada", result["items"][1]["error"])
+
+    @patch('src.services.async_tickets_service.Config.AVAILABILITY_STREAM_POLL_INTERVAL', 0.01)
+    async def test_availability_stream_updates(self):
+        """Probar que compras y sondeo llegan a los suscriptores en modo asíncrono"""
+        self.tickets_service.db_service.purchase_ticket.return_value = Ticket(
+            id="1", type='VIP', price=150.0, quantity_available=45, quantity_sold=15)
+        self.tickets_service.db_service.get_tickets_by_ids.return_value = []
+        subscription = self.tickets_service.subscribe_availability(["1"])
+
+        await self.tickets_service.purchase_tickets("1", 5)
+        self.assertEqual(await subscription.wait(0), {"1": 45})
+
+        # el sondeo ya no la encuentra: se informa como inexistente
+        self.assertEqual(await subscription.wait(2), {"1": None})
+
+        poller = self.tickets_service._poller
+        self.tickets_service.unsubscribe_availability(subscription)
+        await asyncio.wait_for(poller, 2)
+        self.assertIsNone(self.tickets_service._poller)
+
+
+    async def test_concurrent_purchases_share_one_decrement(self):
+        """Probar que compras simultáneas de una entrada se agrupan en un decremento"""
+        async def purchase(ticket_id, quantity):
+            await asyncio.sleep(0.01)
+            return Ticket(id=ticket_id, type='VIP', price=150.0,
+                          quantity_available=44, quantity_sold=16)
+        self.tickets_service.db_service.purchase_ticket.side_effect = purchase
+
+        receipts = await asyncio.gather(*[
+            self.tickets_service.purchase_tickets("1", quantity) for quantity in (1, 2, 3)])
+
+        self.assertEqual([r["remaining_available"] for r in receipts], [49, 47, 44])
+        self.assertEqual(
+            [c.args for c in self.tickets_service.db_service.purchase_ticket.call_args_list],
+            [("1", 6)])
+
+    async def test_batched_purchase_allocates_remaining_stock(self):
+        """Probar el reparto en orden de llegada cuando no alcanza para todo el lote"""
+        self.tickets_service.db_service.get_ticket_by_id.return_value = Ticket(
+            id="1", type='VIP', price=150.0, quantity_available=3, quantity_sold=0)
+        self.tickets_service.db_service.purchase_ticket.side_effect = [
+            InsufficientTicketsError("1"),
+            Ticket(id="1", type='VIP', price=150.0, quantity_available=0, quantity_sold=3)]
+
+        outcomes = await self.tickets_service._purchase_in_arrival_order("1", [2, 2, 1])
+
+        self.assertEqual(outcomes[0].quantity_available, 1)
+        self.assertIsInstance(outcomes[1], ValueError)
+        self.assertEqual(outcomes[2].quantity_available, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.batch_queue import AsyncBatchQueue, BatchQueue, QueueFullError
+
+
+class TestBatchQueue(unittest.TestCase):
+
+    def setUp(self):
+        """Configurar una cola cuyo primer lote queda bloqueado hasta liberarlo"""
+        self.batches = []
+        self.observed = []
+        self.release = threading.Event()
+        self.queue = BatchQueue(self.process, max_batch=10, max_pending=50,
+                                observe=lambda size, waits: self.observed.append((size, waits)))
+
+    def process(self, key, items):
+        self.batches.append((key, list(items)))
+        self.release.wait(timeout=2)
+        return [item * 10 if item >= 0 else ValueError(f"item {item}") for item in items]
+
+    def submit_while_first_batch_runs(self, items, key="hot"):
+        """Enviar el primer ítem, esperar a que su lote arranque y encolar el resto"""
+        pool = ThreadPoolExecutor(max_workers=len(items))
+        futures = [pool.submit(self.queue.submit, key, items[0])]
+        deadline = time.time() + 2
+        while not self.batches and time.time() < deadline:
+            time.sleep(0.001)
+        for item in items[1:]:
+            futures.append(pool.submit(self.queue.submit, key, item))
+            # respetar el orden de llegada entre los hilos del pool
+            while self.queue.stats()["pending"] < len(futures) - 1 and time.time() < deadline:
+                time.sleep(0.001)
+        self.release.set()
+        pool.shutdown(wait=True)
+        return futures
+
+    def test_waiting_items_form_the_next_batch_in_order(self):
+        """Probar que lo que llega durante un lote se procesa junto y en orden"""
+        futures = self.submit_while_first_batch_runs(list(range(1, 16)))
+
+        self.assertEqual([f.result() for f in futures], [i * 10 for i in range(1, 16)])
+        self.assertEqual([items for _, items in self.batches],
+                         [[1], list(range(2, 12)), list(range(12, 16))])
+        self.assertEqual([size for size, _ in self.observed], [1, 10, 4])
+        self.assertEqual(self.queue.stats()["largest_batch"], 10)
+        self.assertEqual(self.queue.stats()["keys"], 0)
+
+    def test_errors_are_raised_only_to_their_item(self):
+        """Probar que la excepción de un ítem no afecta a los demás del lote"""
+        futures = self.submit_while_first_batch_runs([1, 2, -1, 3])
+
+        self.assertEqual(futures[1].result(), 20)
+        with self.assertRaises(ValueError):
+            futures[2].result()
+        self.assertEqual(futures[3].result(), 30)
+
+    def test_failing_batch_fails_all_its_items(self):
+        """Probar que si el procesamiento falla, todos los ítems del lote reciben el error"""
+        queue = BatchQueue(lambda key, items: 1 / 0)
+
+        with self.assertRaises(ZeroDivisionError):
+            queue.submit("hot", 1)
+        self.assertEqual(queue.stats()["keys"], 0)
+
+    def test_full_queue_rejects(self):
+        """Probar el rechazo cuando la cola de una clave llegó a su máximo"""
+        queue = BatchQueue(self.process, max_pending=2)
+        pool = ThreadPoolExecutor(max_workers=3)
+        futures = [pool.submit(queue.submit, "hot", 1)]
+        deadline = time.time() + 2
+        while not self.batches and time.time() < deadline:
+            time.sleep(0.001)
+        futures += [pool.submit(queue.submit, "hot", i) for i in (2, 3)]
+        while queue.stats()["pending"] < 2 and time.time() < deadline:
+            time.sleep(0.001)
+
+        with self.assertRaises(QueueFullError):
+            queue.submit("hot", 4)
+        # otra clave tiene su propia cola
+        self.release.set()
+        self.assertEqual(queue.submit("other", 5), 50)
+        pool.shutdown(wait=True)
+        self.assertEqual([f.result() for f in futures], [10, 20, 30])
+        self.assertEqual(queue.stats()["rejected"], 1)
+
+
+class TestAsyncBatchQueue(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_submits_are_batched(self):
+        """Probar que los envíos simultáneos se agrupan en lotes en orden de llegada"""
+        batches = []
+
+        async def process(key, items):
+            batches.append(list(items))
+            await asyncio.sleep(0.01)
+            return [item * 10 for item in items]
+
+        queue = AsyncBatchQueue(process, max_batch=4)
+        results = await asyncio.gather(*[queue.submit("hot", i) for i in range(1, 10)])
+
+        self.assertEqual(results, [i * 10 for i in range(1, 10)])
+        self.assertEqual(batches, [[1, 2, 3, 4], [5, 6, 7, 8], [9]])
+        self.assertEqual(queue.stats()["keys"], 0)
+
+    async def test_errors_and_full_queue(self):
+        """Probar errores por ítem y rechazo con la cola llena"""
+        async def process(key, items):
+            await asyncio.sleep(0.01)
+            return [ValueError("sin stock") if item < 0 else item for item in items]
+
+        queue = AsyncBatchQueue(process, max_pending=3)
+        tasks = [asyncio.ensure_future(queue.submit("hot", i)) for i in (1, -1, 2)]
+        await asyncio.sleep(0)
+
+        with self.assertRaises(QueueFullError):
+            await queue.submit("hot", 3)
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.assertEqual(results[0], 1)
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(results[2], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import patch
+from src.controllers import tickets_controller
+from src.controllers.tickets_controller import idempotency_store, tickets_service
+from tests.benchmarks.bench_hot_paths import compare_results, limiter_cases, measure, route_cases
+
+
+class TestBenchHotPaths(unittest.TestCase):
+
+    def test_compare_flags_regressions_over_threshold(self):
+        """Probar que solo se marcan como regresión los casos más lentos que el umbral"""
+        baseline = {'a': {'best_us': 10.0}, 'b': {'best_us': 10.0}, 'gone': {'best_us': 1.0}}
+        current = {'a': {'best_us': 12.0}, 'b': {'best_us': 10.5}, 'new': {'best_us': 1.0}}
+
+        comparison = compare_results(current, baseline, threshold=0.15)
+
+        self.assertEqual([r['case'] for r in comparison['regressions']], ['a'])
+        self.assertEqual(comparison['regressions'][0]['change'], 0.2)
+        self.assertEqual(comparison['new_cases'], ['new'])
+        self.assertEqual(comparison['missing_cases'], ['gone'])
+
+    def test_compare_reports_improvements(self):
+        """Probar que las mejoras por encima del umbral se informan aparte"""
+        comparison = compare_results(
+            {'a': {'best_us': 5.0}}, {'a': {'best_us': 10.0}}, threshold=0.15)
+
+        self.assertEqual(comparison['regressions'], [])
+        self.assertEqual(comparison['improvements'][0]['change'], -0.5)
+
+    def test_measure_reports_time_per_operation(self):
+        """Probar que measure calibra iteraciones y reporta microsegundos por operación"""
+        result = measure(lambda: None, min_time=0.001, repeats=2)
+
+        self.assertGreaterEqual(result['loops'], 1)
+        self.assertLessEqual(result['best_us'], result['median_us'])
+
+    def test_route_cases_cover_every_blueprint_route(self):
+        """Probar que hay un caso por cada ruta de tickets_bp y que responden sin error"""
+        # route_cases reemplaza el DatabaseService del controlador; se restaura al salir
+        with patch.object(tickets_service, 'db_service'), \
+                patch.object(tickets_controller, 'rate_limiter'):
+            cases = route_cases()
+        tickets_service.ticket_cache.clear()
+        idempotency_store.responses.clear()
+
+        self.assertIn('route.POST /api/tickets/purchase/batch', cases)
+        self.assertIn('route.GET /api/tickets/health', cases)
+        self.assertEqual(len(cases), 13)
+
+    def test_limiter_cases_admit_and_reject(self):
+        """Probar que los casos del limitador ejercitan tanto la admisión como el rechazo"""
+        cases = limiter_cases()
+
+        for kind in ('local', 'shared'):
+            self.assertEqual(cases[f'limiter.{kind} admit'](), 0.0)
+            self.assertGreater(cases[f'limiter.{kind} reject'](), 0.0)
+            self.assertEqual(cases[f'limiter.{kind} 20k clients'](), 0.0)
+        self.assertEqual(cases['limiter.rate_limit_wait'](), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
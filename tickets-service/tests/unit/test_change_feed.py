@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import unittest
+from src.utils.change_feed import AsyncChangeFeed, ChangeFeed, FeedFullError
+
+
+class TestChangeFeed(unittest.TestCase):
+
+    def setUp(self):
+        """Configurar un feed con lugar para dos suscriptores"""
+        self.feed = ChangeFeed(max_subscribers=2)
+
+    def test_publish_reaches_only_interested_subscribers(self):
+        """Probar que cada suscriptor recibe solo las claves que sigue"""
+        first = self.feed.subscribe(["1", "2"])
+        second = self.feed.subscribe(["2"])
+
+        self.assertEqual(self.feed.publish("1", 10), 1)
+        self.assertEqual(self.feed.publish("2", 5), 2)
+        self.assertEqual(self.feed.publish("3", 1), 0)
+
+        self.assertEqual(first.wait(0), {"1": 10, "2": 5})
+        self.assertEqual(second.wait(0), {"2": 5})
+
+    def test_unchanged_value_is_not_delivered(self):
+        """Probar que republicar el mismo valor no despierta a nadie"""
+        subscription = self.feed.subscribe(["1"])
+        self.feed.publish("1", 10)
+        subscription.wait(0)
+
+        self.assertEqual(self.feed.publish("1", 10), 0)
+        self.assertEqual(subscription.wait(0), {})
+
+    def test_pending_changes_collapse_to_latest_value(self):
+        """Probar que un suscriptor lento recibe solo el último valor por clave"""
+        subscription = self.feed.subscribe(["1"])
+        for value in (10, 9, 8):
+            self.feed.publish("1", value)
+
+        self.assertEqual(subscription.wait(0), {"1": 8})
+
+    def test_mark_seen_suppresses_values_already_sent(self):
+        """Probar que la foto inicial no se reenvía como cambio"""
+        subscription = self.feed.subscribe(["1", "2"])
+        self.feed.publish("1", 10)
+        self.feed.publish("2", 4)
+
+        subscription.mark_seen({"1": 10, "2": 5})
+
+        self.assertEqual(subscription.wait(0), {"2": 4})
+
+    def test_wait_wakes_up_on_publish(self):
+        """Probar que wait retorna en cuanto llega un cambio"""
+        subscription = self.feed.subscribe(["1"])
+        timer = threading.Timer(0.05, self.feed.publish, args=("1", 3))
+        timer.start()
+
+        self.assertEqual(subscription.wait(2), {"1": 3})
+        timer.join()
+
+    def test_subscriber_limit(self):
+        """Probar el rechazo de suscriptores por encima del máximo"""
+        first = self.feed.subscribe(["1"])
+        self.feed.subscribe(["1"])
+
+        with self.assertRaises(FeedFullError):
+            self.feed.subscribe(["1"])
+
+        self.feed.unsubscribe(first)
+        self.feed.unsubscribe(first)
+        self.feed.subscribe(["1"])
+        self.assertEqual(self.feed.stats()["rejected"], 1)
+        self.assertEqual(self.feed.subscribers, 2)
+
+    def test_unsubscribe_forgets_unwatched_keys(self):
+        """Probar que las claves sin suscriptores dejan de seguirse"""
+        subscription = self.feed.subscribe(["1", "2"])
+        self.feed.publish("1", 10)
+
+        self.feed.unsubscribe(subscription)
+
+        self.assertEqual(self.feed.watched_keys(), [])
+        self.assertEqual(self.feed.stats(), {
+            "subscribers": 0, "max_subscribers": 2, "watched_keys": 0,
+            "published": 1, "delivered": 1, "rejected": 0})
+
+
+class TestAsyncChangeFeed(unittest.IsolatedAsyncioTestCase):
+
+    async def test_wait_wakes_up_on_publish(self):
+        """Probar que la espera asíncrona retorna al publicarse un cambio"""
+        feed = AsyncChangeFeed()
+        subscription = feed.subscribe(["1"])
+        asyncio.get_running_loop().call_later(0.05, feed.publish, "1", 3)
+
+        self.assertEqual(await subscription.wait(2), {"1": 3})
+        self.assertEqual(await subscription.wait(0.01), {})
+
+    async def test_mark_seen_and_collapse(self):
+        """Probar el plegado de cambios y la foto inicial en modo asíncrono"""
+        feed = AsyncChangeFeed()
+        subscription = feed.subscribe(["1", "2"])
+        subscription.mark_seen({"1": 10})
+        feed.publish("1", 10)
+        feed.publish("2", 7)
+        feed.publish("2", 6)
+
+        self.assertEqual(await subscription.wait(0), {"2": 6})
+
+
+if __name__ == '__main__':
+    unittest.main()
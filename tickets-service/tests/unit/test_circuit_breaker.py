@@ -0,0 +1,170 @@
+import unittest
+from unittest.mock import Mock, patch
+import httpx
+import requests
+from src.services.async_database_service import CircuitBreakerTransport
+from src.services.database_service import CircuitBreakerAdapter
+from src.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    """Reloj controlable para probar el cool-down sin esperar"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fail():
+    raise ConnectionError("database-service caído")
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        """Configurar un breaker pequeño con reloj simulado"""
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            failure_rate_threshold=0.5, window_size=4, min_calls=4,
+            slow_call_seconds=1.0, cooldown=5.0, clock=self.clock)
+
+    def trip(self):
+        for _ in range(4):
+            with self.assertRaises(ConnectionError):
+                self.breaker.call(fail)
+
+    def test_opens_when_failure_rate_reaches_threshold(self):
+        """Probar que el circuito se abre con la tasa de errores configurada"""
+        self.breaker.call(lambda: "ok")
+        self.breaker.call(lambda: "ok")
+        with self.assertRaises(ConnectionError):
+            self.breaker.call(fail)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+        with self.assertRaises(ConnectionError):
+            self.breaker.call(fail)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_slow_calls_count_as_failures(self):
+        """Probar que las llamadas lentas también abren el circuito"""
+        def slow():
+            self.clock.now += 1.5
+            return "ok"
+
+        for _ in range(4):
+            self.assertEqual(self.breaker.call(slow), "ok")
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_open_circuit_fails_fast(self):
+        """Probar que con el circuito abierto no se ejecuta la llamada"""
+        self.trip()
+        fn = Mock()
+
+        with self.assertRaises(CircuitOpenError) as context:
+            self.breaker.call(fn)
+
+        fn.assert_not_called()
+        self.assertEqual(context.exception.retry_after, 5.0)
+        self.assertEqual(self.breaker.stats()["rejected"], 1)
+
+    def test_half_open_probe_success_closes(self):
+        """Probar que tras el cool-down una prueba exitosa cierra el circuito"""
+        self.trip()
+        self.clock.now += 5
+
+        self.assertEqual(self.breaker.call(lambda: "ok"), "ok")
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.breaker.transitions, {
+            CircuitBreaker.OPEN: 1, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.CLOSED: 1})
+
+    def test_half_open_probe_failure_reopens(self):
+        """Probar que una prueba fallida reabre el circuito y reinicia el cool-down"""
+        self.trip()
+        self.clock.now += 5
+
+        with self.assertRaises(ConnectionError):
+            self.breaker.call(fail)
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.stats()["retry_after_seconds"], 5.0)
+
+    def test_half_open_admits_limited_probes(self):
+        """Probar que en semiabierto solo pasa una llamada de prueba a la vez"""
+        self.trip()
+        self.clock.now += 5
+
+        probe = self.breaker.before_call()
+        self.assertTrue(probe)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+        self.breaker.release(probe)
+        self.assertTrue(self.breaker.before_call())
+
+    def test_result_classifier(self):
+        """Probar que is_success permite contar respuestas como fallos"""
+        for _ in range(4):
+            self.breaker.call(lambda: 503, is_success=lambda status: status < 500)
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_disabled_breaker_never_opens(self):
+        """Probar que con ventana 0 el breaker no interviene"""
+        breaker = CircuitBreaker(window_size=0, min_calls=1)
+        for _ in range(10):
+            with self.assertRaises(ConnectionError):
+                breaker.call(fail)
+
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+class TestCircuitBreakerTransports(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(window_size=2, min_calls=2, cooldown=60)
+
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_adapter_counts_server_errors(self, mock_send):
+        """Probar que el adapter de requests cuenta los 5xx y luego falla rápido"""
+        mock_send.return_value = Mock(status_code=503)
+        adapter = CircuitBreakerAdapter(self.breaker)
+        request = requests.Request('GET', 'http://database-service/tickets').prepare()
+
+        adapter.send(request)
+        adapter.send(request)
+        with self.assertRaises(CircuitOpenError):
+            adapter.send(request)
+
+        self.assertEqual(mock_send.call_count, 2)
+
+    async def test_async_transport_ignores_client_errors(self):
+        """Probar que los 404 no abren el circuito en modo asíncrono"""
+        transport = CircuitBreakerTransport(
+            self.breaker, httpx.MockTransport(lambda request: httpx.Response(404)))
+        async with httpx.AsyncClient(transport=transport) as client:
+            for _ in range(3):
+                response = await client.get('http://database-service/tickets/9')
+                self.assertEqual(response.status_code, 404)
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    async def test_async_transport_opens_on_connection_errors(self):
+        """Probar que los errores de conexión abren el circuito en modo asíncrono"""
+        def refuse(request):
+            raise httpx.ConnectError("connection refused")
+
+        transport = CircuitBreakerTransport(self.breaker, httpx.MockTransport(refuse))
+        async with httpx.AsyncClient(transport=transport) as client:
+            for _ in range(2):
+                with self.assertRaises(httpx.ConnectError):
+                    await client.get('http://database-service/tickets')
+            with self.assertRaises(CircuitOpenError):
+                await client.get('http://database-service/tickets')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,8 @@
+import os
 import unittest
 from unittest.mock import Mock, patch
 import requests
-from src.services.database_service import DatabaseService
+from src.services.database_service import DatabaseService, InsufficientTicketsError
 from src.models.ticket import Ticket
 
 
@@ -18,7 +19,7 @@ class TestDatabaseService(unittest.TestCase):
             'quantity_sold': 10
         }
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_all_tickets_success(self, mock_get):
         """Probar obtención exitosa de todas las entradas"""
         mock_response = Mock()
@@ -31,9 +32,10 @@ class TestDatabaseService(unittest.TestCase):
         self.assertEqual(len(result), 1)
         self.assertIsInstance(result[0], Ticket)
         self.assertEqual(result[0].id, "1")
-        mock_get.assert_called_once_with(f"{self.service.base_url}/tickets")
+        mock_get.assert_called_once_with(
+            f"{self.service.base_url}/tickets", timeout=self.service.timeout)
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_all_tickets_request_exception(self, mock_get):
         """Probar manejo de excepción en get_all_tickets"""
         mock_get.side_effect = requests.RequestException("Connection error")
@@ -44,7 +46,71 @@ class TestDatabaseService(unittest.TestCase):
         self.assertIn("Error al obtener entradas", str(context.exception))
         self.assertIn("Connection error", str(context.exception))
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
+    def test_iter_all_tickets_fetches_pages_lazily(self, mock_get):
+        """Probar que las páginas se piden a medida que se consumen"""
+        pages = {
+            1: [self.sample_ticket_data, {**self.sample_ticket_data, 'id': "2"}],
+            2: [{**self.sample_ticket_data, 'id': "3"}]
+        }
+
+        def get_page(url, params, timeout):
+            response = Mock()
+            response.json.return_value = pages[params["page"]]
+            return response
+        mock_get.side_effect = get_page
+
+        tickets = self.service.iter_all_tickets(2)
+        self.assertEqual(next(tickets).id, "1")
+        self.assertEqual(mock_get.call_count, 1)
+
+        self.assertEqual([t.id for t in tickets], ["2", "3"])
+        self.assertEqual(mock_get.call_count, 2)
+        mock_get.assert_called_with(
+            f"{self.service.base_url}/tickets",
+            params={"page": 2, "pageSize": 2},
+            timeout=self.service.timeout
+        )
+
+    @patch('requests.Session.get')
+    def test_get_tickets_page_request_exception(self, mock_get):
+        """Probar manejo de excepción al pedir una página"""
+        mock_get.side_effect = requests.RequestException("Connection error")
+
+        with self.assertRaises(Exception) as context:
+            self.service.get_tickets_page(1, 10)
+
+        self.assertIn("Error al obtener entradas", str(context.exception))
+
+    @patch('requests.Session.get')
+    def test_get_tickets_by_ids_success(self, mock_get):
+        """Probar obtención masiva de entradas en una sola llamada"""
+        mock_response = Mock()
+        mock_response.json.return_value = [
+            self.sample_ticket_data, {**self.sample_ticket_data, 'id': "2"}]
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+
+        result = self.service.get_tickets_by_ids(["1", "2"])
+
+        self.assertEqual([t.id for t in result], ["1", "2"])
+        mock_get.assert_called_once_with(
+            f"{self.service.base_url}/tickets",
+            params={"ids": "1,2", "pageSize": 2},
+            timeout=self.service.timeout
+        )
+
+    @patch('requests.Session.get')
+    def test_get_tickets_by_ids_request_exception(self, mock_get):
+        """Probar manejo de excepción en get_tickets_by_ids"""
+        mock_get.side_effect = requests.RequestException("Connection error")
+
+        with self.assertRaises(Exception) as context:
+            self.service.get_tickets_by_ids(["1"])
+
+        self.assertIn("Error al obtener entradas", str(context.exception))
+
+    @patch('requests.Session.get')
     def test_get_ticket_by_id_success(self, mock_get):
         """Probar obtención exitosa de ticket por ID"""
         mock_response = Mock()
@@ -57,9 +123,10 @@ class TestDatabaseService(unittest.TestCase):
 
         self.assertIsInstance(result, Ticket)
         self.assertEqual(result.id, "1")
-        mock_get.assert_called_once_with(f"{self.service.base_url}/tickets/1")
+        mock_get.assert_called_once_with(
+            f"{self.service.base_url}/tickets/1", timeout=self.service.timeout)
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_ticket_by_id_not_found(self, mock_get):
         """Probar manejo de ticket no encontrado"""
         mock_response = Mock()
@@ -70,9 +137,9 @@ class TestDatabaseService(unittest.TestCase):
 
         self.assertIsNone(result)
         mock_get.assert_called_once_with(
-            f"{self.service.base_url}/tickets/999")
+            f"{self.service.base_url}/tickets/999", timeout=self.service.timeout)
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_ticket_by_id_request_exception(self, mock_get):
         """Probar manejo de excepción en get_ticket_by_id"""
         mock_get.side_effect = requests.RequestException("Network error")
@@ -83,7 +150,36 @@ class TestDatabaseService(unittest.TestCase):
         self.assertIn("Error al obtener entrada 1", str(context.exception))
         self.assertIn("Network error", str(context.exception))
 
-    @patch('requests.put')
+    @patch('requests.Session.get')
+    def test_get_ticket_by_id_coalesces_concurrent_calls(self, mock_get):
+        """Probar que lecturas concurrentes del mismo ID hacen una sola llamada"""
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        release = threading.Event()
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = self.sample_ticket_data
+
+        def slow_get(*args, **kwargs):
+            release.wait(timeout=2)
+            return mock_response
+        mock_get.side_effect = slow_get
+
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            futures = [pool.submit(self.service.get_ticket_by_id, "1")
+                       for _ in range(10)]
+            deadline = time.time() + 2
+            while self.service.singleflight.coalesced < 9 and time.time() < deadline:
+                time.sleep(0.005)
+            release.set()
+            results = [f.result() for f in futures]
+
+        mock_get.assert_called_once()
+        self.assertTrue(all(r.id == "1" for r in results))
+
+    @patch('requests.Session.put')
     def test_update_ticket_success(self, mock_put):
         """Probar actualización exitosa de ticket"""
         mock_response = Mock()
@@ -100,10 +196,11 @@ class TestDatabaseService(unittest.TestCase):
         self.assertEqual(result.price, 200.0)
         mock_put.assert_called_once_with(
             f"{self.service.base_url}/tickets/1",
-            json=update_data
+            json=update_data,
+            timeout=self.service.timeout
         )
 
-    @patch('requests.put')
+    @patch('requests.Session.put')
     def test_update_ticket_request_exception(self, mock_put):
         """Probar manejo de excepción en update_ticket"""
         mock_put.side_effect = requests.RequestException("Update failed")
@@ -114,7 +211,69 @@ class TestDatabaseService(unittest.TestCase):
         self.assertIn("Error al actualizar entrada 1", str(context.exception))
         self.assertIn("Update failed", str(context.exception))
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
+    def test_purchase_ticket_success(self, mock_post):
+        """Probar compra atómica exitosa en una sola llamada"""
+        mock_response = Mock()
+        mock_response.status_code = 201
+        mock_response.json.return_value = {
+            'ticketId': "1",
+            'quantity': 5,
+            'status': 'purchased',
+            'ticket': {**self.sample_ticket_data, 'quantity_available': 45}
+        }
+        mock_response.raise_for_status.return_value = None
+        mock_post.return_value = mock_response
+
+        result = self.service.purchase_ticket("1", 5)
+
+        self.assertIsInstance(result, Ticket)
+        self.assertEqual(result.quantity_available, 45)
+        mock_post.assert_called_once_with(
+            f"{self.service.base_url}/tickets/purchase",
+            json={"ticketId": "1", "quantity": 5},
+            timeout=self.service.timeout
+        )
+
+    @patch('requests.Session.post')
+    def test_purchase_ticket_not_found(self, mock_post):
+        """Probar compra de una entrada inexistente"""
+        mock_response = Mock()
+        mock_response.status_code = 404
+        mock_post.return_value = mock_response
+
+        self.assertIsNone(self.service.purchase_ticket("999", 1))
+
+    @patch('requests.Session.post')
+    def test_purchase_ticket_insufficient_stock(self, mock_post):
+        """Probar rechazo de compra por falta de stock"""
+        mock_response = Mock()
+        mock_response.status_code = 409
+        mock_response.json.return_value = {
+            'error': 'Not enough tickets available', 'quantityAvailable': 50}
+        mock_post.return_value = mock_response
+
+        with self.assertRaises(InsufficientTicketsError) as context:
+            self.service.purchase_ticket("1", 60)
+        self.assertEqual(context.exception.available, 50)
+
+        # un 409 sin stock informado no debe romper el rechazo
+        mock_response.json.return_value = {'error': 'Not enough tickets available'}
+        with self.assertRaises(InsufficientTicketsError) as context:
+            self.service.purchase_ticket("1", 60)
+        self.assertIsNone(context.exception.available)
+
+    @patch('requests.Session.post')
+    def test_purchase_ticket_request_exception(self, mock_post):
+        """Probar manejo de excepción en purchase_ticket"""
+        mock_post.side_effect = requests.RequestException("Purchase failed")
+
+        with self.assertRaises(Exception) as context:
+            self.service.purchase_ticket("1", 1)
+
+        self.assertIn("Error al comprar entrada 1", str(context.exception))
+
+    @patch('requests.Session.post')
     def test_create_ticket_success(self, mock_post):
         """Probar creación exitosa de ticket"""
         mock_response = Mock()
@@ -134,10 +293,11 @@ class TestDatabaseService(unittest.TestCase):
         self.assertEqual(result.type, 'VIP')
         mock_post.assert_called_once_with(
             f"{self.service.base_url}/tickets",
-            json=create_data
+            json=create_data,
+            timeout=self.service.timeout
         )
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_create_ticket_request_exception(self, mock_post):
         """Probar manejo de excepción en create_ticket"""
         mock_post.side_effect = requests.RequestException("Creation failed")
@@ -148,7 +308,7 @@ class TestDatabaseService(unittest.TestCase):
         self.assertIn("Error al crear entrada", str(context.exception))
         self.assertIn("Creation failed", str(context.exception))
 
-    @patch('requests.delete')
+    @patch('requests.Session.delete')
     def test_delete_ticket_success(self, mock_delete):
         """Probar eliminación exitosa de ticket"""
         mock_response = Mock()
@@ -159,9 +319,9 @@ class TestDatabaseService(unittest.TestCase):
 
         self.assertTrue(result)
         mock_delete.assert_called_once_with(
-            f"{self.service.base_url}/tickets/1")
+            f"{self.service.base_url}/tickets/1", timeout=self.service.timeout)
 
-    @patch('requests.delete')
+    @patch('requests.Session.delete')
     def test_delete_ticket_failure(self, mock_delete):
         """Probar fallo en eliminación de ticket"""
         mock_response = Mock()
@@ -172,9 +332,9 @@ class TestDatabaseService(unittest.TestCase):
 
         self.assertFalse(result)
         mock_delete.assert_called_once_with(
-            f"{self.service.base_url}/tickets/999")
+            f"{self.service.base_url}/tickets/999", timeout=self.service.timeout)
 
-    @patch('requests.delete')
+    @patch('requests.Session.delete')
     def test_delete_ticket_request_exception(self, mock_delete):
         """Probar manejo de excepción en delete_ticket"""
         mock_delete.side_effect = requests.RequestException("Delete failed")
@@ -191,6 +351,60 @@ class TestDatabaseService(unittest.TestCase):
         expected_url = "http://localhost:3000"
         self.assertIn("localhost", service.base_url)
 
+    def test_init_configures_pooled_session(self):
+        """Probar que la sesión usa pool keep-alive, timeouts y reintentos de Config"""
+        from src.config import Config
+        service = DatabaseService()
+        adapter = service.session.get_adapter(service.base_url)
+
+        self.assertIsInstance(service.session, requests.Session)
+        self.assertEqual(service.session.headers['Connection'], 'keep-alive')
+        self.assertEqual(adapter._pool_maxsize, Config.DB_POOL_MAXSIZE)
+        self.assertEqual(adapter.max_retries.total, Config.DB_MAX_RETRIES)
+        self.assertNotIn('POST', adapter.max_retries.allowed_methods)
+        self.assertEqual(
+            service.timeout, (Config.DB_CONNECT_TIMEOUT, Config.DB_READ_TIMEOUT))
+
+    @patch('requests.Session.close')
+    def test_close_releases_session(self, mock_close):
+        """Probar que close libera las conexiones del pool"""
+        self.service.close()
+
+        mock_close.assert_called_once()
+
+    def test_reset_after_fork_replaces_connection_state(self):
+        """Probar que tras un fork el servicio arma sesión, breaker y single-flight propios"""
+        session, breaker, singleflight = (
+            self.service.session, self.service.breaker, self.service.singleflight)
+
+        self.service._reset_after_fork()
+
+        self.assertIsNot(self.service.session, session)
+        self.assertIsNot(self.service.breaker, breaker)
+        self.assertIsNot(self.service.singleflight, singleflight)
+        adapter = self.service.session.get_adapter(self.service.base_url)
+        self.assertIs(adapter.breaker, self.service.breaker)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "requiere os.fork")
+    def test_forked_child_gets_new_session(self):
+        """Probar que un proceso hijo no reutiliza el pool heredado del padre"""
+        parent_session_id = id(self.service.session)
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            replaced = id(self.service.session) != parent_session_id
+            os.write(write_fd, b'1' if replaced else b'0')
+            os._exit(0)
+
+        os.close(write_fd)
+        result = os.read(read_fd, 1)
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+
+        self.assertEqual(result, b'1')
+        self.assertEqual(id(self.service.session), parent_session_id)
+
 
 if __name__ == '__main__':
     unittest.main()
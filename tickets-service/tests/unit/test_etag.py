@@ -0,0 +1,30 @@
+import unittest
+from src.models.ticket import Ticket
+from src.services.tickets_service import ticket_etag
+from src.utils.etag import compute_etag
+
+
+class TestETag(unittest.TestCase):
+
+    def test_same_content_same_etag(self):
+        """Probar que el ETag es determinista"""
+        self.assertEqual(compute_etag("1", 50), compute_etag("1", 50))
+        self.assertEqual(compute_etag([{"id": "1"}]), compute_etag([{"id": "1"}]))
+
+    def test_different_content_different_etag(self):
+        """Probar que el ETag distingue valores y límites entre partes"""
+        self.assertNotEqual(compute_etag("1", 50), compute_etag("1", 49))
+        self.assertNotEqual(compute_etag("12", "3"), compute_etag("1", "23"))
+
+    def test_ticket_etag_tracks_quantities(self):
+        """Probar que el ETag de una entrada cambia al venderse"""
+        ticket = Ticket(id="1", type="VIP", price=150.0,
+                        quantity_available=50, quantity_sold=10)
+        sold = Ticket(id="1", type="VIP", price=150.0,
+                      quantity_available=49, quantity_sold=11)
+
+        self.assertNotEqual(ticket_etag(ticket), ticket_etag(sold))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.idempotency import (
+    AsyncIdempotencyStore,
+    IdempotencyKeyMismatchError,
+    IdempotencyStore,
+    StoredResponse
+)
+
+OK = StoredResponse(200, b'{"success": true}', (('Content-Type', 'application/json'),))
+
+
+class TestIdempotencyStore(unittest.TestCase):
+
+    def setUp(self):
+        """Configurar un almacén con reloj controlado"""
+        self.now = 0.0
+        self.store = IdempotencyStore(maxsize=2, ttl=60, clock=lambda: self.now)
+        self.calls = 0
+
+    def execute(self, response=OK):
+        def run():
+            self.calls += 1
+            return response
+        return run
+
+    def test_later_retry_gets_stored_response(self):
+        """Probar que un reintento posterior no vuelve a ejecutar"""
+        first = self.store.run("k1", "body", self.execute())
+        retry = self.store.run("k1", "body", self.execute())
+
+        self.assertEqual(first, (OK, False))
+        self.assertEqual(retry, (OK, True))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.store.stats()["replayed"], 1)
+
+    def test_concurrent_retry_waits_for_original(self):
+        """Probar que un reintento durante la ejecución original espera su resultado"""
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow():
+            self.calls += 1
+            started.set()
+            release.wait(timeout=2)
+            return OK
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            original = pool.submit(self.store.run, "k1", "body", slow)
+            started.wait(timeout=2)
+            retry = pool.submit(self.store.run, "k1", "body", slow)
+            release.set()
+
+        self.assertEqual(original.result(), (OK, False))
+        self.assertEqual(retry.result(), (OK, True))
+        self.assertEqual(self.calls, 1)
+
+    def test_reused_key_with_other_body_is_rejected(self):
+        """Probar que la misma clave con otra solicitud es un error"""
+        self.store.run("k1", "body", self.execute())
+
+        with self.assertRaises(IdempotencyKeyMismatchError):
+            self.store.run("k1", "other body", self.execute())
+        self.assertEqual(self.store.stats()["mismatched"], 1)
+
+    def test_server_errors_are_not_stored(self):
+        """Probar que una respuesta 5xx se puede reintentar"""
+        unavailable = StoredResponse(503, b'{}')
+        self.store.run("k1", "body", self.execute(unavailable))
+
+        self.assertEqual(self.store.run("k1", "body", self.execute()), (OK, False))
+        self.assertEqual(self.calls, 2)
+
+    def test_keys_expire_and_are_bounded(self):
+        """Probar el TTL y el máximo de claves guardadas"""
+        for key in ("k1", "k2", "k3"):
+            self.store.run(key, "body", self.execute())
+        self.assertEqual(self.store.stats()["stored"], 2)
+
+        self.now = 61
+        self.store.run("k3", "body", self.execute())
+        self.assertEqual(self.calls, 4)
+
+
+class TestAsyncIdempotencyStore(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_and_later_retries(self):
+        """Probar reintentos concurrentes y posteriores en modo asíncrono"""
+        store = AsyncIdempotencyStore(maxsize=10, ttl=60)
+        calls = 0
+
+        async def execute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return OK
+
+        results = await asyncio.gather(
+            store.run("k1", "body", execute), store.run("k1", "body", execute))
+        later = await store.run("k1", "body", execute)
+
+        self.assertEqual(results, [(OK, False), (OK, True)])
+        self.assertEqual(later, (OK, True))
+        self.assertEqual(calls, 1)
+        with self.assertRaises(IdempotencyKeyMismatchError):
+            await store.run("k1", "other", execute)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import unittest
+from src.utils.rate_limiter import (
+    RateLimiter,
+    SharedTokenBuckets,
+    TokenBuckets,
+    build_rate_limiter
+)
+
+
+class TestTokenBuckets(unittest.TestCase):
+
+    def setUp(self):
+        """Configurar cubetas de 2 tokens por segundo y ráfaga de 3, con reloj controlado"""
+        self.now = 100.0
+        self.buckets = TokenBuckets(rate=2, burst=3, max_clients=2, clock=lambda: self.now)
+
+    def test_burst_then_wait_for_refill(self):
+        """Probar que se admite la ráfaga y luego se informa la espera hasta el próximo token"""
+        self.assertEqual([self.buckets.acquire("a") for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertEqual(self.buckets.acquire("a"), 0.5)
+
+        self.now += 0.5
+        self.assertEqual(self.buckets.acquire("a"), 0.0)
+
+    def test_refill_is_capped_at_burst(self):
+        """Probar que un cliente inactivo no acumula más que la ráfaga"""
+        self.buckets.acquire("a")
+        self.now += 3600
+        self.assertEqual([self.buckets.acquire("a") for _ in range(4)], [0.0, 0.0, 0.0, 0.5])
+
+    def test_clients_are_independent_and_bounded(self):
+        """Probar cubetas separadas por cliente y la expulsión del menos reciente"""
+        for _ in range(3):
+            self.buckets.acquire("a")
+        self.assertEqual(self.buckets.acquire("b"), 0.0)
+
+        self.buckets.acquire("c")
+        self.assertEqual(len(self.buckets), 2)
+        # "a" fue expulsado: vuelve con la cubeta llena
+        self.assertEqual(self.buckets.acquire("a"), 0.0)
+
+
+class TestSharedTokenBuckets(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 100.0
+        # clave fija: los casilleros de cada cliente no dependen de la corrida
+        self.buckets = SharedTokenBuckets(rate=2, burst=3, slots=64, clock=lambda: self.now,
+                                          secret=b'test-secret')
+
+    def test_same_decisions_as_local_buckets(self):
+        """Probar que la tabla compartida aplica el mismo algoritmo"""
+        self.assertNotEqual(self.buckets._offset("a"), self.buckets._offset("b"))
+        self.assertEqual([self.buckets.acquire("a") for _ in range(4)], [0.0, 0.0, 0.0, 0.5])
+        self.assertEqual(self.buckets.acquire("b"), 0.0)
+        self.assertEqual(len(self.buckets), 2)
+
+        self.buckets.clear()
+        self.assertEqual(len(self.buckets), 0)
+        self.assertEqual(self.buckets.acquire("a"), 0.0)
+
+    def test_clients_in_the_same_slot_share_the_bucket(self):
+        """Probar que dos clientes en el mismo casillero se limitan juntos"""
+        buckets = SharedTokenBuckets(rate=2, burst=3, slots=1, clock=lambda: self.now)
+
+        self.assertEqual([buckets.acquire("a") for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertEqual(buckets.acquire("b"), 0.5)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "requiere fork")
+    def test_state_is_shared_with_forked_workers(self):
+        """Probar que un proceso hijo consume de la misma cubeta que el padre"""
+        self.buckets.acquire("a")
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if self.buckets.acquire("a") == 0.0 else 1)
+        _, status = os.waitpid(pid, 0)
+
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        self.assertEqual(self.buckets.acquire("a"), 0.0)
+        self.assertEqual(self.buckets.acquire("a"), 0.5)
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_counts_decisions_per_route_class(self):
+        """Probar los contadores de admitidas y limitadas por clase"""
+        limiter = RateLimiter({'purchase': TokenBuckets(1, 1), 'read': TokenBuckets(10, 10)})
+
+        limiter.check('purchase', 'ip:1')
+        limiter.check('purchase', 'ip:1')
+        limiter.check('read', 'ip:1')
+
+        stats = limiter.stats()
+        self.assertEqual((stats['purchase']['allowed'], stats['purchase']['limited']), (1, 1))
+        self.assertEqual((stats['read']['allowed'], stats['read']['limited']), (1, 0))
+
+        limiter.reset()
+        self.assertEqual(limiter.check('purchase', 'ip:1'), 0.0)
+
+    def test_build_skips_unlimited_classes(self):
+        """Probar que una tasa 0 deja la clase sin límite y sin clases no hay limitador"""
+        limiter = build_rate_limiter({'purchase': (5, 10), 'read': (0, 100)}, 100)
+
+        self.assertEqual(list(limiter.buckets), ['purchase'])
+        self.assertIsNone(build_rate_limiter({'read': (0, 100)}, 100))
+        self.assertIsInstance(
+            build_rate_limiter({'read': (5, 10)}, 100, shared=True).buckets['read'],
+            SharedTokenBuckets)
+
+
+if __name__ == '__main__':
+    unittest.main()
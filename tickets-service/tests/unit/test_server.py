@@ -0,0 +1,51 @@
+import unittest
+from unittest.mock import patch
+from src.config import Config
+from src.server import GunicornServer, gunicorn_options, hypercorn_config
+
+
+class TestServerConfig(unittest.TestCase):
+
+    def test_gunicorn_options_come_from_config(self):
+        """Probar que workers, hilos, reciclado y apagado ordenado salen de Config"""
+        options = gunicorn_options()
+
+        self.assertEqual(options['bind'], f"0.0.0.0:{Config.PORT}")
+        self.assertEqual(options['workers'], Config.WEB_CONCURRENCY)
+        self.assertEqual(options['worker_class'], 'gthread')
+        self.assertEqual(options['threads'], Config.WEB_THREADS)
+        self.assertEqual(options['max_requests'], Config.WEB_MAX_REQUESTS)
+        self.assertEqual(options['max_requests_jitter'], Config.WEB_MAX_REQUESTS_JITTER)
+        self.assertEqual(options['graceful_timeout'], Config.WEB_GRACEFUL_TIMEOUT)
+        self.assertEqual(options['preload_app'], Config.WEB_PRELOAD_APP)
+
+    @patch.object(Config, 'WEB_THREADS', 8)
+    @patch.object(Config, 'WEB_CONCURRENCY', 3)
+    def test_gunicorn_server_applies_options(self):
+        """Probar que las opciones se cargan en la configuración de gunicorn"""
+        server = GunicornServer(gunicorn_options())
+
+        self.assertEqual(server.cfg.workers, 3)
+        self.assertEqual(server.cfg.threads, 8)
+        self.assertEqual(server.cfg.worker_class_str, 'gthread')
+
+    def test_gunicorn_server_loads_flask_app(self):
+        """Probar que cada worker carga la app Flask"""
+        app = GunicornServer(gunicorn_options()).load()
+
+        self.assertIn('tickets', app.blueprints)
+
+    @patch.object(Config, 'WEB_CONCURRENCY', 4)
+    def test_hypercorn_config_uses_workers(self):
+        """Probar que el modo async usa varios workers de hypercorn"""
+        config = hypercorn_config()
+
+        self.assertEqual(config.application_path, 'src.asgi:app')
+        self.assertEqual(config.workers, 4)
+        self.assertEqual(config.bind, [f"0.0.0.0:{Config.PORT}"])
+        self.assertEqual(config.max_requests, Config.WEB_MAX_REQUESTS)
+        self.assertEqual(config.graceful_timeout, Config.WEB_GRACEFUL_TIMEOUT)
+
+
+if __name__ == '__main__':
+    unittest.main()
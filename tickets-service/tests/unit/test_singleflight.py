@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.singleflight import SingleFlight, AsyncSingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+        """Configurar el coalescedor para hilos"""
+        self.flight = SingleFlight()
+        self.calls = 0
+        self.release = threading.Event()
+
+    def slow_fetch(self):
+        self.calls += 1
+        self.release.wait(timeout=2)
+        return {"id": "1"}
+
+    def run_concurrently(self, key, fn, workers=20):
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self.flight.do, key, fn) for _ in range(workers)]
+            # esperar a que todos los hilos estén esperando la llamada en curso
+            deadline = time.time() + 2
+            while self.flight.coalesced < workers - 1 and time.time() < deadline:
+                time.sleep(0.005)
+            self.release.set()
+            return futures
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Probar que llamadas concurrentes con la misma clave se agrupan"""
+        futures = self.run_concurrently("ticket-1", self.slow_fetch)
+        results = [f.result() for f in futures]
+
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual(self.flight.stats(), {
+            "executions": 1, "coalesced": 19, "in_flight": 0})
+
+    def test_exception_is_shared_with_waiters(self):
+        """Probar que todos los que esperan reciben la misma excepción"""
+        def failing():
+            self.release.wait(timeout=2)
+            raise RuntimeError("upstream down")
+
+        futures = self.run_concurrently("ticket-1", failing, workers=5)
+
+        for future in futures:
+            with self.assertRaises(RuntimeError):
+                future.result()
+        self.assertEqual(self.flight.executions, 1)
+
+    def test_sequential_calls_are_not_coalesced(self):
+        """Probar que llamadas no solapadas ejecutan cada una su función"""
+        self.release.set()
+        self.flight.do("ticket-1", self.slow_fetch)
+        self.flight.do("ticket-1", self.slow_fetch)
+
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(self.flight.coalesced, 0)
+
+    def test_different_keys_do_not_share(self):
+        """Probar que claves distintas no se agrupan"""
+        self.release.set()
+        self.flight.do("ticket-1", self.slow_fetch)
+        self.flight.do("ticket-2", self.slow_fetch)
+
+        self.assertEqual(self.flight.executions, 2)
+
+
+class TestAsyncSingleFlight(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_coroutines_share_one_execution(self):
+        """Probar coalescencia de corrutinas concurrentes"""
+        flight = AsyncSingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"id": "1"}
+
+        results = await asyncio.gather(
+            *[flight.do("ticket-1", fetch) for _ in range(50)])
+
+        self.assertEqual(calls, 1)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual(flight.stats(), {
+            "executions": 1, "coalesced": 49, "in_flight": 0})
+
+    async def test_exception_is_shared_with_waiters(self):
+        """Probar propagación de errores a todas las corrutinas"""
+        flight = AsyncSingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(
+            *[flight.do("k", failing) for _ in range(3)], return_exceptions=True)
+
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(flight.executions, 1)
+
+    async def test_leader_cancellation_cancels_waiters(self):
+        """Probar que cancelar la llamada en curso cancela a quienes esperan"""
+        flight = AsyncSingleFlight()
+
+        async def slow():
+            await asyncio.sleep(10)
+
+        leader = asyncio.create_task(flight.do("k", slow))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.do("k", slow))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
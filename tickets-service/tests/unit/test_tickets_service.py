@@ -1,7 +1,10 @@
 import unittest
 from unittest.mock import Mock, patch
-from src.services.tickets_service import TicketsService
+from src.services.tickets_service import TicketsService, split_batch_purchase, sync_stream_limit
 from src.models.ticket import Ticket
+from src.services.database_service import InsufficientTicketsError
+from src.utils.circuit_breaker import CircuitOpenError
+from src.utils.ttl_cache import TTLCache
 
 
 class TestTicketsService(unittest.TestCase):
@@ -39,6 +42,39 @@ class TestTicketsService(unittest.TestCase):
         self.tickets_service.db_service.get_ticket_by_id.assert_called_once_with(
             "999")
 
+    def test_check_availability_many_uses_one_bulk_call(self):
+        """Probar disponibilidad masiva con una sola consulta a database-service"""
+        other_ticket = Ticket(id="2", type='GENERAL', price=50.0,
+                              quantity_available=0, quantity_sold=100)
+        self.tickets_service.db_service.get_tickets_by_ids.return_value = [
+            self.sample_ticket, other_ticket]
+
+        result = self.tickets_service.check_availability_many(["1", "2", "999", "1"])
+
+        self.assertEqual(result, {"1": 50, "2": 0, "999": None})
+        self.tickets_service.db_service.get_tickets_by_ids.assert_called_once_with(
+            ["1", "2", "999"])
+        self.tickets_service.db_service.get_ticket_by_id.assert_not_called()
+
+    def test_check_availability_many_only_fetches_cache_misses(self):
+        """Probar que la consulta masiva reutiliza las entradas en caché"""
+        self.tickets_service.ticket_cache.set("1", self.sample_ticket)
+        self.tickets_service.db_service.get_tickets_by_ids.return_value = []
+
+        result = self.tickets_service.check_availability_many(["1", "2"])
+
+        self.assertEqual(result, {"1": 50, "2": None})
+        self.tickets_service.db_service.get_tickets_by_ids.assert_called_once_with(
+            ["2"])
+
+    def test_check_availability_many_all_cached(self):
+        """Probar que no hay llamada upstream si todo está en caché"""
+        self.tickets_service.ticket_cache.set("1", self.sample_ticket)
+
+        self.assertEqual(
+            self.tickets_service.check_availability_many(["1"]), {"1": 50})
+        self.tickets_service.db_service.get_tickets_by_ids.assert_not_called()
+
     def test_check_availability_for_quantity_sufficient(self):
         """Probar verificación de disponibilidad para cantidad suficiente"""
         self.tickets_service.db_service.get_ticket_by_id.return_value = self.sample_ticket
@@ -73,8 +109,7 @@ class TestTicketsService(unittest.TestCase):
             quantity_sold=15
         )
 
-        self.tickets_service.db_service.get_ticket_by_id.return_value = self.sample_ticket
-        self.tickets_service.db_service.update_ticket.return_value = updated_ticket
+        self.tickets_service.db_service.purchase_ticket.return_value = updated_ticket
 
         result = self.tickets_service.purchase_tickets("1", 5)
 
@@ -88,18 +123,14 @@ class TestTicketsService(unittest.TestCase):
         }
         self.assertEqual(result, expected)
 
-        self.tickets_service.db_service.get_ticket_by_id.assert_called_once_with(
-            "1")
-        expected_update_data = {
-            "quantityAvailable": 45,
-            "quantitySold": 15
-        }
-        self.tickets_service.db_service.update_ticket.assert_called_once_with(
-            "1", expected_update_data)
+        self.tickets_service.db_service.purchase_ticket.assert_called_once_with(
+            "1", 5)
+        self.tickets_service.db_service.get_ticket_by_id.assert_not_called()
+        self.tickets_service.db_service.update_ticket.assert_not_called()
 
     def test_purchase_tickets_non_existing(self):
         """Probar compra de tickets inexistentes"""
-        self.tickets_service.db_service.get_ticket_by_id.return_value = None
+        self.tickets_service.db_service.purchase_ticket.return_value = None
 
         with self.assertRaises(ValueError) as context:
             self.tickets_service.purchase_tickets("999", 5)
@@ -109,13 +140,15 @@ class TestTicketsService(unittest.TestCase):
 
     def test_purchase_tickets_insufficient_quantity(self):
         """Probar compra con cantidad insuficiente"""
-        self.tickets_service.db_service.get_ticket_by_id.return_value = self.sample_ticket
+        self.tickets_service.db_service.purchase_ticket.side_effect = \
+            InsufficientTicketsError("Not enough tickets available", available=50)
 
         with self.assertRaises(ValueError) as context:
             self.tickets_service.purchase_tickets("1", 60)
 
-        self.assertIn("No hay suficientes entradas disponibles",
-                      str(context.exception))
+        self.assertEqual(str(context.exception),
+                         "No hay suficientes entradas disponibles. "
+                         "Disponibles: 50, Solicitadas: 60")
 
     def test_get_all_tickets(self):
         """Probar obtención de todas las entradas"""
@@ -132,6 +165,32 @@ class TestTicketsService(unittest.TestCase):
         ]
         self.assertEqual(result, expected)
 
+    def test_get_tickets_page(self):
+        """Probar página del listado con indicador de página siguiente"""
+        self.tickets_service.db_service.get_tickets_page.return_value = [
+            self.sample_ticket, self.sample_ticket]
+
+        result = self.tickets_service.get_tickets_page(3, 2)
+
+        self.assertEqual(len(result["items"]), 2)
+        self.assertEqual(result["page"], 3)
+        self.assertEqual(result["next_page"], 4)
+
+        self.tickets_service.db_service.get_tickets_page.return_value = [
+            self.sample_ticket]
+        self.assertIsNone(self.tickets_service.get_tickets_page(4, 2)["next_page"])
+
+    def test_iter_ticket_summaries(self):
+        """Probar el recorrido perezoso del listado completo"""
+        self.tickets_service.db_service.iter_all_tickets.return_value = iter(
+            [self.sample_ticket])
+
+        result = list(self.tickets_service.iter_ticket_summaries(50))
+
+        self.assertEqual(result[0]["id"], "1")
+        self.assertTrue(result[0]["available"])
+        self.tickets_service.db_service.iter_all_tickets.assert_called_once_with(50)
+
     def test_get_ticket_info_existing(self):
         """Probar obtención de información de ticket existente"""
         self.tickets_service.db_service.get_ticket_by_id.return_value = self.sample_ticket
@@ -196,6 +255,287 @@ class TestTicketsService(unittest.TestCase):
         self.assertIn("No se proporcionaron campos válidos",
                       str(context.exception))
 
+    def test_repeated_reads_are_served_from_cache(self):
+        """Probar que lecturas repetidas no vuelven a database-service"""
+        self.tickets_service.db_service.get_ticket_by_id.return_value = self.sample_ticket
+
+        self.tickets_service.check_availability("1")
+        self.tickets_service.get_ticket_info("1")
+        self.tickets_service.check_availability("1")
+
+        self.tickets_service.db_service.get_ticket_by_id.assert_called_once_with(
+            "1")
+        self.assertEqual(self.tickets_service.ticket_cache.hits, 2)
+
+    def test_missing_ticket_is_cached_briefly(self):
+        """Probar que un 404 se recuerda hasta que vence el TTL de la caché negativa"""
+        now = [0.0]
+        self.tickets_service.missing_tickets = TTLCache(10, 5.0, clock=lambda: now[0])
+        self.tickets_service.db_service.get_ticket_by_id.return_value = None
+
+        self.assertIsNone(self.tickets_service.check_availability("999"))
+        self.assertIsNone(self.tickets_service.check_availability("999"))
+        self.assertEqual(self.tickets_service.db_service.get_ticket_by_id.call_count, 1)
+
+        now[0] = 5.0
+        self.tickets_service.check_availability("999")
+        self.assertEqual(self.tickets_service.db_service.get_ticket_by_id.call_count, 2)
+
+    def test_missing_ticket_skips_purchase_and_bulk_reads(self):
+        """Probar que un ID inexistente recordado no sale del proceso al comprar ni en lecturas masivas"""
+        self.tickets_service.db_service.get_tickets_by_ids.return_value = [self.sample_ticket]
+
+        first = self.tickets_service.check_availability_many(["1", "999"])
+        second = self.tickets_service.check_availability_many(["999"])
+        with self.assertRaises(ValueError):
+            self.tickets_service.purchase_tickets("999", 1)
+
+        self.assertEqual(first, {"1": 50, "999": None})
+        self.assertEqual(second, {"999": None})
+        self.tickets_service.db_service.get_tickets_by_ids.assert_called_once_with(["1", "999"])
+        self.tickets_service.db_service.purchase_ticket.assert_not_called()
+
+    def test_written_ticket_leaves_negative_cache(self):
+        """Probar que una entrada escrita deja de considerarse inexistente"""
+        self.tickets_service.db_service.get_ticket_by_id.return_value = None
+        self.tickets_service.get_ticket("1")
+
+        self.tickets_service._store_ticket("1", self.sample_ticket)
+
+        self.assertIsNone(self.tickets_service.missing_tickets.get("1"))
+        self.assertEqual(self.tickets_service.get_ticket("1"), self.sample_ticket)
+
+    def test_update_refreshes_cached_ticket(self):
+        """Probar que update_ticket_info deja la versión nueva en caché"""
+        updated_ticket = Ticket(
+            id="1", type='VIP', price=200.0, quantity_available=50, quantity_sold=10)
+        self.tickets_service.db_service.get_ticket_by_id.return_value = self.sample_ticket
+        self.tickets_service.db_service.update_ticket.return_value = updated_ticket
+
+        self.tickets_service.update_ticket_info("1", {"price": 200.0})
+        result = self.tickets_service.get_ticket_info("1")
+
+        self.assertEqual(result["price"], 200.0)
+        self.tickets_service.db_service.get_ticket_by_id.assert_called_once_with(
+            "1")
+
+    def test_purchase_refreshes_cached_availability(self):
+        """Probar que una compra actualiza la disponibilidad en caché"""
+        self.tickets_service.db_service.get_ticket_by_id.return_value = self.sample_ticket
+        self.tickets_service.db_service.purchase_ticket.return_value = Ticket(
+            id="1", type='VIP', price=150.0, quantity_available=45, quantity_sold=15)
+
+        self.assertEqual(self.tickets_service.check_availability("1"), 50)
+        self.tickets_service.purchase_tickets("1", 5)
+
+        self.assertEqual(self.tickets_service.check_availability("1"), 45)
+        self.tickets_service.db_service.get_ticket_by_id.assert_called_once_with(
+            "1")
+
+    def test_purchase_of_missing_ticket_invalidates_cache(self):
+        """Probar que una compra sobre una entrada eliminada la saca de caché"""
+        self.tickets_service.ticket_cache.set("1", self.sample_ticket)
+        self.tickets_service.db_service.purchase_ticket.return_value = None
+
+        with self.assertRaises(ValueError):
+            self.tickets_service.purchase_tickets("1", 1)
+
+        self.assertIsNone(self.tickets_service.ticket_cache.get("1"))
+
+    def test_open_circuit_serves_stale_ticket(self):
+        """Probar que con el circuito abierto se sirve la versión vencida en caché"""
+        self.tickets_service.ticket_cache = TTLCache(10, 1, clock=lambda: self.now,
+                                                     stale_ttl=30)
+        self.now = 0
+        self.tickets_service.ticket_cache.set("1", self.sample_ticket)
+        self.now = 5
+        self.tickets_service.db_service.get_ticket_by_id.side_effect = \
+            CircuitOpenError(3.0)
+        self.tickets_service.db_service.get_tickets_by_ids.side_effect = \
+            CircuitOpenError(3.0)
+
+        self.assertEqual(self.tickets_service.check_availability("1"), 50)
+        self.assertEqual(self.tickets_service.check_availability_many(["1"]), {"1": 50})
+
+        with self.assertRaises(CircuitOpenError):
+            self.tickets_service.check_availability("2")
+        with self.assertRaises(CircuitOpenError):
+            self.tickets_service.check_availability_many(["1", "2"])
+
+    def test_purchase_tickets_batch_all_successful(self):
+        """Probar compra en lote con todos los ítems exitosos"""
+        def purchase(ticket_id, quantity):
+            return Ticket(id=ticket_id, type='VIP', price=100.0,
+                          quantity_available=10, quantity_sold=quantity)
+        self.tickets_service.db_service.purchase_ticket.side_effect = purchase
+
+        result = self.tickets_service.purchase_tickets_batch([
+            {"ticket_id": "1", "quantity": 2},
+            {"ticket_id": "2", "quantity": 3}
+        ])
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["total_quantity"], 5)
+        self.assertEqual(result["total_amount"], 500.0)
+        self.assertEqual(result["failed_count"], 0)
+        self.assertEqual([i["ticket_id"] for i in result["items"]], ["1", "2"])
+        self.assertEqual(
+            self.tickets_service.db_service.purchase_ticket.call_count, 2)
+
+    def test_purchase_tickets_batch_partial_failure(self):
+        """Probar que un ítem fallido no impide comprar los demás"""
+        def purchase(ticket_id, quantity):
+            if ticket_id == "2":
+                raise InsufficientTicketsError("Not enough tickets available")
+            if ticket_id == "3":
+                raise Exception("timeout")
+            return self.sample_ticket
+        self.tickets_service.db_service.purchase_ticket.side_effect = purchase
+
+        result = self.tickets_service.purchase_tickets_batch([
+            {"ticket_id": "1", "quantity": 1},
+            {"ticket_id": "2", "quantity": 99},
+            {"ticket_id": "3", "quantity": 1}
+        ])
+
+        self.assertFalse(result["success"])
+        self.assertEqual(result["failed_count"], 2)
+        self.assertEqual(result["total_amount"], 150.0)
+        self.assertTrue(result["items"][0]["success"])
+        self.assertIn("No hay suficientes entradas disponibles",
+                      result["items"][1]["error"])
+        self.assertIn("Error al procesar la compra", result["items"][2]["error"])
+
+    @patch('src.services.tickets_service.Config.AVAILABILITY_STREAM_POLL_INTERVAL', 0)
+    def test_purchase_publishes_availability_change(self):
+        """Probar que una compra avisa a los streams que siguen la entrada"""
+        self.tickets_service.db_service.purchase_ticket.return_value = Ticket(
+            id="1", type='VIP', price=150.0, quantity_available=45, quantity_sold=15)
+        subscription = self.tickets_service.subscribe_availability(["1"])
+
+        self.tickets_service.purchase_tickets("1", 5)
+
+        self.assertEqual(subscription.wait(0), {"1": 45})
+        self.tickets_service.unsubscribe_availability(subscription)
+        self.assertEqual(self.tickets_service.availability_feed.subscribers, 0)
+
+    @patch('src.services.tickets_service.Config.AVAILABILITY_STREAM_POLL_INTERVAL', 0)
+    @patch('src.services.tickets_service.Config.AVAILABILITY_STREAM_MAX_SUBSCRIBERS', 500)
+    def test_sync_streams_leave_a_worker_thread_free(self):
+        """Probar que en modo sync los streams nunca ocupan todos los hilos del worker"""
+        from src.utils.change_feed import FeedFullError
+        with patch('src.services.tickets_service.Config.WEB_THREADS', 4):
+            self.assertEqual(sync_stream_limit(), 3)
+            service = TicketsService()
+        with patch('src.services.tickets_service.Config.WEB_THREADS', 1):
+            self.assertEqual(sync_stream_limit(), 0)
+
+        subscriptions = [service.subscribe_availability(["1"]) for _ in range(3)]
+        with self.assertRaises(FeedFullError):
+            service.subscribe_availability(["1"])
+        for subscription in subscriptions:
+            service.unsubscribe_availability(subscription)
+
+    @patch('src.services.tickets_service.Config.AVAILABILITY_STREAM_POLL_INTERVAL', 0)
+    def test_refresh_watched_availability(self):
+        """Probar que el sondeo publica cambios hechos fuera de este proceso"""
+        subscription = self.tickets_service.subscribe_availability(["1", "2"])
+        subscription.mark_seen({"1": 50, "2": 3})
+        self.tickets_service.db_service.get_tickets_by_ids.return_value = [
+            Ticket(id="1", type='VIP', price=150.0, quantity_available=40, quantity_sold=20)]
+
+        self.tickets_service.refresh_watched_availability()
+
+        self.assertEqual(subscription.wait(0), {"1": 40, "2": None})
+        self.assertEqual(self.tickets_service.ticket_cache.get("1").quantity_available, 40)
+        (requested,), _ = self.tickets_service.db_service.get_tickets_by_ids.call_args
+        self.assertCountEqual(requested, ["1", "2"])
+
+    @patch('src.services.tickets_service.Config.AVAILABILITY_STREAM_POLL_INTERVAL', 0.01)
+    def test_availability_poller_stops_without_subscribers(self):
+        """Probar que el hilo de sondeo termina al irse el último suscriptor"""
+        self.tickets_service.db_service.get_tickets_by_ids.return_value = [self.sample_ticket]
+        subscription = self.tickets_service.subscribe_availability(["1"])
+        poller = self.tickets_service._poller
+
+        self.assertEqual(subscription.wait(2), {"1": 50})
+        self.tickets_service.unsubscribe_availability(subscription)
+        poller.join(timeout=2)
+
+        self.assertFalse(poller.is_alive())
+        self.assertIsNone(self.tickets_service._poller)
+
+
+    def test_split_batch_purchase_in_arrival_order(self):
+        """Probar que cada compra de un lote ve el stock como si fueran en serie"""
+        final = Ticket(id="1", type='VIP', price=150.0, quantity_available=40, quantity_sold=20)
+
+        views = split_batch_purchase(final, [2, 5, 3])
+
+        self.assertEqual([v.quantity_available for v in views], [48, 43, 40])
+        self.assertEqual([v.quantity_sold for v in views], [12, 17, 20])
+        self.assertEqual(final.quantity_available, 40)
+
+    def test_batched_purchase_uses_one_decrement(self):
+        """Probar que un lote con stock suficiente hace un solo decremento"""
+        self.tickets_service.db_service.purchase_ticket.return_value = Ticket(
+            id="1", type='VIP', price=150.0, quantity_available=40, quantity_sold=20)
+
+        outcomes = self.tickets_service._purchase_in_arrival_order("1", [2, 5, 3])
+
+        self.tickets_service.db_service.purchase_ticket.assert_called_once_with("1", 10)
+        self.assertEqual([o.quantity_available for o in outcomes], [48, 43, 40])
+        self.assertEqual(self.tickets_service.ticket_cache.get("1").quantity_available, 40)
+
+    def test_batched_purchase_allocates_remaining_stock_in_order(self):
+        """Probar que sin stock para todo el lote se reparte en orden de llegada"""
+        stock = {"available": 4}
+
+        def current(ticket_id):
+            return Ticket(id=ticket_id, type='VIP', price=150.0,
+                          quantity_available=stock["available"], quantity_sold=0)
+
+        def purchase(ticket_id, quantity):
+            if quantity > stock["available"]:
+                raise InsufficientTicketsError(ticket_id)
+            stock["available"] -= quantity
+            return current(ticket_id)
+        self.tickets_service.db_service.get_ticket_by_id.side_effect = current
+        self.tickets_service.db_service.purchase_ticket.side_effect = purchase
+
+        outcomes = self.tickets_service._purchase_in_arrival_order(
+            "1", [1, 1, 3, 1, 2, 1])
+
+        self.assertEqual([o.quantity_available if isinstance(o, Ticket) else str(o)
+                          for o in outcomes],
+                         [3, 2, "No hay suficientes entradas disponibles. Disponibles: 2, Solicitadas: 3",
+                          1, "No hay suficientes entradas disponibles. Disponibles: 1, Solicitadas: 2",
+                          0])
+        # el lote entero no entra; lo que entra se compra con un segundo decremento
+        self.assertEqual(
+            [c.args[1] for c in self.tickets_service.db_service.purchase_ticket.call_args_list],
+            [9, 4])
+
+    def test_batched_purchase_falls_back_to_single_purchases(self):
+        """Probar que si el stock cambió entre la lectura y el decremento se compra de a una"""
+        self.tickets_service.db_service.get_ticket_by_id.return_value = self.sample_ticket
+        self.tickets_service.db_service.purchase_ticket.side_effect = [
+            InsufficientTicketsError("1"), InsufficientTicketsError("1"),
+            self.sample_ticket, InsufficientTicketsError("1")]
+
+        outcomes = self.tickets_service._purchase_in_arrival_order("1", [2, 3])
+
+        self.assertIs(outcomes[0], self.sample_ticket)
+        self.assertIsInstance(outcomes[1], ValueError)
+
+    def test_batched_purchase_of_missing_ticket(self):
+        """Probar que todas las compras de un lote fallan si la entrada no existe"""
+        self.tickets_service.db_service.purchase_ticket.return_value = None
+
+        outcomes = self.tickets_service._purchase_in_arrival_order("9", [1, 2])
+
+        self.assertEqual([str(o) for o in outcomes], ["Entrada con ID 9 no encontrada"] * 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+from src.utils.ttl_cache import TTLCache
+
+
+class FakeClock:
+    """Reloj controlable para probar expiraciones sin esperar"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def setUp(self):
+        """Configurar una caché pequeña con reloj simulado"""
+        self.clock = FakeClock()
+        self.cache = TTLCache(maxsize=2, ttl=10, clock=self.clock)
+
+    def test_get_miss_and_hit(self):
+        """Probar contadores de fallos y aciertos"""
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.set("a", 1)
+
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_entries_expire_after_ttl(self):
+        """Probar que una entrada vencida se descarta y cuenta como fallo"""
+        self.cache.set("a", 1)
+        self.clock.now = 10
+
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.expirations, 1)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_stale_entries_kept_for_fallback(self):
+        """Probar que con stale_ttl una entrada vencida sigue disponible en get_stale"""
+        cache = TTLCache(maxsize=2, ttl=10, clock=self.clock, stale_ttl=5)
+        cache.set("a", 1)
+        self.clock.now = 12
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get_stale("a"), 1)
+
+        self.clock.now = 15
+        self.assertIsNone(cache.get_stale("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_custom_ttl_per_entry(self):
+        """Probar TTL específico por entrada"""
+        self.cache.set("a", 1, ttl=1)
+        self.clock.now = 2
+
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_lru_eviction(self):
+        """Probar que se expulsa la entrada menos usada recientemente"""
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_set_existing_key_refreshes_value(self):
+        """Probar que reescribir una clave actualiza valor y vigencia"""
+        self.cache.set("a", 1)
+        self.clock.now = 8
+        self.cache.set("a", 2)
+        self.clock.now = 15
+
+        self.assertEqual(self.cache.get("a"), 2)
+        self.assertEqual(self.cache.evictions, 0)
+
+    def test_invalidate_and_clear(self):
+        """Probar invalidación puntual y limpieza total"""
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+
+        self.cache.invalidate("a")
+        self.assertIsNone(self.cache.get("a"))
+
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_disabled_cache_stores_nothing(self):
+        """Probar que maxsize 0 deshabilita la caché"""
+        cache = TTLCache(maxsize=0, ttl=10)
+        cache.set("a", 1)
+
+        self.assertFalse(cache.enabled)
+        self.assertIsNone(cache.get("a"))
+
+    def test_stats(self):
+        """Probar el resumen de contadores"""
+        self.cache.set("a", 1)
+        self.cache.get("a")
+
+        stats = self.cache.stats()
+
+        self.assertEqual(stats["size"], 1)
+        self.assertEqual(stats["maxsize"], 2)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["evictions"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()